@@ -3,13 +3,17 @@ from .models import (
     DoctrineContractDecision,
     DoctrineItemRule,
     DoctrineLocation,
+    DoctrineMatchBackfillCheckpoint,
     DoctrineMatchProfile,
     DoctrineMatchResult,
     DoctrineQuantityTolerance,
+    DoctrineStockSnapshot,
     DoctrineSubstitutionRule,
     DoctrineSystem,
     FittingClaimAutoClearance,
+    FittingPriceSnapshot,
     SubsidyConfig,
+    SubsidyItemPriceHistory,
 )
 
 
@@ -209,6 +213,86 @@ class DoctrineContractDecisionAdmin(SubsidyAdminMixin, admin.ModelAdmin):
         return request.user.has_perm("aasubsidy.subsidy_admin")
 
 
+@admin.register(DoctrineMatchBackfillCheckpoint)
+class DoctrineMatchBackfillCheckpointAdmin(SubsidyAdminMixin, admin.ModelAdmin):
+    list_display = ("signature", "last_pk", "processed", "deferred", "updated_at", "completed_at")
+    list_filter = ("deferred", "completed_at")
+    search_fields = ("signature",)
+    readonly_fields = ("signature", "filters_json", "status_counts_json", "source_counts_json", "created_at", "updated_at")
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+
+@admin.register(FittingPriceSnapshot)
+class FittingPriceSnapshotAdmin(SubsidyAdminMixin, admin.ModelAdmin):
+    list_display = ("fitting", "basis_total", "total_volume_m3", "suggested", "built_at")
+    search_fields = ("fitting__name",)
+    raw_id_fields = ("fitting",)
+    readonly_fields = ("config_version", "built_at")
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+
+@admin.register(DoctrineStockSnapshot)
+class DoctrineStockSnapshotAdmin(SubsidyAdminMixin, admin.ModelAdmin):
+    list_display = ("system", "fitting_name", "stock_requested", "stock_available", "stock_needed", "built_at")
+    list_filter = ("system",)
+    search_fields = ("fitting_name", "doctrine_name")
+    raw_id_fields = ("fitting",)
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+
+@admin.register(SubsidyItemPriceHistory)
+class SubsidyItemPriceHistoryAdmin(SubsidyAdminMixin, admin.ModelAdmin):
+    list_display = ("eve_type", "buy", "sell", "recorded_at")
+    list_filter = ("recorded_at",)
+    search_fields = ("eve_type__name", "eve_type__id")
+    raw_id_fields = ("eve_type",)
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.has_perm("aasubsidy.subsidy_admin")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(FittingClaimAutoClearance)
 class FittingClaimAutoClearanceAdmin(SubsidyAdminMixin, admin.ModelAdmin):
     list_display = ("contract", "user", "fitting", "quantity", "created_at")
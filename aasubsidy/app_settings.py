@@ -7,3 +7,58 @@ SUBSIDY_ESI_COMPATIBILITY_DATE = getattr(
     "SUBSIDY_ESI_COMPATIBILITY_DATE",
     "2025-08-26",
 )
+SUBSIDY_MATCH_EVIDENCE_COMPRESSION = getattr(
+    settings,
+    "SUBSIDY_MATCH_EVIDENCE_COMPRESSION",
+    True,
+)
+SUBSIDY_MATCH_PROFILE_LOG_LEVEL = getattr(
+    settings,
+    "SUBSIDY_MATCH_PROFILE_LOG_LEVEL",
+    "DEBUG",
+)
+SUBSIDY_PRICE_HOT_CONTRACT_DAYS = getattr(
+    settings,
+    "SUBSIDY_PRICE_HOT_CONTRACT_DAYS",
+    30,
+)
+SUBSIDY_PRICE_COLD_REFRESH_DAYS = getattr(
+    settings,
+    "SUBSIDY_PRICE_COLD_REFRESH_DAYS",
+    28,
+)
+SUBSIDY_PRICE_COLD_BATCH_SIZE = getattr(
+    settings,
+    "SUBSIDY_PRICE_COLD_BATCH_SIZE",
+    5000,
+)
+SUBSIDY_PRICE_PROVIDERS = getattr(
+    settings,
+    "SUBSIDY_PRICE_PROVIDERS",
+    ["janice", "fuzzwork"],
+)
+SUBSIDY_PRICE_FETCH_WORKERS = getattr(
+    settings,
+    "SUBSIDY_PRICE_FETCH_WORKERS",
+    4,
+)
+SUBSIDY_PRICE_AT_CONTRACT_DATE = getattr(
+    settings,
+    "SUBSIDY_PRICE_AT_CONTRACT_DATE",
+    False,
+)
+SUBSIDY_PRICE_CACHE_TIMEOUT = getattr(
+    settings,
+    "SUBSIDY_PRICE_CACHE_TIMEOUT",
+    6 * 60 * 60,
+)
+SUBSIDY_MAIN_CACHE_TIMEOUT = getattr(
+    settings,
+    "SUBSIDY_MAIN_CACHE_TIMEOUT",
+    5 * 60,
+)
+SUBSIDY_REMATCH_LOOKBACK_DAYS = getattr(
+    settings,
+    "SUBSIDY_REMATCH_LOOKBACK_DAYS",
+    30,
+)
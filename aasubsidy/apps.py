@@ -13,3 +13,7 @@ class AasubsidyConfig(AppConfig):
     name = "aasubsidy"
     label = "aasubsidy"
     verbose_name = f"AA Subsidy v{__version__}"
+
+    def ready(self):
+        # AA Subsidy App
+        from aasubsidy import signals  # noqa: F401
@@ -0,0 +1,4 @@
+"""Synthetic-data benchmarks for the doctrine matcher.
+
+Run with ``python -m aasubsidy.benchmarks`` (no database required).
+"""
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from decimal import Decimal
+
+from ..contracts.matching import (
+    DRONE_CATEGORY_ID,
+    ContractItemData,
+    FittingDefinition,
+    ItemRuleData,
+    MatchProfileData,
+    QuantityToleranceData,
+    SubstitutionRuleData,
+    TypeInfo,
+)
+
+AMMO_MARKET_GROUP_ID = 11
+DRONE_MARKET_GROUP_ID = 157
+MODULE_MARKET_GROUP_ID = 9
+HULL_TYPE_BASE = 10_000
+MODULE_TYPE_BASE = 20_000
+MODULES_PER_GROUP = 4  # meta variants per module group: T2, compact, faction, deadspace
+RACKS = (("high", 4, 8), ("mid", 3, 6), ("low", 3, 6))
+
+
+@dataclass(slots=True)
+class ContractNoise:
+    """How far generated contracts drift from the doctrine they were built from."""
+
+    missing_rate: float = 0.05
+    substitute_rate: float = 0.10
+    quantity_drift_rate: float = 0.10
+    extra_items: int = 1
+    cargo_copies: int = 1
+    wrong_hull_rate: float = 0.02
+
+
+@dataclass(slots=True)
+class Scenario:
+    definitions: dict[int, FittingDefinition]
+    contracts: dict[int, dict[int, ContractItemData]]
+    source_fit_ids: dict[int, int]
+
+
+class DoctrineGenerator:
+    """Seeded generator for doctrines and contracts with controllable noise.
+
+    Types are laid out in groups of meta variants so group, meta family and
+    specific substitution rules have real alternatives to match against.
+    Several doctrines share each hull, as in production, so contracts are
+    scored against more than one candidate.
+    """
+
+    def __init__(self, seed: int = 0, *, module_groups: int = 120, hulls: int = 12) -> None:
+        self.rng = random.Random(seed)
+        self.type_info: dict[int, TypeInfo] = {}
+        self.hull_ids = [HULL_TYPE_BASE + index for index in range(hulls)]
+        for hull_id in self.hull_ids:
+            self.type_info[hull_id] = TypeInfo(hull_id, f"Hull {hull_id}", category_id=6, group_id=25)
+        self.module_groups: list[list[int]] = []
+        for group_index in range(module_groups):
+            kind = "ammo" if group_index % 10 == 8 else "drone" if group_index % 10 == 9 else "module"
+            group_id = 1_000 + group_index
+            variants = []
+            for variant in range(MODULES_PER_GROUP):
+                type_id = MODULE_TYPE_BASE + group_index * MODULES_PER_GROUP + variant
+                self.type_info[type_id] = TypeInfo(
+                    type_id=type_id,
+                    name=f"{kind.title()} {group_index} {('II', 'Compact', 'Navy', 'Deadspace')[variant]}",
+                    category_id=DRONE_CATEGORY_ID if kind == "drone" else 8 if kind == "ammo" else 7,
+                    group_id=group_id,
+                    market_group_id=(
+                        DRONE_MARKET_GROUP_ID if kind == "drone"
+                        else AMMO_MARKET_GROUP_ID if kind == "ammo"
+                        else MODULE_MARKET_GROUP_ID
+                    ),
+                    meta_level=(5, 1, 8, 12)[variant],
+                    meta_group_id=(2, 1, 4, 6)[variant],
+                    faction=variant == 2,
+                )
+                variants.append(type_id)
+            self.module_groups.append(variants)
+
+    def _groups_of_kind(self, kind: str) -> list[list[int]]:
+        offset = {"ammo": 8, "drone": 9}.get(kind)
+        return [
+            variants
+            for index, variants in enumerate(self.module_groups)
+            if (index % 10 == offset if offset is not None else index % 10 < 8)
+        ]
+
+    def doctrine(self, fitting_id: int, hull_id: int | None = None) -> FittingDefinition:
+        rng = self.rng
+        hull_id = hull_id or rng.choice(self.hull_ids)
+        rules = [ItemRuleData(hull_id, self.type_info[hull_id].name, category="hull", sort_order=-1000, is_hull=True)]
+        substitutions: list[SubstitutionRuleData] = []
+        tolerances: dict[int, list[QuantityToleranceData]] = {}
+
+        rack_sizes = [rng.randint(low, high) // 2 + 1 for _, low, high in RACKS]
+        picked = iter(rng.sample(self._groups_of_kind("module"), sum(rack_sizes)))
+        for sort_order, ((slot, _, _), size) in enumerate(zip(RACKS, rack_sizes)):
+            for variants in [next(picked) for _ in range(size)]:
+                type_id = variants[0]
+                rules.append(ItemRuleData(
+                    type_id,
+                    self.type_info[type_id].name,
+                    expected_quantity=rng.randint(1, 3),
+                    slot_label=slot,
+                    sort_order=sort_order,
+                ))
+                roll = rng.random()
+                if roll < 0.25:
+                    substitutions.append(SubstitutionRuleData(type_id, rule_type="group", penalty_points=Decimal("0.50")))
+                elif roll < 0.40:
+                    substitutions.append(SubstitutionRuleData(type_id, rule_type="specific", allowed_type_id=variants[1]))
+                elif roll < 0.50:
+                    substitutions.append(SubstitutionRuleData(
+                        type_id, rule_type="meta_family", max_meta_level_delta=4, penalty_points=Decimal("0.25"),
+                    ))
+
+        for variants in rng.sample(self._groups_of_kind("drone"), rng.randint(1, 3)):
+            type_id = variants[0]
+            rules.append(ItemRuleData(
+                type_id, self.type_info[type_id].name, expected_quantity=rng.choice([2, 5, 10]), category="drone", sort_order=5,
+            ))
+        for variants in rng.sample(self._groups_of_kind("ammo"), rng.randint(1, 4)):
+            type_id = variants[0]
+            rules.append(ItemRuleData(
+                type_id,
+                self.type_info[type_id].name,
+                rule_kind="cargo",
+                quantity_mode=rng.choice(["exact", "minimum"]),
+                expected_quantity=rng.choice([500, 1000, 2500, 5000]),
+                category="cargo",
+                sort_order=6,
+            ))
+            if rng.random() < 0.5:
+                tolerances[type_id] = [QuantityToleranceData(type_id, mode="percent", lower_bound=-25, upper_bound=50)]
+
+        profile = MatchProfileData(
+            fitting_id=fitting_id,
+            allow_meta_variants=rng.random() < 0.3,
+            allow_faction_variants=rng.random() < 0.2,
+        )
+        return FittingDefinition(
+            fitting_id=fitting_id,
+            fitting_name=f"Doctrine {fitting_id}",
+            ship_type_id=hull_id,
+            ship_type_name=self.type_info[hull_id].name,
+            profile=profile,
+            item_rules=rules,
+            substitutions=substitutions,
+            quantity_tolerances=tolerances,
+            type_info=self.type_info,
+        )
+
+    def doctrines(self, count: int) -> dict[int, FittingDefinition]:
+        return {
+            fitting_id: self.doctrine(fitting_id, self.hull_ids[fitting_id % len(self.hull_ids)])
+            for fitting_id in range(1, count + 1)
+        }
+
+    def contract(self, definition: FittingDefinition, noise: ContractNoise | None = None) -> dict[int, ContractItemData]:
+        noise = noise or ContractNoise()
+        rng = self.rng
+        items: dict[int, ContractItemData] = {}
+
+        def add(type_id: int, qty: int) -> None:
+            if qty <= 0:
+                return
+            info = self.type_info[type_id]
+            item = items.get(type_id)
+            if item is None:
+                item = items[type_id] = ContractItemData(
+                    type_id=type_id,
+                    name=info.name,
+                    category_id=info.category_id,
+                    group_id=info.group_id,
+                    market_group_id=info.market_group_id,
+                    meta_level=info.meta_level,
+                    meta_group_id=info.meta_group_id,
+                    faction=info.faction,
+                )
+            item.included_qty += qty
+
+        copies = max(int(noise.cargo_copies), 1)
+        for rule in definition.item_rules:
+            qty = max(rule.expected_quantity, rule.min_quantity) * copies
+            if rule.is_hull:
+                hull_id = rule.expected_type_id
+                if rng.random() < noise.wrong_hull_rate:
+                    hull_id = rng.choice([other for other in self.hull_ids if other != hull_id] or [hull_id])
+                add(hull_id, copies)
+                continue
+            if rng.random() < noise.missing_rate:
+                continue
+            if rng.random() < noise.quantity_drift_rate:
+                qty = max(qty + rng.choice([-1, 1]) * max(qty // 5, 1), 0)
+            type_id = rule.expected_type_id
+            if rng.random() < noise.substitute_rate:
+                group = next((variants for variants in self.module_groups if type_id in variants), [type_id])
+                type_id = rng.choice(group[1:] or group)
+            add(type_id, qty)
+
+        for _ in range(max(int(noise.extra_items), 0)):
+            add(rng.choice(rng.choice(self.module_groups)), rng.randint(1, 3))
+        return items
+
+    def scenario(self, *, doctrines: int, contracts: int, noise: ContractNoise | None = None) -> Scenario:
+        definitions = self.doctrines(doctrines)
+        fit_ids = sorted(definitions)
+        contract_map: dict[int, dict[int, ContractItemData]] = {}
+        source_fit_ids: dict[int, int] = {}
+        for contract_id in range(1, contracts + 1):
+            fit_id = self.rng.choice(fit_ids)
+            contract_map[contract_id] = self.contract(definitions[fit_id], noise)
+            source_fit_ids[contract_id] = fit_id
+        return Scenario(definitions=definitions, contracts=contract_map, source_fit_ids=source_fit_ids)
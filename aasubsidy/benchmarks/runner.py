@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable
+
+from ..contracts.matching import (
+    MATCH_ENGINE_VERSION,
+    _CONSUMABLE_MARKET_GROUPS_CACHE,
+    _evaluate_contracts,
+    _select_result,
+    evaluate_contract_against_definition,
+)
+from .generator import MODULE_MARKET_GROUP_ID, ContractNoise, DoctrineGenerator, Scenario
+
+SCALES: dict[str, dict[str, int]] = {
+    "small": {"doctrines": 10, "contracts": 100},
+    "medium": {"doctrines": 40, "contracts": 1_000},
+    "large": {"doctrines": 120, "contracts": 5_000},
+}
+DEFAULT_REGRESSION_THRESHOLD = 0.15
+CLOSE_MATCH_THRESHOLD = Decimal("70.00")
+
+
+def _candidate_pairs(scenario: Scenario) -> list[tuple[dict, Any]]:
+    by_hull: dict[int, list[Any]] = {}
+    for definition in scenario.definitions.values():
+        by_hull.setdefault(definition.ship_type_id, []).append(definition)
+    pairs = []
+    for items in scenario.contracts.values():
+        for type_id in items:
+            pairs.extend((items, definition) for definition in by_hull.get(type_id, []))
+    return pairs
+
+
+def _time(func: Callable[[], Any], *, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _entry(timings: list[float], ops: int) -> dict[str, Any]:
+    best = min(timings)
+    return {
+        "ops": ops,
+        "repeat": len(timings),
+        "min_s": round(best, 6),
+        "median_s": round(statistics.median(timings), 6),
+        "per_op_us": round(best / ops * 1_000_000, 3) if ops else 0.0,
+    }
+
+
+def bench_scale(scale: str, *, seed: int = 0, repeat: int = 5, noise: ContractNoise | None = None) -> dict[str, dict[str, Any]]:
+    sizes = SCALES[scale]
+    # Production resolves non-consumable market groups once via the SDE and caches them.
+    _CONSUMABLE_MARKET_GROUPS_CACHE.setdefault(MODULE_MARKET_GROUP_ID, False)
+    scenario = DoctrineGenerator(seed).scenario(doctrines=sizes["doctrines"], contracts=sizes["contracts"], noise=noise)
+    pairs = _candidate_pairs(scenario)
+    grouped: dict[int, list[Any]] = {}
+    for items, definition in pairs:
+        grouped.setdefault(id(items), []).append(evaluate_contract_against_definition(items, definition))
+    candidate_sets = [grouped.get(id(items), []) for items in scenario.contracts.values()]
+
+    def evaluate_all():
+        for items, definition in pairs:
+            evaluate_contract_against_definition(items, definition)
+
+    def select_all():
+        for contract_id, candidates in enumerate(candidate_sets, start=1):
+            _select_result(contract_id=contract_id, candidates=candidates, close_match_threshold=CLOSE_MATCH_THRESHOLD)
+
+    contract_ids = list(scenario.contracts)
+
+    def pipeline():
+        _evaluate_contracts(
+            contract_ids,
+            contract_items_map=scenario.contracts,
+            fit_definitions=scenario.definitions,
+            forced_fit_ids={},
+            latest_decisions={},
+            preview_fit_id=None,
+            close_match_threshold=CLOSE_MATCH_THRESHOLD,
+        )
+
+    return {
+        f"evaluate_contract_against_definition[{scale}]": _entry(_time(evaluate_all, repeat=repeat), len(pairs)),
+        f"_select_result[{scale}]": _entry(_time(select_all, repeat=repeat), len(candidate_sets)),
+        f"match_contracts_pipeline[{scale}]": _entry(_time(pipeline, repeat=repeat), len(contract_ids)),
+    }
+
+
+def run_suite(scales: list[str], *, seed: int = 0, repeat: int = 5, noise: ContractNoise | None = None) -> dict[str, Any]:
+    benchmarks: dict[str, dict[str, Any]] = {}
+    for scale in scales:
+        benchmarks.update(bench_scale(scale, seed=seed, repeat=repeat, noise=noise))
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "engine_version": MATCH_ENGINE_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "scales": {scale: SCALES[scale] for scale in scales},
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], *, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> list[dict[str, Any]]:
+    """Per-benchmark ratio of current to baseline ``per_op_us`` (above 1.0 is slower)."""
+    rows = []
+    for name, entry in current.get("benchmarks", {}).items():
+        base = (baseline.get("benchmarks") or {}).get(name)
+        if not base or not base.get("per_op_us"):
+            continue
+        ratio = entry["per_op_us"] / base["per_op_us"]
+        rows.append({
+            "name": name,
+            "baseline_us": base["per_op_us"],
+            "current_us": entry["per_op_us"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = ContractNoise()
+    parser = argparse.ArgumentParser(
+        prog="python -m aasubsidy.benchmarks",
+        description="Time the doctrine matcher on synthetic doctrines and contracts.",
+    )
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES), help="Scale to run; repeatable. Defaults to small and medium.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--missing-rate", type=float, default=defaults.missing_rate)
+    parser.add_argument("--substitute-rate", type=float, default=defaults.substitute_rate)
+    parser.add_argument("--extra-items", type=int, default=defaults.extra_items)
+    parser.add_argument("--cargo-copies", type=int, default=defaults.cargo_copies)
+    parser.add_argument("--save", type=Path, help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", type=Path, help="Compare against a saved baseline JSON.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="Allowed slowdown before a regression is reported.")
+    args = parser.parse_args(argv)
+
+    noise = ContractNoise(
+        missing_rate=args.missing_rate,
+        substitute_rate=args.substitute_rate,
+        extra_items=args.extra_items,
+        cargo_copies=args.cargo_copies,
+    )
+    current = run_suite(args.scale or ["small", "medium"], seed=args.seed, repeat=args.repeat, noise=noise)
+    for name, entry in current["benchmarks"].items():
+        print(f"{name:<52}{entry['per_op_us']:>12.1f} us/op  {entry['min_s'] * 1000:>10.1f} ms  ops={entry['ops']}")
+
+    if args.save:
+        args.save.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n")
+        print(f"saved {args.save}")
+
+    if args.baseline:
+        rows = compare(current, json.loads(args.baseline.read_text()), threshold=args.threshold)
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<52}{row['baseline_us']:>10.1f} -> {row['current_us']:>10.1f} us/op  x{row['ratio']:.3f}{flag}")
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
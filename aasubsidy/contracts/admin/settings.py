@@ -1,12 +1,20 @@
+import json
+
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from decimal import Decimal, InvalidOperation
 
 from aasubsidy.models import SubsidyConfig
 
+from ..config_preview import preview_pricing_config
+from ..pricing import parse_rounding_increment
+
 
 class SubsidySettingsAdminView(PermissionRequiredMixin, View):
     permission_required = "aasubsidy.subsidy_admin"
@@ -31,7 +39,7 @@ class SubsidySettingsAdminView(PermissionRequiredMixin, View):
             cfg.price_basis = "buy" if basis == "buy" else "sell"
             cfg.pct_over_basis = Decimal(pct_raw)
             cfg.cost_per_m3 = Decimal(m3_raw)
-            cfg.rounding_increment = int(incr_raw)
+            cfg.rounding_increment = parse_rounding_increment(incr_raw)
             cfg.corporation_id = int(corp_id_raw)
             cfg.ignore_zero_isk_contracts = ignore_zero_isk_contracts
             cfg.ignored_contract_title_patterns = ignored_contract_title_patterns
@@ -54,3 +62,24 @@ class SubsidySettingsAdminView(PermissionRequiredMixin, View):
         except (InvalidOperation, ValueError):
             messages.error(request, "Invalid values provided. Please review and try again.")
         return redirect(reverse("aasubsidy:subsidy_settings"))
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class SubsidySettingsPreviewView(PermissionRequiredMixin, View):
+    """Suggested subsidy deltas for unsaved pricing settings. Nothing is saved."""
+
+    permission_required = "aasubsidy.subsidy_admin"
+
+    def post(self, request):
+        try:
+            payload = json.loads(request.body.decode("utf-8") or "{}")
+        except Exception:
+            return JsonResponse({"ok": False, "error": "invalid_json"}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({"ok": False, "error": "invalid_json"}, status=400)
+
+        try:
+            result = preview_pricing_config(payload)
+        except ValueError as exc:
+            return JsonResponse({"ok": False, "error": "invalid_params", "message": str(exc)}, status=400)
+        return JsonResponse({"ok": True, "result": result})
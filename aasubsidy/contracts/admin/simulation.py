@@ -0,0 +1,73 @@
+import json
+
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import TemplateView, View
+
+from fittings.models import Fitting
+
+from ...models import DoctrineMatchProfile, SubsidyConfig
+from ..simulation import DEFAULT_DAYS, DEFAULT_LIMIT, parse_proposal, simulate
+
+MAX_DAYS = 365
+MAX_LIMIT = 20000
+
+
+class SimulationAdminView(PermissionRequiredMixin, TemplateView):
+    """What-if page for doctrine profile, substitution and threshold changes."""
+
+    permission_required = "aasubsidy.subsidy_admin"
+    template_name = "admin/simulation.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        profiles = {profile.fitting_id: profile for profile in DoctrineMatchProfile.objects.all()}
+        fittings = []
+        for fit in Fitting.objects.select_related("ship_type").order_by("name", "pk"):
+            profile = profiles.get(fit.pk)
+            fittings.append({
+                "id": fit.pk,
+                "name": fit.name,
+                "ship_name": getattr(fit.ship_type, "name", ""),
+                "enabled": getattr(profile, "enabled", True),
+                "auto_match_threshold": getattr(profile, "auto_match_threshold", 95),
+                "review_threshold": getattr(profile, "review_threshold", 80),
+                "allow_meta_variants": getattr(profile, "allow_meta_variants", False),
+                "allow_faction_variants": getattr(profile, "allow_faction_variants", False),
+            })
+        context["fittings"] = fittings
+        context["cfg"] = SubsidyConfig.active()
+        context["default_days"] = DEFAULT_DAYS
+        context["default_limit"] = DEFAULT_LIMIT
+        return context
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class SimulationRunView(PermissionRequiredMixin, View):
+    """Run a proposal against recent contracts and return the diff summary. Nothing is saved."""
+
+    permission_required = "aasubsidy.subsidy_admin"
+
+    def post(self, request):
+        try:
+            payload = json.loads(request.body.decode("utf-8") or "{}")
+        except Exception:
+            return JsonResponse({"ok": False, "error": "invalid_json"}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({"ok": False, "error": "invalid_json"}, status=400)
+
+        try:
+            days = min(max(int(payload.get("days") or DEFAULT_DAYS), 1), MAX_DAYS)
+            limit = min(max(int(payload.get("limit") or DEFAULT_LIMIT), 1), MAX_LIMIT)
+            proposal = parse_proposal(payload)
+        except (TypeError, ValueError, AttributeError) as exc:
+            return JsonResponse({"ok": False, "error": "invalid_params", "message": str(exc)}, status=400)
+        if proposal.is_empty:
+            return JsonResponse(
+                {"ok": False, "error": "invalid_params", "message": "The proposal does not change anything."},
+                status=400,
+            )
+
+        return JsonResponse({"ok": True, "result": simulate(proposal, days=days, limit=limit)})
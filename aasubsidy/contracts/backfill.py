@@ -0,0 +1,168 @@
+"""Resumable, keyset-paginated doctrine match backfills."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_CHUNK_SIZE = 250
+DEFAULT_SLICE_SIZE = 2000
+
+
+@dataclass(slots=True)
+class SliceResult:
+    processed: int = 0
+    last_pk: int = 0
+    completed: bool = False
+    status_counts: Counter = field(default_factory=Counter)
+    source_counts: Counter = field(default_factory=Counter)
+
+
+def filter_signature(requested: dict[str, Any]) -> str:
+    """Stable hash of the filters as requested (``--days`` stays relative, not resolved)."""
+    canonical = json.dumps(requested, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def resolve_filters(requested: dict[str, Any]) -> dict[str, Any]:
+    """Pin relative filters to absolute bounds so a resumed run scans the same window."""
+    from ..tasks import _effective_corporation_id
+
+    resolved = dict(requested)
+    resolved["corporation_id"] = _effective_corporation_id(requested.get("corporation_id"))
+    days = resolved.pop("days", None)
+    if days is not None:
+        now = timezone.now()
+        resolved["date_from"] = (now - timedelta(days=int(days))).isoformat()
+        resolved["date_to"] = now.isoformat()
+    return resolved
+
+
+def backfill_queryset(filters: dict[str, Any]):
+    """Contract queryset for resolved filters, ordered by primary key for keyset paging."""
+    from corptools.models import CorporateContract
+
+    from ..models import SubsidyConfig
+    from .filters import apply_contract_exclusions
+
+    cfg = SubsidyConfig.active()
+    qs = CorporateContract.objects.filter(
+        corporation__corporation__corporation_id=int(filters["corporation_id"])
+    ).order_by("id")
+    qs = apply_contract_exclusions(qs, cfg)
+    if filters.get("date_from"):
+        qs = qs.filter(date_issued__gte=parse_datetime(filters["date_from"]))
+    if filters.get("date_to"):
+        qs = qs.filter(date_issued__lte=parse_datetime(filters["date_to"]))
+    statuses = filters.get("statuses") or []
+    if statuses:
+        status_q = Q()
+        for status in statuses:
+            status_q |= Q(status__iexact=status)
+        qs = qs.filter(status_q)
+    if filters.get("contract_id_start") is not None:
+        qs = qs.filter(contract_id__gte=int(filters["contract_id_start"]))
+    if filters.get("contract_id_end") is not None:
+        qs = qs.filter(contract_id__lte=int(filters["contract_id_end"]))
+    if filters.get("only_missing_results"):
+        qs = qs.filter(doctrine_match__isnull=True)
+    return qs
+
+
+def get_checkpoint(requested: dict[str, Any], *, resume: bool):
+    """The checkpoint for these filters, started fresh unless ``resume`` is set."""
+    from ..models import DoctrineMatchBackfillCheckpoint
+
+    signature = filter_signature(requested)
+    checkpoint = DoctrineMatchBackfillCheckpoint.objects.filter(signature=signature).first()
+    if checkpoint is not None and resume:
+        return checkpoint
+    if checkpoint is None:
+        checkpoint = DoctrineMatchBackfillCheckpoint(signature=signature)
+    checkpoint.filters_json = json.dumps(resolve_filters(requested), sort_keys=True)
+    checkpoint.last_pk = 0
+    checkpoint.processed = 0
+    checkpoint.status_counts_json = "{}"
+    checkpoint.source_counts_json = "{}"
+    checkpoint.completed_at = None
+    checkpoint.deferred = False
+    return checkpoint
+
+
+def run_slice(
+    checkpoint,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_contracts: int | None = None,
+    dry_run: bool = False,
+    on_chunk=None,
+) -> SliceResult:
+    """Match contracts after ``checkpoint.last_pk`` in ``id > last`` pages.
+
+    The checkpoint is saved after every chunk unless ``dry_run`` is set, so a
+    killed run resumes from the last finished chunk. ``max_contracts`` bounds
+    the slice for periodic task invocations.
+    """
+    from .instrumentation import MatchStats, log_stats
+    from .matching import match_contracts
+
+    qs = backfill_queryset(checkpoint.filters)
+    status_counts = Counter(checkpoint.status_counts)
+    source_counts = Counter(checkpoint.source_counts)
+    result = SliceResult(last_pk=int(checkpoint.last_pk or 0))
+    stats = MatchStats()
+
+    while max_contracts is None or result.processed < max_contracts:
+        limit = chunk_size if max_contracts is None else min(chunk_size, max_contracts - result.processed)
+        batch = [int(pk) for pk in qs.filter(id__gt=result.last_pk).values_list("id", flat=True)[:limit]]
+        if not batch:
+            result.completed = True
+            break
+
+        for match in match_contracts(batch, persist=not dry_run, stats=stats).values():
+            status_counts[match.match_status] += 1
+            source_counts[match.match_source] += 1
+            result.status_counts[match.match_status] += 1
+            result.source_counts[match.match_source] += 1
+        result.processed += len(batch)
+        result.last_pk = batch[-1]
+
+        checkpoint.last_pk = result.last_pk
+        checkpoint.processed = int(checkpoint.processed or 0) + len(batch)
+        checkpoint.status_counts_json = json.dumps(dict(status_counts), sort_keys=True)
+        checkpoint.source_counts_json = json.dumps(dict(source_counts), sort_keys=True)
+        if len(batch) < limit:
+            result.completed = True
+            checkpoint.completed_at = timezone.now()
+        if not dry_run:
+            checkpoint.save()
+        if on_chunk is not None:
+            on_chunk(checkpoint)
+        if result.completed:
+            break
+
+    if result.completed and checkpoint.completed_at is None:
+        checkpoint.completed_at = timezone.now()
+        if not dry_run:
+            checkpoint.save()
+    log_stats(stats, label="backfill_doctrine_matches")
+    return result
+
+
+def next_open_checkpoint():
+    """Oldest deferred checkpoint that has not finished, for the trickle task."""
+    from ..models import DoctrineMatchBackfillCheckpoint
+
+    return (
+        DoctrineMatchBackfillCheckpoint.objects.filter(deferred=True, completed_at__isnull=True)
+        .order_by("created_at", "id")
+        .first()
+    )
@@ -0,0 +1,144 @@
+"""What a pricing settings change would do to suggested subsidies, before it is saved.
+
+The doctrine fits and unpaid contracts are loaded into a FittingPriceMatrix
+once and kept for a short while, so each preview while an admin types only
+re-prices the matrix under the current and the proposed config.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from .pricing import get_active_pricing_config, parse_rounding_increment
+
+PREVIEW_INPUTS_TTL = 60
+MAX_FIT_ROWS = 100
+
+_INPUTS: tuple[float, int | None, "PreviewInputs"] | None = None
+_INPUTS_LOCK = threading.Lock()
+
+
+class PreviewInputs:
+    """Doctrine fits, unpaid contracts and the price matrix covering them."""
+
+    def __init__(self, matrix, fit_names: dict[int, str], doctrine_fit_ids: set[int], backlog: dict[int, int]) -> None:
+        self.matrix = matrix
+        self.fit_names = fit_names
+        self.doctrine_fit_ids = doctrine_fit_ids
+        # contract id -> fit id its suggested subsidy comes from
+        self.backlog = backlog
+
+
+def parse_pricing_config(data: dict[str, Any], base: dict[str, Any]) -> dict[str, Any]:
+    """``base`` with the pricing fields of a settings form applied; raises ValueError."""
+    cfg = dict(base)
+    try:
+        if data.get("price_basis") is not None:
+            cfg["basis"] = "buy" if data["price_basis"] == "buy" else "sell"
+        if data.get("pct_over_basis") not in (None, ""):
+            cfg["pct"] = Decimal(str(data["pct_over_basis"]))
+        if data.get("cost_per_m3") not in (None, ""):
+            cfg["m3"] = Decimal(str(data["cost_per_m3"]))
+        if data.get("rounding_increment") not in (None, ""):
+            cfg["incr"] = parse_rounding_increment(data["rounding_increment"])
+        cfg["pct"] = Decimal(str(cfg["pct"] or 0))
+        cfg["m3"] = Decimal(str(cfg["m3"] or 0))
+    except (InvalidOperation, TypeError) as exc:
+        raise ValueError("Invalid pricing value.") from exc
+    if not cfg["pct"].is_finite() or not cfg["m3"].is_finite() or cfg["pct"] < 0 or cfg["m3"] < 0:
+        raise ValueError("Percentage and cost per m³ must be non-negative numbers.")
+    return cfg
+
+
+def _load_inputs() -> PreviewInputs:
+    from fittings.models import Doctrine, Fitting
+
+    from ..models import CorporateContractSubsidy
+    from .pricing import load_fitting_price_matrix
+
+    doctrine_fit_ids = {
+        int(fit_id) for fit_id in Doctrine.objects.values_list("fittings__id", flat=True) if fit_id
+    }
+    backlog: dict[int, int] = {}
+    for contract_id, forced_fit_id, matched_fit_id in (
+        CorporateContractSubsidy.objects.filter(paid=False, exempt=False)
+        .exclude(review_status=-1)
+        .values_list("contract_id", "forced_fitting_id", "contract__doctrine_match__matched_fitting_id")
+    ):
+        fit_id = forced_fit_id or matched_fit_id
+        if fit_id:
+            backlog[int(contract_id)] = int(fit_id)
+
+    fit_ids = doctrine_fit_ids | set(backlog.values())
+    fit_names = dict(Fitting.objects.filter(pk__in=fit_ids).values_list("pk", "name"))
+    return PreviewInputs(load_fitting_price_matrix(fit_ids), fit_names, doctrine_fit_ids, backlog)
+
+
+def _preview_inputs() -> PreviewInputs:
+    """Inputs shared by previews for PREVIEW_INPUTS_TTL seconds, or until prices change."""
+    global _INPUTS
+    from .price_cache import price_version
+
+    version = price_version()
+    with _INPUTS_LOCK:
+        if _INPUTS is not None and _INPUTS[1] == version and time.monotonic() - _INPUTS[0] < PREVIEW_INPUTS_TTL:
+            return _INPUTS[2]
+    inputs = _load_inputs()
+    with _INPUTS_LOCK:
+        _INPUTS = (time.monotonic(), version, inputs)
+    return inputs
+
+
+def summarise_preview(inputs: PreviewInputs, current: dict[int, dict], proposed: dict[int, dict]) -> dict[str, Any]:
+    """Per-fit and total suggested subsidy deltas between two pricing results."""
+
+    def suggested(values: dict[int, dict], fit_id: int) -> Decimal:
+        return (values.get(fit_id) or {}).get("suggested") or Decimal("0")
+
+    fits = []
+    fits_before = fits_after = Decimal("0")
+    for fit_id in sorted(inputs.doctrine_fit_ids):
+        before, after = suggested(current, fit_id), suggested(proposed, fit_id)
+        fits_before += before
+        fits_after += after
+        fits.append({
+            "fit_id": fit_id,
+            "name": inputs.fit_names.get(fit_id) or str(fit_id),
+            "current": float(before),
+            "proposed": float(after),
+            "delta": float(after - before),
+        })
+    fits.sort(key=lambda row: (-abs(row["delta"]), row["name"].lower()))
+
+    backlog_before = sum((suggested(current, fit_id) for fit_id in inputs.backlog.values()), Decimal("0"))
+    backlog_after = sum((suggested(proposed, fit_id) for fit_id in inputs.backlog.values()), Decimal("0"))
+    return {
+        "fits": fits[:MAX_FIT_ROWS],
+        "fit_count": len(fits),
+        "changed_fits": sum(1 for row in fits if row["delta"]),
+        "fit_totals": {
+            "current": float(fits_before),
+            "proposed": float(fits_after),
+            "delta": float(fits_after - fits_before),
+        },
+        "backlog": {
+            "contracts": len(inputs.backlog),
+            "current": float(backlog_before),
+            "proposed": float(backlog_after),
+            "delta": float(backlog_after - backlog_before),
+        },
+    }
+
+
+def preview_pricing_config(data: dict[str, Any]) -> dict[str, Any]:
+    """Suggested subsidy deltas of doctrine fits and the unpaid backlog under a proposed config."""
+    started = time.perf_counter()
+    current_cfg = get_active_pricing_config()
+    proposed_cfg = parse_pricing_config(data, current_cfg)
+    inputs = _preview_inputs()
+    result = summarise_preview(inputs, inputs.matrix.values(current_cfg), inputs.matrix.values(proposed_cfg))
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class MatchStats:
+    """Per-stage wall time, query counts and counters for one matcher run."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, dict[str, float | int]] = {}
+        self.counters: Counter[str] = Counter()
+        self.timers: dict[str, float] = {}
+        self.contracts = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with _query_wrapper(count_query):
+            try:
+                yield
+            finally:
+                entry = self.stages.setdefault(name, {"seconds": 0.0, "queries": 0, "calls": 0})
+                entry["seconds"] += time.perf_counter() - started
+                entry["queries"] += queries[0]
+                entry["calls"] += 1
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Accumulate time for work nested inside a stage (not added to the total)."""
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def merge(self, other: "MatchStats") -> None:
+        for name, entry in other.stages.items():
+            target = self.stages.setdefault(name, {"seconds": 0.0, "queries": 0, "calls": 0})
+            for key, value in entry.items():
+                target[key] += value
+        self.counters.update(other.counters)
+        for name, seconds in other.timers.items():
+            self.add_time(name, seconds)
+        self.contracts += other.contracts
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(float(entry["seconds"]) for entry in self.stages.values())
+
+    @property
+    def total_queries(self) -> int:
+        return sum(int(entry["queries"]) for entry in self.stages.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        candidates = self.counters.get("candidates_evaluated", 0)
+        return {
+            "contracts": self.contracts,
+            "total_seconds": round(self.total_seconds, 6),
+            "total_queries": self.total_queries,
+            "stages": {
+                name: {
+                    "seconds": round(float(entry["seconds"]), 6),
+                    "queries": int(entry["queries"]),
+                    "calls": int(entry["calls"]),
+                }
+                for name, entry in self.stages.items()
+            },
+            "timers": {name: round(seconds, 6) for name, seconds in self.timers.items()},
+            "counters": dict(sorted(self.counters.items())),
+            "candidates_per_contract": round(candidates / self.contracts, 2) if self.contracts else 0.0,
+        }
+
+    def format(self) -> str:
+        data = self.as_dict()
+        parts = [
+            f"contracts={data['contracts']}",
+            f"total={data['total_seconds'] * 1000:.1f}ms",
+            f"queries={data['total_queries']}",
+        ]
+        parts.extend(
+            f"{name}={entry['seconds'] * 1000:.1f}ms/{entry['queries']}q"
+            for name, entry in data["stages"].items()
+        )
+        parts.extend(f"{name}={seconds * 1000:.1f}ms" for name, seconds in data["timers"].items())
+        parts.extend(f"{name}={value}" for name, value in data["counters"].items())
+        return " ".join(parts)
+
+
+class MatchRun(dict):
+    """Matcher results keyed by contract id, with the run's ``stats`` attached."""
+
+    def __init__(self, *args, stats: MatchStats | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = stats if stats is not None else MatchStats()
+
+
+@contextmanager
+def _query_wrapper(wrapper):
+    try:
+        from django.db import connection
+
+        wrapped = connection.execute_wrapper(wrapper)
+    except Exception:
+        # No configured database (pure matcher tests, benchmarks).
+        wrapped = nullcontext()
+    with wrapped:
+        yield
+
+
+def _log_level() -> int:
+    try:
+        from .. import app_settings
+
+        configured = app_settings.SUBSIDY_MATCH_PROFILE_LOG_LEVEL
+    except Exception:
+        return logging.DEBUG
+    if isinstance(configured, int):
+        return configured
+    level = logging.getLevelName(str(configured).strip().upper())
+    return level if isinstance(level, int) else logging.DEBUG
+
+
+def log_stats(stats: MatchStats, *, label: str = "match_contracts") -> None:
+    """Log a finished run; whoever created ``stats`` calls this once, after its last chunk."""
+    level = _log_level()
+    if logger.isEnabledFor(level):
+        logger.log(level, "%s profile: %s", label, stats.format())
@@ -1,17 +1,24 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import re
+import time
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Any, Iterable
 
+from ..helpers import json_codec
+from .instrumentation import MatchRun, MatchStats, log_stats
 
 MAX_SCORE = Decimal("100.00")
 ZERO = Decimal("0.00")
 MATCH_ENGINE_VERSION = 10
 DRONE_CATEGORY_ID = 18
+# Evidence keys only the contract detail views read; everything else is the
+# compact summary that list pages load with the result row.
+DETAIL_EVIDENCE_KEYS = frozenset({"profile", "item_rows", "substitutions", "approved_substitutions", "scoring_details"})
 
 
 @dataclass(slots=True)
@@ -99,6 +106,31 @@ class FittingDefinition:
     substitutions: list[SubstitutionRuleData] = field(default_factory=list)
     quantity_tolerances: dict[int, list[QuantityToleranceData]] = field(default_factory=dict)
     type_info: dict[int, TypeInfo] = field(default_factory=dict)
+    # Identifies the rule content for definitions loaded from the database;
+    # blank for definitions built or modified in memory.
+    version: str = ""
+    compiled: CompiledDefinition | None = field(default=None, init=False, repr=False, compare=False)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    rule: ItemRuleData
+    expected_type: TypeInfo
+    is_ignore: bool
+    is_consumable: bool
+    preferred_qty: int
+    minimum_qty: int
+    consumable_lower: int
+    consumable_upper: int
+    # Explicit substitution rules in evaluation order, paired with their penalty in centipoints.
+    substitutions: tuple[tuple[SubstitutionRuleData, int], ...]
+    tolerances: tuple[QuantityToleranceData, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledDefinition:
+    rules: tuple[CompiledRule, ...]
+    expected_items: int
 
 
 @dataclass(slots=True)
@@ -113,6 +145,8 @@ class CandidateMatch:
     source_hint: str
     auto_threshold: Decimal
     review_threshold: Decimal
+    # False when evaluated without item rows and suggestions (see evaluate_contract_against_definition).
+    detailed: bool = True
 
     @property
     def viable(self) -> bool:
@@ -134,6 +168,8 @@ class MatchResultData:
     hard_failures: list[dict[str, Any]]
     warnings: list[dict[str, Any]]
     evidence: dict[str, Any]
+    candidate_fit_ids: list[int] = field(default_factory=list)
+    input_fingerprint: str = ""
 
 
 def _decimal(value: Any) -> Decimal:
@@ -145,6 +181,22 @@ def _decimal(value: Any) -> Decimal:
         return ZERO
 
 
+def _centipoints(value: Any) -> int:
+    """Penalty points as an integer number of hundredths, rounded like ``_decimal``."""
+    return int(_decimal(value).scaleb(2))
+
+
+def _score_from_centipoints(expected_items: int, penalty_centipoints: int) -> Decimal:
+    """(expected - penalty) / expected x 100, rounded half-even to 0.01 and floored at zero."""
+    numerator = (expected_items * 100 - penalty_centipoints) * 100
+    if numerator <= 0:
+        return ZERO
+    quotient, remainder = divmod(numerator, expected_items)
+    if remainder * 2 > expected_items or (remainder * 2 == expected_items and quotient % 2):
+        quotient += 1
+    return Decimal(quotient).scaleb(-2)
+
+
 def _min_required(rule: ItemRuleData) -> int:
     if rule.quantity_mode == "range":
         return max(rule.min_quantity, 0)
@@ -395,16 +447,16 @@ def _substitution_matches(
     return False
 
 
-def _implicit_substitution_penalty(
+def _implicit_substitution_centipoints(
     profile: MatchProfileData,
     *,
     expected: TypeInfo,
     actual: TypeInfo,
-) -> Decimal | None:
+) -> int | None:
     if expected.type_id == actual.type_id:
-        return ZERO
+        return 0
     if _is_drone_substitution_candidate(expected=expected, actual=actual):
-        return Decimal("1.00")
+        return 100
     if profile.allow_meta_variants:
         if (
             expected.group_id
@@ -413,13 +465,23 @@ def _implicit_substitution_penalty(
             and expected.meta_level is not None
             and actual.meta_level is not None
         ):
-            return Decimal("5.00")
+            return 500
     if profile.allow_faction_variants:
         if expected.group_id and actual.group_id and expected.group_id == actual.group_id and actual.faction:
-            return Decimal("4.00")
+            return 400
     return None
 
 
+def _implicit_substitution_penalty(
+    profile: MatchProfileData,
+    *,
+    expected: TypeInfo,
+    actual: TypeInfo,
+) -> Decimal | None:
+    penalty = _implicit_substitution_centipoints(profile, expected=expected, actual=actual)
+    return None if penalty is None else Decimal(penalty).scaleb(-2)
+
+
 def _match_tolerance(
     tolerances: Iterable[QuantityToleranceData],
     *,
@@ -435,8 +497,9 @@ def _match_tolerance(
         if tolerance.mode == "absolute":
             matched = tolerance.lower_bound <= diff <= tolerance.upper_bound
         elif tolerance.mode == "percent" and preferred_qty > 0:
-            pct_diff = Decimal(diff) * Decimal("100") / Decimal(preferred_qty)
-            matched = Decimal(str(tolerance.lower_bound)) <= pct_diff <= Decimal(str(tolerance.upper_bound))
+            # lower <= diff * 100 / preferred <= upper, cross-multiplied to stay in integers.
+            pct_scaled = diff * 100
+            matched = tolerance.lower_bound * preferred_qty <= pct_scaled <= tolerance.upper_bound * preferred_qty
         elif tolerance.mode == "missing_only" and diff < 0:
             missing = abs(diff)
             matched = tolerance.lower_bound <= missing <= tolerance.upper_bound
@@ -503,9 +566,85 @@ def _is_consumable_market_group(market_group_id: int | None) -> bool:
         return False
 
 
+_COMPILED_DEFINITIONS: dict[tuple[int, str], CompiledDefinition] = {}
+_COMPILED_DEFINITIONS_MAX = 5_000
+
+
+def _compile_definition(fitting: FittingDefinition, *, stats: MatchStats | None = None) -> CompiledDefinition:
+    substitutions_by_expected: dict[int, list[SubstitutionRuleData]] = defaultdict(list)
+    for substitution in fitting.substitutions:
+        substitutions_by_expected[substitution.expected_type_id].append(substitution)
+
+    rules: list[CompiledRule] = []
+    for rule in sorted(fitting.item_rules, key=lambda entry: (entry.sort_order, entry.expected_type_name.lower())):
+        expected_type = fitting.type_info.get(
+            rule.expected_type_id,
+            TypeInfo(type_id=rule.expected_type_id, name=rule.expected_type_name),
+        )
+        if stats is not None and expected_type.market_group_id is not None:
+            stats.incr(
+                "consumable_group_cache_hits"
+                if expected_type.market_group_id in _CONSUMABLE_MARKET_GROUPS_CACHE
+                else "consumable_group_cache_misses"
+            )
+        preferred_qty = _preferred_quantity(rule)
+        explicit_rules = sorted(
+            substitutions_by_expected.get(rule.expected_type_id, []),
+            key=lambda entry: (entry.penalty_points, entry.rule_type, entry.allowed_type_id or 0),
+        )
+        rules.append(CompiledRule(
+            rule=rule,
+            expected_type=expected_type,
+            is_ignore=rule.rule_kind == "ignore",
+            is_consumable=_is_consumable_market_group(expected_type.market_group_id),
+            preferred_qty=preferred_qty,
+            minimum_qty=_min_required(rule),
+            consumable_lower=preferred_qty * 80 // 100,
+            consumable_upper=preferred_qty * 120 // 100,
+            substitutions=tuple(
+                (sub_rule, 0 if sub_rule.rule_type == "specific" else _centipoints(sub_rule.penalty_points))
+                for sub_rule in explicit_rules
+            ),
+            tolerances=tuple(fitting.quantity_tolerances.get(rule.expected_type_id, [])),
+        ))
+    return CompiledDefinition(
+        rules=tuple(rules),
+        expected_items=sum(1 for rule in rules if not rule.is_ignore),
+    )
+
+
+def compile_definition(fitting: FittingDefinition, *, stats: MatchStats | None = None) -> CompiledDefinition:
+    """The fit-only part of scoring, built once per definition version.
+
+    Rules come pre-sorted with their quantities, consumable bounds, ordered
+    substitution rules and tolerances resolved, so the evaluator only walks
+    contract quantities. Definitions with a ``version`` share the compiled form
+    across runs; others compile once per object. A definition must not be
+    mutated after it has been evaluated; derive a copy with
+    ``dataclasses.replace`` instead.
+    """
+    if fitting.compiled is not None:
+        return fitting.compiled
+    key = (fitting.fitting_id, fitting.version) if fitting.version else None
+    compiled = _COMPILED_DEFINITIONS.get(key) if key is not None else None
+    if compiled is None:
+        compiled = _compile_definition(fitting, stats=stats)
+        if stats is not None:
+            stats.incr("definitions_compiled")
+        if key is not None:
+            if len(_COMPILED_DEFINITIONS) >= _COMPILED_DEFINITIONS_MAX:
+                _COMPILED_DEFINITIONS.clear()
+            _COMPILED_DEFINITIONS[key] = compiled
+    fitting.compiled = compiled
+    return compiled
+
+
 def evaluate_contract_against_definition(
     contract_items: dict[int, ContractItemData],
     fitting: FittingDefinition,
+    *,
+    stats: MatchStats | None = None,
+    detail: bool = True,
 ) -> CandidateMatch:
     """
     NEW ITEM-COUNT BASED SCORING SYSTEM
@@ -520,7 +659,22 @@ def evaluate_contract_against_definition(
     - Wrong consumable quantity (±20%): -0.5 points
     - Substitution: -1 point
     - Final score = (expected_items - penalty_points) / expected_items × 100
+
+    Penalties are accumulated as integer centipoints (hundredths of a point)
+    and only converted to Decimal for the final score and evidence.
+
+    The fit-only work (rule order, quantities, substitution and tolerance
+    lookups) comes from ``compile_definition``. When ``stats`` is given,
+    substitution checks, substitution search time and, on compilation,
+    consumable market group cache hits are recorded on it.
+
+    With ``detail=False`` only the score, issues and source hint are produced:
+    item rows, approved substitutions and substitution suggestions are skipped
+    and the evidence holds just the fit id and name.
     """
+    if stats is not None:
+        stats.incr("candidates_evaluated")
+    compiled = compile_definition(fitting, stats=stats)
     remaining = Counter({
         type_id: int(item.included_qty)
         for type_id, item in contract_items.items()
@@ -535,51 +689,43 @@ def evaluate_contract_against_definition(
     used_learned_rule = False
 
     # Track points for item-count scoring (START WITH MAX POINTS, SUBTRACT PENALTIES)
-    expected_items = 0  # Total items we expect (max possible points)
-    penalty_points = Decimal("0.00")  # Total penalties to subtract
-
-    substitution_rules_by_expected: dict[int, list[SubstitutionRuleData]] = defaultdict(list)
-    for substitution in fitting.substitutions:
-        substitution_rules_by_expected[substitution.expected_type_id].append(substitution)
+    # Total items we expect (max possible points); modules and consumable stacks both = 1 point
+    expected_items = compiled.expected_items
+    penalty_centipoints = 0  # Total penalties to subtract, in hundredths of a point
 
     # Process each expected item in the fitting
-    for rule in sorted(fitting.item_rules, key=lambda entry: (entry.sort_order, entry.expected_type_name.lower())):
-        expected_type = fitting.type_info.get(
-            rule.expected_type_id,
-            TypeInfo(type_id=rule.expected_type_id, name=rule.expected_type_name),
-        )
+    for compiled_rule in compiled.rules:
+        rule = compiled_rule.rule
+        expected_type = compiled_rule.expected_type
         contract_item = contract_items.get(rule.expected_type_id)
         included_qty = int(contract_item.included_qty) if contract_item else 0
         excluded_qty = int(contract_item.excluded_qty) if contract_item else 0
         exact_qty = int(remaining.get(rule.expected_type_id, 0))
 
-        # Check if this is a consumable
-        is_consumable = _is_consumable_market_group(expected_type.market_group_id)
+        is_consumable = compiled_rule.is_consumable
 
         # Ignore rules don't count toward scoring
-        if rule.rule_kind == "ignore":
+        if compiled_rule.is_ignore:
             if exact_qty > 0:
                 remaining[rule.expected_type_id] -= exact_qty
                 if remaining[rule.expected_type_id] <= 0:
                     remaining.pop(rule.expected_type_id, None)
                 used_learned_rule = True
-                item_rows.append(_row(
-                    expected_type_id=rule.expected_type_id,
-                    expected_name=expected_type.name,
-                    actual_qty=exact_qty,
-                    included_qty=included_qty,
-                    excluded_qty=excluded_qty,
-                    expected_qty=rule.expected_quantity,
-                    reason="Ignored by doctrine policy.",
-                    category=rule.category,
-                ))
+                if detail:
+                    item_rows.append(_row(
+                        expected_type_id=rule.expected_type_id,
+                        expected_name=expected_type.name,
+                        actual_qty=exact_qty,
+                        included_qty=included_qty,
+                        excluded_qty=excluded_qty,
+                        expected_qty=rule.expected_quantity,
+                        reason="Ignored by doctrine policy.",
+                        category=rule.category,
+                    ))
             continue
 
-        # Count this item in our expected total (modules and consumable stacks both = 1 point)
-        expected_items += 1
-
-        preferred_qty = _preferred_quantity(rule)
-        minimum_qty = _min_required(rule)
+        preferred_qty = compiled_rule.preferred_qty
+        minimum_qty = compiled_rule.minimum_qty
 
         # Try to find substitutes if needed
         applied_substitutions: list[dict[str, Any]] = []
@@ -587,10 +733,7 @@ def evaluate_contract_against_definition(
         shortage_target = max(preferred_qty - exact_qty, 0) if preferred_qty > 0 else 0
 
         if shortage_target > 0:
-            explicit_rules = sorted(
-                substitution_rules_by_expected.get(rule.expected_type_id, []),
-                key=lambda entry: (entry.penalty_points, entry.rule_type, entry.allowed_type_id or 0),
-            )
+            search_started = time.perf_counter() if stats is not None else 0.0
             candidate_actual_ids = [
                 type_id for type_id, qty in remaining.items()
                 if qty > 0 and type_id != rule.expected_type_id
@@ -599,11 +742,13 @@ def evaluate_contract_against_definition(
                 if substitute_qty >= shortage_target:
                     break
                 actual_info = fitting.type_info.get(actual_type_id) or _type_info_from_contract_item(contract_items.get(actual_type_id)) or TypeInfo(type_id=actual_type_id, name=str(actual_type_id))
-                matched_rule = next((
-                    sub_rule for sub_rule in explicit_rules
-                    if _substitution_matches(sub_rule, expected=expected_type, actual=actual_info)
-                ), None)
-                implicit_penalty = _implicit_substitution_penalty(fitting.profile, expected=expected_type, actual=actual_info)
+                matched_rule, matched_penalty = next((
+                    entry for entry in compiled_rule.substitutions
+                    if _substitution_matches(entry[0], expected=expected_type, actual=actual_info)
+                ), (None, 0))
+                implicit_penalty = _implicit_substitution_centipoints(fitting.profile, expected=expected_type, actual=actual_info)
+                if stats is not None:
+                    stats.incr("substitution_checks")
 
                 if matched_rule is None and implicit_penalty is None:
                     continue
@@ -618,24 +763,21 @@ def evaluate_contract_against_definition(
                     remaining.pop(actual_type_id, None)
                 substitute_qty += use_qty
 
-                if matched_rule is not None and matched_rule.rule_type == "specific":
-                    penalty = ZERO
-                else:
-                    penalty = matched_rule.penalty_points if matched_rule is not None else implicit_penalty
-                penalty = _decimal(penalty)
-                if penalty > ZERO:
-                    penalty_points += penalty
+                penalty = matched_penalty if matched_rule is not None else implicit_penalty
+                if penalty > 0:
+                    penalty_centipoints += penalty
                     exact_match = False
                 used_learned_rule = True
 
-                applied_substitutions.append({
-                    "type_id": actual_info.type_id,
-                    "name": actual_info.name,
-                    "qty": use_qty,
-                    "penalty_points": float(penalty),
-                    "rule_type": matched_rule.rule_type if matched_rule else "profile_variant",
-                })
-                if penalty > ZERO:
+                if detail:
+                    applied_substitutions.append({
+                        "type_id": actual_info.type_id,
+                        "name": actual_info.name,
+                        "qty": use_qty,
+                        "penalty_points": penalty / 100,
+                        "rule_type": matched_rule.rule_type if matched_rule else "profile_variant",
+                    })
+                if penalty > 0:
                     warnings.append(_issue(
                         "warning",
                         "substitution",
@@ -645,7 +787,7 @@ def evaluate_contract_against_definition(
                         quantity=use_qty,
                         fitting_id=fitting.fitting_id,
                     ))
-                else:
+                elif detail:
                     approved_substitutions.append(_issue(
                         "info",
                         "approved_substitution",
@@ -655,10 +797,12 @@ def evaluate_contract_against_definition(
                         quantity=use_qty,
                         fitting_id=fitting.fitting_id,
                     ))
+            if stats is not None:
+                stats.add_time("substitution_search", time.perf_counter() - search_started)
 
         actual_qty = exact_qty + substitute_qty
         matched_tolerance = _match_tolerance(
-            fitting.quantity_tolerances.get(rule.expected_type_id, []),
+            compiled_rule.tolerances,
             actual_qty=actual_qty,
             preferred_qty=preferred_qty,
         )
@@ -691,7 +835,7 @@ def evaluate_contract_against_definition(
         elif rule.rule_kind == "optional" and actual_qty <= 0:
             status = "warning"
             exact_match = False
-            penalty_points += Decimal("1.00")  # -1 point for missing optional
+            penalty_centipoints += 100  # -1 point for missing optional
             used_learned_rule = True
             reason = "Optional doctrine item is missing."
             warnings.append(_issue(
@@ -703,7 +847,7 @@ def evaluate_contract_against_definition(
             ))
 
         # Required item missing but covered by an explicit tolerance rule
-        elif actual_qty < minimum_qty and matched_tolerance is not None and _decimal(matched_tolerance.penalty_points) <= ZERO:
+        elif actual_qty < minimum_qty and matched_tolerance is not None and _centipoints(matched_tolerance.penalty_points) <= 0:
             used_learned_rule = True
             reason = "Allowed quantity variance."
 
@@ -711,7 +855,7 @@ def evaluate_contract_against_definition(
         elif actual_qty < minimum_qty:
             status = "error"
             exact_match = False
-            penalty_points += Decimal("1.00")  # -1 point for missing required item
+            penalty_centipoints += 100  # -1 point for missing required item
             reason = f"Expected at least {minimum_qty}, found {actual_qty}."
             hard_failures.append(_issue(
                 "error",
@@ -735,10 +879,10 @@ def evaluate_contract_against_definition(
             and is_consumable
             and preferred_qty > 0
             and matched_tolerance is not None
-            and _decimal(matched_tolerance.penalty_points) <= ZERO
+            and _centipoints(matched_tolerance.penalty_points) <= 0
             and (
-                actual_qty < int(Decimal(preferred_qty) * Decimal("0.80"))
-                or actual_qty > int(Decimal(preferred_qty) * Decimal("1.20"))
+                actual_qty < compiled_rule.consumable_lower
+                or actual_qty > compiled_rule.consumable_upper
             )
         ):
             used_learned_rule = True
@@ -748,13 +892,12 @@ def evaluate_contract_against_definition(
         elif actual_qty > 0:
             # For consumables, check if quantity is within ±20%
             if is_consumable and preferred_qty > 0:
-                tolerance_pct = Decimal("0.20")  # 20%
-                lower_bound = int(Decimal(preferred_qty) * (Decimal("1.00") - tolerance_pct))
-                upper_bound = int(Decimal(preferred_qty) * (Decimal("1.00") + tolerance_pct))
+                lower_bound = compiled_rule.consumable_lower
+                upper_bound = compiled_rule.consumable_upper
 
                 if actual_qty < lower_bound or actual_qty > upper_bound:
                     # Outside tolerance: -0.5 points
-                    penalty_points += Decimal("0.50")
+                    penalty_centipoints += 50
                     exact_match = False
                     status = "warning"
                     reason = f"Consumable quantity {actual_qty} outside ±20% of expected {preferred_qty}."
@@ -769,6 +912,9 @@ def evaluate_contract_against_definition(
                     ))
                     actions.append("quantity_tolerance")
 
+        if not detail:
+            continue
+
         if applied_substitutions and status == "ok":
             approved_names = [item["name"] for item in applied_substitutions if float(item.get("penalty_points") or 0) <= 0]
             if approved_names:
@@ -804,7 +950,7 @@ def evaluate_contract_against_definition(
 
         if fitting.profile.allow_extra_items:
             exact_match = False
-            penalty_points += Decimal("1.00")  # -1 point for extra item
+            penalty_centipoints += 100  # -1 point for extra item
             warnings.append(_issue(
                 "warning",
                 "unexpected_extra_item",
@@ -813,21 +959,22 @@ def evaluate_contract_against_definition(
                 actual_qty=qty,
                 fitting_id=fitting.fitting_id,
             ))
-            item_rows.append(_row(
-                expected_type_id=None,
-                expected_name=actual_name,
-                actual_type_id=actual_type_id,
-                actual_name=actual_name,
-                actual_qty=qty,
-                included_qty=int(contract_item.included_qty) if contract_item else qty,
-                excluded_qty=int(contract_item.excluded_qty) if contract_item else 0,
-                status="warning",
-                reason="Unexpected extra item allowed by profile.",
-                actions=["ignore_extra_item"],
-            ))
+            if detail:
+                item_rows.append(_row(
+                    expected_type_id=None,
+                    expected_name=actual_name,
+                    actual_type_id=actual_type_id,
+                    actual_name=actual_name,
+                    actual_qty=qty,
+                    included_qty=int(contract_item.included_qty) if contract_item else qty,
+                    excluded_qty=int(contract_item.excluded_qty) if contract_item else 0,
+                    status="warning",
+                    reason="Unexpected extra item allowed by profile.",
+                    actions=["ignore_extra_item"],
+                ))
         else:
             exact_match = False
-            penalty_points += Decimal("1.00")  # -1 point for extra item
+            penalty_centipoints += 100  # -1 point for extra item
             hard_failures.append(_issue(
                 "error",
                 "unexpected_extra_item",
@@ -836,18 +983,19 @@ def evaluate_contract_against_definition(
                 actual_qty=qty,
                 fitting_id=fitting.fitting_id,
             ))
-            item_rows.append(_row(
-                expected_type_id=None,
-                expected_name=actual_name,
-                actual_type_id=actual_type_id,
-                actual_name=actual_name,
-                actual_qty=qty,
-                included_qty=int(contract_item.included_qty) if contract_item else qty,
-                excluded_qty=int(contract_item.excluded_qty) if contract_item else 0,
-                status="error",
-                reason="Unexpected extra item is not allowed by profile.",
-                actions=["ignore_extra_item"],
-            ))
+            if detail:
+                item_rows.append(_row(
+                    expected_type_id=None,
+                    expected_name=actual_name,
+                    actual_type_id=actual_type_id,
+                    actual_name=actual_name,
+                    actual_qty=qty,
+                    included_qty=int(contract_item.included_qty) if contract_item else qty,
+                    excluded_qty=int(contract_item.excluded_qty) if contract_item else 0,
+                    status="error",
+                    reason="Unexpected extra item is not allowed by profile.",
+                    actions=["ignore_extra_item"],
+                ))
 
     # Calculate final score using item-count method
     # Score = (expected_items - penalty_points) / expected_items × 100
@@ -857,14 +1005,27 @@ def evaluate_contract_against_definition(
     elif expected_items == 0:
         score = MAX_SCORE  # No items expected, perfect match
     else:
-        points_earned = Decimal(expected_items) - penalty_points
-        score = (points_earned / Decimal(expected_items)) * Decimal("100.00")
-        score = max(score, ZERO).quantize(Decimal("0.01"))
+        score = _score_from_centipoints(expected_items, penalty_centipoints)
 
     source_hint = "auto"
     if used_learned_rule or not exact_match:
         source_hint = "learned_rule"
 
+    if not detail:
+        return CandidateMatch(
+            fitting_id=fitting.fitting_id,
+            fitting_name=fitting.fitting_name,
+            score=score,
+            exact_match=exact_match,
+            hard_failures=hard_failures,
+            warnings=warnings,
+            evidence={"selected_fit_id": fitting.fitting_id, "selected_fit_name": fitting.fitting_name},
+            source_hint=source_hint,
+            auto_threshold=fitting.profile.auto_match_threshold,
+            review_threshold=fitting.profile.review_threshold,
+            detailed=False,
+        )
+
     evidence = {
         "selected_fit_id": fitting.fitting_id,
         "selected_fit_name": fitting.fitting_name,
@@ -878,8 +1039,8 @@ def evaluate_contract_against_definition(
         "approved_substitutions": approved_substitutions,
         "scoring_details": {
             "expected_items": expected_items,
-            "penalty_points": float(penalty_points),
-            "points_earned": float(Decimal(expected_items) - penalty_points),
+            "penalty_points": penalty_centipoints / 100,
+            "points_earned": (expected_items * 100 - penalty_centipoints) / 100,
         },
     }
     _maybe_add_substitution_suggestions(item_rows, contract_items=contract_items, fitting=fitting)
@@ -1475,7 +1636,7 @@ def _candidate_summaries(candidates: Iterable[CandidateMatch]) -> list[dict[str,
 
 def _model_refs():
     from django.utils import timezone
-    from django.db.models import Sum
+    from django.db.models import Q
     from corptools.models import CorporateContract, CorporateContractItem
     from eveuniverse.models import EveType
     from fittings.models import Fitting, FittingItem
@@ -1484,6 +1645,8 @@ def _model_refs():
         CorporateContractSubsidy,
         DoctrineContractDecision,
         DoctrineItemRule,
+        DoctrineMatchCandidate,
+        DoctrineMatchEvidence,
         DoctrineMatchProfile,
         DoctrineMatchResult,
         DoctrineQuantityTolerance,
@@ -1497,6 +1660,8 @@ def _model_refs():
         "CorporateContractSubsidy": CorporateContractSubsidy,
         "DoctrineContractDecision": DoctrineContractDecision,
         "DoctrineItemRule": DoctrineItemRule,
+        "DoctrineMatchCandidate": DoctrineMatchCandidate,
+        "DoctrineMatchEvidence": DoctrineMatchEvidence,
         "DoctrineMatchProfile": DoctrineMatchProfile,
         "DoctrineMatchResult": DoctrineMatchResult,
         "DoctrineQuantityTolerance": DoctrineQuantityTolerance,
@@ -1504,7 +1669,7 @@ def _model_refs():
         "EveType": EveType,
         "Fitting": Fitting,
         "FittingItem": FittingItem,
-        "Sum": Sum,
+        "Q": Q,
         "SubsidyConfig": SubsidyConfig,
         "timezone": timezone,
     }
@@ -1533,6 +1698,137 @@ def _type_info_from_obj(obj: Any) -> TypeInfo:
     )
 
 
+# TypeInfo slot -> attribute names probed on the contract item's type, in order.
+_CONTRACT_TYPE_SLOTS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("category_id", ("category_id", "eve_category_id", "category_fk_id")),
+    ("group_id", ("group_id", "eve_group_id", "group_fk_id")),
+    ("market_group_id", ("market_group_id", "eve_market_group_id")),
+    ("meta_level", ("meta_level",)),
+    ("meta_group_id", ("meta_group_id",)),
+)
+_CONTRACT_TYPE_CACHE: dict[int, TypeInfo] = {}
+_CONTRACT_TYPE_CACHE_MAX = 50_000
+_CONTRACT_TYPE_COLUMNS: dict[Any, tuple[str, ...] | None] = {}
+
+
+def _contract_type_columns(model) -> tuple[str, ...] | None:
+    """Concrete columns backing the ``_CONTRACT_TYPE_SLOTS`` probes on ``model``.
+
+    Returns None when a probed name is a computed attribute rather than a column,
+    in which case types have to be loaded as instances.
+    """
+    if model in _CONTRACT_TYPE_COLUMNS:
+        return _CONTRACT_TYPE_COLUMNS[model]
+    attnames = {field.attname for field in model._meta.concrete_fields}
+    columns: list[str] = []
+    for _, names in _CONTRACT_TYPE_SLOTS:
+        for name in names:
+            if name in attnames:
+                columns.append(name)
+            elif hasattr(model, name):
+                _CONTRACT_TYPE_COLUMNS[model] = None
+                return None
+    _CONTRACT_TYPE_COLUMNS[model] = tuple(columns)
+    return _CONTRACT_TYPE_COLUMNS[model]
+
+
+def _contract_type_info(type_id: int, name: str | None, values: dict[str, Any]) -> TypeInfo:
+    faction_hint = str(name or "").lower()
+    slots = {
+        slot: next((values[attr] for attr in names if values.get(attr) is not None), None)
+        for slot, names in _CONTRACT_TYPE_SLOTS
+    }
+    return TypeInfo(
+        type_id=type_id,
+        name=name or str(type_id),
+        faction=("faction" in faction_hint or "navy" in faction_hint),
+        **slots,
+    )
+
+
+def _load_contract_type_info(type_ids: Iterable[int], *, stats: MatchStats | None = None) -> dict[int, TypeInfo]:
+    """Type metadata for contract items, resolved once per distinct type id."""
+    CorporateContractItem = _model_refs()["CorporateContractItem"]
+    type_model = CorporateContractItem._meta.get_field("type_name").related_model
+
+    type_ids = set(type_ids)
+    resolved = {type_id: _CONTRACT_TYPE_CACHE[type_id] for type_id in type_ids if type_id in _CONTRACT_TYPE_CACHE}
+    missing = type_ids - resolved.keys()
+    if stats is not None:
+        stats.incr("type_cache_hits", len(resolved))
+        stats.incr("type_cache_misses", len(missing))
+    if not missing:
+        return resolved
+
+    columns = _contract_type_columns(type_model)
+    pk_name = type_model._meta.pk.attname
+    loaded: dict[int, TypeInfo] = {}
+    if columns is None:
+        for eve_type in type_model.objects.filter(pk__in=missing):
+            type_id = int(eve_type.pk)
+            values = {name: getattr(eve_type, name, None) for _, names in _CONTRACT_TYPE_SLOTS for name in names}
+            loaded[type_id] = _contract_type_info(type_id, getattr(eve_type, "name", None), values)
+    else:
+        for row in type_model.objects.filter(pk__in=missing).values_list(pk_name, "name", *columns):
+            loaded[int(row[0])] = _contract_type_info(int(row[0]), row[1], dict(zip(columns, row[2:])))
+    for type_id in missing - loaded.keys():
+        loaded[type_id] = TypeInfo(type_id=type_id, name=str(type_id))
+
+    if len(_CONTRACT_TYPE_CACHE) + len(loaded) > _CONTRACT_TYPE_CACHE_MAX:
+        _CONTRACT_TYPE_CACHE.clear()
+    _CONTRACT_TYPE_CACHE.update(loaded)
+    resolved.update(loaded)
+    return resolved
+
+
+def _load_contract_items(
+    db_contract_ids: list[str],
+    *,
+    stats: MatchStats | None = None,
+) -> tuple[dict[int, dict[int, ContractItemData]], set[int]]:
+    """Contract items per contract plus the type ids usable as hulls (included, qty > 0)."""
+    CorporateContractItem = _model_refs()["CorporateContractItem"]
+
+    quantities: dict[int, dict[int, list[int]]] = defaultdict(dict)
+    row_count = 0
+    for contract_id, type_id, is_included, quantity in CorporateContractItem.objects.filter(
+        contract_id__in=db_contract_ids
+    ).values_list("contract_id", "type_name_id", "is_included", "quantity"):
+        row_count += 1
+        bucket = quantities[int(contract_id)].get(int(type_id))
+        if bucket is None:
+            bucket = quantities[int(contract_id)][int(type_id)] = [0, 0]
+        bucket[0 if is_included else 1] += int(quantity or 0)
+
+    type_info = _load_contract_type_info(
+        {type_id for per_contract in quantities.values() for type_id in per_contract},
+        stats=stats,
+    )
+    contract_items_map: dict[int, dict[int, ContractItemData]] = defaultdict(dict)
+    hull_type_ids: set[int] = set()
+    for contract_id, per_contract in quantities.items():
+        items = contract_items_map[contract_id]
+        for type_id, (included_qty, excluded_qty) in per_contract.items():
+            info = type_info[type_id]
+            items[type_id] = ContractItemData(
+                type_id=type_id,
+                name=info.name,
+                included_qty=included_qty,
+                excluded_qty=excluded_qty,
+                category_id=info.category_id,
+                group_id=info.group_id,
+                market_group_id=info.market_group_id,
+                meta_level=info.meta_level,
+                meta_group_id=info.meta_group_id,
+                faction=info.faction,
+            )
+            if included_qty > 0:
+                hull_type_ids.add(type_id)
+    if stats is not None:
+        stats.incr("item_rows", row_count)
+    return contract_items_map, hull_type_ids
+
+
 def _load_fit_definitions(fit_ids: Iterable[int]) -> dict[int, FittingDefinition]:
     refs = _model_refs()
     Fitting = refs["Fitting"]
@@ -1715,63 +2011,165 @@ def _load_fit_definitions(fit_ids: Iterable[int]) -> dict[int, FittingDefinition
             substitutions=substitutions_by_fit.get(int(fit.pk), []),
             quantity_tolerances=dict(tolerances_by_fit.get(int(fit.pk), {})),
             type_info=type_info_by_fit.get(int(fit.pk), {}),
+            version=_definition_version(
+                getattr(profile, "definition_version", 0),
+                fit.ship_type_type_id,
+                {type_id: row["total_qty"] for type_id, row in fit_items_by_fit.get(int(fit.pk), {}).items()},
+            ),
         )
     return fit_definitions
 
 
+def _definition_version(profile_version: int | None, ship_type_id: int, item_quantities: dict[int, int]) -> str:
+    """Version of a fit definition: profile edits bump definition_version, the hull and items are hashed directly."""
+    source = [
+        int(profile_version or 0),
+        int(ship_type_id),
+        sorted((int(type_id), int(qty or 0)) for type_id, qty in item_quantities.items()),
+    ]
+    return hashlib.sha1(json.dumps(source, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _split_evidence(evidence: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+    summary = {key: value for key, value in evidence.items() if key not in DETAIL_EVIDENCE_KEYS}
+    detail = {key: value for key, value in evidence.items() if key in DETAIL_EVIDENCE_KEYS}
+    return summary, detail
+
+
+def _result_content_hash(result: MatchResultData, summary: dict[str, Any], detail: dict[str, Any]) -> str:
+    payload = [
+        result.matched_fitting_id,
+        result.match_source,
+        result.match_status,
+        str(result.score),
+        result.hard_failures,
+        result.warnings,
+        summary,
+        detail,
+        sorted(result.candidate_fit_ids),
+    ]
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _upsert(model, objs: list, *, unique_fields: list[str], update_fields: list[str]) -> None:
+    from django.db import connections
+
+    if not objs:
+        return
+    options = {"update_conflicts": True, "update_fields": update_fields}
+    # MySQL/MariaDB upsert on any unique key and reject an explicit conflict target.
+    if connections[model.objects.db].features.supports_update_conflicts_with_target:
+        options["unique_fields"] = unique_fields
+    model.objects.bulk_create(objs, **options)
+
+
 def _persist_results(results: list[MatchResultData]) -> None:
+    """Upsert results whose content changed; unchanged rows keep their ``updated_at``.
+
+    A row whose content is unchanged but whose input fingerprint moved only has
+    the fingerprint rewritten, through bulk_update, which skips auto_now.
+    """
     if not results:
         return
+    from .. import app_settings
+
     refs = _model_refs()
+    DoctrineMatchEvidence = refs["DoctrineMatchEvidence"]
     DoctrineMatchResult = refs["DoctrineMatchResult"]
     timezone = refs["timezone"]
     now = timezone.now()
 
-    contract_ids = [int(result.contract_id) for result in results]
-    db_contract_ids = [str(contract_id) for contract_id in contract_ids]
-    existing = DoctrineMatchResult.objects.in_bulk(db_contract_ids, field_name="contract_id")
-    to_create = []
-    to_update = []
+    db_contract_ids = [str(result.contract_id) for result in results]
+    stored = {
+        str(contract_id): (pk, content_hash, input_fingerprint)
+        for contract_id, pk, content_hash, input_fingerprint in DoctrineMatchResult.objects.filter(
+            contract_id__in=db_contract_ids
+        ).values_list("contract_id", "pk", "content_hash", "input_fingerprint")
+    }
+    changed_results = []
+    rows = []
+    details = []
+    fingerprint_rows = []
     for result in results:
         evidence = dict(result.evidence or {})
         evidence["engine_version"] = MATCH_ENGINE_VERSION
-        payload = {
-            "matched_fitting_id": result.matched_fitting_id,
-            "match_source": result.match_source,
-            "match_status": result.match_status,
-            "score": result.score,
-            "hard_failures_json": json.dumps(result.hard_failures),
-            "warnings_json": json.dumps(result.warnings),
-            "evidence_json": json.dumps(evidence),
-            "updated_at": now,
-        }
-        current = existing.get(str(result.contract_id))
-        if current is None:
-            to_create.append(DoctrineMatchResult(contract_id=str(result.contract_id), **payload))
+        summary, detail = _split_evidence(evidence)
+        content_hash = _result_content_hash(result, summary, detail)
+        stored_pk, stored_hash, stored_fingerprint = stored.get(str(result.contract_id), (None, None, None))
+        if stored_hash == content_hash:
+            if stored_fingerprint != result.input_fingerprint:
+                fingerprint_rows.append(DoctrineMatchResult(pk=stored_pk, input_fingerprint=result.input_fingerprint))
             continue
-        for field_name, value in payload.items():
-            setattr(current, field_name, value)
-        to_update.append(current)
-    if to_create:
-        DoctrineMatchResult.objects.bulk_create(to_create, ignore_conflicts=True)
-    if to_update:
-        DoctrineMatchResult.objects.bulk_update(
-            to_update,
-            [
-                "matched_fitting_id",
-                "match_source",
-                "match_status",
-                "score",
-                "hard_failures_json",
-                "warnings_json",
-                "evidence_json",
-                "updated_at",
-            ],
+        changed_results.append(result)
+        rows.append(
+            DoctrineMatchResult(
+                contract_id=str(result.contract_id),
+                matched_fitting_id=result.matched_fitting_id,
+                match_source=result.match_source,
+                match_status=result.match_status,
+                score=result.score,
+                hard_failures_json=json_codec.dumps(result.hard_failures),
+                warnings_json=json_codec.dumps(result.warnings),
+                summary_json=json_codec.dumps(summary),
+                content_hash=content_hash,
+                input_fingerprint=result.input_fingerprint,
+                updated_at=now,
+            )
+        )
+        detail_payload, compressed = DoctrineMatchEvidence.encode(
+            detail,
+            compress=app_settings.SUBSIDY_MATCH_EVIDENCE_COMPRESSION,
+        )
+        details.append(
+            DoctrineMatchEvidence(contract_id=str(result.contract_id), payload=detail_payload, compressed=compressed)
         )
 
+    if fingerprint_rows:
+        DoctrineMatchResult.objects.bulk_update(fingerprint_rows, ["input_fingerprint"], batch_size=500)
+    if not rows:
+        return
+    _upsert(
+        DoctrineMatchResult,
+        rows,
+        unique_fields=["contract"],
+        update_fields=[
+            "matched_fitting",
+            "match_source",
+            "match_status",
+            "score",
+            "hard_failures_json",
+            "warnings_json",
+            "summary_json",
+            "content_hash",
+            "input_fingerprint",
+            "updated_at",
+        ],
+    )
+    _upsert(DoctrineMatchEvidence, details, unique_fields=["contract"], update_fields=["payload", "compressed"])
+    _persist_candidate_index(changed_results)
+
+
+def _persist_candidate_index(results: list[MatchResultData]) -> None:
+    """Refresh the fitting -> contract reverse index used for targeted re-matching."""
+    refs = _model_refs()
+    DoctrineMatchCandidate = refs["DoctrineMatchCandidate"]
+
+    db_contract_ids = [str(result.contract_id) for result in results]
+    rows = [
+        DoctrineMatchCandidate(contract_id=str(result.contract_id), fitting_id=int(fit_id))
+        for result in results
+        for fit_id in result.candidate_fit_ids
+    ]
+    DoctrineMatchCandidate.objects.filter(contract_id__in=db_contract_ids).delete()
+    if rows:
+        DoctrineMatchCandidate.objects.bulk_create(rows, ignore_conflicts=True)
+
 
-def _result_from_record(record) -> MatchResultData:
-    evidence = record.evidence or {}
+def _result_from_record(record, detail: dict[str, Any] | None = None) -> MatchResultData:
+    evidence = dict(record.summary or {})
+    if detail:
+        evidence.update(detail)
     matched_fitting_name = None
     if getattr(record, "matched_fitting_id", None):
         matched_fitting = getattr(record, "matched_fitting", None)
@@ -1783,48 +2181,201 @@ def _result_from_record(record) -> MatchResultData:
         match_source=record.match_source,
         match_status=record.match_status,
         score=_decimal(record.score),
-        hard_failures=record.hard_failures,
-        warnings=record.warnings,
+        hard_failures=list(record.hard_failures),
+        warnings=list(record.warnings),
         evidence=evidence,
     )
 
 
 def _record_matches_current_engine(record) -> bool:
-    evidence = record.evidence or {}
+    summary = record.summary or {}
     try:
-        return int(evidence.get("engine_version") or 0) == MATCH_ENGINE_VERSION
+        return int(summary.get("engine_version") or 0) == MATCH_ENGINE_VERSION
     except (TypeError, ValueError):
         return False
 
 
+def _input_fingerprints(contract_ids: list[int]) -> dict[int, str]:
+    """Hash of everything a stored result depends on, computed without scoring.
+
+    Covers the contract items, forced fit, latest manual decision, the name and
+    definition version of every fit the contract would be scored against (the
+    same version _load_fit_definitions gives the definition), the engine version,
+    the close-match threshold, the pricing settings and the price version, so
+    stored pricing is not served once prices or settings have moved on.
+    """
+    from .price_cache import price_version
+    from .pricing import pricing_config, pricing_config_version
+
+    refs = _model_refs()
+    CorporateContractItem = refs["CorporateContractItem"]
+    CorporateContractSubsidy = refs["CorporateContractSubsidy"]
+    DoctrineContractDecision = refs["DoctrineContractDecision"]
+    DoctrineMatchProfile = refs["DoctrineMatchProfile"]
+    Fitting = refs["Fitting"]
+    FittingItem = refs["FittingItem"]
+    SubsidyConfig = refs["SubsidyConfig"]
+    Q = refs["Q"]
+
+    contract_ids = [int(contract_id) for contract_id in contract_ids if contract_id]
+    if not contract_ids:
+        return {}
+    db_contract_ids = [str(contract_id) for contract_id in contract_ids]
+
+    items: dict[int, Counter] = defaultdict(Counter)
+    for contract_id, type_id, is_included, quantity in CorporateContractItem.objects.filter(
+        contract_id__in=db_contract_ids
+    ).values_list("contract_id", "type_name_id", "is_included", "quantity"):
+        items[int(contract_id)][(int(type_id), bool(is_included))] += int(quantity or 0)
+
+    forced = {
+        int(contract_id): int(fit_id) if fit_id else None
+        for contract_id, fit_id in CorporateContractSubsidy.objects.filter(
+            contract_id__in=db_contract_ids
+        ).values_list("contract_id", "forced_fitting_id")
+    }
+    decisions: dict[int, list[Any]] = {}
+    for contract_id, decision_id, decision, fit_id in DoctrineContractDecision.objects.filter(
+        contract_id__in=db_contract_ids
+    ).order_by("contract_id", "-created_at", "-id").values_list("contract_id", "id", "decision", "fitting_id"):
+        decisions.setdefault(int(contract_id), [int(decision_id), decision, int(fit_id) if fit_id else None])
+
+    hull_type_ids = {
+        type_id
+        for counter in items.values()
+        for (type_id, included), qty in counter.items()
+        if included and qty > 0
+    }
+    extra_fit_ids = {fit_id for fit_id in forced.values() if fit_id}
+    extra_fit_ids.update(decision[2] for decision in decisions.values() if decision[2])
+    fits = list(
+        Fitting.objects.filter(Q(ship_type_type_id__in=hull_type_ids) | Q(pk__in=extra_fit_ids))
+        .values_list("id", "ship_type_type_id", "name")
+    )
+    fit_ids = [int(fit_id) for fit_id, _, _ in fits]
+    profile_versions = dict(
+        DoctrineMatchProfile.objects.filter(fitting_id__in=fit_ids).values_list("fitting_id", "definition_version")
+    )
+    fit_items: dict[int, Counter] = defaultdict(Counter)
+    for fit_id, type_id, quantity in FittingItem.objects.filter(fit_id__in=fit_ids).values_list(
+        "fit_id", "type_id", "quantity"
+    ):
+        fit_items[int(fit_id)][int(type_id)] += int(quantity or 0)
+    fits_by_hull: dict[int, list[int]] = defaultdict(list)
+    fit_versions: dict[int, list[Any]] = {}
+    for fit_id, ship_type_id, name in fits:
+        fits_by_hull[int(ship_type_id)].append(int(fit_id))
+        fit_versions[int(fit_id)] = [
+            name,
+            _definition_version(profile_versions.get(fit_id), ship_type_id, fit_items.get(int(fit_id), {})),
+        ]
+
+    cfg = SubsidyConfig.active()
+    close_match_threshold = str(cfg.close_match_threshold)
+    pricing_version = [pricing_config_version(pricing_config(cfg)), price_version()]
+    fingerprints: dict[int, str] = {}
+    for contract_id in contract_ids:
+        counter = items.get(contract_id, Counter())
+        candidate_fit_ids = {
+            fit_id
+            for (type_id, included), qty in counter.items()
+            if included and qty > 0
+            for fit_id in fits_by_hull.get(type_id, [])
+        }
+        if forced.get(contract_id):
+            candidate_fit_ids.add(forced[contract_id])
+        decision = decisions.get(contract_id)
+        if decision and decision[2]:
+            candidate_fit_ids.add(decision[2])
+        payload = [
+            MATCH_ENGINE_VERSION,
+            close_match_threshold,
+            pricing_version,
+            sorted([type_id, included, qty] for (type_id, included), qty in counter.items()),
+            forced.get(contract_id),
+            decision,
+            [[fit_id, fit_versions.get(fit_id)] for fit_id in sorted(candidate_fit_ids)],
+        ]
+        encoded = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        fingerprints[contract_id] = hashlib.sha256(encoded).hexdigest()
+    return fingerprints
+
+
+def _load_evidence_details(db_contract_ids: list[str]) -> dict[int, dict[str, Any]]:
+    DoctrineMatchEvidence = _model_refs()["DoctrineMatchEvidence"]
+    return {
+        int(row.contract_id): row.detail
+        for row in DoctrineMatchEvidence.objects.filter(contract_id__in=db_contract_ids)
+    }
+
+
 def get_or_match_contracts(
     contract_ids: Iterable[int],
     *,
     persist: bool = True,
     refresh: bool = False,
-) -> dict[int, MatchResultData]:
+    include_detail: bool = False,
+    verify_inputs: bool = False,
+    stats: MatchStats | None = None,
+) -> MatchRun:
+    """Stored results where current, fresh matches otherwise.
+
+    Stored results only carry the evidence summary unless ``include_detail`` is
+    set; freshly matched results always carry the full evidence. With
+    ``verify_inputs`` a stored result is only served while its input
+    fingerprint still matches the contract's current inputs.
+    """
     refs = _model_refs()
     DoctrineMatchResult = refs["DoctrineMatchResult"]
 
+    owns_stats = stats is None
+    stats = stats if stats is not None else MatchStats()
     contract_ids = [int(contract_id) for contract_id in contract_ids if contract_id]
     if not contract_ids:
-        return {}
+        return MatchRun(stats=stats)
     db_contract_ids = [str(contract_id) for contract_id in contract_ids]
 
     if refresh:
-        return match_contracts(contract_ids, persist=persist)
-
-    existing_rows = DoctrineMatchResult.objects.filter(contract_id__in=db_contract_ids).select_related("matched_fitting")
-    results: dict[int, MatchResultData] = {}
-    for row in existing_rows:
-        if _record_matches_current_engine(row):
-            results[int(row.contract_id)] = _result_from_record(row)
+        results = match_contracts(contract_ids, persist=persist, stats=stats)
+        if owns_stats:
+            log_stats(stats, label="get_or_match_contracts")
+        return results
+
+    with stats.stage("load_stored"):
+        existing_rows = [
+            row
+            for row in DoctrineMatchResult.objects.filter(contract_id__in=db_contract_ids).select_related("matched_fitting")
+            if _record_matches_current_engine(row)
+        ]
+        if verify_inputs and existing_rows:
+            fingerprints = _input_fingerprints([int(row.contract_id) for row in existing_rows])
+            current_rows = [
+                row for row in existing_rows
+                if row.input_fingerprint and row.input_fingerprint == fingerprints.get(int(row.contract_id))
+            ]
+            stats.incr("stored_result_stale_inputs", len(existing_rows) - len(current_rows))
+            existing_rows = current_rows
+        details = (
+            _load_evidence_details([str(row.contract_id) for row in existing_rows])
+            if include_detail and existing_rows
+            else {}
+        )
+        results: dict[int, MatchResultData] = {}
+        for row in existing_rows:
+            results[int(row.contract_id)] = _result_from_record(row, details.get(int(row.contract_id)))
 
     missing_or_stale_ids = [contract_id for contract_id in contract_ids if contract_id not in results]
+    stats.incr("stored_result_hits", len(contract_ids) - len(missing_or_stale_ids))
+    stats.incr("stored_result_misses", len(missing_or_stale_ids))
     if missing_or_stale_ids:
-        results.update(match_contracts(missing_or_stale_ids, persist=persist))
+        results.update(match_contracts(missing_or_stale_ids, persist=persist, stats=stats))
 
-    return {contract_id: results[contract_id] for contract_id in contract_ids if contract_id in results}
+    if owns_stats:
+        log_stats(stats, label="get_or_match_contracts")
+    return MatchRun(
+        {contract_id: results[contract_id] for contract_id in contract_ids if contract_id in results},
+        stats=stats,
+    )
 
 
 def get_or_match_contract(
@@ -1832,33 +2383,30 @@ def get_or_match_contract(
     *,
     persist: bool = True,
     refresh: bool = False,
+    include_detail: bool = False,
+    verify_inputs: bool = False,
 ) -> MatchResultData:
-    return get_or_match_contracts([int(contract_id)], persist=persist, refresh=refresh)[int(contract_id)]
+    return get_or_match_contracts(
+        [int(contract_id)],
+        persist=persist,
+        refresh=refresh,
+        include_detail=include_detail,
+        verify_inputs=verify_inputs,
+    )[int(contract_id)]
 
 
-def match_contracts(
-    contract_ids: Iterable[int],
+def _load_match_context(
+    db_contract_ids: list[str],
     *,
-    forced_fit_ids: dict[int, int | None] | None = None,
-    preview_fit_id: int | None = None,
-    persist: bool = True,
-) -> dict[int, MatchResultData]:
+    load_forced: bool = True,
+) -> tuple[dict[int, int | None], dict[int, dict[str, Any]]]:
+    """Stored forced fits and the latest review decision per contract."""
     refs = _model_refs()
-    CorporateContractItem = refs["CorporateContractItem"]
     CorporateContractSubsidy = refs["CorporateContractSubsidy"]
     DoctrineContractDecision = refs["DoctrineContractDecision"]
-    Fitting = refs["Fitting"]
-    SubsidyConfig = refs["SubsidyConfig"]
-
-    contract_ids = [int(contract_id) for contract_id in contract_ids if contract_id]
-    if not contract_ids:
-        return {}
-    db_contract_ids = [str(contract_id) for contract_id in contract_ids]
-
-    cfg = SubsidyConfig.active()
-    close_match_threshold = Decimal(str(cfg.close_match_threshold))
 
-    if forced_fit_ids is None:
+    forced_fit_ids: dict[int, int | None] = {}
+    if load_forced:
         forced_fit_ids = {
             int(row["contract_id"]): int(row["forced_fitting_id"]) if row["forced_fitting_id"] else None
             for row in CorporateContractSubsidy.objects.filter(contract_id__in=db_contract_ids)
@@ -1876,38 +2424,21 @@ def match_contracts(
             "details": decision.details,
             "created_at": decision.created_at.isoformat() if decision.created_at else None,
         }
+    return forced_fit_ids, latest_decisions
 
-    contract_items_map: dict[int, dict[int, ContractItemData]] = defaultdict(dict)
-    hull_type_ids: set[int] = set()
-    item_rows = CorporateContractItem.objects.filter(contract_id__in=db_contract_ids).select_related("type_name")
-    for row in item_rows:
-        contract_id = int(row.contract_id)
-        type_id = int(row.type_name_id)
-        item = contract_items_map[contract_id].get(type_id)
-        eve_type = getattr(row, "type_name", None)
-        if item is None:
-            faction_hint = str(getattr(eve_type, "name", "") or "").lower()
-            item = ContractItemData(
-                type_id=type_id,
-                name=getattr(eve_type, "name", None) or str(type_id),
-                category_id=_attr(eve_type, ("category_id", "eve_category_id", "category_fk_id")),
-                group_id=_attr(eve_type, ("group_id", "eve_group_id", "group_fk_id")),
-                market_group_id=_attr(eve_type, ("market_group_id", "eve_market_group_id")),
-                meta_level=_attr(eve_type, ("meta_level",)),
-                meta_group_id=_attr(eve_type, ("meta_group_id",)),
-                faction=("faction" in faction_hint or "navy" in faction_hint),
-            )
-            contract_items_map[contract_id][type_id] = item
-        qty = int(getattr(row, "quantity", 0) or 0)
-        if row.is_included:
-            item.included_qty += qty
-            if item.included_qty > 0:
-                hull_type_ids.add(type_id)
-        else:
-            item.excluded_qty += qty
+
+def _candidate_definition_ids(
+    hull_type_ids: Iterable[int],
+    *,
+    forced_fit_ids: dict[int, int | None],
+    latest_decisions: dict[int, dict[str, Any]],
+    preview_fit_id: int | None = None,
+) -> set[int]:
+    """Fittings that any of the contracts could be scored against."""
+    Fitting = _model_refs()["Fitting"]
 
     fit_ids = set(
-        Fitting.objects.filter(ship_type_type_id__in=hull_type_ids).values_list("id", flat=True)
+        Fitting.objects.filter(ship_type_type_id__in=set(hull_type_ids)).values_list("id", flat=True)
     )
     fit_ids.update(int(fit_id) for fit_id in forced_fit_ids.values() if fit_id)
     fit_ids.update(
@@ -1917,7 +2448,129 @@ def match_contracts(
     )
     if preview_fit_id:
         fit_ids.add(int(preview_fit_id))
-    fit_definitions = _load_fit_definitions(fit_ids)
+    return fit_ids
+
+
+def match_contracts(
+    contract_ids: Iterable[int],
+    *,
+    forced_fit_ids: dict[int, int | None] | None = None,
+    preview_fit_id: int | None = None,
+    persist: bool = True,
+    stats: MatchStats | None = None,
+) -> MatchRun:
+    """Match contracts and return the results keyed by contract id.
+
+    The returned mapping carries a ``stats`` attribute with per-stage wall time,
+    query counts and matcher counters; pass ``stats`` to accumulate into an
+    existing collector instead, in which case logging the run is left to the
+    caller so chunked runs are logged once rather than once per chunk.
+    """
+    SubsidyConfig = _model_refs()["SubsidyConfig"]
+
+    owns_stats = stats is None
+    stats = stats if stats is not None else MatchStats()
+    contract_ids = [int(contract_id) for contract_id in contract_ids if contract_id]
+    if not contract_ids:
+        return MatchRun(stats=stats)
+    db_contract_ids = [str(contract_id) for contract_id in contract_ids]
+    stats.contracts += len(contract_ids)
+
+    # Fingerprint the inputs before loading them so a concurrent change leaves
+    # the stored fingerprint stale rather than wrongly current. Runs with
+    # caller-supplied overrides are not fingerprinted since the stored inputs
+    # may not be what was scored.
+    fingerprints: dict[int, str] = {}
+    if persist and forced_fit_ids is None and not preview_fit_id:
+        with stats.stage("fingerprint"):
+            fingerprints = _input_fingerprints(contract_ids)
+
+    with stats.stage("load_context"):
+        cfg = SubsidyConfig.active()
+        close_match_threshold = Decimal(str(cfg.close_match_threshold))
+        stored_forced_fit_ids, latest_decisions = _load_match_context(
+            db_contract_ids,
+            load_forced=forced_fit_ids is None,
+        )
+        if forced_fit_ids is None:
+            forced_fit_ids = stored_forced_fit_ids
+
+    with stats.stage("load_items"):
+        contract_items_map, hull_type_ids = _load_contract_items(db_contract_ids, stats=stats)
+
+    with stats.stage("load_definitions"):
+        fit_definitions = _load_fit_definitions(
+            _candidate_definition_ids(
+                hull_type_ids,
+                forced_fit_ids=forced_fit_ids,
+                latest_decisions=latest_decisions,
+                preview_fit_id=preview_fit_id,
+            )
+        )
+        stats.incr("definitions_loaded", len(fit_definitions))
+
+    signature_index: dict[str, int] = {}
+    if not preview_fit_id:
+        from .signatures import exclusive_signature_index
+
+        with stats.stage("signatures"):
+            signature_index = exclusive_signature_index(fit_definitions, hull_type_ids)
+
+    with stats.stage("evaluate"):
+        results = _evaluate_contracts(
+            contract_ids,
+            contract_items_map=contract_items_map,
+            fit_definitions=fit_definitions,
+            forced_fit_ids=forced_fit_ids,
+            latest_decisions=latest_decisions,
+            preview_fit_id=preview_fit_id,
+            close_match_threshold=close_match_threshold,
+            stats=stats,
+            signature_index=signature_index,
+        )
+
+    with stats.stage("pricing"):
+        _attach_pricing(results)
+    for contract_id, result in results.items():
+        result.input_fingerprint = fingerprints.get(contract_id, "")
+
+    if persist:
+        with stats.stage("persist"):
+            _persist_results(list(results.values()))
+    if owns_stats:
+        log_stats(stats)
+    return MatchRun(results, stats=stats)
+
+
+def _evaluate_contracts(
+    contract_ids: list[int],
+    *,
+    contract_items_map: dict[int, dict[int, ContractItemData]],
+    fit_definitions: dict[int, FittingDefinition],
+    forced_fit_ids: dict[int, int | None],
+    latest_decisions: dict[int, dict[str, Any]],
+    preview_fit_id: int | None,
+    close_match_threshold: Decimal,
+    stats: MatchStats | None = None,
+    candidate_cache: dict[tuple[int, int], CandidateMatch] | None = None,
+    detail: bool = True,
+    signature_index: dict[str, int] | None = None,
+) -> dict[int, MatchResultData]:
+    """Score and select every contract against the loaded definitions.
+
+    Every candidate is first scored without evidence detail; only the
+    candidate whose evidence the selected result carries is then evaluated in
+    full. ``detail=False`` skips that second pass for callers that only need
+    statuses and scores. ``candidate_cache`` maps (contract id, fit id) to an
+    already scored candidate; hits skip the evaluator and misses are added.
+
+    ``signature_index`` maps contract signatures to exclusive fits (see
+    ``signatures.exclusive_signature_index``). A contract holding exactly an
+    exclusive fit's items, with no forced fit, decision or preview, is scored
+    against that fit alone.
+    """
+    if signature_index:
+        from .signatures import contract_signature
 
     results: dict[int, MatchResultData] = {}
     for contract_id in contract_ids:
@@ -1936,54 +2589,144 @@ def match_contracts(
         if preview_fit_id:
             candidate_fit_ids.add(int(preview_fit_id))
 
-        manual_fit_id = int(manual_decision["fitting_id"]) if manual_decision and manual_decision.get("fitting_id") else None
-        candidates = [
-            evaluate_contract_against_definition(contract_items, fit_definitions[fit_id])
-            for fit_id in candidate_fit_ids
-            if fit_id in fit_definitions
-            and (
-                fit_definitions[fit_id].profile.enabled
-                or fit_id == forced_fit_id
-                or fit_id == manual_fit_id
+        if signature_index and not forced_fit_id and not manual_decision and not preview_fit_id:
+            result = _signature_match(
+                contract_id,
+                contract_items,
+                fit_definitions.get(signature_index.get(contract_signature(contract_items))),
+                candidate_fit_ids=candidate_fit_ids,
+                fit_definitions=fit_definitions,
+                close_match_threshold=close_match_threshold,
+                detail=detail,
+                stats=stats,
             )
-        ]
-        results[contract_id] = _select_result(
+            if result is not None:
+                results[contract_id] = result
+                continue
+
+        manual_fit_id = int(manual_decision["fitting_id"]) if manual_decision and manual_decision.get("fitting_id") else None
+        candidates = []
+        for fit_id in candidate_fit_ids:
+            definition = fit_definitions.get(fit_id)
+            if definition is None or not (
+                definition.profile.enabled or fit_id == forced_fit_id or fit_id == manual_fit_id
+            ):
+                continue
+            candidate = candidate_cache.get((contract_id, fit_id)) if candidate_cache is not None else None
+            if candidate is None:
+                candidate = evaluate_contract_against_definition(contract_items, definition, stats=stats, detail=False)
+                if candidate_cache is not None:
+                    candidate_cache[(contract_id, fit_id)] = candidate
+            candidates.append(candidate)
+        select_kwargs = dict(
             contract_id=contract_id,
-            candidates=candidates,
             forced_fit_id=forced_fit_id,
             forced_fit_name=fit_definitions[forced_fit_id].fitting_name if forced_fit_id in fit_definitions else None,
             manual_decision=manual_decision,
             close_match_threshold=close_match_threshold,
         )
+        result = _select_result(candidates=candidates, **select_kwargs)
+        evidence_fit_id = result.matched_fitting_id or (result.evidence or {}).get("selected_fit_id")
+        if detail and evidence_fit_id:
+            # Selection only reads scores and issues, so re-selecting with the
+            # winner evaluated in full yields the same result plus its evidence.
+            for index, candidate in enumerate(candidates):
+                if candidate.fitting_id == evidence_fit_id and not candidate.detailed:
+                    candidates[index] = evaluate_contract_against_definition(
+                        contract_items, fit_definitions[evidence_fit_id], detail=True, stats=stats
+                    )
+                    if stats is not None:
+                        stats.incr("evidence_built")
+                    result = _select_result(candidates=candidates, **select_kwargs)
+                    break
+        result.candidate_fit_ids = sorted(candidate_fit_ids)
+        results[contract_id] = result
+    return results
 
+
+def _signature_match(
+    contract_id: int,
+    contract_items: dict[int, ContractItemData],
+    definition: FittingDefinition | None,
+    *,
+    candidate_fit_ids: set[int],
+    fit_definitions: dict[int, FittingDefinition],
+    close_match_threshold: Decimal,
+    detail: bool,
+    stats: MatchStats | None,
+) -> MatchResultData | None:
+    """Result for a contract holding exactly an exclusive fit's items, or None to score normally."""
+    if definition is None or definition.fitting_id not in candidate_fit_ids:
+        return None
+    # Exclusivity was established among the fits on this hull only.
+    if any(
+        fit_id in fit_definitions and fit_definitions[fit_id].ship_type_id != definition.ship_type_id
+        for fit_id in candidate_fit_ids
+    ):
+        return None
+    candidate = evaluate_contract_against_definition(contract_items, definition, stats=stats, detail=detail)
+    if candidate.score != MAX_SCORE or not candidate.auto_match:
+        return None
+    result = _select_result(
+        contract_id=contract_id,
+        candidates=[candidate],
+        close_match_threshold=close_match_threshold,
+    )
+    result.evidence["signature_match"] = True
+    result.candidate_fit_ids = sorted(candidate_fit_ids)
+    if stats is not None:
+        stats.incr("signature_matches")
+    return result
+
+
+def _attach_pricing(results: dict[int, MatchResultData]) -> None:
     selected_fit_ids = {
         int(result.matched_fitting_id or (result.evidence or {}).get("selected_fit_id") or 0)
         for result in results.values()
         if result.matched_fitting_id or (result.evidence or {}).get("selected_fit_id")
     }
+    pricing_map: dict[int, dict[str, Any]] = {}
+    dated_pricing: dict[int, dict[str, Any]] = {}
+    issued: dict[int, Any] = {}
     if selected_fit_ids:
-        from .pricing import get_fitting_pricing_map
-
-        pricing_map = get_fitting_pricing_map(selected_fit_ids)
-    else:
-        pricing_map = {}
+        from .. import app_settings
+        from .pricing import fitting_prices_at, get_fitting_pricing_map
+
+        if app_settings.SUBSIDY_PRICE_AT_CONTRACT_DATE:
+            # Value each contract at the prices of the day it was issued.
+            CorporateContract = _model_refs()["CorporateContract"]
+            issued = {
+                int(pk): date_issued
+                for pk, date_issued in CorporateContract.objects.filter(
+                    pk__in=[str(contract_id) for contract_id in results]
+                ).values_list("pk", "date_issued")
+            }
+            dated_pricing = fitting_prices_at(
+                {
+                    contract_id: (
+                        result.matched_fitting_id or (result.evidence or {}).get("selected_fit_id"),
+                        issued.get(int(contract_id)),
+                    )
+                    for contract_id, result in results.items()
+                }
+            )
+        else:
+            pricing_map = get_fitting_pricing_map(selected_fit_ids)
 
-    for result in results.values():
+    for contract_id, result in results.items():
         evidence = dict(result.evidence or {})
         selected_fit_id = int(result.matched_fitting_id or evidence.get("selected_fit_id") or 0) or None
-        pricing = pricing_map.get(selected_fit_id or 0)
+        pricing = dated_pricing.get(contract_id) or pricing_map.get(selected_fit_id or 0)
         evidence["pricing"] = {
             "fit_id": selected_fit_id,
             "basis_isk": float(pricing["basis_total"] or 0) if pricing else 0.0,
-            "total_volume_m3": float(pricing["total_vol"] or 0) if pricing else 0.0,
+            "total_volume_m3": float(pricing["total_volume_m3"] or 0) if pricing else 0.0,
             "suggested_subsidy": float(pricing["suggested"] or 0) if pricing else 0.0,
         }
+        if contract_id in dated_pricing and issued.get(int(contract_id)):
+            evidence["pricing"]["priced_at"] = issued[int(contract_id)].isoformat()
         result.evidence = evidence
 
-    if persist:
-        _persist_results(list(results.values()))
-    return results
-
 
 _MATCH_CONTRACT_RELOAD = object()
 
@@ -6,32 +6,10 @@ from allianceauth.eveonline.models import EveCharacter
 from allianceauth.authentication.models import CharacterOwnership
 from corptools.models import CorporateContract
 
+from ..helpers.mains import mains_for_characters
 from ..models import CorporateContractSubsidy
 
 
-def _user_id_for_issuer_eve_id(issuer_eve_id: int | None) -> int | None:
-    if not issuer_eve_id:
-        return None
-    return (
-        CharacterOwnership.objects.filter(character__character_id=issuer_eve_id)
-        .values_list("user_id", flat=True)
-        .first()
-    )
-
-def _main_name_for_user_id(user_id: int | None, fallback_name: str) -> str:
-    if not user_id:
-        return fallback_name
-    ownership = (
-        CharacterOwnership.objects.filter(user_id=user_id)
-        .select_related("user__profile__main_character")
-        .first()
-    )
-    if not ownership:
-        return fallback_name
-    profile = getattr(ownership.user, "profile", None)
-    main = getattr(profile, "main_character", None) if profile else None
-    return getattr(main, "character_name", None) or fallback_name
-
 def _all_character_eve_ids_for_user(user_id: int) -> List[int]:
     return list(
         EveCharacter.objects.filter(character_ownership__user_id=user_id)
@@ -54,6 +32,7 @@ def aggregate_payments_to_main() -> Tuple[List[dict], Dict[str, int]]:
         "exempt_unpaid": 0,
         "exempt_paid_negative_abs": 0,
         "fallback_name": "Unknown",
+        "main_name": None,
     })
 
     base_qs = (
@@ -63,19 +42,25 @@ def aggregate_payments_to_main() -> Tuple[List[dict], Dict[str, int]]:
         .values("contract__issuer_name__eve_id", "contract__issuer_name__name", "paid", "exempt")
         .annotate(total=Sum("subsidy_amount"))
     )
+    base_rows = list(base_qs)
+    mains = mains_for_characters(row.get("contract__issuer_name__eve_id") for row in base_rows)
 
-    for row in base_qs:
+    for row in base_rows:
         issuer_char_id = row.get("contract__issuer_name__eve_id")
         issuer_name = row.get("contract__issuer_name__name") or "Unknown"
-        user_id = _user_id_for_issuer_eve_id(issuer_char_id)
+        main = mains.get(int(issuer_char_id)) if issuer_char_id else None
 
-        if user_id is None:
+        if main is None:
             synthetic_key = -abs(hash(issuer_name))
             user_id = synthetic_key
+        else:
+            user_id = main.user_id
 
         user_bucket = per_user[user_id]
         if user_bucket["fallback_name"] == "Unknown":
             user_bucket["fallback_name"] = issuer_name
+        if main is not None:
+            user_bucket["main_name"] = main.main_character_name
 
         paid = bool(row["paid"])
         exempt = bool(row["exempt"])
@@ -95,14 +80,12 @@ def aggregate_payments_to_main() -> Tuple[List[dict], Dict[str, int]]:
     rows: List[dict] = []
     totals = {"approved_unpaid": 0, "approved_paid": 0, "total_approved": 0}
 
-    def display_name(uid: int, fallback: str) -> str:
-        if uid < 0:
-            return fallback
-        return _main_name_for_user_id(uid, fallback)
+    def display_name(uid: int) -> str:
+        return per_user[uid]["main_name"] or per_user[uid]["fallback_name"]
 
-    for uid in sorted(per_user.keys(), key=lambda k: display_name(k, per_user[k]["fallback_name"]).lower()):
+    for uid in sorted(per_user.keys(), key=lambda k: display_name(k).lower()):
         b = per_user[uid]
-        name = display_name(uid, b["fallback_name"])
+        name = display_name(uid)
         total = b["approved_unpaid"] + b["approved_paid"]
         rows.append({
             "character": name,
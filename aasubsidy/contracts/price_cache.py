@@ -0,0 +1,140 @@
+"""Shared cache of SubsidyItemPrice buy/sell by type id.
+
+Entries live in the configured Django cache (Redis on Alliance Auth) under
+one key per type, each tagged with the price version current when it was
+read; a per-process LRU sits in front. A price refresh bumps the version
+once it has committed, which retires every entry at once without deleting
+anything. A lookup reads the version together with the entries it needs in
+one ``get_many``, and only types missing from both layers reach the
+database.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Callable, Iterable
+
+from ..helpers.versioned_cache import VersionedCache
+
+VERSION_KEY = "aasubsidy:prices:version"
+_ITEM_KEY = "aasubsidy:prices:type:{type_id}"
+LOCAL_MAX_ENTRIES = 20_000
+
+Prices = tuple[Decimal, Decimal]
+
+
+class _LocalPrices:
+    """Process-wide LRU of (version, prices) by type id."""
+
+    def __init__(self, max_entries: int = LOCAL_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[int, Prices | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, type_id: int, version: int):
+        with self._lock:
+            entry = self._entries.get(type_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(type_id)
+            return entry
+
+    def put(self, type_id: int, version: int, prices: Prices | None) -> None:
+        with self._lock:
+            self._entries[type_id] = (version, prices)
+            self._entries.move_to_end(type_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, type_ids: Iterable[int]) -> dict[int, int]:
+        with self._lock:
+            return {type_id: self._entries[type_id][0] for type_id in type_ids if type_id in self._entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_LOCAL = _LocalPrices()
+_CACHE = VersionedCache(VERSION_KEY, "SUBSIDY_PRICE_CACHE_TIMEOUT")
+
+
+def _load_from_db(type_ids: set[int]) -> dict[int, Prices]:
+    from ..models import SubsidyItemPrice
+
+    return {
+        int(type_id): (buy, sell)
+        for type_id, buy, sell in SubsidyItemPrice.objects.filter(eve_type_id__in=type_ids).values_list(
+            "eve_type_id", "buy", "sell"
+        )
+    }
+
+
+def _item_key(type_id: int) -> str:
+    return _ITEM_KEY.format(type_id=type_id)
+
+
+def get_prices(
+    type_ids: Iterable[int],
+    *,
+    backend=None,
+    loader: Callable[[set[int]], dict[int, Prices]] | None = None,
+    timeout: int | None = None,
+    local: _LocalPrices | None = None,
+) -> dict[int, Prices]:
+    """(buy, sell) for each type id that has a price row."""
+    type_ids = {int(type_id) for type_id in type_ids if type_id}
+    if not type_ids:
+        return {}
+    backend = _CACHE.backend(backend)
+    local = _LOCAL if local is None else local
+
+    # Ask the shared cache for types this process has no entry for, plus the version.
+    local_versions = local.versions(type_ids)
+    wanted = type_ids - local_versions.keys()
+    version, fetched = _CACHE.read([_item_key(type_id) for type_id in wanted], backend)
+    stale = {type_id for type_id, entry_version in local_versions.items() if entry_version != version}
+    fetched.update(_CACHE.read_at([_item_key(type_id) for type_id in stale], version, backend))
+
+    output: dict[int, Prices] = {}
+    missing: set[int] = set()
+    for type_id in type_ids:
+        entry = None if type_id in wanted or type_id in stale else local.get(type_id, version)
+        if entry is None and _item_key(type_id) in fetched:
+            entry = (version, fetched[_item_key(type_id)])
+            local.put(type_id, version, entry[1])
+        if entry is None:
+            missing.add(type_id)
+        elif entry[1] is not None:
+            output[type_id] = entry[1]
+
+    if missing:
+        loaded = (loader or _load_from_db)(missing)
+        # Types without a row are cached too, so they do not reach the database every time.
+        _CACHE.write(version, {_item_key(type_id): loaded.get(type_id) for type_id in missing}, backend, timeout)
+        for type_id in missing:
+            local.put(type_id, version, loaded.get(type_id))
+        output.update(loaded)
+    return output
+
+
+def prices_for(type_ids: Iterable[int], basis: str = "buy", **kwargs) -> dict[int, Decimal]:
+    """One side of each cached price; ``kwargs`` go to get_prices."""
+    side = 1 if basis == "sell" else 0
+    return {type_id: prices[side] for type_id, prices in get_prices(type_ids, **kwargs).items()}
+
+
+def price_version(backend=None) -> int | None:
+    """The current price version, or None before the first lookup or bump."""
+    return _CACHE.version(backend)
+
+
+def bump_price_version(backend=None) -> int:
+    """Retire every cached price; call once new prices have committed."""
+    return _CACHE.bump(backend)
+
+
+def bump_price_version_on_commit() -> None:
+    _CACHE.bump_on_commit()
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
-from decimal import Decimal
+import hashlib
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import ROUND_CEILING, ROUND_HALF_UP, Decimal
 from typing import Iterable
 
-from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
-from django.db.models.functions import Coalesce
-
-from eveuniverse.models import EveType
-from fittings.models import Fitting, FittingItem
+DEFAULT_ROUNDING_INCREMENT = 250_000
+SNAPSHOT_CHUNK_SIZE = 500
+CENT = Decimal("0.01")
+ZERO = Decimal("0")
 
-from ..helpers.db import Ceil, Round
-from ..models import SubsidyConfig, SubsidyItemPrice
 
+def get_active_pricing_config() -> dict[str, Decimal | int | str | None]:
+    from ..models import SubsidyConfig
 
-DEFAULT_ROUNDING_INCREMENT = 250_000
+    return pricing_config(SubsidyConfig.active())
 
 
-def get_active_pricing_config() -> dict[str, Decimal | int | str | None]:
-    cfg = SubsidyConfig.active()
+def pricing_config(cfg) -> dict[str, Decimal | int | str | None]:
+    """The pricing settings of a SubsidyConfig row in the shape the pricing helpers take."""
     return {
         "basis": cfg.price_basis,
         "pct": cfg.pct_over_basis,
@@ -27,126 +29,355 @@ def get_active_pricing_config() -> dict[str, Decimal | int | str | None]:
     }
 
 
+def pricing_config_version(cfg: dict) -> str:
+    """Hash of the settings a snapshot depends on; a settings change selects a new set of rows."""
+    parts = (
+        "sell" if cfg["basis"] == "sell" else "buy",
+        str(Decimal(str(cfg["pct"] or 0)).normalize()),
+        str(Decimal(str(cfg["m3"] or 0)).normalize()),
+        str(int(cfg["incr"] or DEFAULT_ROUNDING_INCREMENT)),
+    )
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def parse_rounding_increment(raw) -> int:
+    """Rounding increment entered on the settings form; raises ValueError below 1 ISK.
+
+    Saving and previewing both go through this, so a preview never accepts a
+    value the save would store and pricing would then swap for the default.
+    """
+    incr = int(raw)
+    if incr < 1:
+        raise ValueError("The rounding increment must be at least 1 ISK.")
+    return incr
+
+
+def _increment(cfg: dict) -> Decimal:
+    incr = Decimal(str(cfg["incr"] or DEFAULT_ROUNDING_INCREMENT))
+    return incr if incr != 0 else Decimal(DEFAULT_ROUNDING_INCREMENT)
+
+
+def ceil_to_increment(value: Decimal, incr: Decimal) -> Decimal:
+    if incr <= 0:
+        return value
+    return ((value / incr).to_integral_value(rounding=ROUND_CEILING) * incr).quantize(CENT)
+
+
+def fitting_price_values(
+    *,
+    item_lines: Iterable[tuple[int, Decimal | None, Decimal | None]],
+    ship_price: Decimal | None,
+    ship_volume: Decimal | None,
+    cfg: dict,
+) -> dict[str, Decimal]:
+    """Basis, volume and suggested subsidy for one fitting.
+
+    ``item_lines`` are (quantity, unit price, unit volume) per fitting item.
+    Item and hull basis are each rounded up to the increment before they are
+    added; the suggested subsidy is the rounded-up pct/m3 markup on that total.
+    """
+    incr = _increment(cfg)
+    items_basis_raw = ZERO
+    items_volume = ZERO
+    for quantity, price, volume in item_lines:
+        items_basis_raw += int(quantity or 0) * (price or ZERO)
+        items_volume += int(quantity or 0) * (volume or ZERO)
+    items_basis_raw = items_basis_raw.quantize(CENT)
+    ship_basis_raw = (ship_price or ZERO).quantize(CENT)
+    basis_total = ceil_to_increment(items_basis_raw, incr) + ceil_to_increment(ship_basis_raw, incr)
+    total_volume = (items_volume + (ship_volume or ZERO)).quantize(Decimal("0.0001"))
+    markup = (
+        basis_total * Decimal(str(cfg["pct"] or 0)) + total_volume * Decimal(str(cfg["m3"] or 0))
+    ).quantize(CENT, rounding=ROUND_HALF_UP)
+    return {
+        "items_basis_raw": items_basis_raw,
+        "ship_basis_raw": ship_basis_raw,
+        "basis_total": basis_total,
+        "items_volume_m3": items_volume.quantize(Decimal("0.0001")),
+        "ship_volume_m3": (ship_volume or ZERO).quantize(Decimal("0.0001")),
+        "total_volume_m3": total_volume,
+        "suggested": ceil_to_increment(markup, incr),
+    }
+
+
+def _load_fitting_lines(fit_ids: list[int]) -> tuple[dict[int, int], dict[int, dict[int, int]], set[int], dict[int, object]]:
+    """Hull type and summed item quantities per fit, every type involved, and their volumes."""
+    from eveuniverse.models import EveType
+    from fittings.models import Fitting, FittingItem
+
+    ships = {
+        int(fit_id): ship_type_id
+        for fit_id, ship_type_id in Fitting.objects.filter(pk__in=fit_ids).values_list("pk", "ship_type_type_id")
+    }
+    lines_by_fit: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for fit_id, type_id, quantity in FittingItem.objects.filter(fit_id__in=ships).values_list("fit_id", "type_id", "quantity"):
+        lines_by_fit[int(fit_id)][int(type_id)] += int(quantity or 0)
+
+    type_ids = {int(type_id) for type_id in ships.values() if type_id}
+    type_ids.update(type_id for lines in lines_by_fit.values() for type_id in lines)
+    volumes = {
+        int(type_id): packaged if packaged is not None else volume
+        for type_id, packaged, volume in EveType.objects.filter(id__in=type_ids).values_list("id", "packaged_volume", "volume")
+    }
+    return ships, lines_by_fit, type_ids, volumes
+
+
+def _dec(value) -> Decimal | None:
+    return None if value is None else Decimal(str(value))
+
+
+def _fit_values(fit_id: int, ship_type_id, lines_by_fit, volumes, price_of, cfg: dict) -> dict[str, Decimal]:
+    return fitting_price_values(
+        item_lines=[
+            (quantity, _dec(price_of(type_id)), _dec(volumes.get(type_id)))
+            for type_id, quantity in lines_by_fit.get(int(fit_id), {}).items()
+        ],
+        ship_price=_dec(price_of(ship_type_id)),
+        ship_volume=_dec(volumes.get(ship_type_id)),
+        cfg=cfg,
+    )
+
+
+def load_fitting_price_matrix(fit_ids: Iterable[int]):
+    """A FittingPriceMatrix of ``fit_ids`` with current prices, ready to price any config."""
+    from .price_cache import get_prices
+    from .pricing_engine import FittingPriceMatrix
+
+    ships, lines_by_fit, type_ids, volumes = _load_fitting_lines(sorted({int(fit_id) for fit_id in fit_ids if fit_id}))
+    return FittingPriceMatrix(ships, lines_by_fit, get_prices(type_ids), volumes)
+
+
+def _compute_fitting_prices(fit_ids: list[int], cfg: dict) -> dict[int, dict[str, Decimal]]:
+    return load_fitting_price_matrix(fit_ids).values(cfg)
+
+
+def _store_snapshots(values_by_fit: dict[int, dict[str, Decimal]], version: str) -> None:
+    from ..models import FittingPriceSnapshot
+    from .matching import _upsert
+
+    fields = list(FittingPriceSnapshot.VALUE_FIELDS)
+    _upsert(
+        FittingPriceSnapshot,
+        [
+            FittingPriceSnapshot(fitting_id=fit_id, config_version=version, **values)
+            for fit_id, values in values_by_fit.items()
+        ],
+        unique_fields=["fitting", "config_version"],
+        update_fields=[*fields, "built_at"],
+    )
+
+
+def rebuild_fitting_price_snapshots(
+    fit_ids: Iterable[int] | None = None,
+    *,
+    type_ids: Iterable[int] | None = None,
+) -> int:
+    """Recompute snapshots for the current settings.
+
+    With no arguments every fitting is rebuilt and rows for earlier settings
+    are dropped. ``type_ids`` limits the rebuild to fittings using those types,
+    as hulls or items.
+    """
+    from fittings.models import Fitting, FittingItem
+
+    from ..models import FittingPriceSnapshot
+
+    cfg = get_active_pricing_config()
+    version = pricing_config_version(cfg)
+    full = fit_ids is None and type_ids is None
+    if full:
+        targets = set(Fitting.objects.values_list("pk", flat=True))
+    else:
+        targets = {int(fit_id) for fit_id in fit_ids or [] if fit_id}
+    if type_ids is not None:
+        type_ids = {int(type_id) for type_id in type_ids}
+        targets.update(Fitting.objects.filter(ship_type_type_id__in=type_ids).values_list("pk", flat=True))
+        targets.update(FittingItem.objects.filter(type_id__in=type_ids).values_list("fit_id", flat=True))
+
+    ordered = sorted(int(fit_id) for fit_id in targets)
+    for start in range(0, len(ordered), SNAPSHOT_CHUNK_SIZE):
+        chunk = ordered[start:start + SNAPSHOT_CHUNK_SIZE]
+        _store_snapshots(_compute_fitting_prices(chunk, cfg), version)
+    if full:
+        FittingPriceSnapshot.objects.exclude(config_version=version).delete()
+    return len(ordered)
+
+
+def invalidate_fitting_price_snapshots(fit_ids: Iterable[int]) -> None:
+    """Drop snapshots so the next read recomputes them."""
+    from ..models import FittingPriceSnapshot
+
+    fit_ids = {int(fit_id) for fit_id in fit_ids if fit_id}
+    if fit_ids:
+        FittingPriceSnapshot.objects.filter(fitting_id__in=fit_ids).delete()
+
+
 def get_fitting_pricing_map(fit_ids: Iterable[int]) -> dict[int, dict[str, object]]:
+    """Stored pricing per fitting for the current settings, computing any that are missing."""
+    from ..models import FittingPriceSnapshot
+
     fit_ids = sorted({int(fit_id) for fit_id in fit_ids if fit_id})
     if not fit_ids:
         return {}
 
     cfg = get_active_pricing_config()
-    price_field = "sell" if cfg["basis"] == "sell" else "buy"
-    incr_value = Decimal(str(cfg["incr"] or DEFAULT_ROUNDING_INCREMENT))
-    safe_incr_value = incr_value if incr_value != 0 else Decimal(str(DEFAULT_ROUNDING_INCREMENT))
-
-    dec_0 = DecimalField(max_digits=30, decimal_places=0)
-    dec_2 = DecimalField(max_digits=30, decimal_places=2)
-    dec_4 = DecimalField(max_digits=30, decimal_places=4)
-
-    fi_for_fit = FittingItem.objects.filter(fit_id=OuterRef("pk")).values("fit_id")
-    items_basis_fit = (
-        fi_for_fit.annotate(
-            line_val=Coalesce(
-                F("quantity")
-                * Coalesce(
-                    Subquery(
-                        SubsidyItemPrice.objects.filter(eve_type_id=OuterRef("type_id")).values(price_field)[:1],
-                        output_field=dec_2,
-                    ),
-                    Value(Decimal("0"), output_field=dec_2),
-                ),
-                Value(Decimal("0"), output_field=dec_2),
-            )
-        )
-        .values("fit_id")
-        .annotate(total=Sum("line_val", output_field=dec_2))
-        .values("total")
-    )
-    items_volume_fit = (
-        fi_for_fit.annotate(
-            line_vol=Coalesce(
-                F("quantity")
-                * Coalesce(
-                    Subquery(
-                        EveType.objects.filter(id=OuterRef("type_id"))
-                        .annotate(eff_vol=Coalesce(F("packaged_volume"), F("volume")))
-                        .values("eff_vol")[:1],
-                        output_field=dec_4,
-                    ),
-                    Value(Decimal("0"), output_field=dec_4),
-                ),
-                Value(Decimal("0"), output_field=dec_4),
-            )
-        )
-        .values("fit_id")
-        .annotate(total=Sum("line_vol", output_field=dec_4))
-        .values("total")
-    )
-
-    ship_basis_fit = Subquery(
-        SubsidyItemPrice.objects.filter(eve_type_id=OuterRef("ship_type_type_id")).values(price_field)[:1],
-        output_field=dec_2,
-    )
-    ship_vol_fit = Subquery(
-        EveType.objects.filter(id=OuterRef("ship_type_type_id"))
-        .annotate(eff_vol=Coalesce(F("packaged_volume"), F("volume")))
-        .values("eff_vol")[:1],
-        output_field=dec_4,
-    )
+    version = pricing_config_version(cfg)
+    columns = ("fitting_id", "fitting__name", *FittingPriceSnapshot.VALUE_FIELDS)
+    rows = {
+        int(row["fitting_id"]): row
+        for row in FittingPriceSnapshot.objects.filter(fitting_id__in=fit_ids, config_version=version).values(*columns)
+    }
+    missing = [fit_id for fit_id in fit_ids if fit_id not in rows]
+    if missing:
+        from fittings.models import Fitting
 
-    round_items = ExpressionWrapper(
-        Ceil(
-            ExpressionWrapper(
-                Coalesce(Subquery(items_basis_fit, output_field=dec_2), Value(Decimal("0"), output_field=dec_2))
-                / Value(safe_incr_value, output_field=dec_2),
-                output_field=dec_2,
-            ),
-            output_field=dec_0,
-        )
-        * Value(safe_incr_value, output_field=dec_2),
-        output_field=dec_2,
-    )
-    round_ship = ExpressionWrapper(
-        Ceil(
-            ExpressionWrapper(
-                Coalesce(ship_basis_fit, Value(Decimal("0"), output_field=dec_2))
-                / Value(safe_incr_value, output_field=dec_2),
-                output_field=dec_2,
-            ),
-            output_field=dec_0,
-        )
-        * Value(safe_incr_value, output_field=dec_2),
-        output_field=dec_2,
-    )
-    fit_basis_total = ExpressionWrapper(round_items + round_ship, output_field=dec_2)
-    fit_total_vol = ExpressionWrapper(
-        Coalesce(Subquery(items_volume_fit, output_field=dec_4), Value(Decimal("0"), output_field=dec_4))
-        + Coalesce(ship_vol_fit, Value(Decimal("0"), output_field=dec_4)),
-        output_field=dec_4,
-    )
-    fit_suggested = ExpressionWrapper(
-        Ceil(
-            ExpressionWrapper(
-                Round(
-                    ExpressionWrapper(
-                        (F("basis_total") * Value(cfg["pct"], output_field=dec_2))
-                        + (F("total_vol") * Value(cfg["m3"], output_field=dec_2)),
-                        output_field=dec_2,
-                    ),
-                    Value(2),
-                    output_field=dec_2,
-                )
-                / Value(safe_incr_value, output_field=dec_2),
-                output_field=dec_2,
-            ),
-            output_field=dec_0,
-        )
-        * Value(safe_incr_value, output_field=dec_2),
-        output_field=dec_2,
-    )
+        computed = _compute_fitting_prices(missing, cfg)
+        _store_snapshots(computed, version)
+        names = dict(Fitting.objects.filter(pk__in=computed).values_list("pk", "name"))
+        for fit_id, values in computed.items():
+            rows[fit_id] = {"fitting_id": fit_id, "fitting__name": names.get(fit_id), **values}
 
     return {
-        row["pk"]: row
-        for row in Fitting.objects.filter(pk__in=fit_ids)
-        .annotate(basis_total=fit_basis_total, total_vol=fit_total_vol)
-        .annotate(suggested=fit_suggested)
-        .values("pk", "name", "basis_total", "total_vol", "suggested")
+        fit_id: {
+            **row,
+            "pk": fit_id,
+            "name": row["fitting__name"],
+            "total_vol": row["total_volume_m3"],
+        }
+        for fit_id, row in rows.items()
     }
+
+
+class PriceTimeline:
+    """Buy/sell history of a set of types, answering "price of X at T" in memory.
+
+    ``history`` rows are (type id, recorded at, buy, sell). Types with no row
+    at or before T fall back to ``current`` (type id -> (buy, sell)), which is
+    how prices from before history was kept are valued.
+    """
+
+    def __init__(self, history: Iterable[tuple], current: dict[int, tuple] | None = None) -> None:
+        rows: dict[int, list[tuple]] = defaultdict(list)
+        for type_id, recorded_at, buy, sell in history:
+            rows[int(type_id)].append((recorded_at, buy, sell))
+        self._times: dict[int, list] = {}
+        self._prices: dict[int, list[tuple]] = {}
+        for type_id, entries in rows.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._times[type_id] = [entry[0] for entry in entries]
+            self._prices[type_id] = [(entry[1], entry[2]) for entry in entries]
+        self._current = current or {}
+
+    def price(self, type_id: int | None, when, basis: str = "buy") -> Decimal | None:
+        if not type_id:
+            return None
+        side = 1 if basis == "sell" else 0
+        times = self._times.get(int(type_id))
+        if times and when is not None:
+            index = bisect_right(times, when)
+            if index:
+                return self._prices[int(type_id)][index - 1][side]
+        current = self._current.get(int(type_id))
+        return None if current is None else current[side]
+
+
+def record_price_history(rows: Iterable[tuple[int, Decimal, Decimal]], recorded_at, *, skip_unchanged: bool = False) -> int:
+    """Append (type id, buy, sell) history rows.
+
+    Refreshes pass only prices they changed. ``skip_unchanged`` compares with
+    the latest stored row first, for writers that cannot tell.
+    """
+    from ..models import SubsidyItemPriceHistory
+
+    rows = [(int(type_id), buy, sell) for type_id, buy, sell in rows]
+    if skip_unchanged and rows:
+        latest = _latest_history({type_id for type_id, _, _ in rows}, None)
+        rows = [row for row in rows if latest.get(row[0]) != (Decimal(row[1]).quantize(CENT), Decimal(row[2]).quantize(CENT))]
+    SubsidyItemPriceHistory.objects.bulk_create(
+        [
+            SubsidyItemPriceHistory(eve_type_id=type_id, buy=buy, sell=sell, recorded_at=recorded_at)
+            for type_id, buy, sell in rows
+        ],
+        batch_size=SNAPSHOT_CHUNK_SIZE,
+    )
+    return len(rows)
+
+
+def _latest_history(type_ids: Iterable[int], when) -> dict[int, tuple[Decimal, Decimal]]:
+    """(buy, sell) from each type's latest history row at or before ``when`` (ever, when None)."""
+    from django.db.models import OuterRef, Subquery
+
+    from ..models import SubsidyItemPriceHistory
+
+    ordered = sorted({int(type_id) for type_id in type_ids if type_id})
+    output: dict[int, tuple[Decimal, Decimal]] = {}
+    for start in range(0, len(ordered), SNAPSHOT_CHUNK_SIZE):
+        chunk = ordered[start:start + SNAPSHOT_CHUNK_SIZE]
+        latest = SubsidyItemPriceHistory.objects.filter(eve_type_id=OuterRef("eve_type_id"))
+        if when is not None:
+            latest = latest.filter(recorded_at__lte=when)
+        # Each lookup is one seek on the (eve_type, recorded_at) index.
+        latest = latest.order_by("-recorded_at", "-pk").values("pk")[:1]
+        for type_id, buy, sell in SubsidyItemPriceHistory.objects.filter(
+            eve_type_id__in=chunk, pk=Subquery(latest)
+        ).values_list("eve_type_id", "buy", "sell"):
+            output[int(type_id)] = (buy, sell)
+    return output
+
+
+def item_prices_at(type_ids: Iterable[int], when, *, basis: str = "buy") -> dict[int, Decimal]:
+    """Price of each type at ``when``; types with no history by then use the current price."""
+    from .price_cache import prices_for
+
+    type_ids = {int(type_id) for type_id in type_ids if type_id}
+    side = 1 if basis == "sell" else 0
+    output = {type_id: prices[side] for type_id, prices in _latest_history(type_ids, when).items()}
+    missing = type_ids - output.keys()
+    if missing:
+        output.update(prices_for(missing, basis))
+    return output
+
+
+def load_price_timeline(type_ids: Iterable[int], *, until=None) -> PriceTimeline:
+    """History of ``type_ids`` up to ``until`` plus their current prices from the price cache."""
+    from ..models import SubsidyItemPriceHistory
+    from .price_cache import get_prices
+
+    ordered = sorted({int(type_id) for type_id in type_ids if type_id})
+    history: list[tuple] = []
+    for start in range(0, len(ordered), SNAPSHOT_CHUNK_SIZE):
+        chunk = ordered[start:start + SNAPSHOT_CHUNK_SIZE]
+        rows = SubsidyItemPriceHistory.objects.filter(eve_type_id__in=chunk)
+        if until is not None:
+            rows = rows.filter(recorded_at__lte=until)
+        history.extend(rows.values_list("eve_type_id", "recorded_at", "buy", "sell"))
+    return PriceTimeline(history, get_prices(ordered))
+
+
+def fitting_prices_at(targets: dict, cfg: dict | None = None) -> dict:
+    """Pricing values per key for ``targets`` of key -> (fit id, when).
+
+    Used to value contracts at their issue date: every fit's items and the
+    price history they need are loaded once for the whole batch.
+    """
+    targets = {key: (int(fit_id), when) for key, (fit_id, when) in targets.items() if fit_id}
+    if not targets:
+        return {}
+    cfg = cfg or get_active_pricing_config()
+    basis = "sell" if cfg["basis"] == "sell" else "buy"
+    ships, lines_by_fit, type_ids, volumes = _load_fitting_lines(sorted({fit_id for fit_id, _ in targets.values()}))
+    dates = [when for _, when in targets.values() if when is not None]
+    timeline = load_price_timeline(type_ids, until=max(dates) if dates else None)
+    output = {}
+    for key, (fit_id, when) in targets.items():
+        if fit_id not in ships:
+            continue
+        output[key] = _fit_values(
+            fit_id,
+            ships[fit_id],
+            lines_by_fit,
+            volumes,
+            lambda type_id, when=when: timeline.price(type_id, when, basis),
+            cfg,
+        )
+    return output
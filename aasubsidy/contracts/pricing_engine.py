@@ -0,0 +1,228 @@
+"""Vectorised fitting pricing.
+
+``FittingPriceMatrix`` holds every fitting's item quantities as a sparse
+fitting x type matrix (coordinate form) with buy, sell and volume vectors,
+and prices all fittings for a config in one pass. Money is held in integer
+cents and volumes in integer units of the finest volume precision present,
+so sums and the increment, half-up and half-even rounding of
+``fitting_price_values`` are reproduced exactly rather than approximated in
+floating point.
+
+NumPy is optional. Without it, or when a value would not fit the integer
+representation (negative or sub-cent prices, very large totals), the matrix
+falls back to ``fitting_price_values`` for every fit.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from .pricing import ZERO, _dec, _increment, fitting_price_values
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Headroom below 2**63: item sums stay under _SUM_LIMIT so rounding them up and
+# adding the hull cannot overflow; the markup numerator stays under _INT_LIMIT.
+_SUM_LIMIT = 2**60
+_INT_LIMIT = 2**62
+_MAX_VOLUME_DIGITS = 8
+_VOLUME_DIGITS = 4
+
+
+def _scaled(value: Decimal, digits: int) -> int | None:
+    """``value`` as an integer count of 10**-digits, or None when that is not exact."""
+    scaled = value.scaleb(digits)
+    if scaled != scaled.to_integral_value():
+        return None
+    return int(scaled)
+
+
+def _decimal_digits(value: Decimal) -> int:
+    exponent = value.normalize().as_tuple().exponent
+    return max(-exponent, 0) if isinstance(exponent, int) else 0
+
+
+def _ratio(value) -> tuple[int, int] | None:
+    """Non-negative Decimal as (numerator, decimal places)."""
+    value = Decimal(str(value or 0))
+    if value < 0:
+        return None
+    digits = _decimal_digits(value)
+    return int(value.scaleb(digits)), digits
+
+
+class FittingPriceMatrix:
+    """Basis, volume and suggested subsidy of a set of fittings under any pricing config.
+
+    ``ships`` maps fit id to hull type id, ``lines_by_fit`` fit id to
+    {type id: quantity}, ``prices`` type id to (buy, sell) and ``volumes``
+    type id to unit volume. Everything but the config is fixed, so repeated
+    ``values`` calls for different configs only redo the per-fit rounding.
+    """
+
+    def __init__(
+        self,
+        ships: dict[int, Any],
+        lines_by_fit: dict[int, dict[int, int]],
+        prices: dict[int, tuple[Any, Any]],
+        volumes: dict[int, Any],
+    ) -> None:
+        self.fit_ids = sorted(int(fit_id) for fit_id in ships)
+        self._ships = ships
+        self._lines_by_fit = lines_by_fit
+        self._prices = prices
+        self._volumes = volumes
+        self._arrays = self._build() if np is not None else None
+
+    @property
+    def vectorised(self) -> bool:
+        return self._arrays is not None
+
+    def _build(self) -> dict[str, Any] | None:
+        type_ids = sorted(
+            {int(type_id) for lines in self._lines_by_fit.values() for type_id in lines}
+            | {int(type_id) for type_id in self._ships.values() if type_id}
+        )
+        index = {type_id: position for position, type_id in enumerate(type_ids)}
+
+        volumes = [_dec(self._volumes.get(type_id)) or ZERO for type_id in type_ids]
+        if any(volume < 0 for volume in volumes):
+            return None
+        volume_digits = max([_VOLUME_DIGITS, *(_decimal_digits(volume) for volume in volumes)])
+        if volume_digits > _MAX_VOLUME_DIGITS:
+            return None
+
+        columns: dict[str, list[int]] = {"buy": [], "sell": [], "volume": []}
+        for type_id, volume in zip(type_ids, volumes):
+            buy, sell = self._prices.get(type_id) or (None, None)
+            for side, price in (("buy", buy), ("sell", sell)):
+                cents = _scaled(_dec(price) or ZERO, 2)
+                if cents is None or cents < 0:
+                    return None
+                columns[side].append(cents)
+            columns["volume"].append(_scaled(volume, volume_digits))
+
+        rows, cols, quantities = [], [], []
+        ship_index = []
+        fit_quantity = 0
+        for row, fit_id in enumerate(self.fit_ids):
+            lines = self._lines_by_fit.get(fit_id, {})
+            for type_id, quantity in lines.items():
+                quantity = int(quantity or 0)
+                if quantity < 0:
+                    return None
+                rows.append(row)
+                cols.append(index[int(type_id)])
+                quantities.append(quantity)
+            fit_quantity = max(fit_quantity, sum(int(quantity or 0) for quantity in lines.values()))
+            ship_type_id = self._ships.get(fit_id)
+            ship_index.append(index[int(ship_type_id)] if ship_type_id else -1)
+
+        for column in columns.values():
+            largest = max(column, default=0)
+            if (fit_quantity + 1) * largest >= _SUM_LIMIT:
+                return None
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        quantities = np.asarray(quantities, dtype=np.int64)
+        ship_index = np.asarray(ship_index, dtype=np.int64)
+        has_ship = ship_index >= 0
+        arrays: dict[str, Any] = {"volume_digits": volume_digits}
+        for name, column in columns.items():
+            vector = np.asarray(column, dtype=np.int64)
+            item_totals = np.zeros(len(self.fit_ids), dtype=np.int64)
+            np.add.at(item_totals, rows, quantities * vector[cols])
+            arrays[f"items_{name}"] = item_totals
+            ship_values = np.zeros(len(self.fit_ids), dtype=np.int64)
+            ship_values[has_ship] = vector[ship_index[has_ship]]
+            arrays[f"ship_{name}"] = ship_values
+        return arrays
+
+    def values(self, cfg: dict) -> dict[int, dict[str, Decimal]]:
+        """The ``fitting_price_values`` result of every fit for ``cfg``."""
+        if self._arrays is not None:
+            output = self._vectorised_values(cfg)
+            if output is not None:
+                return output
+        return self._decimal_values(cfg)
+
+    def _decimal_values(self, cfg: dict) -> dict[int, dict[str, Decimal]]:
+        side = 1 if cfg["basis"] == "sell" else 0
+
+        def price(type_id):
+            prices = self._prices.get(type_id)
+            return None if prices is None else _dec(prices[side])
+
+        return {
+            fit_id: fitting_price_values(
+                item_lines=[
+                    (quantity, price(type_id), _dec(self._volumes.get(type_id)))
+                    for type_id, quantity in self._lines_by_fit.get(fit_id, {}).items()
+                ],
+                ship_price=price(self._ships.get(fit_id)),
+                ship_volume=_dec(self._volumes.get(self._ships.get(fit_id))),
+                cfg=cfg,
+            )
+            for fit_id in self.fit_ids
+        }
+
+    def _vectorised_values(self, cfg: dict) -> dict[int, dict[str, Decimal]] | None:
+        arrays = self._arrays
+        side = "sell" if cfg["basis"] == "sell" else "buy"
+        increment = _scaled(_increment(cfg), 2)
+        pct = _ratio(cfg["pct"])
+        m3 = _ratio(cfg["m3"])
+        if increment is None or pct is None or m3 is None:
+            return None
+
+        def ceil_to_increment(cents):
+            if increment <= 0:
+                return cents
+            return -((-cents) // increment) * increment
+
+        def round_half_even(units, factor: int):
+            if factor == 1:
+                return units
+            quotient, remainder = np.divmod(units, factor)
+            return quotient + ((2 * remainder > factor) | ((2 * remainder == factor) & (quotient % 2 == 1)))
+
+        items_basis = arrays[f"items_{side}"]
+        ship_basis = arrays[f"ship_{side}"]
+        basis_total = ceil_to_increment(items_basis) + ceil_to_increment(ship_basis)
+        volume_factor = 10 ** (arrays["volume_digits"] - _VOLUME_DIGITS)
+        items_volume = round_half_even(arrays["items_volume"], volume_factor)
+        ship_volume = round_half_even(arrays["ship_volume"], volume_factor)
+        total_volume = round_half_even(arrays["items_volume"] + arrays["ship_volume"], volume_factor)
+
+        # markup = basis_total / 100 * pct + total_volume / 10**4 * m3, as a numerator over 10**scale.
+        (pct_value, pct_digits), (m3_value, m3_digits) = pct, m3
+        scale = max(pct_digits + 2, m3_digits + _VOLUME_DIGITS)
+        basis_factor = pct_value * 10 ** (scale - pct_digits - 2)
+        volume_rate = m3_value * 10 ** (scale - m3_digits - _VOLUME_DIGITS)
+        largest = int(basis_total.max(initial=0)) * basis_factor + int(total_volume.max(initial=0)) * volume_rate
+        if largest >= _INT_LIMIT or basis_factor >= _INT_LIMIT or volume_rate >= _INT_LIMIT:
+            return None
+        numerator = basis_total * basis_factor + total_volume * volume_rate
+        divisor = 10 ** (scale - 2)
+        markup = (numerator + divisor // 2) // divisor if divisor > 1 else numerator
+        suggested = ceil_to_increment(markup)
+
+        columns = {
+            "items_basis_raw": (items_basis, 2),
+            "ship_basis_raw": (ship_basis, 2),
+            "basis_total": (basis_total, 2),
+            "items_volume_m3": (items_volume, _VOLUME_DIGITS),
+            "ship_volume_m3": (ship_volume, _VOLUME_DIGITS),
+            "total_volume_m3": (total_volume, _VOLUME_DIGITS),
+            "suggested": (suggested, 2),
+        }
+        lists = {name: (values.tolist(), digits) for name, (values, digits) in columns.items()}
+        return {
+            fit_id: {name: Decimal(values[row]).scaleb(-digits) for name, (values, digits) in lists.items()}
+            for row, fit_id in enumerate(self.fit_ids)
+        }
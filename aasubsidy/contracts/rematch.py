@@ -0,0 +1,162 @@
+"""Targeted background re-matching after doctrine rule or profile changes."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterable, NamedTuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+REMATCH_DEBOUNCE_SECONDS = 30
+REMATCH_PENDING_TIMEOUT = 60 * 60
+_SCHEDULED_KEY = "aasubsidy:rematch:scheduled:{fitting_id}"
+# One key holding every queued or running re-match, so the review board polls it in a single read.
+_RUNS_KEY = "aasubsidy:rematch:runs"
+_RUNS_LOCK_KEY = "aasubsidy:rematch:runs:lock"
+_RUNS_LOCK_ATTEMPTS = 50
+_RUNS_LOCK_WAIT_SECONDS = 0.05
+
+
+class RematchStatus(NamedTuple):
+    """Contracts being re-matched, and whether a scheduled run has not counted its contracts yet."""
+
+    contracts: int
+    queued: bool
+
+
+def _fitting_ids(fitting_ids: Iterable[int]) -> list[int]:
+    return sorted({int(fitting_id) for fitting_id in fitting_ids if fitting_id})
+
+
+def affected_contract_pks(fitting_ids: Iterable[int]) -> list[int]:
+    """Contracts the fittings are, or would now be, a candidate for that are still open for review.
+
+    Candidates of a contract are the fits on any hull it includes plus fits it
+    was forced to or decided against, so contracts are selected the same way
+    rather than only from the candidate index: results stored before the index
+    existed have no rows there, and a new fit on an existing hull has none yet.
+    The hull scan only reaches back SUBSIDY_REMATCH_LOOKBACK_DAYS, like the
+    review board; older contracts are still picked up through the index.
+    """
+    from corptools.models import CorporateContract, CorporateContractItem
+    from django.utils import timezone
+    from fittings.models import Fitting
+
+    from .. import app_settings
+    from ..models import CorporateContractSubsidy, DoctrineContractDecision
+    from ..tasks import _exclude_review_locked_contracts
+
+    fitting_ids = _fitting_ids(fitting_ids)
+    if not fitting_ids:
+        return []
+    hull_type_ids = set(
+        Fitting.objects.filter(pk__in=fitting_ids).values_list("ship_type_type_id", flat=True)
+    )
+    contract_pks = set(
+        CorporateContract.objects.filter(doctrine_match_candidates__fitting_id__in=fitting_ids).values_list(
+            "id", flat=True
+        )
+    )
+    if hull_type_ids:
+        contract_pks.update(
+            CorporateContractItem.objects.filter(
+                type_name_id__in=hull_type_ids,
+                is_included=True,
+                quantity__gt=0,
+                contract__date_issued__gte=timezone.now()
+                - timedelta(days=int(app_settings.SUBSIDY_REMATCH_LOOKBACK_DAYS)),
+            ).values_list("contract_id", flat=True)
+        )
+    contract_pks.update(
+        CorporateContractSubsidy.objects.filter(forced_fitting_id__in=fitting_ids).values_list("contract_id", flat=True)
+    )
+    contract_pks.update(
+        DoctrineContractDecision.objects.filter(fitting_id__in=fitting_ids).values_list("contract_id", flat=True)
+    )
+    if not contract_pks:
+        return []
+    qs = _exclude_review_locked_contracts(CorporateContract.objects.filter(pk__in=contract_pks))
+    return sorted({int(contract_pk) for contract_pk in qs.values_list("id", flat=True)})
+
+
+def queue_fitting_rematch(fitting_ids: Iterable[int]) -> None:
+    """Schedule a debounced re-match for the given fittings once the current transaction commits."""
+    fitting_ids = _fitting_ids(fitting_ids)
+    if fitting_ids:
+        transaction.on_commit(lambda: _schedule_rematch(fitting_ids))
+
+
+def _schedule_rematch(fitting_ids: list[int]) -> None:
+    from ..tasks import rematch_contracts_for_fittings
+
+    # The first change for a fitting schedules the run; later changes inside the
+    # debounce window are picked up by that run because it reads the rules when it starts.
+    due = [
+        fitting_id
+        for fitting_id in fitting_ids
+        if cache.add(_SCHEDULED_KEY.format(fitting_id=fitting_id), True, timeout=REMATCH_DEBOUNCE_SECONDS * 2)
+    ]
+    if not due:
+        return
+    # The task counts the affected contracts when it starts; until then the run shows as queued.
+    _set_run(due, None)
+    rematch_contracts_for_fittings.apply_async(args=[due], countdown=REMATCH_DEBOUNCE_SECONDS)
+
+
+def release_fittings(fitting_ids: Iterable[int]) -> None:
+    """Reopen the debounce window so changes made during a run schedule a fresh one."""
+    cache.delete_many([_SCHEDULED_KEY.format(fitting_id=fitting_id) for fitting_id in _fitting_ids(fitting_ids)])
+
+
+@contextmanager
+def _runs_lock():
+    for _ in range(_RUNS_LOCK_ATTEMPTS):
+        if cache.add(_RUNS_LOCK_KEY, True, timeout=5):
+            try:
+                yield
+            finally:
+                cache.delete(_RUNS_LOCK_KEY)
+            return
+        time.sleep(_RUNS_LOCK_WAIT_SECONDS)
+    # The registry only drives the progress indicator; update it unlocked rather than hold up a task.
+    yield
+
+
+def _live_runs(now: float) -> dict[str, tuple[int | None, float]]:
+    # Each run carries its own expiry, so one left behind by a killed worker ages out on its own.
+    return {run: entry for run, entry in (cache.get(_RUNS_KEY) or {}).items() if entry[1] > now}
+
+
+def _set_run(fitting_ids: list[int], count: int | None) -> None:
+    """Record a run's contract count (None while queued), or drop the run when the count is 0."""
+    run = ",".join(str(fitting_id) for fitting_id in fitting_ids)
+    if not run:
+        return
+    with _runs_lock():
+        now = time.time()
+        runs = _live_runs(now)
+        if count is None or count:
+            runs[run] = (None if count is None else int(count), now + REMATCH_PENDING_TIMEOUT)
+        else:
+            runs.pop(run, None)
+        cache.set(_RUNS_KEY, runs, timeout=REMATCH_PENDING_TIMEOUT)
+
+
+def mark_rematch_running(fitting_ids: Iterable[int], count: int) -> None:
+    _set_run(_fitting_ids(fitting_ids), count)
+
+
+def mark_rematch_finished(fitting_ids: Iterable[int]) -> None:
+    _set_run(_fitting_ids(fitting_ids), 0)
+
+
+def pending_rematch() -> RematchStatus:
+    """Contracts being re-matched in the background, read with one cache lookup."""
+    runs = _live_runs(time.time())
+    return RematchStatus(
+        contracts=sum(int(count or 0) for count, _ in runs.values()),
+        queued=any(count is None for count, _ in runs.values()),
+    )
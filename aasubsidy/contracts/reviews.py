@@ -1,39 +1,22 @@
 from datetime import datetime
 from typing import Iterable
 
-from allianceauth.eveonline.models import EveCharacter
-from eveuniverse.models import EveEntity
 from corptools.models import CorporateContract
 
 from .filters import apply_contract_exclusions
 from .matching import get_or_match_contracts
 from .pricing import get_active_pricing_config, get_fitting_pricing_map
+from ..helpers.mains import mains_for_names
 from ..models import CorporateContractSubsidy, SubsidyConfig
 from ..tasks import _effective_corporation_id
 
 
 def _bulk_display_issuer_names(entity_names: Iterable[str]) -> dict[str, str]:
-    names = list(set(entity_names))
-    entities = EveEntity.objects.filter(name__in=names).values("name", "id")
-    entity_map = {e["name"]: e for e in entities}
-
-    chars = EveCharacter.objects.filter(
-        character_id__in={e["id"] for e in entities}
-    ).select_related("character_ownership__user__profile__main_character")
-    char_map = {char.character_id: char for char in chars}
-
+    names = set(entity_names)
+    mains = mains_for_names(names)
     results = {}
     for name in names:
-        ent = entity_map.get(name)
-        if not ent:
-            results[name] = name
-            continue
-        char = char_map.get(ent["id"])
-        if not char or not getattr(char, "character_ownership", None):
-            results[name] = name
-            continue
-        main_char = char.character_ownership.user.profile.main_character
-        main_name = getattr(main_char, "character_name", None)
+        main_name = mains[name].main_character_name if name in mains else None
         results[name] = f"{main_name} ({name})" if main_name and main_name != name else name
     return results
 
@@ -0,0 +1,179 @@
+"""Canonical item signatures for the matcher's exact-match fast path.
+
+A fitting's signature hashes the (type id, quantity) multiset a contract has
+to contain to match it exactly; a contract's signature hashes its included
+items the same way. A fitting is *exclusive* when a contract holding exactly
+its items auto-matches it and nothing else on the hull, so a contract whose
+signature belongs to an exclusive fitting only needs that fitting scored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from .matching import (
+    MATCH_ENGINE_VERSION,
+    MAX_SCORE,
+    ContractItemData,
+    FittingDefinition,
+    TypeInfo,
+    _select_result,
+    _upsert,
+    compile_definition,
+    evaluate_contract_against_definition,
+)
+
+
+def _hash(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _signature(quantities: dict[int, int]) -> str | None:
+    return _hash(sorted(quantities.items())) if quantities else None
+
+
+def contract_signature(contract_items: dict[int, ContractItemData]) -> str | None:
+    return _signature({
+        int(type_id): int(item.included_qty)
+        for type_id, item in contract_items.items()
+        if int(item.included_qty or 0) > 0
+    })
+
+
+def expected_quantities(definition: FittingDefinition) -> dict[int, int]:
+    """The items a contract matching the fit exactly would hold.
+
+    Ignore rules and rules without a preferred quantity are left out; ranged
+    and minimum rules count at their preferred quantity.
+    """
+    quantities: dict[int, int] = defaultdict(int)
+    for rule in compile_definition(definition).rules:
+        if rule.is_ignore or rule.preferred_qty <= 0:
+            continue
+        quantities[rule.rule.expected_type_id] += rule.preferred_qty
+    return dict(quantities)
+
+
+def definition_signature(definition: FittingDefinition) -> str | None:
+    return _signature(expected_quantities(definition))
+
+
+def _exact_contract(definition: FittingDefinition) -> dict[int, ContractItemData]:
+    contract: dict[int, ContractItemData] = {}
+    for type_id, qty in expected_quantities(definition).items():
+        info = definition.type_info.get(type_id) or TypeInfo(type_id=type_id, name=str(type_id))
+        contract[type_id] = ContractItemData(
+            type_id=type_id,
+            name=info.name,
+            included_qty=qty,
+            category_id=info.category_id,
+            group_id=info.group_id,
+            market_group_id=info.market_group_id,
+            meta_level=info.meta_level,
+            meta_group_id=info.meta_group_id,
+            faction=info.faction,
+        )
+    return contract
+
+
+def hull_version(definitions: Iterable[FittingDefinition]) -> str:
+    """Identifies the fits on one hull; exclusivity is only valid while it is unchanged."""
+    return _hash([MATCH_ENGINE_VERSION, sorted([d.fitting_id, d.version] for d in definitions)])
+
+
+def hull_signatures(definitions: list[FittingDefinition]) -> dict[int, tuple[str | None, bool]]:
+    """(signature, exclusive) for each fit, given every fit sharing their hull.
+
+    A fit is exclusive when its exact contract holds no other hull of the
+    group and selection over the whole group auto-matches it with a perfect,
+    unambiguous score.
+    """
+    signatures = {definition.fitting_id: definition_signature(definition) for definition in definitions}
+    counts = Counter(signatures.values())
+    hull_ids = {definition.ship_type_id for definition in definitions}
+    output: dict[int, tuple[str | None, bool]] = {}
+    for definition in definitions:
+        signature = signatures[definition.fitting_id]
+        exclusive = False
+        if signature is not None and counts[signature] == 1 and definition.profile.enabled:
+            contract = _exact_contract(definition)
+            if hull_ids & contract.keys() == {definition.ship_type_id}:
+                result = _select_result(
+                    contract_id=0,
+                    candidates=[
+                        evaluate_contract_against_definition(contract, other, detail=False)
+                        for other in definitions
+                        if other.profile.enabled
+                    ],
+                )
+                exclusive = (
+                    result.match_status == "matched"
+                    and result.matched_fitting_id == definition.fitting_id
+                    and result.score == MAX_SCORE
+                )
+        output[definition.fitting_id] = (signature, exclusive)
+    return output
+
+
+def exclusive_signature_index(
+    fit_definitions: dict[int, FittingDefinition],
+    hull_type_ids: Iterable[int],
+) -> dict[str, int]:
+    """Contract signature -> exclusive fit id for the loaded fits on ``hull_type_ids``.
+
+    Every fit on those hulls must be loaded, as match_contracts does; fits
+    loaded only as a forced or decided fit are skipped. Stored rows are reused
+    while their hull version is current; hulls with a missing or stale row are
+    recomputed and stored. Definitions without a version (built in memory)
+    never take the fast path.
+    """
+    from ..models import FittingMatchSignature
+
+    hull_type_ids = set(hull_type_ids)
+    by_hull: dict[int, list[FittingDefinition]] = defaultdict(list)
+    for definition in fit_definitions.values():
+        if definition.ship_type_id in hull_type_ids:
+            by_hull[definition.ship_type_id].append(definition)
+    versions = {
+        hull_id: hull_version(definitions)
+        for hull_id, definitions in by_hull.items()
+        if all(definition.version for definition in definitions)
+    }
+    if not versions:
+        return {}
+
+    fit_ids = [definition.fitting_id for hull_id in versions for definition in by_hull[hull_id]]
+    stored = {
+        int(fit_id): (signature, stored_version, exclusive)
+        for fit_id, signature, stored_version, exclusive in FittingMatchSignature.objects.filter(
+            fitting_id__in=fit_ids
+        ).values_list("fitting_id", "signature", "hull_version", "exclusive")
+    }
+
+    index: dict[str, int] = {}
+    rebuilt: list = []
+    for hull_id, version in versions.items():
+        definitions = by_hull[hull_id]
+        rows = [stored.get(definition.fitting_id) for definition in definitions]
+        if all(row is not None and row[1] == version for row in rows):
+            entries = {definition.fitting_id: (row[0], row[2]) for definition, row in zip(definitions, rows)}
+        else:
+            entries = hull_signatures(definitions)
+            rebuilt.extend(
+                FittingMatchSignature(fitting_id=fit_id, signature=signature or "", hull_version=version, exclusive=exclusive)
+                for fit_id, (signature, exclusive) in entries.items()
+            )
+        for fit_id, (signature, exclusive) in entries.items():
+            if exclusive and signature:
+                index[signature] = fit_id
+    if rebuilt:
+        _upsert(
+            FittingMatchSignature,
+            rebuilt,
+            unique_fields=["fitting"],
+            update_fields=["signature", "hull_version", "exclusive", "built_at"],
+        )
+    return index
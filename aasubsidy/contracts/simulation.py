@@ -0,0 +1,347 @@
+"""In-memory what-if runs of proposed doctrine rule and threshold changes.
+
+Nothing here writes to the database: contracts from the selected window are
+scored against the current definitions and against copies carrying the
+proposed changes, and the two outcomes are compared.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable
+
+from .instrumentation import MatchStats
+from .matching import (
+    CandidateMatch,
+    ContractItemData,
+    FittingDefinition,
+    MatchResultData,
+    SubstitutionRuleData,
+    _candidate_definition_ids,
+    _decimal,
+    _evaluate_contracts,
+    _load_contract_items,
+    _load_fit_definitions,
+    _load_match_context,
+)
+
+DEFAULT_DAYS = 30
+DEFAULT_LIMIT = 5000
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_SAMPLE_SIZE = 50
+MATCH_STATUSES = ("matched", "needs_review", "no_match")
+PROFILE_DECIMAL_FIELDS = ("auto_match_threshold", "review_threshold")
+PROFILE_FLAG_FIELDS = ("enabled", "allow_extra_items", "allow_meta_variants", "allow_faction_variants")
+SUBSTITUTION_RULE_TYPES = ("specific", "meta_family", "market_group", "group")
+
+# Contract items do not change once a contract is issued, so repeated runs
+# while an admin iterates on a proposal reuse the vectors already loaded.
+_ITEM_VECTOR_CACHE: dict[int, dict[int, ContractItemData]] = {}
+_ITEM_VECTOR_CACHE_MAX = 20_000
+
+
+@dataclass(slots=True)
+class Proposal:
+    close_match_threshold: Decimal | None = None
+    profiles: dict[int, dict[str, Any]] = field(default_factory=dict)
+    substitutions: dict[int, list[SubstitutionRuleData]] = field(default_factory=dict)
+
+    @property
+    def changed_fit_ids(self) -> set[int]:
+        return set(self.profiles) | set(self.substitutions)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.close_match_threshold is None and not self.changed_fit_ids
+
+
+def _threshold(value: Any, label: str) -> Decimal:
+    try:
+        threshold = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"{label} must be a number.")
+    if not Decimal("0") <= threshold <= Decimal("100"):
+        raise ValueError(f"{label} must be between 0 and 100.")
+    return threshold.quantize(Decimal("0.01"))
+
+
+def _positive_int(value: Any, label: str) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} must be an integer.")
+    if number <= 0:
+        raise ValueError(f"{label} must be greater than 0.")
+    return number
+
+
+def parse_proposal(payload: dict[str, Any]) -> Proposal:
+    """Build a proposal from the JSON body the admin page posts.
+
+    ``profiles`` maps a fitting id to profile fields to override and
+    ``substitutions`` lists extra rules, each carrying its ``fitting_id``.
+    Raises ValueError with a user-facing message on invalid input.
+    """
+    proposal = Proposal()
+    if payload.get("close_match_threshold") not in (None, ""):
+        proposal.close_match_threshold = _threshold(payload["close_match_threshold"], "Close match threshold")
+
+    for fit_id, overrides in (payload.get("profiles") or {}).items():
+        fit_id = _positive_int(fit_id, "Fitting id")
+        parsed: dict[str, Any] = {}
+        for name in PROFILE_DECIMAL_FIELDS:
+            if (overrides or {}).get(name) not in (None, ""):
+                parsed[name] = _threshold(overrides[name], name.replace("_", " ").capitalize())
+        for name in PROFILE_FLAG_FIELDS:
+            if (overrides or {}).get(name) is not None:
+                parsed[name] = bool(overrides[name])
+        if parsed:
+            proposal.profiles[fit_id] = parsed
+
+    for rule in payload.get("substitutions") or []:
+        fit_id = _positive_int(rule.get("fitting_id"), "Fitting id")
+        rule_type = rule.get("rule_type") or "specific"
+        if rule_type not in SUBSTITUTION_RULE_TYPES:
+            raise ValueError(f"Unknown substitution rule type: {rule_type}.")
+        allowed_type_id = rule.get("allowed_type_id")
+        if rule_type == "specific":
+            allowed_type_id = _positive_int(allowed_type_id, "Allowed type id")
+        proposal.substitutions.setdefault(fit_id, []).append(
+            SubstitutionRuleData(
+                expected_type_id=_positive_int(rule.get("expected_type_id"), "Expected type id"),
+                rule_type=rule_type,
+                allowed_type_id=int(allowed_type_id) if allowed_type_id else None,
+                max_meta_level_delta=int(rule.get("max_meta_level_delta") or 0),
+                same_slot_only=bool(rule.get("same_slot_only", True)),
+                same_group_only=bool(rule.get("same_group_only", True)),
+                penalty_points=_decimal(rule.get("penalty_points")),
+            )
+        )
+    return proposal
+
+
+def apply_proposal(
+    definitions: dict[int, FittingDefinition],
+    proposal: Proposal,
+) -> dict[int, FittingDefinition]:
+    """Definitions with the proposal applied; untouched fittings are shared, not copied."""
+    proposed = dict(definitions)
+    for fit_id in proposal.changed_fit_ids & definitions.keys():
+        definition = definitions[fit_id]
+        profile = definition.profile
+        if fit_id in proposal.profiles:
+            profile = replace(profile, **proposal.profiles[fit_id])
+        substitutions = definition.substitutions
+        if fit_id in proposal.substitutions:
+            substitutions = [*substitutions, *proposal.substitutions[fit_id]]
+        # A blank version keeps the copy from sharing the stored definition's compiled rules.
+        proposed[fit_id] = replace(definition, profile=profile, substitutions=substitutions, version="")
+    return proposed
+
+
+def _outcome(result: MatchResultData) -> tuple[str, int | None]:
+    fit_id = result.matched_fitting_id or (result.evidence or {}).get("selected_fit_id")
+    return result.match_status, int(fit_id) if fit_id else None
+
+
+def diff_results(
+    baseline: dict[int, MatchResultData],
+    proposed: dict[int, MatchResultData],
+    *,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> dict[str, Any]:
+    """Status counts before and after, status transitions and a sample of changed contracts.
+
+    A contract counts as changed when its status or selected fitting differs;
+    score-only movement is counted separately.
+    """
+    before: Counter = Counter({status: 0 for status in MATCH_STATUSES})
+    after: Counter = Counter({status: 0 for status in MATCH_STATUSES})
+    transitions: Counter = Counter()
+    changed: list[dict[str, Any]] = []
+    score_changed = 0
+    for contract_id, old in baseline.items():
+        new = proposed.get(contract_id)
+        if new is None:
+            continue
+        before[old.match_status] += 1
+        after[new.match_status] += 1
+        if _outcome(old) == _outcome(new):
+            score_changed += old.score != new.score
+            continue
+        transitions[(old.match_status, new.match_status)] += 1
+        changed.append({
+            "contract_id": contract_id,
+            "before_status": old.match_status,
+            "after_status": new.match_status,
+            "before_fit_id": _outcome(old)[1],
+            "after_fit_id": _outcome(new)[1],
+            "before_fit_name": old.matched_fitting_name or (old.evidence or {}).get("selected_fit_name"),
+            "after_fit_name": new.matched_fitting_name or (new.evidence or {}).get("selected_fit_name"),
+            "before_score": float(old.score),
+            "after_score": float(new.score),
+        })
+    changed.sort(key=lambda row: (-abs(row["after_score"] - row["before_score"]), row["contract_id"]))
+    return {
+        "contracts": sum(before.values()),
+        "changed": len(changed),
+        "score_changed": score_changed,
+        "before": dict(before),
+        "after": dict(after),
+        "transitions": [
+            {"from": old_status, "to": new_status, "count": count}
+            for (old_status, new_status), count in sorted(transitions.items(), key=lambda entry: -entry[1])
+        ],
+        "changed_contracts": changed[:max(sample_size, 0)],
+    }
+
+
+def _load_item_vectors(
+    contract_ids: list[int],
+    *,
+    stats: MatchStats | None = None,
+) -> tuple[dict[int, dict[int, ContractItemData]], set[int]]:
+    missing = [contract_id for contract_id in contract_ids if contract_id not in _ITEM_VECTOR_CACHE]
+    if stats is not None:
+        stats.incr("item_vector_cache_hits", len(contract_ids) - len(missing))
+        stats.incr("item_vector_cache_misses", len(missing))
+    if missing:
+        loaded, _ = _load_contract_items([str(contract_id) for contract_id in missing], stats=stats)
+        if len(_ITEM_VECTOR_CACHE) + len(loaded) > _ITEM_VECTOR_CACHE_MAX:
+            _ITEM_VECTOR_CACHE.clear()
+        # Contracts without items yet are left uncached; their items may still be syncing.
+        _ITEM_VECTOR_CACHE.update({contract_id: items for contract_id, items in loaded.items() if items})
+
+    items_map = {contract_id: _ITEM_VECTOR_CACHE.get(contract_id, {}) for contract_id in contract_ids}
+    hull_type_ids = {
+        type_id
+        for items in items_map.values()
+        for type_id, item in items.items()
+        if item.included_qty > 0
+    }
+    return items_map, hull_type_ids
+
+
+def window_contract_ids(*, days: int = DEFAULT_DAYS, limit: int = DEFAULT_LIMIT) -> list[int]:
+    """Most recent contracts issued in the last ``days`` days, after the configured exclusions."""
+    from django.utils import timezone
+
+    from corptools.models import CorporateContract
+
+    from ..models import SubsidyConfig
+    from ..tasks import _effective_corporation_id
+    from .filters import apply_contract_exclusions
+
+    cfg = SubsidyConfig.active()
+    qs = CorporateContract.objects.filter(
+        corporation__corporation__corporation_id=_effective_corporation_id(cfg.corporation_id),
+        date_issued__gte=timezone.now() - timedelta(days=days),
+    ).order_by("-date_issued", "-id")
+    qs = apply_contract_exclusions(qs, cfg)
+    return [int(contract_id) for contract_id in qs.values_list("id", flat=True)[:limit]]
+
+
+def simulate(
+    proposal: Proposal,
+    *,
+    days: int = DEFAULT_DAYS,
+    limit: int = DEFAULT_LIMIT,
+    contract_ids: Iterable[int] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    stats: MatchStats | None = None,
+) -> dict[str, Any]:
+    """Score the window under the current rules and under ``proposal`` and diff the outcomes.
+
+    Both runs share one evaluation per (contract, fitting) pair except for the
+    fittings the proposal touches, which are the only ones scored twice.
+    """
+    from ..models import SubsidyConfig
+
+    stats = stats if stats is not None else MatchStats()
+    if contract_ids is None:
+        with stats.stage("select"):
+            contract_ids = window_contract_ids(days=days, limit=limit)
+    contract_ids = [int(contract_id) for contract_id in contract_ids]
+    stats.contracts += len(contract_ids)
+
+    current_threshold = Decimal(str(SubsidyConfig.active().close_match_threshold))
+    proposed_threshold = (
+        proposal.close_match_threshold if proposal.close_match_threshold is not None else current_threshold
+    )
+    definitions: dict[int, FittingDefinition] = {}
+    proposed_definitions: dict[int, FittingDefinition] = {}
+    baseline: dict[int, MatchResultData] = {}
+    proposed: dict[int, MatchResultData] = {}
+
+    for start in range(0, len(contract_ids), chunk_size):
+        chunk = contract_ids[start:start + chunk_size]
+        with stats.stage("load_context"):
+            forced_fit_ids, latest_decisions = _load_match_context([str(contract_id) for contract_id in chunk])
+        with stats.stage("load_items"):
+            items_map, hull_type_ids = _load_item_vectors(chunk, stats=stats)
+        with stats.stage("load_definitions"):
+            fit_ids = _candidate_definition_ids(
+                hull_type_ids,
+                forced_fit_ids=forced_fit_ids,
+                latest_decisions=latest_decisions,
+            )
+            loaded = _load_fit_definitions(fit_ids - definitions.keys())
+            definitions.update(loaded)
+            proposed_definitions.update(apply_proposal(loaded, proposal))
+            stats.incr("definitions_loaded", len(loaded))
+
+        with stats.stage("evaluate"):
+            shared = dict(
+                contract_items_map=items_map,
+                forced_fit_ids=forced_fit_ids,
+                latest_decisions=latest_decisions,
+                preview_fit_id=None,
+                stats=stats,
+            )
+            candidate_cache: dict[tuple[int, int], CandidateMatch] = {}
+            baseline.update(_evaluate_contracts(
+                chunk,
+                fit_definitions=definitions,
+                close_match_threshold=current_threshold,
+                candidate_cache=candidate_cache,
+                detail=False,
+                **shared,
+            ))
+            changed_fit_ids = proposal.changed_fit_ids
+            candidate_cache = {key: value for key, value in candidate_cache.items() if key[1] not in changed_fit_ids}
+            proposed.update(_evaluate_contracts(
+                chunk,
+                fit_definitions=proposed_definitions,
+                close_match_threshold=proposed_threshold,
+                candidate_cache=candidate_cache,
+                detail=False,
+                **shared,
+            ))
+
+    summary = diff_results(baseline, proposed, sample_size=sample_size)
+    _attach_contract_numbers(summary["changed_contracts"])
+    summary.update({
+        "days": days,
+        "close_match_threshold": {"current": float(current_threshold), "proposed": float(proposed_threshold)},
+        "changed_fit_ids": sorted(proposal.changed_fit_ids),
+        "stats": stats.as_dict(),
+    })
+    return summary
+
+
+def _attach_contract_numbers(rows: list[dict[str, Any]]) -> None:
+    """Add the in-game contract number to sampled rows for display."""
+    if not rows:
+        return
+    from corptools.models import CorporateContract
+
+    numbers = dict(
+        CorporateContract.objects.filter(id__in=[str(row["contract_id"]) for row in rows])
+        .values_list("id", "contract_id")
+    )
+    for row in rows:
+        row["contract_number"] = numbers.get(row["contract_id"])
@@ -0,0 +1,195 @@
+"""Doctrine stock per staging system.
+
+Contract locations are matched against every system at once through an
+index of location id -> system ids, so the contracts are read in a single
+pass whatever the number of tracked systems.
+
+The main page reads a DoctrineStockSnapshot built from the same rows after
+contract imports, match runs and changes to targets, locations or pricing;
+rebuilds are debounced the way doctrine re-matches are.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping
+
+STOCK_LOOKBACK_DAYS = 3000
+SNAPSHOT_REFRESH_DEBOUNCE_SECONDS = 30
+_SCHEDULED_KEY = "aasubsidy:stock:snapshot:scheduled"
+# Set on every rebuild, so a snapshot that is empty because there is no stock is not taken for a missing one.
+BUILT_AT_KEY = "aasubsidy:stock:snapshot:built_at"
+SNAPSHOT_FIELDS = (
+    "fitting_name",
+    "doctrine_id",
+    "doctrine_name",
+    "stock_requested",
+    "stock_available",
+    "stock_needed",
+    "volume_m3",
+    "jita_sell_isk",
+    "subsidy_isk",
+    "alliance_purchase_isk",
+)
+
+
+def index_system_locations(system_locations: Mapping[int, Iterable[int]]) -> Dict[int, set[int]]:
+    """location id -> ids of the systems listing it."""
+    index: Dict[int, set[int]] = defaultdict(set)
+    for system_id, locations in system_locations.items():
+        for location_id in locations:
+            index[int(location_id)].add(int(system_id))
+    return dict(index)
+
+
+def stock_by_system(
+    matched_fit_map: Mapping[int, int],
+    contract_locations: Mapping[int, Iterable[int]],
+    system_locations: Mapping[int, Iterable[int]],
+) -> Dict[int, Dict[int, int]]:
+    """system id -> {fit id: matched contracts} in one pass over the contracts.
+
+    A contract counts once towards every system that lists its station or its
+    solar system; systems without locations get no stock.
+    """
+    index = index_system_locations(system_locations)
+    counts: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for contract_id, fit_id in matched_fit_map.items():
+        system_ids = set()
+        for location_id in contract_locations.get(contract_id, ()):
+            system_ids |= index.get(location_id, set())
+        for system_id in system_ids:
+            counts[system_id][int(fit_id)] += 1
+    return {system_id: dict(fits) for system_id, fits in counts.items()}
+
+
+def requests_by_system(rows: Iterable[tuple[int, int, int | None]]) -> Dict[int, Dict[int, int]]:
+    """system id -> {fit id: requested} from (system id, fit id, requested) rows."""
+    requests: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for system_id, fit_id, requested in rows:
+        if system_id is None:
+            continue
+        requests[int(system_id)][int(fit_id)] = int(requested or 0)
+    return dict(requests)
+
+
+def systems_from_snapshot(rows: Iterable[Mapping[str, Any]]) -> List[dict]:
+    """Snapshot rows ordered by system, in the shape of doctrine_stock_rows."""
+    systems: List[dict] = []
+    for row in rows:
+        if not systems or systems[-1]["system_id"] != row["system_id"]:
+            systems.append(
+                {
+                    "system_id": row["system_id"],
+                    "system_name": row["system__name"],
+                    "system_description": row["system__description"],
+                    "rows": [],
+                }
+            )
+        systems[-1]["rows"].append(
+            {
+                "fit_id": row["fitting_id"],
+                "doctrine": row["doctrine_name"] or "No Doctrine",
+                "doctrine_id": row["doctrine_id"],
+                "fitting_name": row["fitting_name"],
+                "stock_requested": row["stock_requested"],
+                "stock_available": row["stock_available"],
+                "stock_needed": row["stock_needed"],
+                "volume_m3": float(row["volume_m3"] or 0),
+                "jita_sell_isk": row["jita_sell_isk"],
+                "subsidy_isk": row["subsidy_isk"],
+                "alliance_purchase_isk": row["alliance_purchase_isk"],
+            }
+        )
+    for system in systems:
+        system["totals"] = {
+            "requested": sum(r["stock_requested"] for r in system["rows"]),
+            "available": sum(r["stock_available"] for r in system["rows"]),
+            "needed": sum(r["stock_needed"] for r in system["rows"]),
+        }
+    return systems
+
+
+def stock_snapshot() -> tuple[List[dict], datetime | None]:
+    """The stored stock of every active system and when it was built, in one query.
+
+    The timestamp is None when no snapshot has been built yet.
+    """
+    from django.core.cache import cache
+    from django.db.models.functions import Lower
+
+    from ..models import DoctrineStockSnapshot
+
+    rows = list(
+        DoctrineStockSnapshot.objects.filter(system__is_active=True)
+        .order_by("system__name", "system_id", Lower("fitting_name"))
+        .values("system_id", "system__name", "system__description", "fitting_id", "built_at", *SNAPSHOT_FIELDS)
+    )
+    built_at = min((row["built_at"] for row in rows), default=None)
+    if built_at is None:
+        built_at = cache.get(BUILT_AT_KEY)
+    return systems_from_snapshot(rows), built_at
+
+
+def rebuild_stock_snapshot(corporation_id: int | None = None) -> int:
+    """Recompute doctrine stock for every active system and replace the snapshot."""
+    from django.core.cache import cache
+    from django.db import transaction
+    from django.utils import timezone
+
+    from ..models import DoctrineStockSnapshot
+    from .summaries import doctrine_stock_rows
+
+    built_at = timezone.now()
+    systems = doctrine_stock_rows(
+        built_at - timedelta(days=STOCK_LOOKBACK_DAYS), built_at, corporation_id=corporation_id
+    )
+    snapshots = [
+        DoctrineStockSnapshot(
+            system_id=system["system_id"],
+            fitting_id=row["fit_id"],
+            fitting_name=row["fitting_name"] or "",
+            doctrine_id=row["doctrine_id"],
+            doctrine_name=row["doctrine"] if row["doctrine_id"] else "",
+            stock_requested=row["stock_requested"],
+            stock_available=row["stock_available"],
+            stock_needed=row["stock_needed"],
+            volume_m3=row["volume_m3"],
+            jita_sell_isk=row["jita_sell_isk"],
+            subsidy_isk=row["subsidy_isk"],
+            alliance_purchase_isk=row["alliance_purchase_isk"],
+            built_at=built_at,
+        )
+        for system in systems
+        for row in system["rows"]
+    ]
+    with transaction.atomic():
+        DoctrineStockSnapshot.objects.all().delete()
+        DoctrineStockSnapshot.objects.bulk_create(snapshots)
+    cache.set(BUILT_AT_KEY, built_at, timeout=None)
+    return len(snapshots)
+
+
+def queue_stock_snapshot_refresh() -> None:
+    """Schedule a debounced snapshot rebuild once the current transaction commits."""
+    from django.db import transaction
+
+    transaction.on_commit(_schedule_refresh)
+
+
+def _schedule_refresh() -> None:
+    from django.core.cache import cache
+
+    from ..tasks import refresh_doctrine_stock_snapshot
+
+    # Changes inside the debounce window are picked up by the scheduled run, which reads everything when it starts.
+    if cache.add(_SCHEDULED_KEY, True, timeout=SNAPSHOT_REFRESH_DEBOUNCE_SECONDS * 2):
+        refresh_doctrine_stock_snapshot.apply_async(countdown=SNAPSHOT_REFRESH_DEBOUNCE_SECONDS)
+
+
+def release_refresh() -> None:
+    """Reopen the debounce window so changes made during a rebuild schedule a fresh one."""
+    from django.core.cache import cache
+
+    cache.delete(_SCHEDULED_KEY)
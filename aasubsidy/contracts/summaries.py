@@ -1,37 +1,33 @@
 from __future__ import annotations
 
 from collections import Counter, defaultdict
-from decimal import Decimal, ROUND_UP
+from decimal import Decimal
 from typing import Dict, Iterable, List, Tuple
 from django.utils import timezone
 
 from django.db.models import (
-    DecimalField,
-    ExpressionWrapper,
     F,
-    OuterRef,
     Prefetch,
     Q,
-    Subquery,
     Sum,
-    Value,
 )
 from django.db.models.functions import Coalesce
 
 from eveuniverse.models import EveType
 from fittings.models import Fitting, FittingItem, Doctrine
 from .filters import apply_contract_exclusions
-from ..helpers.db import Ceil, Round
 from ..models import (
     FittingClaim,
     FittingRequest,
     SubsidyConfig,
-    SubsidyItemPrice,
     DoctrineSystem,
 )
 from corptools.models import CorporateContract
 from .matching import get_or_match_contracts
-from allianceauth.eveonline.models import EveCharacter
+from .price_cache import prices_for
+from .pricing import get_fitting_pricing_map
+from .stock import requests_by_system, stock_by_system
+from ..helpers.mains import mains_for_characters, mains_for_users
 from ..tasks import _effective_corporation_id
 
 INCR = 250_000
@@ -48,13 +44,6 @@ def _cfg() -> dict:
     }
 
 
-def _ceil_to_increment(x: Decimal, inc: Decimal) -> Decimal:
-    if inc <= 0:
-        return x
-    q = (x / inc).quantize(Decimal("1."), rounding=ROUND_UP)
-    return q * inc
-
-
 def claimed_multibuy_summary(user_id: int | None) -> dict:
     empty = {
         "claim_count": 0,
@@ -115,11 +104,7 @@ def claimed_multibuy_summary(user_id: int | None) -> dict:
         )
 
     type_ids = sorted(type_totals.keys())
-    price_by_type = {
-        int(type_id): Decimal(sell or 0)
-        for type_id, sell in SubsidyItemPrice.objects.filter(eve_type_id__in=type_ids)
-        .values_list("eve_type_id", "sell")
-    }
+    price_by_type = {type_id: Decimal(sell or 0) for type_id, sell in prices_for(type_ids, "sell").items()}
     volume_by_type = {
         int(row["id"]): Decimal(row["eff_volume"] or 0)
         for row in EveType.objects.filter(id__in=type_ids)
@@ -158,13 +143,76 @@ def doctrine_stock_summary(
     statuses: Tuple[str, ...] | None = ("outstanding",),
     request_user_id: int | None = None,
 ):
+    systems = doctrine_stock_rows(start, end, corporation_id=corporation_id, statuses=statuses)
+    return apply_fitting_claims(systems, request_user_id)
+
+
+def apply_fitting_claims(systems: List[dict], request_user_id: int | None = None) -> List[dict]:
+    """Add the live claim columns to the rows of doctrine_stock_rows or the stock snapshot."""
+    fit_ids = {row["fit_id"] for system in systems for row in system["rows"]}
+    claims_by_fit: Dict[int, int] = defaultdict(int)
+    my_claims_by_fit: Dict[int, int] = defaultdict(int)
+
+    # claimants_display[fit_id] = string representation
+    # claimants_raw_str[fit_id] = "user_id:name:qty|user_id:name:qty"
+    claimants_display: Dict[int, str] = {}
+    claimants_raw_str: Dict[int, str] = {}
+
+    per_fit_user = list(
+        FittingClaim.objects.filter(fitting_id__in=fit_ids)
+        .values("fitting_id", "user_id")
+        .annotate(total=Sum("quantity"))
+        .order_by("fitting_id")
+    )
+    mains_by_user = mains_for_users(row["user_id"] for row in per_fit_user)
+    for row in per_fit_user:
+        fid = int(row["fitting_id"])
+        uid = int(row["user_id"]) if row["user_id"] is not None else None
+        qty = int(row["total"] or 0)
+        claims_by_fit[fid] += qty
+        if request_user_id and uid == request_user_id:
+            my_claims_by_fit[fid] += qty
+        if qty <= 0:
+            continue
+        main = mains_by_user.get(uid)
+        name = main.display_name("Unknown") if main else "Unknown"
+
+        existing = claimants_display.get(fid, "")
+        piece = f"{name} ({qty})"
+        claimants_display[fid] = f"{existing}, {piece}"[2:] if existing else piece
+
+        # Format: user_id:name:quantity
+        raw_piece = f"{uid}:{name}:{qty}"
+        existing_raw = claimants_raw_str.get(fid, "")
+        claimants_raw_str[fid] = f"{existing_raw}|{raw_piece}" if existing_raw else raw_piece
+
+    for system in systems:
+        for row in system["rows"]:
+            fit_id = row["fit_id"]
+            claimed_total = int(claims_by_fit.get(fit_id, 0))
+            row.update(
+                {
+                    "claimed_total": claimed_total,
+                    "claimed_by_me": int(my_claims_by_fit.get(fit_id, 0)),
+                    "adjusted_needed": max(row["stock_needed"] - claimed_total, 0),
+                    "claimants": claimants_display.get(fit_id, ""),
+                    "claimants_raw": claimants_raw_str.get(fit_id, ""),
+                }
+            )
+    return systems
+
+
+def doctrine_stock_rows(
+    start,
+    end,
+    corporation_id: int | None = None,
+    statuses: Tuple[str, ...] | None = ("outstanding",),
+) -> List[dict]:
+    """Stock, targets and prices per active system, without the per-user claim columns."""
     cfg_model = SubsidyConfig.active()
     cfg = _cfg()
     if corporation_id is None:
         corporation_id = cfg["corporation_id"]
-    incr_val = Decimal(cfg["incr"])
-    price_field = "sell" if cfg["basis"] == "sell" else "buy"
-
     contract_filters = {
         "corporation_id": corporation_id,
         "date_issued__gte": start,
@@ -233,8 +281,7 @@ def doctrine_stock_summary(
 
         contract_locations[cid] = locs
 
-    # CRITICAL: Convert to int because .values_list() returns strings
-    contract_pks = [int(pk) for pk in contract_qs.values_list("pk", flat=True)]
+    contract_pks = list(contract_locations)
     match_map = get_or_match_contracts(contract_pks, persist=True, refresh=False)
 
     matched_fit_map: Dict[int, int] = {
@@ -244,111 +291,6 @@ def doctrine_stock_summary(
         and Decimal(str(result.score or 0)) >= Decimal(str(cfg_model.close_match_threshold))
     }
 
-    DEC_0 = DecimalField(max_digits=30, decimal_places=0)
-    DEC_2 = DecimalField(max_digits=30, decimal_places=2)
-    DEC_4 = DecimalField(max_digits=30, decimal_places=4)
-
-    fi = FittingItem.objects.filter(fit_id=OuterRef("pk")).values("fit_id")
-
-    items_sell = (
-        fi.annotate(
-            line_sell=Coalesce(
-                F("quantity")
-                * Coalesce(
-                    Subquery(
-                        SubsidyItemPrice.objects.filter(
-                            eve_type_id=OuterRef("type_id")
-                        ).values(price_field)[:1],
-                        output_field=DEC_2,
-                    ),
-                    Value(Decimal("0"), output_field=DEC_2),
-                ),
-                Value(Decimal("0"), output_field=DEC_2),
-            )
-        )
-        .values("fit_id")
-        .annotate(total=Sum("line_sell", output_field=DEC_2))
-        .values("total")
-    )
-
-    items_volume = (
-        fi.annotate(
-            line_vol=Coalesce(
-                F("quantity")
-                * Coalesce(
-                    Subquery(
-                        EveType.objects.filter(id=OuterRef("type_id"))
-                        .annotate(eff_vol=Coalesce(F("packaged_volume"), F("volume")))
-                        .values("eff_vol")[:1],
-                        output_field=DEC_4,
-                    ),
-                    Value(Decimal("0"), output_field=DEC_4),
-                ),
-                Value(Decimal("0"), output_field=DEC_4),
-            )
-        )
-        .values("fit_id")
-        .annotate(total=Sum("line_vol", output_field=DEC_4))
-        .values("total")
-    )
-
-    ship_sell = Subquery(
-        SubsidyItemPrice.objects.filter(eve_type_id=OuterRef("ship_type_type_id")).values(
-            price_field
-        )[:1],
-        output_field=DEC_2,
-    )
-    ship_vol = Subquery(
-        EveType.objects.filter(id=OuterRef("ship_type_type_id"))
-        .annotate(eff_vol=Coalesce(F("packaged_volume"), F("volume")))
-        .values("eff_vol")[:1],
-        output_field=DEC_4,
-    )
-
-    qs_base = (
-        Fitting.objects.all()
-        .annotate(
-            items_sell_isk_raw=Coalesce(
-                Subquery(items_sell, output_field=DEC_2),
-                Value(Decimal("0"), output_field=DEC_2),
-            ),
-            items_volume_m3=Coalesce(
-                Subquery(items_volume, output_field=DEC_4),
-                Value(Decimal("0"), output_field=DEC_4),
-            ),
-            ship_sell_isk_raw=Coalesce(ship_sell, Value(Decimal("0"), output_field=DEC_2)),
-            ship_volume_m3=Coalesce(ship_vol, Value(Decimal("0"), output_field=DEC_4)),
-        )
-        .annotate(
-            items_sell_isk=ExpressionWrapper(
-                Ceil(
-                    ExpressionWrapper(
-                        F("items_sell_isk_raw") / Value(int(INCR), output_field=DEC_2),
-                        output_field=DEC_2,
-                    ),
-                    output_field=DEC_0,
-                )
-                * Value(int(INCR), output_field=DEC_2),
-                output_field=DEC_2,
-            ),
-            ship_sell_isk=ExpressionWrapper(
-                Ceil(
-                    ExpressionWrapper(
-                        F("ship_sell_isk_raw") / Value(int(INCR), output_field=DEC_2),
-                        output_field=DEC_2,
-                    ),
-                    output_field=DEC_0,
-                )
-                * Value(int(INCR), output_field=DEC_2),
-                output_field=DEC_2,
-            ),
-        )
-        .annotate(
-            jita_sell_isk=ExpressionWrapper(F("items_sell_isk") + F("ship_sell_isk"), output_field=DEC_2),
-            total_vol=ExpressionWrapper(F("items_volume_m3") + F("ship_volume_m3"), output_field=DEC_4),
-        )
-    )
-
     systems = list(
         DoctrineSystem.objects.filter(is_active=True)
         .prefetch_related("locations")
@@ -359,142 +301,65 @@ def doctrine_stock_summary(
         locs = {loc.location_id for loc in system.locations.all()}
         if locs:
             system_locations[system.id] = locs
+    stock_counts = stock_by_system(matched_fit_map, contract_locations, system_locations)
+    fit_requests = requests_by_system(
+        FittingRequest.objects.filter(system__in=systems).values_list("system_id", "fitting_id", "requested")
+    )
 
     results = []
-    pct = Decimal(cfg["pct"])
-    per_m3 = Decimal(cfg["m3"])
 
     fit_ids = list(Fitting.objects.values_list("id", flat=True))
-    claims_by_fit: Dict[int, int] = defaultdict(int)
-    my_claims_by_fit: Dict[int, int] = defaultdict(int)
-
-    from ..contracts.view import get_main_for_character
-
-    # claimants_display[fit_id] = string representation
-    # claimants_raw_str[fit_id] = "user_id:name:qty|user_id:name:qty"
-    claimants_display: Dict[int, str] = {}
-    claimants_raw_str: Dict[int, str] = {}
-
-    user_any_char = {
-        row["user_id"]: EveCharacter.objects.filter(
-            character_ownership__user_id=row["user_id"]
-        )
-        .select_related("character_ownership__user__profile__main_character")
-        .first()
-        for row in FittingClaim.objects.filter(fitting_id__in=fit_ids)
-        .values("user_id")
-        .distinct()
-    }
-
-    per_fit_user = (
-        FittingClaim.objects.filter(fitting_id__in=fit_ids)
-        .values("fitting_id", "user_id")
-        .annotate(total=Sum("quantity"))
-        .order_by("fitting_id")
-    )
-    for row in per_fit_user:
-        fid = int(row["fitting_id"])
-        uid = int(row["user_id"]) if row["user_id"] is not None else None
-        qty = int(row["total"] or 0)
-        if qty <= 0:
-            continue
-        any_char = user_any_char.get(uid)
-        main_char = get_main_for_character(any_char) if any_char else None
-        name = getattr(main_char, "character_name", None) or "Unknown"
-        
-        existing = claimants_display.get(fid, "")
-        piece = f"{name} ({qty})"
-        claimants_display[fid] = f"{existing}, {piece}"[2:] if existing else piece
-        
-        # Format: user_id:name:quantity
-        raw_piece = f"{uid}:{name}:{qty}"
-        existing_raw = claimants_raw_str.get(fid, "")
-        claimants_raw_str[fid] = f"{existing_raw}|{raw_piece}" if existing_raw else raw_piece
-
-    for c in (
-        FittingClaim.objects.filter(fitting_id__in=fit_ids)
-        .values("fitting_id")
-        .annotate(total=Sum("quantity"))
-    ):
-        claims_by_fit[int(c["fitting_id"])] = int(c["total"] or 0)
-
-    if request_user_id:
-        my_claims = (
-            FittingClaim.objects.filter(fitting_id__in=fit_ids, user_id=request_user_id)
-            .values("fitting_id")
-            .annotate(total=Sum("quantity"))
-        )
-        for mc in my_claims:
-            my_claims_by_fit[mc["fitting_id"]] = int(mc["total"] or 0)
+    pricing_map = get_fitting_pricing_map(fit_ids)
 
     # Map each fitting to its doctrine names for display
     fit_to_doctrines_list = defaultdict(list)
+    doctrine_fit_ids: Dict[int, List[int]] = {}
     all_doctrines = list(Doctrine.objects.prefetch_related("fittings").all())
     for d in all_doctrines:
+        doctrine_fit_ids[d.id] = [f.id for f in d.fittings.all()]
         for f in d.fittings.all():
             fit_to_doctrines_list[f.id].append(d)
 
+    def price_fit(r) -> tuple[Decimal, Decimal, Decimal, Decimal]:
+        # The snapshot basis is already a multiple of the increment, so rounding
+        # basis plus markup up to it is the basis plus the rounded-up markup.
+        jita_sell = Decimal(r["basis_total"] or 0)
+        suggested = Decimal(r["suggested"] or 0)
+        return jita_sell, Decimal(r["total_vol"] or 0), suggested, jita_sell + suggested
+
     for system in systems:
         allowed_locations = system_locations.get(system.id)
-        system_stock_counts: Dict[int, int] = defaultdict(int)
-
-        for cid, fit_id in matched_fit_map.items():
-            if allowed_locations is not None:
-                c_locs = contract_locations.get(cid, set())
-                if not (c_locs & allowed_locations):
-                    continue
-            else:
-                # If no locations configured for this system, skip ALL contracts
-                continue
-            system_stock_counts[int(fit_id)] += 1
+        # A system without locations gets no stock.
+        system_stock_counts = stock_counts.get(system.id, {})
 
         # Calculate doctrine-level totals for this system
         # requested_per_fit[fit_id] = FittingRequest.requested in this system
-        system_fit_reqs = dict(
-            FittingRequest.objects.filter(system=system).values_list("fitting_id", "requested")
-        )
-        doctrine_sum_req = defaultdict(int)
-        for d in all_doctrines:
-            for f in d.fittings.all():
-                doctrine_sum_req[d.id] += system_fit_reqs.get(f.id, 0)
+        system_fit_reqs = fit_requests.get(system.id, {})
+        doctrine_sum_req = {
+            doctrine_id: sum(system_fit_reqs.get(fid, 0) for fid in fids)
+            for doctrine_id, fids in doctrine_fit_ids.items()
+        }
 
         fittings_with_stock = [
             fid for fid, count in system_stock_counts.items() if count > 0
         ]
 
-        system_qs = (
-            qs_base.annotate(
-                stock_requested=Coalesce(
-                    Subquery(
-                        FittingRequest.objects.filter(
-                            fitting_id=OuterRef("pk"), system=system
-                        ).values("requested")[:1]
-                    ),
-                    Value(0),
-                )
-            )
-            .filter(Q(stock_requested__gt=0) | Q(pk__in=fittings_with_stock))
-            .values("pk", "name", "stock_requested", "total_vol", "jita_sell_isk")
-            .order_by("name")
+        system_fit_ids = {
+            fid for fid, requested in system_fit_reqs.items() if (requested or 0) > 0
+        } | set(fittings_with_stock)
+        system_pricing = sorted(
+            (pricing_map[fid] for fid in system_fit_ids if fid in pricing_map),
+            key=lambda row: (row["name"] or "").lower(),
         )
 
         system_rows = []
-        for r in system_qs:
+        for r in system_pricing:
             fit_id = int(r["pk"])
             available = int(system_stock_counts.get(fit_id, 0))
-            requested = int(r["stock_requested"] or 0)
+            requested = int(system_fit_reqs.get(fit_id) or 0)
             needed = max(requested - available, 0)
 
-            claimed_total = int(claims_by_fit.get(fit_id, 0))
-            claimed_by_me = int(my_claims_by_fit.get(fit_id, 0))
-            adjusted_needed = max(needed - claimed_total, 0)
-
-            jita_sell = Decimal(r["jita_sell_isk"] or 0)
-            total_vol = Decimal(r["total_vol"] or 0)
-            base = (jita_sell * pct) + (total_vol * per_m3)
-            base = base.quantize(Decimal("0.01"))
-            subsidy_isk = _ceil_to_increment(base, incr_val)
-            alliance_purchase_isk = _ceil_to_increment(jita_sell + base, incr_val)
+            jita_sell, total_vol, subsidy_isk, alliance_purchase_isk = price_fit(r)
 
             if requested == 0:
                 subsidy_isk = Decimal("0")
@@ -524,11 +389,6 @@ def doctrine_stock_summary(
                     "stock_requested": requested,
                     "stock_available": available,
                     "stock_needed": needed,
-                    "claimed_total": claimed_total,
-                    "claimed_by_me": claimed_by_me,
-                    "adjusted_needed": adjusted_needed,
-                    "claimants": claimants_display.get(fit_id, ""),
-                    "claimants_raw": claimants_raw_str.get(fit_id, ""),
                     "volume_m3": round(float(total_vol or 0), 2),
                     "jita_sell_isk": int(jita_sell),
                     "subsidy_isk": int(subsidy_isk),
@@ -539,6 +399,7 @@ def doctrine_stock_summary(
         if system_rows:
             results.append(
                 {
+                    "system_id": system.id,
                     "system_name": system.name,
                     "system_description": system.description,
                     "has_locations": allowed_locations is not None,
@@ -555,8 +416,6 @@ def doctrine_stock_summary(
 
 
 def doctrine_insights(corporation_id: int | None = None):
-    from .payments import _user_id_for_issuer_eve_id, _main_name_for_user_id
-
     cfg_model = SubsidyConfig.active()
     cfg = _cfg()
     if corporation_id is None:
@@ -628,11 +487,13 @@ def doctrine_insights(corporation_id: int | None = None):
         contract_fit_pk[int(c.id)] = int(result.matched_fitting_id)
         valid_contract_ids.add(int(c.id))
 
+    mains = mains_for_characters(getattr(c.issuer_name, "eve_id", None) for c in all_contracts)
+
     def get_display_issuer(c):
         char_id = getattr(c.issuer_name, "eve_id", None)
-        uid = _user_id_for_issuer_eve_id(char_id)
         fallback = getattr(c.issuer_name, "name", "Unknown")
-        return _main_name_for_user_id(uid, fallback)
+        main = mains.get(int(char_id)) if char_id else None
+        return main.display_name(fallback) if main else fallback
 
     slow_contracts = []
     for c in slow_contracts_qs:
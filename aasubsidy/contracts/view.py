@@ -25,8 +25,16 @@ from fittings.models import Fitting
 from ..contracts.filters import apply_contract_exclusions
 from ..contracts.matching import get_or_match_contract, get_or_match_contracts, match_contract
 from ..contracts.pricing import get_fitting_pricing_map
+from ..contracts.rematch import pending_rematch
 from ..contracts.reviews import reviewer_table
-from ..contracts.summaries import claimed_multibuy_summary, doctrine_stock_summary, doctrine_insights
+from ..contracts.stock import STOCK_LOOKBACK_DAYS, queue_stock_snapshot_refresh, stock_snapshot
+from ..contracts.summaries import (
+    apply_fitting_claims,
+    claimed_multibuy_summary,
+    doctrine_insights,
+    doctrine_stock_rows,
+)
+from ..helpers.mains import mains_for_characters
 from ..models import (
     CorporateContractSubsidy,
     DoctrineContractDecision,
@@ -53,38 +61,19 @@ def _all_character_ids_for_user(user) -> List[int]:
         return []
 
 
-def _main_name_for_issuer(issuer_eve_id: int | None, fallback_name: str, cache: dict[int, str]) -> str:
-    if not issuer_eve_id:
-        return fallback_name
-    if issuer_eve_id in cache:
-        return cache[issuer_eve_id]
-    try:
-        ownership = (
-            CharacterOwnership.objects.filter(character__character_id=issuer_eve_id)
-            .select_related("user__profile__main_character")
-            .first()
-        )
-        if not ownership:
-            cache[issuer_eve_id] = fallback_name
-            return fallback_name
-        profile = getattr(ownership.user, "profile", None)
-        main = getattr(profile, "main_character", None) if profile else None
-        resolved = getattr(main, "character_name", None) or fallback_name
-        cache[issuer_eve_id] = resolved
-        return resolved
-    except Exception:
-        cache[issuer_eve_id] = fallback_name
-        return fallback_name
-
-
 def _build_stats_payload(contracts_qs, aggregate_to_main: bool = False):
     rows = []
     totals_by_char: dict[str, int] = {}
     contract_count_by_char: dict[str, int] = {}
     approved_count_by_char: dict[str, int] = {}
-    main_name_cache: dict[int, str] = {}
+    contracts = list(contracts_qs)
+    mains = (
+        mains_for_characters(getattr(c.issuer_name, "eve_id", None) for c in contracts)
+        if aggregate_to_main
+        else {}
+    )
 
-    for c in contracts_qs:
+    for c in contracts:
         meta = getattr(c, "aasubsidy_meta", None)
         subsidy_amount = float(getattr(meta, "subsidy_amount", 0) or 0)
         review_status = getattr(meta, "review_status", 0)
@@ -93,16 +82,9 @@ def _build_stats_payload(contracts_qs, aggregate_to_main: bool = False):
         exempt = bool(getattr(meta, "exempt", False))
         issuer = getattr(c.issuer_name, "name", "Unknown")
         issuer_eve_id = getattr(c.issuer_name, "eve_id", None)
-        stats_name = (
-            _main_name_for_issuer(issuer_eve_id, issuer, main_name_cache)
-            if aggregate_to_main
-            else issuer
-        )
-        issuer_main = (
-            _main_name_for_issuer(issuer_eve_id, issuer, main_name_cache)
-            if aggregate_to_main
-            else ""
-        )
+        main = mains.get(int(issuer_eve_id)) if issuer_eve_id else None
+        issuer_main = (main.display_name(issuer) if main else issuer) if aggregate_to_main else ""
+        stats_name = issuer_main if aggregate_to_main else issuer
 
         rows.append(
             {
@@ -174,6 +156,11 @@ def _contract_queryset_for_corporation(corporation_id: int | None):
     )
 
 
+def _force_rematch_requested(request) -> bool:
+    """Admins can bypass the stored result with ``?force=1``."""
+    return request.GET.get("force") == "1" and request.user.has_perm("aasubsidy.subsidy_admin")
+
+
 def get_main_for_character(character: EveCharacter):
     try:
         return character.character_ownership.user.profile.main_character
@@ -329,14 +316,18 @@ class MainView(PermissionRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        end = timezone.now()
-        start = end - timedelta(days=3000)
-
-        systems = doctrine_stock_summary(
-            start, end, request_user_id=self.request.user.id if self.request.user.is_authenticated else None
+        systems, as_of = stock_snapshot()
+        if as_of is None:
+            # No snapshot built yet, e.g. right after an upgrade: compute live and schedule a build.
+            end = timezone.now()
+            systems = doctrine_stock_rows(end - timedelta(days=STOCK_LOOKBACK_DAYS), end)
+            queue_stock_snapshot_refresh()
+        systems = apply_fitting_claims(
+            systems, self.request.user.id if self.request.user.is_authenticated else None
         )
-        
+
         ctx["systems"] = systems
+        ctx["stock_as_of"] = as_of
         ctx["is_admin"] = self.request.user.is_superuser or self.request.user.has_perm("aasubsidy.subsidy_admin")
         ctx["overall_totals"] = {
             "requested": sum(s["totals"]["requested"] for s in systems),
@@ -467,6 +458,9 @@ class ReviewerView(PermissionRequiredMixin, TemplateView):
         ctx["contracts"] = reviewer_table(start, end, corporation_id=cfg.corporation_id)
         ctx["all_fits"] = Fitting.objects.only("id", "name").order_by("name")
         ctx["close_match_threshold"] = float(cfg.close_match_threshold)
+        rematch = pending_rematch()
+        ctx["rematch_pending"] = rematch.contracts
+        ctx["rematch_queued"] = rematch.queued
         if self.request.user.is_authenticated:
             pref = UserTablePreference.objects.filter(
                 user=self.request.user, table_key="contracts"
@@ -491,7 +485,10 @@ class ReviewSummariesView(PermissionRequiredMixin, View):
             return JsonResponse({"ok": False, "error": "invalid_contract_ids"}, status=400)
 
         if not public_contract_ids:
-            return JsonResponse({"ok": True, "rows": []})
+            rematch = pending_rematch()
+            return JsonResponse(
+                {"ok": True, "rows": [], "rematch_pending": rematch.contracts, "rematch_queued": rematch.queued}
+            )
 
         cfg = SubsidyConfig.active()
         contracts_query = _contract_queryset_for_corporation(cfg.corporation_id).filter(
@@ -520,7 +517,10 @@ class ReviewSummariesView(PermissionRequiredMixin, View):
             for contract in contracts
         ]
 
-        return JsonResponse({"ok": True, "rows": rows})
+        rematch = pending_rematch()
+        return JsonResponse(
+            {"ok": True, "rows": rows, "rematch_pending": rematch.contracts, "rematch_queued": rematch.queued}
+        )
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -759,6 +759,7 @@ class ForceFitView(PermissionRequiredMixin, View):
 
         meta.save(update_fields=["forced_fitting"])
         result = match_contract(cc.pk, forced_fit_id=forced_fit_id, persist=True)
+        queue_stock_snapshot_refresh()
         return JsonResponse({"ok": True, "match": _serialize_match_result(result)})
 
 
@@ -775,8 +776,13 @@ class MatchPreviewView(PermissionRequiredMixin, View):
         except CorporateContract.DoesNotExist:
             return JsonResponse({"ok": False, "error": "not_found"}, status=404)
 
-        # IMPORTANT: Use refresh=True to re-evaluate matching on detail view
-        result = get_or_match_contract(cc.pk, persist=True, refresh=True)
+        result = get_or_match_contract(
+            cc.pk,
+            persist=True,
+            refresh=_force_rematch_requested(request),
+            include_detail=True,
+            verify_inputs=True,
+        )
         return JsonResponse({"ok": True, "match": _serialize_match_result(result, include_items=True)})
 
 
@@ -992,8 +998,13 @@ class ContractItemsView(PermissionRequiredMixin, View):
         except CorporateContract.DoesNotExist:
             return JsonResponse({"ok": False, "error": "not_found"}, status=404)
 
-        # IMPORTANT: Use refresh=True to re-evaluate matching on detail view
-        result = get_or_match_contract(cc.pk, persist=True, refresh=True)
+        result = get_or_match_contract(
+            cc.pk,
+            persist=True,
+            refresh=_force_rematch_requested(request),
+            include_detail=True,
+            verify_inputs=True,
+        )
         analysis = _serialize_match_result(result, include_items=True)
         items = []
         for row in analysis.get("items", []):
@@ -1016,7 +1027,7 @@ class ContractItemsView(PermissionRequiredMixin, View):
                     contract=cc,
                     force_refresh=False,
                 )
-                result = get_or_match_contract(cc.pk, persist=True, refresh=True)
+                result = get_or_match_contract(cc.pk, persist=True, include_detail=True, verify_inputs=True)
                 analysis = _serialize_match_result(result, include_items=True)
                 for row in analysis.get("items", []):
                     rendered = dict(row)
@@ -1061,5 +1072,6 @@ class ContractItemsView(PermissionRequiredMixin, View):
 
         # Check if we can undo an accept_once decision
         analysis["can_undo_accept_once"] = analysis.get("match_source") == "manual_accept"
+        analysis["can_force_rematch"] = request.user.has_perm("aasubsidy.subsidy_admin")
 
         return JsonResponse({"ok": True, "items": items, "analysis": analysis})
@@ -0,0 +1,79 @@
+"""JSON encoding for stored match payloads.
+
+Uses orjson when it is installed and the standard library otherwise. Both
+produce plain JSON the other can read, so rows written by either backend stay
+readable when the optional dependency comes or goes. Hashes and fingerprints
+keep using ``json.dumps`` directly: their exact bytes must not depend on
+which backend is installed.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps_bytes(value: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Integers past 64 bits and other values orjson refuses; json.dumps decides.
+            pass
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(value: Any) -> str:
+    return dumps_bytes(value).decode("utf-8")
+
+
+def loads(raw: str | bytes | bytearray | memoryview | None, default: Any = None) -> Any:
+    """Decode ``raw``; empty or malformed input returns ``default``."""
+    if isinstance(raw, memoryview):
+        raw = raw.tobytes()
+    if not raw:
+        return default
+    try:
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return default
+
+
+class ParsedJSON:
+    """Read-only attribute decoding a JSON text field at most once per instance.
+
+    The decoded value is cached beside the raw value it came from, so assigning
+    the field (or ``refresh_from_db``) invalidates it on the next read. Callers
+    share the cached object and must copy it before changing it.
+    """
+
+    def __init__(self, field: str, default: Callable[[], Any], *, decode: Callable[[Any], Any] | None = None) -> None:
+        self.field = field
+        self.default = default
+        self.decode = decode
+        self.cache_attr = f"_{field}_parsed"
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.__doc__ = f"Decoded ``{self.field}``."
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        raw = getattr(instance, self.field)
+        cached = instance.__dict__.get(self.cache_attr)
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        value = self.decode(raw) if self.decode is not None else loads(raw, None)
+        if value is None:
+            value = self.default()
+        instance.__dict__[self.cache_attr] = (raw, value)
+        return value
@@ -0,0 +1,140 @@
+"""Bulk character -> user -> main character resolution.
+
+Lookups by character id, character name or user id each cost one cache
+``get_many`` plus at most one query for the keys the cache does not hold.
+Entries carry the ownership version current when they were read; any
+CharacterOwnership or UserProfile change bumps it once committed, retiring
+every entry at once, and the short timeout bounds anything missed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Hashable, Iterable, NamedTuple
+
+from .versioned_cache import VersionedCache
+
+VERSION_KEY = "aasubsidy:mains:version"
+_KEY = "aasubsidy:mains:{kind}:{key}"
+_CACHE = VersionedCache(VERSION_KEY, "SUBSIDY_MAIN_CACHE_TIMEOUT")
+
+
+class MainInfo(NamedTuple):
+    """Owning user and their main character; the main is None when the user has not set one."""
+
+    user_id: int
+    main_character_id: int | None
+    main_character_name: str | None
+
+    def display_name(self, fallback: str) -> str:
+        return self.main_character_name or fallback
+
+
+def _ownership_rows(**filters):
+    from allianceauth.authentication.models import CharacterOwnership
+
+    return CharacterOwnership.objects.filter(**filters).values_list(
+        "character__character_id",
+        "character__character_name",
+        "user_id",
+        "user__profile__main_character__character_id",
+        "user__profile__main_character__character_name",
+    )
+
+
+def _load_by_character_id(character_ids: set[int]) -> dict[int, MainInfo]:
+    return {
+        int(character_id): MainInfo(int(user_id), main_id, main_name)
+        for character_id, _name, user_id, main_id, main_name in _ownership_rows(
+            character__character_id__in=character_ids
+        )
+    }
+
+
+def _load_by_character_name(names: set[str]) -> dict[str, MainInfo]:
+    return {
+        name: MainInfo(int(user_id), main_id, main_name)
+        for _id, name, user_id, main_id, main_name in _ownership_rows(character__character_name__in=names)
+    }
+
+
+def _load_by_user_id(user_ids: set[int]) -> dict[int, MainInfo]:
+    from allianceauth.authentication.models import UserProfile
+
+    found = {
+        int(user_id): MainInfo(int(user_id), main_id, main_name)
+        for user_id, main_id, main_name in UserProfile.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "main_character__character_id", "main_character__character_name"
+        )
+    }
+    for user_id in user_ids - found.keys():
+        found[user_id] = MainInfo(user_id, None, None)
+    return found
+
+
+def _cache_key(kind: str, key: Hashable) -> str:
+    if kind == "name":
+        # Character names carry spaces and other characters some cache backends reject in keys.
+        key = hashlib.sha1(str(key).encode("utf-8")).hexdigest()
+    return _KEY.format(kind=kind, key=key)
+
+
+def _resolve(kind: str, keys: set, loader: Callable[[set], dict], backend, timeout: int | None) -> dict:
+    if not keys:
+        return {}
+    backend = _CACHE.backend(backend)
+    cache_keys = {key: _cache_key(kind, key) for key in keys}
+    version, fetched = _CACHE.read(cache_keys.values(), backend)
+
+    output = {}
+    missing = set()
+    for key, cache_key in cache_keys.items():
+        if cache_key not in fetched:
+            missing.add(key)
+        elif fetched[cache_key] is not None:
+            output[key] = MainInfo(*fetched[cache_key])
+
+    if missing:
+        loaded = loader(missing)
+        # Unowned characters are cached too, so they do not reach the database on every page.
+        _CACHE.write(
+            version,
+            {cache_keys[key]: tuple(loaded[key]) if key in loaded else None for key in missing},
+            backend,
+            timeout,
+        )
+        output.update({key: info for key, info in loaded.items() if key in missing})
+    return output
+
+
+def mains_for_characters(
+    character_ids: Iterable[int | None], *, backend=None, loader=None, timeout: int | None = None
+) -> dict[int, MainInfo]:
+    """MainInfo for each character id owned by a user."""
+    keys = {int(character_id) for character_id in character_ids if character_id}
+    return _resolve("char", keys, loader or _load_by_character_id, backend, timeout)
+
+
+def mains_for_names(
+    names: Iterable[str | None], *, backend=None, loader=None, timeout: int | None = None
+) -> dict[str, MainInfo]:
+    """MainInfo for each character name owned by a user."""
+    keys = {str(name) for name in names if name}
+    return _resolve("name", keys, loader or _load_by_character_name, backend, timeout)
+
+
+def mains_for_users(
+    user_ids: Iterable[int | None], *, backend=None, loader=None, timeout: int | None = None
+) -> dict[int, MainInfo]:
+    """MainInfo for each user id."""
+    keys = {int(user_id) for user_id in user_ids if user_id}
+    return _resolve("user", keys, loader or _load_by_user_id, backend, timeout)
+
+
+def bump_mains_version(backend=None) -> int:
+    """Retire every cached resolution; call once an ownership change has committed."""
+    return _CACHE.bump(backend)
+
+
+def bump_mains_version_on_commit() -> None:
+    _CACHE.bump_on_commit()
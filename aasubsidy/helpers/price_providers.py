@@ -0,0 +1,253 @@
+"""Market price sources for SubsidyItemPrice refreshes.
+
+Every provider returns prices keyed by type id string in the Fuzzwork
+aggregate shape, ``{"34": {"buy": {"percentile": "5.01"}, "sell": {...}}}``,
+which is what the refresh consumes. ``fetch_prices`` splits the types into
+provider-sized chunks, fetches them concurrently and fails over to the next
+provider for any chunk the current one cannot answer;
+``fetch_prices_and_failures`` also reports the types no provider answered.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Sequence
+
+from allianceauth.services.hooks import get_extension_logger
+
+logger = get_extension_logger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_WORKERS = 4
+JITA_STATION_ID = 60003760
+
+
+class PriceProviderError(Exception):
+    """A provider could not answer a chunk."""
+
+
+def build_session(*, pool_size: int = DEFAULT_WORKERS, retries: int = 3, backoff: float = 0.5):
+    """A ``requests.Session`` with a connection pool and retry/backoff on transient failures."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,  # the Janice pricer is a POST but safe to repeat
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["accept"] = "application/json"
+    return session
+
+
+class PriceProvider(ABC):
+    name = "base"
+    chunk_size = 200
+    timeout = 30
+
+    def __init__(self, session=None) -> None:
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = build_session()
+        return self._session
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def fetch(self, type_ids: Sequence[int]) -> dict[str, dict[str, dict[str, str]]]:
+        """Prices for one chunk; raises PriceProviderError when the chunk cannot be answered."""
+        try:
+            return self._fetch(type_ids)
+        except PriceProviderError:
+            raise
+        except Exception as exc:
+            raise PriceProviderError(f"{self.name}: {exc}") from exc
+
+    @abstractmethod
+    def _fetch(self, type_ids: Sequence[int]) -> dict[str, dict[str, dict[str, str]]]:
+        """Prices for one chunk in the Fuzzwork aggregate shape."""
+
+
+class JanicePriceProvider(PriceProvider):
+    name = "janice"
+    chunk_size = 1000
+    timeout = 60
+    url = "https://janice.e-351.com/api/rest/v2/pricer?market=2"
+
+    def __init__(self, api_key: str, session=None) -> None:
+        super().__init__(session)
+        self.api_key = api_key or ""
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _fetch(self, type_ids):
+        response = self.session.post(
+            self.url,
+            data="\n".join(str(type_id) for type_id in type_ids),
+            headers={"Content-Type": "text/plain", "X-ApiKey": self.api_key, "accept": "application/json"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if not isinstance(payload, list):
+            raise PriceProviderError(f"janice: unexpected payload {str(payload)[:200]}")
+        output = {}
+        for item in payload:
+            try:
+                prices = item["top5AveragePrices"]
+                output[str(item["itemType"]["eid"])] = {
+                    "buy": {"percentile": str(prices["buyPrice5DayMedian"])},
+                    "sell": {"percentile": str(prices["sellPrice5DayMedian"])},
+                }
+            except (KeyError, TypeError):
+                continue
+        return output
+
+
+class FuzzworkPriceProvider(PriceProvider):
+    name = "fuzzwork"
+    chunk_size = 200
+    url = "https://market.fuzzwork.co.uk/aggregates/"
+
+    def __init__(self, session=None, station_id: int = JITA_STATION_ID) -> None:
+        super().__init__(session)
+        self.station_id = station_id
+
+    def _fetch(self, type_ids):
+        response = self.session.get(
+            self.url,
+            params={"station": self.station_id, "types": ",".join(str(type_id) for type_id in type_ids)},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if not isinstance(payload, dict):
+            raise PriceProviderError(f"fuzzwork: unexpected payload {str(payload)[:200]}")
+        output = {}
+        for type_id, entry in payload.items():
+            try:
+                output[str(type_id)] = {
+                    "buy": {"percentile": str(entry["buy"]["percentile"])},
+                    "sell": {"percentile": str(entry["sell"]["percentile"])},
+                }
+            except (KeyError, TypeError):
+                continue
+        return output
+
+
+PROVIDERS = {
+    JanicePriceProvider.name: JanicePriceProvider,
+    FuzzworkPriceProvider.name: FuzzworkPriceProvider,
+}
+_DEFAULT_PROVIDERS: list[PriceProvider] | None = None
+
+
+def default_providers() -> list[PriceProvider]:
+    """Configured providers in failover order, sharing one pooled session per process."""
+    global _DEFAULT_PROVIDERS
+    if _DEFAULT_PROVIDERS is None:
+        from django.conf import settings
+
+        from .. import app_settings
+
+        session = build_session(pool_size=max(int(app_settings.SUBSIDY_PRICE_FETCH_WORKERS), 1))
+        providers: list[PriceProvider] = []
+        for name in app_settings.SUBSIDY_PRICE_PROVIDERS:
+            if name == JanicePriceProvider.name:
+                providers.append(JanicePriceProvider(getattr(settings, "SUBSIDY_JANICE_API_KEY", "") or "", session=session))
+            elif name in PROVIDERS:
+                providers.append(PROVIDERS[name](session=session))
+            else:
+                logger.warning("Unknown price provider %r ignored.", name)
+        _DEFAULT_PROVIDERS = providers
+    return [provider for provider in _DEFAULT_PROVIDERS if provider.available]
+
+
+def _chunks(values: Sequence[int], size: int) -> list[Sequence[int]]:
+    size = max(int(size), 1)
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
+def _fetch_with_failover(chunk: Sequence[int], providers: Sequence[PriceProvider]) -> tuple[dict[str, Any], set[int]]:
+    pending = list(chunk)
+    output: dict[str, Any] = {}
+    for provider in providers:
+        answered: set[int] = set()
+        try:
+            # A fallback provider may take smaller requests than the one that failed.
+            for part in _chunks(pending, provider.chunk_size):
+                output.update(provider.fetch(part))
+                answered.update(part)
+            return output, set()
+        except PriceProviderError as exc:
+            logger.warning("Price provider %s failed for %s types: %s", provider.name, len(pending) - len(answered), exc)
+            pending = [type_id for type_id in pending if type_id not in answered]
+    return output, set(pending)
+
+
+def fetch_prices_and_failures(
+    type_ids: Iterable[int],
+    *,
+    providers: Sequence[PriceProvider] | None = None,
+    max_workers: int | None = None,
+) -> tuple[dict[str, Any], set[int]]:
+    """Prices for ``type_ids`` from the first provider able to answer each chunk, and the ids no provider answered.
+
+    A type left out of a successful response has no market data; a type in a
+    request every provider failed is unfetched and is returned in the set.
+    """
+    type_ids = sorted({int(type_id) for type_id in type_ids if type_id})
+    providers = list(providers) if providers is not None else default_providers()
+    if not type_ids:
+        return {}, set()
+    if not providers:
+        return {}, set(type_ids)
+    if max_workers is None:
+        from .. import app_settings
+
+        max_workers = int(app_settings.SUBSIDY_PRICE_FETCH_WORKERS)
+
+    chunks = _chunks(type_ids, providers[0].chunk_size)
+    output: dict[str, Any] = {}
+    unfetched: set[int] = set()
+    if len(chunks) == 1 or max_workers <= 1:
+        results = [_fetch_with_failover(chunk, providers) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            results = list(pool.map(lambda chunk: _fetch_with_failover(chunk, providers), chunks))
+    for prices, failed in results:
+        output.update(prices)
+        unfetched |= failed
+    return output, unfetched
+
+
+def fetch_prices(
+    type_ids: Iterable[int],
+    *,
+    providers: Sequence[PriceProvider] | None = None,
+    max_workers: int | None = None,
+) -> dict[str, Any]:
+    """Prices for ``type_ids`` from the first provider able to answer each chunk.
+
+    Chunks no provider answered are absent from the result, so callers can
+    tell "no data" apart from a zero price.
+    """
+    return fetch_prices_and_failures(type_ids, providers=providers, max_workers=max_workers)[0]
@@ -1,13 +1,27 @@
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable
+
 import requests
 from celery import shared_task
 from django.conf import settings
-from django.db import Error
+from django.db import Error, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 from allianceauth.services.hooks import get_extension_logger
 
+from .. import app_settings
+from ..contracts.pricing import record_price_history
 from ..models import SubsidyItemPrice
+from .price_providers import fetch_prices_and_failures
 
 logger = get_extension_logger(__name__)
 
+PRICE_CHUNK_SIZE = 1000
+# Past this many changed types a full snapshot rebuild is cheaper than looking up affected fittings.
+SNAPSHOT_FULL_REBUILD_TYPES = 5000
+CENT = Decimal("0.01")
+
 try:
     from eveuniverse.models import EveMarketPrice
 except Exception:
@@ -36,85 +50,251 @@ def valid_janice_api_key() -> bool:
         logger.warning("Janice API check failed: %s", e)
         return False
 
-def _update_price_bulk(type_ids: list[int]) -> dict:
-    api_key = getattr(settings, "SUBSIDY_JANICE_API_KEY", "") or ""
-    if api_key:
-        logger.info("Using Janice API for price updates")
-        try:
-            r = requests.post(
-                "https://janice.e-351.com/api/rest/v2/pricer?market=2",
-                data="\n".join([str(x) for x in type_ids]),
-                headers={
-                    "Content-Type": "text/plain",
-                    "X-ApiKey": api_key,
-                    "accept": "application/json",
-                },
-                timeout=60,
-            )
-            r.raise_for_status()
-            payload = r.json()
-            output: dict[str, dict] = {}
-            for item in payload:
-                try:
-                    eid = str(item["itemType"]["eid"])
-                    output[eid] = {
-                        "buy": {"percentile": str(item["top5AveragePrices"]["buyPrice5DayMedian"])},
-                        "sell": {"percentile": str(item["top5AveragePrices"]["sellPrice5DayMedian"])},
-                    }
-                except Exception:
-                    continue
-            return output
-        except Exception as e:
-            logger.warning("Janice request failed, falling back to Fuzzworks: %s", e)
+
+def _doctrine_type_ids() -> set[int]:
+    """Fitting hulls and items plus every type a doctrine rule names."""
+    from fittings.models import Fitting, FittingItem
+
+    from ..models import DoctrineItemRule, DoctrineQuantityTolerance, DoctrineSubstitutionRule
+
+    type_ids: set[int] = set()
+    type_ids.update(Fitting.objects.values_list("ship_type_type_id", flat=True).distinct())
+    type_ids.update(FittingItem.objects.values_list("type_id", flat=True).distinct())
+    type_ids.update(DoctrineItemRule.objects.values_list("eve_type_id", flat=True).distinct())
+    type_ids.update(DoctrineQuantityTolerance.objects.values_list("eve_type_id", flat=True).distinct())
+    for expected_type_id, allowed_type_id in DoctrineSubstitutionRule.objects.values_list(
+        "expected_type_id", "allowed_type_id"
+    ):
+        type_ids.update((expected_type_id, allowed_type_id))
+    return {int(type_id) for type_id in type_ids if type_id}
+
+
+def _contract_type_ids(since=None) -> set[int]:
+    from corptools.models import CorporateContractItem
+
+    items = CorporateContractItem.objects.all()
+    if since is not None:
+        items = items.filter(contract__date_issued__gte=since)
+    return {int(type_id) for type_id in items.values_list("type_name_id", flat=True).distinct() if type_id}
+
+
+def hot_price_type_ids(contract_days: int | None = None) -> set[int]:
+    """Types that affect subsidies: fitting hulls and items, doctrine rules and recent contract items."""
+    if contract_days is None:
+        contract_days = app_settings.SUBSIDY_PRICE_HOT_CONTRACT_DAYS
+    type_ids = _doctrine_type_ids()
+    if contract_days and contract_days > 0:
+        type_ids |= _contract_type_ids(since=timezone.now() - timedelta(days=int(contract_days)))
+    return type_ids
+
+
+def referenced_price_type_ids() -> set[int]:
+    """Every type a fitting, doctrine rule or contract item refers to; the set worth keeping a price row for."""
+    return _doctrine_type_ids() | _contract_type_ids()
+
+
+def seed_price_rows(type_ids: Iterable[int] | None = None, chunk_size: int = PRICE_CHUNK_SIZE) -> int:
+    """Create zero-priced SubsidyItemPrice rows for types that have none.
+
+    Runs as INSERT ... SELECT against EveType, so nothing is loaded into
+    Python and ids unknown to eveuniverse are skipped. Without ``type_ids``
+    every EveType is seeded. Returns the number of rows created.
+    """
+    from django.db import connection
+    from django.db.models.constants import OnConflict
+    from eveuniverse.models import EveType
+
+    qn = connection.ops.quote_name
+    price_table = qn(SubsidyItemPrice._meta.db_table)
+    type_table = qn(EveType._meta.db_table)
+    type_column = qn(SubsidyItemPrice._meta.get_field("eve_type").column)
+    price_columns = ", ".join(qn(SubsidyItemPrice._meta.get_field(name).column) for name in ("buy", "sell", "updated_at"))
+    insert = connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)
+    suffix = connection.ops.on_conflict_suffix_sql([], OnConflict.IGNORE, [], []) or ""
+    base_sql = (
+        f"{insert} {price_table} ({type_column}, {price_columns}) "
+        f"SELECT t.{qn('id')}, 0, 0, %s FROM {type_table} t "
+        f"LEFT JOIN {price_table} p ON p.{type_column} = t.{qn('id')} "
+        f"WHERE p.{qn('id')} IS NULL"
+    )
+
+    if type_ids is None:
+        batches: list[list[int] | None] = [None]
+    else:
+        ordered = sorted({int(type_id) for type_id in type_ids if type_id})
+        batches = [ordered[start:start + chunk_size] for start in range(0, len(ordered), chunk_size)]
+
+    created = 0
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for batch in batches:
+            sql, params = base_sql, [now]
+            if batch is not None:
+                sql += f" AND t.{qn('id')} IN ({', '.join(['%s'] * len(batch))})"
+                params.extend(batch)
+            cursor.execute(f"{sql} {suffix}".strip(), params)
+            created += max(cursor.rowcount, 0)
+    if created:
+        logger.info("Seeded %s SubsidyItemPrice rows.", created)
+    return created
+
+
+def _cold_price_type_ids(hot: set[int], *, limit: int, stale_days: int) -> list[int]:
+    """Least recently checked rows outside the hot set that are due for a refresh."""
+    if limit <= 0:
+        return []
+    stale_before = timezone.now() - timedelta(days=max(int(stale_days), 0))
+    ids = (
+        SubsidyItemPrice.objects.filter(Q(checked_at__isnull=True) | Q(checked_at__lt=stale_before))
+        .order_by(F("checked_at").asc(nulls_first=True), "eve_type_id")
+        .values_list("eve_type_id", flat=True)
+    )
+    cold: list[int] = []
+    # The hot set is skipped in Python; as a NOT IN it would be thousands of parameters.
+    for type_id in ids.iterator(chunk_size=PRICE_CHUNK_SIZE):
+        if type_id not in hot:
+            cold.append(int(type_id))
+            if len(cold) >= limit:
+                break
+    return cold
+
+
+def _market_price(entry: dict | None, side: str) -> Decimal:
+    try:
+        return Decimal(str(entry[side]["percentile"])).quantize(CENT, rounding=ROUND_HALF_UP)
+    except Exception:
+        return Decimal("0.00")
+
+
+def _price_changes(
+    rows: Iterable[tuple[int, int, Decimal, Decimal]],
+    market_data: dict,
+) -> tuple[list[SubsidyItemPrice], list[int], int]:
+    """Rows whose buy or sell moved, their type ids, and how many types had no market data.
+
+    ``rows`` are (pk, eve_type_id, buy, sell). Types missing from the payload
+    are priced at zero, as the full refresh always did.
+    """
+    changed: list[SubsidyItemPrice] = []
+    changed_type_ids: list[int] = []
+    missing = 0
+    for pk, type_id, buy, sell in rows:
+        entry = market_data.get(str(type_id))
+        if entry is None:
+            missing += 1
+        new_buy = _market_price(entry, "buy")
+        new_sell = _market_price(entry, "sell")
+        if new_buy != Decimal(buy or 0).quantize(CENT) or new_sell != Decimal(sell or 0).quantize(CENT):
+            changed.append(SubsidyItemPrice(pk=pk, eve_type_id=type_id, buy=new_buy, sell=new_sell))
+            changed_type_ids.append(int(type_id))
+    return changed, changed_type_ids, missing
+
 
 """Scheduled updates"""
 @shared_task
-def update_all_prices() -> dict:
+def update_all_prices(include_cold: bool = True, chunk_size: int = PRICE_CHUNK_SIZE) -> dict:
+    """Refresh the hot set of types, plus a batch of the least recently checked others.
+
+    Prices are fetched and compared one chunk at a time and only rows whose
+    buy or sell moved are written, each with a price history row. Fitting
+    price snapshots are rebuilt for the changed types only.
+    """
+    hot = sorted(hot_price_type_ids())
+    # Types that became hot since the last run get a row now rather than after the weekly seed.
+    seed_price_rows(hot, chunk_size=chunk_size)
     type_ids: list[int] = []
-    market_data: dict = {}
-
-    prices = SubsidyItemPrice.objects.select_related("eve_type").all()
-    total = prices.count()
-    logger.info("SubsidyItemPrice update starting for %s items (Janice)...", total)
-
-    for item in prices:
-        type_ids.append(item.eve_type_id)
-        if len(type_ids) == 1000:
-            market_data.update(_update_price_bulk(type_ids))
-            type_ids.clear()
-    if type_ids:
-        market_data.update(_update_price_bulk(type_ids))
-
-    logger.info("Market data fetched, starting database update...")
-    missing_items: list[str] = []
-    updated = 0
-
-    for price in prices:
-        key = str(price.eve_type_id)
-        if key in market_data:
-            try:
-                buy = float(market_data[key]["buy"]["percentile"])
-            except Exception:
-                buy = 0.0
+    for start in range(0, len(hot), chunk_size):
+        type_ids.extend(
+            SubsidyItemPrice.objects.filter(eve_type_id__in=hot[start:start + chunk_size])
+            .order_by("eve_type_id")
+            .values_list("eve_type_id", flat=True)
+        )
+    cold: list[int] = []
+    if include_cold:
+        cold = _cold_price_type_ids(
+            set(type_ids),
+            limit=int(app_settings.SUBSIDY_PRICE_COLD_BATCH_SIZE),
+            stale_days=int(app_settings.SUBSIDY_PRICE_COLD_REFRESH_DAYS),
+        )
+    logger.info("SubsidyItemPrice refresh starting: %s hot and %s cold types.", len(type_ids), len(cold))
+
+    checked = updated = missing = unfetched_count = failed_chunks = 0
+    changed_type_ids: list[int] = []
+    queue = type_ids + cold
+    # Each window is fetched concurrently by the providers, then compared and written chunk by chunk.
+    window_size = chunk_size * max(int(app_settings.SUBSIDY_PRICE_FETCH_WORKERS), 1)
+    for window_start in range(0, len(queue), window_size):
+        window = queue[window_start:window_start + window_size]
+        market_data, unfetched = fetch_prices_and_failures(window)
+        for start in range(0, len(window), chunk_size):
+            chunk = window[start:start + chunk_size]
+            # Types in a request every provider failed keep their stored prices rather than being zeroed;
+            # only types a successful response left out are priced at zero.
+            fetched = [type_id for type_id in chunk if type_id not in unfetched]
+            unfetched_count += len(chunk) - len(fetched)
+            if len(fetched) < len(chunk):
+                logger.warning(
+                    "No provider answered for %s types starting at %s; keeping stored prices.",
+                    len(chunk) - len(fetched),
+                    chunk[0],
+                )
+            if not fetched:
+                failed_chunks += 1
+                continue
+            chunk = fetched
+
+            rows = SubsidyItemPrice.objects.filter(eve_type_id__in=chunk).values_list("pk", "eve_type_id", "buy", "sell")
+            changed, chunk_changed_ids, chunk_missing = _price_changes(rows, market_data)
+            now = timezone.now()
+            for price in changed:
+                price.updated_at = now
             try:
-                sell = float(market_data[key]["sell"]["percentile"])
-            except Exception:
-                sell = 0.0
+                with transaction.atomic():
+                    if changed:
+                        SubsidyItemPrice.objects.bulk_update(changed, ["buy", "sell", "updated_at"])
+                        record_price_history(((price.eve_type_id, price.buy, price.sell) for price in changed), now)
+                    SubsidyItemPrice.objects.filter(eve_type_id__in=chunk).update(checked_at=now)
+            except Error as e:
+                failed_chunks += 1
+                logger.error("Error updating SubsidyItemPrice: %s", e)
+                continue
+            checked += len(chunk)
+            updated += len(changed)
+            missing += chunk_missing
+            changed_type_ids.extend(chunk_changed_ids)
+
+    logger.info(
+        "SubsidyItemPrice refresh done: checked=%s changed=%s missing=%s unfetched=%s failed_chunks=%s",
+        checked, updated, missing, unfetched_count, failed_chunks,
+    )
+
+    rebuilt = 0
+    if changed_type_ids:
+        from ..contracts.price_cache import bump_price_version
+        from ..contracts.pricing import rebuild_fitting_price_snapshots
+
+        # Every changed chunk has committed; retire cached prices before snapshots read them.
+        bump_price_version()
+
+        if len(changed_type_ids) > SNAPSHOT_FULL_REBUILD_TYPES:
+            rebuilt = rebuild_fitting_price_snapshots()
         else:
-            missing_items.append(getattr(price.eve_type, "name", str(price.eve_type_id)))
-            buy, sell = 0.0, 0.0
+            rebuilt = rebuild_fitting_price_snapshots(type_ids=changed_type_ids)
+        logger.info("Rebuilt price snapshots for %s fittings.", rebuilt)
 
-        price.buy = buy
-        price.sell = sell
-        updated += 1
+        from ..contracts.stock import queue_stock_snapshot_refresh
 
-    try:
-        SubsidyItemPrice.objects.bulk_update(prices, ["buy", "sell"])
-        logger.info("Updated %s SubsidyItemPrice rows.", updated)
-    except Error as e:
-        logger.error("Error updating SubsidyItemPrice: %s", e)
+        queue_stock_snapshot_refresh()
 
-    return {"updated": updated, "missing": len(missing_items)}
+    return {
+        "checked": checked,
+        "updated": updated,
+        "missing": missing,
+        "unfetched": unfetched_count,
+        "failed_chunks": failed_chunks,
+        "changed_type_ids": changed_type_ids,
+        "snapshots": rebuilt,
+    }
 
 
 @shared_task
@@ -122,16 +302,6 @@ def ensure_prices_for_types(type_ids: list[int] | None = None) -> dict:
     if not type_ids:
         logger.info("ensure_prices_for_types: no type_ids provided; skipping.")
         return {"created": 0, "skipped": 0}
-    existing = set(
-        SubsidyItemPrice.objects.filter(eve_type_id__in=type_ids).values_list("eve_type_id", flat=True)
-    )
-    to_create: list[SubsidyItemPrice] = []
-    for tid in type_ids:
-        if tid not in existing:
-            to_create.append(SubsidyItemPrice(eve_type_id=tid, buy=0, sell=0))
-    if to_create:
-        SubsidyItemPrice.objects.bulk_create(to_create, ignore_conflicts=True)
-        logger.info("Created %s SubsidyItemPrice rows.", len(to_create))
-        return {"created": len(to_create), "skipped": len(type_ids) - len(to_create)}
-    logger.info("No missing SubsidyItemPrice rows.")
-    return {"created": 0, "skipped": len(type_ids)}
+    type_ids = {int(type_id) for type_id in type_ids if type_id}
+    created = seed_price_rows(type_ids)
+    return {"created": created, "skipped": len(type_ids) - created}
@@ -0,0 +1,85 @@
+"""Entries in the Django cache retired all at once by bumping a version.
+
+Each entry is stored as ``(version, value)``. A read fetches the version
+key together with the entries in one ``get_many`` and drops entries written
+under another version, so bumping the version invalidates everything
+without deleting keys; the entries themselves age out with their timeout.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Iterable, Mapping
+
+
+class VersionedCache:
+    """Version bookkeeping and reads/writes for one family of cache entries."""
+
+    def __init__(self, version_key: str, timeout_setting: str) -> None:
+        self.version_key = version_key
+        self.timeout_setting = timeout_setting
+
+    @staticmethod
+    def backend(backend=None):
+        if backend is not None:
+            return backend
+        from django.core.cache import cache
+
+        return cache
+
+    def timeout(self, timeout: int | None = None) -> int:
+        if timeout is not None:
+            return int(timeout)
+        from .. import app_settings
+
+        return int(getattr(app_settings, self.timeout_setting))
+
+    def _current_version(self, backend, stored) -> int:
+        if stored is not None:
+            return int(stored)
+        # First use, or the version key was evicted: start from a value no earlier entry can carry.
+        backend.add(self.version_key, time.time_ns(), timeout=None)
+        return int(backend.get(self.version_key) or 0)
+
+    def read(self, keys: Iterable[str], backend=None) -> tuple[int, dict[str, Any]]:
+        """The current version and the values of ``keys`` written under it, in one round trip."""
+        backend = self.backend(backend)
+        fetched = backend.get_many([self.version_key, *keys])
+        version = self._current_version(backend, fetched.pop(self.version_key, None))
+        return version, self._current(fetched, version)
+
+    def read_at(self, keys: Iterable[str], version: int, backend=None) -> dict[str, Any]:
+        """Values of ``keys`` written under ``version``, for a version the caller already read."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        return self._current(self.backend(backend).get_many(keys), version)
+
+    @staticmethod
+    def _current(fetched: Mapping[str, Any], version: int) -> dict[str, Any]:
+        return {key: entry[1] for key, entry in fetched.items() if entry is not None and entry[0] == version}
+
+    def write(self, version: int, values: Mapping[str, Any], backend=None, timeout: int | None = None) -> None:
+        if values:
+            self.backend(backend).set_many(
+                {key: (version, value) for key, value in values.items()}, timeout=self.timeout(timeout)
+            )
+
+    def version(self, backend=None) -> int | None:
+        """The current version, or None before the first read or bump."""
+        stored = self.backend(backend).get(self.version_key)
+        return None if stored is None else int(stored)
+
+    def bump(self, backend=None) -> int:
+        """Retire every entry; call once the data behind them has committed."""
+        backend = self.backend(backend)
+        try:
+            return int(backend.incr(self.version_key))
+        except ValueError:
+            self._current_version(backend, None)
+            return int(backend.incr(self.version_key))
+
+    def bump_on_commit(self) -> None:
+        from django.db import transaction
+
+        transaction.on_commit(self.bump)
@@ -1,19 +1,13 @@
 from __future__ import annotations
 
-from collections import Counter
-from datetime import datetime, time, timedelta
+from datetime import datetime, time
 
 from django.core.management.base import BaseCommand, CommandError
-from django.db.models import Q
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
 
-from corptools.models import CorporateContract
-
-from aasubsidy.contracts.filters import apply_contract_exclusions
-from aasubsidy.contracts.matching import match_contracts
+from aasubsidy.contracts.backfill import get_checkpoint, run_slice
 from aasubsidy.models import SubsidyConfig
-from aasubsidy.tasks import _effective_corporation_id
 
 
 class Command(BaseCommand):
@@ -76,31 +70,47 @@ class Command(BaseCommand):
         parser.add_argument(
             "--dry-run",
             action="store_true",
-            help="Evaluate matches and report counts without persisting DoctrineMatchResult.",
+            help="Evaluate matches and report counts without persisting DoctrineMatchResult or the checkpoint.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue from the checkpoint recorded for the same filters instead of starting over.",
+        )
+        parser.add_argument(
+            "--max-contracts",
+            type=int,
+            default=None,
+            help="Stop after this many contracts; rerun with --resume to continue.",
+        )
+        parser.add_argument(
+            "--defer",
+            action="store_true",
+            help="Only record the checkpoint; the backfill_doctrine_matches_slice task works through it off-peak.",
         )
 
     def handle(self, *args, **options):
-        corporation_id = options.get("corporation_id") or SubsidyConfig.active().corporation_id
         chunk_size = int(options.get("chunk_size") or 250)
         dry_run = bool(options.get("dry_run"))
+        resume = bool(options.get("resume"))
         only_missing_results = bool(options.get("only_missing_results"))
+        max_contracts = options.get("max_contracts")
 
         if chunk_size <= 0:
             raise CommandError("--chunk-size must be greater than 0.")
+        if max_contracts is not None and int(max_contracts) <= 0:
+            raise CommandError("--max-contracts must be greater than 0.")
 
         days = options.get("days")
         date_from_raw = (options.get("date_from") or "").strip()
         date_to_raw = (options.get("date_to") or "").strip()
         if days is not None and (date_from_raw or date_to_raw):
             raise CommandError("Use either --days or --date-from/--date-to, not both.")
+        if days is not None and int(days) < 0:
+            raise CommandError("--days must be 0 or greater.")
 
         date_from = self._parse_lower_bound(date_from_raw) if date_from_raw else None
         date_to = self._parse_upper_bound(date_to_raw) if date_to_raw else None
-        if days is not None:
-            if int(days) < 0:
-                raise CommandError("--days must be 0 or greater.")
-            date_from = timezone.now() - timedelta(days=int(days))
-            date_to = timezone.now()
 
         statuses = self._normalize_statuses(options.get("status") or [])
         contract_id_start = options.get("contract_id_start")
@@ -108,42 +118,43 @@ class Command(BaseCommand):
         if contract_id_start and contract_id_end and int(contract_id_start) > int(contract_id_end):
             raise CommandError("--contract-id-start cannot be greater than --contract-id-end.")
 
-        cfg = SubsidyConfig.active()
-        corporation_id = _effective_corporation_id(corporation_id)
-        qs = CorporateContract.objects.filter(
-            corporation__corporation__corporation_id=corporation_id
-        ).order_by("id")
-        qs = apply_contract_exclusions(qs, cfg)
-        if date_from is not None:
-            qs = qs.filter(date_issued__gte=date_from)
-        if date_to is not None:
-            qs = qs.filter(date_issued__lte=date_to)
-        if statuses:
-            status_q = Q()
-            for status in statuses:
-                status_q |= Q(status__iexact=status)
-            qs = qs.filter(status_q)
-        if contract_id_start is not None:
-            qs = qs.filter(contract_id__gte=int(contract_id_start))
-        if contract_id_end is not None:
-            qs = qs.filter(contract_id__lte=int(contract_id_end))
-        if only_missing_results:
-            qs = qs.filter(doctrine_match__isnull=True)
-
-        total = qs.count()
-        if total == 0:
-            self.stdout.write(self.style.WARNING("No contracts matched the selected filters."))
+        requested = {
+            "corporation_id": options.get("corporation_id") or SubsidyConfig.active().corporation_id,
+            "days": int(days) if days is not None else None,
+            "date_from": date_from.isoformat() if date_from else None,
+            "date_to": date_to.isoformat() if date_to else None,
+            "statuses": statuses,
+            "contract_id_start": contract_id_start,
+            "contract_id_end": contract_id_end,
+            "only_missing_results": only_missing_results,
+        }
+        checkpoint = get_checkpoint(requested, resume=resume)
+        if resume and checkpoint.completed_at is not None:
+            self.stdout.write(self.style.WARNING(
+                f"Backfill for these filters already completed at {checkpoint.completed_at.isoformat()}."
+            ))
+            return
+        filters = checkpoint.filters
+        if options.get("defer"):
+            if dry_run:
+                raise CommandError("--defer cannot be combined with --dry-run.")
+            checkpoint.deferred = True
+            checkpoint.save()
+            self.stdout.write(self.style.SUCCESS(
+                f"Queued backfill checkpoint {checkpoint.signature[:12]} after id={checkpoint.last_pk}."
+            ))
             return
 
         self.stdout.write(self.style.MIGRATE_HEADING("Backfilling doctrine match results..."))
         self.stdout.write(
-            f"corporation_id={corporation_id} total={total} chunk_size={chunk_size} dry_run={dry_run} "
-            f"only_missing_results={only_missing_results}"
+            f"corporation_id={filters['corporation_id']} chunk_size={chunk_size} dry_run={dry_run} "
+            f"only_missing_results={only_missing_results} checkpoint={checkpoint.signature[:12]}"
         )
-        if date_from is not None or date_to is not None:
+        if resume and checkpoint.last_pk:
+            self.stdout.write(f"resuming after id={checkpoint.last_pk} ({checkpoint.processed} already processed)")
+        if filters.get("date_from") or filters.get("date_to"):
             self.stdout.write(
-                f"date_issued range: {date_from.isoformat() if date_from else '*'} -> "
-                f"{date_to.isoformat() if date_to else '*'}"
+                f"date_issued range: {filters.get('date_from') or '*'} -> {filters.get('date_to') or '*'}"
             )
         if statuses:
             self.stdout.write(f"statuses: {', '.join(statuses)}")
@@ -153,35 +164,26 @@ class Command(BaseCommand):
                 f"{contract_id_end if contract_id_end is not None else '*'}"
             )
 
-        processed = 0
-        status_counts: Counter[str] = Counter()
-        source_counts: Counter[str] = Counter()
-
-        batch: list[int] = []
-        for contract_pk in qs.values_list("id", flat=True).iterator(chunk_size=chunk_size):
-            batch.append(int(contract_pk))
-            if len(batch) < chunk_size:
-                continue
-            processed += self._process_batch(
-                batch=batch,
-                dry_run=dry_run,
-                status_counts=status_counts,
-                source_counts=source_counts,
-            )
-            self.stdout.write(f"processed {processed}/{total}")
-            batch = []
-
-        if batch:
-            processed += self._process_batch(
-                batch=batch,
-                dry_run=dry_run,
-                status_counts=status_counts,
-                source_counts=source_counts,
-            )
-            self.stdout.write(f"processed {processed}/{total}")
+        result = run_slice(
+            checkpoint,
+            chunk_size=chunk_size,
+            max_contracts=int(max_contracts) if max_contracts is not None else None,
+            dry_run=dry_run,
+            on_chunk=lambda state: self.stdout.write(f"processed {state.processed} (last id={state.last_pk})"),
+        )
+        if checkpoint.processed == 0:
+            self.stdout.write(self.style.WARNING("No contracts matched the selected filters."))
+            return
 
         suffix = " (dry-run)" if dry_run else ""
-        self.stdout.write(self.style.SUCCESS(f"Doctrine match backfill complete{suffix}."))
+        if result.completed:
+            self.stdout.write(self.style.SUCCESS(f"Doctrine match backfill complete{suffix}."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"Stopped after {result.processed} contracts{suffix}; rerun with --resume to continue."
+            ))
+        status_counts = checkpoint.status_counts
+        source_counts = checkpoint.source_counts
         self.stdout.write(
             "match_status counts: "
             + ", ".join(
@@ -197,20 +199,6 @@ class Command(BaseCommand):
             )
         )
 
-    def _process_batch(
-        self,
-        *,
-        batch: list[int],
-        dry_run: bool,
-        status_counts: Counter[str],
-        source_counts: Counter[str],
-    ) -> int:
-        results = match_contracts(batch, persist=not dry_run)
-        for result in results.values():
-            status_counts[result.match_status] += 1
-            source_counts[result.match_source] += 1
-        return len(batch)
-
     def _normalize_statuses(self, raw_statuses: list[str]) -> list[str]:
         normalized: list[str] = []
         for raw in raw_statuses:
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from corptools.models import CorporateContract
+
+from aasubsidy.contracts.filters import apply_contract_exclusions
+from aasubsidy.contracts.instrumentation import MatchStats
+from aasubsidy.contracts.matching import match_contracts
+from aasubsidy.models import SubsidyConfig
+from aasubsidy.tasks import _effective_corporation_id
+
+
+class Command(BaseCommand):
+    help = "Run the doctrine matcher over a contract set and print a per-stage profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "contract_ids",
+            nargs="*",
+            type=int,
+            help="CorporateContract primary keys to profile. Defaults to recent contracts.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="When no ids are given, profile contracts issued in the last N days.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=500,
+            help="When no ids are given, profile at most this many contracts.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=250,
+            help="Number of contracts to process per matcher batch.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Run the contract set this many times and report the last run (earlier runs warm caches).",
+        )
+        parser.add_argument(
+            "--persist",
+            action="store_true",
+            help="Persist results so the persist stage is included. Default is a dry run.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the profile as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = int(options.get("chunk_size") or 250)
+        repeat = int(options.get("repeat") or 1)
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size must be greater than 0.")
+        if repeat <= 0:
+            raise CommandError("--repeat must be greater than 0.")
+
+        contract_ids = [int(contract_id) for contract_id in options.get("contract_ids") or []]
+        if not contract_ids:
+            contract_ids = self._recent_contract_ids(days=int(options.get("days") or 0), limit=int(options.get("limit") or 0))
+        if not contract_ids:
+            self.stdout.write(self.style.WARNING("No contracts matched the selected filters."))
+            return
+
+        persist = bool(options.get("persist"))
+        for _ in range(repeat):
+            stats = MatchStats()
+            for start in range(0, len(contract_ids), chunk_size):
+                match_contracts(contract_ids[start:start + chunk_size], persist=persist, stats=stats)
+
+        if options.get("json"):
+            self.stdout.write(json.dumps(stats.as_dict(), indent=2, sort_keys=True))
+            return
+        self._print_profile(stats)
+
+    def _recent_contract_ids(self, *, days: int, limit: int) -> list[int]:
+        cfg = SubsidyConfig.active()
+        corporation_id = _effective_corporation_id(cfg.corporation_id)
+        qs = CorporateContract.objects.filter(
+            corporation__corporation__corporation_id=corporation_id,
+            date_issued__gte=timezone.now() - timedelta(days=max(days, 0)),
+        ).order_by("-date_issued")
+        qs = apply_contract_exclusions(qs, cfg)
+        ids = qs.values_list("id", flat=True)
+        if limit > 0:
+            ids = ids[:limit]
+        return [int(contract_id) for contract_id in ids]
+
+    def _print_profile(self, stats: MatchStats) -> None:
+        data = stats.as_dict()
+        total_seconds = data["total_seconds"] or 0.0
+        self.stdout.write(self.style.MIGRATE_HEADING("Doctrine matcher profile"))
+        self.stdout.write(
+            f"contracts={data['contracts']} total={total_seconds * 1000:.1f}ms "
+            f"queries={data['total_queries']} candidates_per_contract={data['candidates_per_contract']}"
+        )
+        self.stdout.write(f"{'stage':<20}{'ms':>12}{'share':>9}{'queries':>10}{'calls':>8}")
+        for name, entry in data["stages"].items():
+            share = (entry["seconds"] / total_seconds * 100) if total_seconds else 0.0
+            self.stdout.write(
+                f"{name:<20}{entry['seconds'] * 1000:>12.1f}{share:>8.1f}%{entry['queries']:>10}{entry['calls']:>8}"
+            )
+        for name, seconds in data["timers"].items():
+            self.stdout.write(f"  {name:<18}{seconds * 1000:>12.1f}  (within evaluate)")
+        if data["counters"]:
+            self.stdout.write("counters: " + ", ".join(f"{key}={value}" for key, value in data["counters"].items()))
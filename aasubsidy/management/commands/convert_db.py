@@ -8,7 +8,7 @@ from allianceauth.services.hooks import get_extension_logger
 
 from aasubsidy.tasks import (
     sync_fitting_requests,
-    seed_all_types_into_subsidy,
+    seed_referenced_types_into_subsidy,
     refresh_subsidy_item_prices,
 )
 from aasubsidy.models import CorporateContractSubsidy
@@ -50,8 +50,8 @@ class Command(BaseCommand):
             res1 = sync_fitting_requests.apply(args=[], kwargs={}).get(disable_sync_subtasks=False)
             self.stdout.write(self.style.SUCCESS(f"Fitting requests synced: {res1}"))
 
-            self.stdout.write(self.style.MIGRATE_HEADING("Step 2/4: Seed all EveTypes into SubsidyItemPrice (wait)…"))
-            res2 = seed_all_types_into_subsidy.apply(args=[], kwargs={}).get(disable_sync_subtasks=False)
+            self.stdout.write(self.style.MIGRATE_HEADING("Step 2/4: Seed referenced types into SubsidyItemPrice (wait)…"))
+            res2 = seed_referenced_types_into_subsidy.apply(args=[], kwargs={}).get(disable_sync_subtasks=False)
             self.stdout.write(self.style.SUCCESS(f"Seed complete: {res2}"))
 
             self.stdout.write(self.style.MIGRATE_HEADING("Step 3/4: Queue price refresh (no wait for inner task)…"))
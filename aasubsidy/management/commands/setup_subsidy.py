@@ -64,7 +64,7 @@ class Command(BaseCommand):
         )
         self.stdout.write(self.style.SUCCESS("Scheduled refresh_subsidy_item_prices weekly"))
 
-        # 4. Seed types into subsidy once a week (e.g., Sunday at 00:00)
+        # 4. Seed price rows for referenced types once a week (e.g., Sunday at 00:00)
         schedule_seed, _ = CrontabSchedule.objects.get_or_create(
             minute="0",
             hour="0",
@@ -73,11 +73,30 @@ class Command(BaseCommand):
             month_of_year="*",
         )
 
+        PeriodicTask.objects.filter(name="AA Subsidy: Seed All Types Into Subsidy").delete()
         PeriodicTask.objects.update_or_create(
-            name="AA Subsidy: Seed All Types Into Subsidy",
+            name="AA Subsidy: Seed Referenced Types Into Subsidy",
             defaults=self._periodic_task_defaults(
                 crontab=schedule_seed,
-                task="aasubsidy.tasks.seed_all_types_into_subsidy",
+                task="aasubsidy.tasks.seed_referenced_types_into_subsidy",
             ),
         )
-        self.stdout.write(self.style.SUCCESS("Scheduled seed_all_types_into_subsidy weekly"))
+        self.stdout.write(self.style.SUCCESS("Scheduled seed_referenced_types_into_subsidy weekly"))
+
+        # 5. Trickle queued doctrine match backfills through off-peak hours
+        schedule_backfill, _ = CrontabSchedule.objects.get_or_create(
+            minute="*/10",
+            hour="1-6",
+            day_of_week="*",
+            day_of_month="*",
+            month_of_year="*",
+        )
+
+        PeriodicTask.objects.update_or_create(
+            name="AA Subsidy: Backfill Doctrine Matches",
+            defaults=self._periodic_task_defaults(
+                crontab=schedule_backfill,
+                task="aasubsidy.tasks.backfill_doctrine_matches_slice",
+            ),
+        )
+        self.stdout.write(self.style.SUCCESS("Scheduled backfill_doctrine_matches_slice every 10 minutes, 01:00-06:59"))
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.27 on 2026-05-04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0007_fittingclaimautoclearance"),
+        ("corptools", "0127_alter_corporationaudit_options"),
+        ("fittings", "0016_remove_dogmaattribute_type_remove_dogmaeffect_type_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DoctrineMatchCandidate",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "contract",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="doctrine_match_candidates",
+                        to="corptools.corporatecontract",
+                    ),
+                ),
+                (
+                    "fitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="fittings.fitting",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Doctrine Match Candidate",
+                "verbose_name_plural": "Doctrine Match Candidates",
+                "unique_together": {("contract", "fitting")},
+                "indexes": [
+                    models.Index(fields=["fitting"], name="dmc_fitting_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.27 on 2026-05-06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0008_doctrinematchcandidate"),
+        ("corptools", "0127_alter_corporationaudit_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctrinematchresult",
+            name="summary_json",
+            field=models.TextField(blank=True, default="{}"),
+        ),
+        migrations.CreateModel(
+            name="DoctrineMatchEvidence",
+            fields=[
+                (
+                    "contract",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="doctrine_match_evidence",
+                        serialize=False,
+                        to="corptools.corporatecontract",
+                    ),
+                ),
+                ("compressed", models.BooleanField(default=False)),
+                ("payload", models.BinaryField(default=b"")),
+            ],
+            options={
+                "verbose_name": "Doctrine Match Evidence",
+                "verbose_name_plural": "Doctrine Match Evidence",
+            },
+        ),
+    ]
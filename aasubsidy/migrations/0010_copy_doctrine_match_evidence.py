@@ -0,0 +1,95 @@
+# Generated by Django 4.2.27 on 2026-05-06
+
+import json
+import zlib
+
+from django.db import migrations
+
+DETAIL_KEYS = ("profile", "item_rows", "substitutions", "approved_substitutions", "scoring_details")
+COMPRESS_MIN_BYTES = 1024
+BATCH_SIZE = 500
+
+
+def _encode(detail):
+    raw = json.dumps(detail).encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return zlib.compress(raw, 6), True
+    return raw, False
+
+
+def split_evidence(apps, schema_editor):
+    DoctrineMatchResult = apps.get_model("aasubsidy", "DoctrineMatchResult")
+    DoctrineMatchEvidence = apps.get_model("aasubsidy", "DoctrineMatchEvidence")
+
+    results = []
+    details = []
+
+    def flush():
+        DoctrineMatchResult.objects.bulk_update(results, ["summary_json"])
+        DoctrineMatchEvidence.objects.bulk_create(details, ignore_conflicts=True)
+        results.clear()
+        details.clear()
+
+    for row in DoctrineMatchResult.objects.only("id", "contract_id", "evidence_json").iterator(chunk_size=BATCH_SIZE):
+        try:
+            evidence = json.loads(row.evidence_json or "{}")
+        except (TypeError, ValueError):
+            evidence = {}
+        if not isinstance(evidence, dict):
+            evidence = {}
+        summary = {key: value for key, value in evidence.items() if key not in DETAIL_KEYS}
+        detail = {key: value for key, value in evidence.items() if key in DETAIL_KEYS}
+        row.summary_json = json.dumps(summary)
+        results.append(row)
+        if detail:
+            payload, compressed = _encode(detail)
+            details.append(DoctrineMatchEvidence(contract_id=row.contract_id, payload=payload, compressed=compressed))
+        if len(results) >= BATCH_SIZE:
+            flush()
+    flush()
+
+
+def merge_evidence(apps, schema_editor):
+    DoctrineMatchResult = apps.get_model("aasubsidy", "DoctrineMatchResult")
+    DoctrineMatchEvidence = apps.get_model("aasubsidy", "DoctrineMatchEvidence")
+
+    results = []
+
+    def flush():
+        # One evidence query per batch of results rather than one per row.
+        details = {
+            row.contract_id: row
+            for row in DoctrineMatchEvidence.objects.filter(contract_id__in=[result.contract_id for result in results])
+        }
+        for result in results:
+            try:
+                evidence = json.loads(result.summary_json or "{}")
+            except (TypeError, ValueError):
+                evidence = {}
+            detail_row = details.get(result.contract_id)
+            if detail_row is not None:
+                raw = bytes(detail_row.payload or b"")
+                if detail_row.compressed:
+                    raw = zlib.decompress(raw)
+                evidence.update(json.loads(raw.decode("utf-8") or "{}"))
+            result.evidence_json = json.dumps(evidence)
+        DoctrineMatchResult.objects.bulk_update(results, ["evidence_json"])
+        results.clear()
+
+    for row in DoctrineMatchResult.objects.only("id", "contract_id", "summary_json").iterator(chunk_size=BATCH_SIZE):
+        results.append(row)
+        if len(results) >= BATCH_SIZE:
+            flush()
+    if results:
+        flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0009_doctrinematchevidence"),
+    ]
+
+    operations = [
+        migrations.RunPython(split_evidence, merge_evidence),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-05-06
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0010_copy_doctrine_match_evidence"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="doctrinematchresult",
+            name="evidence_json",
+        ),
+    ]
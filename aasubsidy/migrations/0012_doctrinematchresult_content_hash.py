@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-05-07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0011_remove_doctrinematchresult_evidence_json"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctrinematchresult",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-05-08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0012_doctrinematchresult_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DoctrineMatchBackfillCheckpoint",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("signature", models.CharField(max_length=64, unique=True)),
+                ("filters_json", models.TextField(blank=True, default="{}")),
+                ("last_pk", models.BigIntegerField(default=0)),
+                ("processed", models.PositiveIntegerField(default=0)),
+                ("status_counts_json", models.TextField(blank=True, default="{}")),
+                ("source_counts_json", models.TextField(blank=True, default="{}")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Doctrine Match Backfill Checkpoint",
+                "verbose_name_plural": "Doctrine Match Backfill Checkpoints",
+            },
+        ),
+    ]
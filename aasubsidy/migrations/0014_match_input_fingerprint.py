@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-05-08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0013_doctrinematchbackfillcheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctrinematchprofile",
+            name="definition_version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="doctrinematchresult",
+            name="input_fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
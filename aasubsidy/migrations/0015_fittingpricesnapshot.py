@@ -0,0 +1,43 @@
+# Generated by Django 4.2.27 on 2026-05-09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0014_match_input_fingerprint"),
+        ("fittings", "0016_remove_dogmaattribute_type_remove_dogmaeffect_type_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FittingPriceSnapshot",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("config_version", models.CharField(max_length=64)),
+                ("items_basis_raw", models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ("ship_basis_raw", models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ("basis_total", models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ("items_volume_m3", models.DecimalField(decimal_places=4, default=0, max_digits=30)),
+                ("ship_volume_m3", models.DecimalField(decimal_places=4, default=0, max_digits=30)),
+                ("total_volume_m3", models.DecimalField(decimal_places=4, default=0, max_digits=30)),
+                ("suggested", models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ("built_at", models.DateTimeField(auto_now=True)),
+                (
+                    "fitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="subsidy_price_snapshots",
+                        to="fittings.fitting",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fitting Price Snapshot",
+                "verbose_name_plural": "Fitting Price Snapshots",
+                "unique_together": {("fitting", "config_version")},
+            },
+        ),
+    ]
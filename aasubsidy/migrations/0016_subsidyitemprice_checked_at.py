@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-05-09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0015_fittingpricesnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subsidyitemprice",
+            name="checked_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Last time the market source was asked for this type",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subsidyitemprice",
+            index=models.Index(fields=["checked_at"], name="sip_checked_at_idx"),
+        ),
+    ]
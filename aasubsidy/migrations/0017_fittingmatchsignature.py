@@ -0,0 +1,49 @@
+# Generated by Django 4.2.27 on 2026-05-10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0016_subsidyitemprice_checked_at"),
+        ("fittings", "0016_remove_dogmaattribute_type_remove_dogmaeffect_type_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FittingMatchSignature",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("signature", models.CharField(blank=True, db_index=True, max_length=64)),
+                (
+                    "hull_version",
+                    models.CharField(
+                        help_text="Versions of every fitting on the same hull when this row was built",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "exclusive",
+                    models.BooleanField(
+                        default=False,
+                        help_text="A contract holding exactly these items auto-matches this fitting and no other",
+                    ),
+                ),
+                ("built_at", models.DateTimeField(auto_now=True)),
+                (
+                    "fitting",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="subsidy_match_signature",
+                        to="fittings.fitting",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fitting Match Signature",
+                "verbose_name_plural": "Fitting Match Signatures",
+            },
+        ),
+    ]
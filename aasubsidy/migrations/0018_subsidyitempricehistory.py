@@ -0,0 +1,39 @@
+# Generated by Django 4.2.27 on 2026-05-11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0017_fittingmatchsignature"),
+        ("eveuniverse", "0011_extend_industry_activites"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubsidyItemPriceHistory",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("sell", models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ("buy", models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ("recorded_at", models.DateTimeField()),
+                (
+                    "eve_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="eveuniverse.evetype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Subsidy Item Price History",
+                "verbose_name_plural": "Subsidy Item Price History",
+                "indexes": [
+                    models.Index(fields=["eve_type", "recorded_at"], name="siph_type_recorded_idx"),
+                ],
+            },
+        ),
+    ]
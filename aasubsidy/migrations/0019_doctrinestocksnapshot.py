@@ -0,0 +1,53 @@
+# Generated by Django 4.2.27 on 2026-05-12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0018_subsidyitempricehistory"),
+        ("fittings", "0016_remove_dogmaattribute_type_remove_dogmaeffect_type_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DoctrineStockSnapshot",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("fitting_name", models.CharField(blank=True, default="", max_length=255)),
+                ("doctrine_id", models.IntegerField(blank=True, null=True)),
+                ("doctrine_name", models.CharField(blank=True, default="", max_length=255)),
+                ("stock_requested", models.IntegerField(default=0)),
+                ("stock_available", models.IntegerField(default=0)),
+                ("stock_needed", models.IntegerField(default=0)),
+                ("volume_m3", models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ("jita_sell_isk", models.BigIntegerField(default=0)),
+                ("subsidy_isk", models.BigIntegerField(default=0)),
+                ("alliance_purchase_isk", models.BigIntegerField(default=0)),
+                ("built_at", models.DateTimeField()),
+                (
+                    "fitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="fittings.fitting",
+                    ),
+                ),
+                (
+                    "system",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="aasubsidy.doctrinesystem",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Doctrine Stock Snapshot",
+                "verbose_name_plural": "Doctrine Stock Snapshots",
+                "unique_together": {("system", "fitting")},
+            },
+        ),
+    ]
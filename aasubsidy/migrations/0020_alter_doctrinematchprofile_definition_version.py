@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-05-13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0019_doctrinestocksnapshot"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="doctrinematchprofile",
+            name="definition_version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-05-14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aasubsidy", "0020_alter_doctrinematchprofile_definition_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctrinematchbackfillcheckpoint",
+            name="deferred",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,7 +1,11 @@
 import json
+import zlib
 
 from django.db import models
 
+from .helpers import json_codec
+from .helpers.json_codec import ParsedJSON
+
 
 class General(models.Model):
     class Meta:
@@ -56,10 +60,36 @@ class SubsidyItemPrice(models.Model):
     sell = models.DecimalField(max_digits=20, decimal_places=2, default=0)
     buy = models.DecimalField(max_digits=20, decimal_places=2, default=0)
     updated_at = models.DateTimeField(auto_now=True)
+    checked_at = models.DateTimeField(null=True, blank=True, help_text="Last time the market source was asked for this type")
 
     class Meta:
         verbose_name = "Subsidy Item Price"
         verbose_name_plural = "Subsidy Item Prices"
+        indexes = [
+            models.Index(fields=["checked_at"], name="sip_checked_at_idx"),
+        ]
+
+
+class SubsidyItemPriceHistory(models.Model):
+    """Append-only buy/sell of a type, written only when a refresh changes its price.
+
+    A type's price at time T is its latest row recorded at or before T.
+    """
+
+    eve_type = models.ForeignKey("eveuniverse.EveType", on_delete=models.CASCADE, related_name="+")
+    sell = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    buy = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Subsidy Item Price History"
+        verbose_name_plural = "Subsidy Item Price History"
+        indexes = [
+            models.Index(fields=["eve_type", "recorded_at"], name="siph_type_recorded_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.eve_type_id}@{self.recorded_at:%Y-%m-%d %H:%M}:{self.buy}/{self.sell}"
 
 
 class CorporateContractSubsidy(models.Model):
@@ -120,6 +150,8 @@ class DoctrineMatchProfile(models.Model):
     allow_meta_variants = models.BooleanField(default=False)
     allow_faction_variants = models.BooleanField(default=False)
     notes = models.TextField(blank=True, default="")
+    # Bumped whenever the profile or one of its rules changes.
+    definition_version = models.PositiveIntegerField(default=1, editable=False)
 
     class Meta:
         verbose_name = "Doctrine Match Profile"
@@ -128,6 +160,17 @@ class DoctrineMatchProfile(models.Model):
     def __str__(self) -> str:
         return f"Match Profile: {self.fitting_id}"
 
+    def save(self, *args, **kwargs):
+        # The version only moves through the F() bump in signals, so an instance
+        # loaded before a rule edit cannot write an already used number back.
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "definition_version"
+            ]
+        super().save(*args, **kwargs)
+
 
 class DoctrineItemRule(models.Model):
     RULE_REQUIRED = "required"
@@ -300,7 +343,9 @@ class DoctrineMatchResult(models.Model):
     score = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     hard_failures_json = models.TextField(default="[]", blank=True)
     warnings_json = models.TextField(default="[]", blank=True)
-    evidence_json = models.TextField(default="{}", blank=True)
+    summary_json = models.TextField(default="{}", blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    input_fingerprint = models.CharField(max_length=64, blank=True, default="")
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -315,24 +360,93 @@ class DoctrineMatchResult(models.Model):
     def __str__(self) -> str:
         return f"{self.contract_id}:{self.matched_fitting_id or 'none'}:{self.match_status}"
 
-    @staticmethod
-    def _loads(raw: str, default):
-        try:
-            return json.loads(raw or "")
-        except (TypeError, ValueError):
-            return default
+    # Decoded once per instance; treat the values as read-only.
+    hard_failures = ParsedJSON("hard_failures_json", list)
+    warnings = ParsedJSON("warnings_json", list)
+    summary = ParsedJSON("summary_json", dict)
 
-    @property
-    def hard_failures(self):
-        return self._loads(self.hard_failures_json, [])
+    def load_evidence(self) -> dict:
+        """Summary merged with the stored per-item detail, read with one DoctrineMatchEvidence query per call."""
+        evidence = dict(self.summary)
+        detail = DoctrineMatchEvidence.objects.filter(contract_id=self.contract_id).first()
+        if detail is not None:
+            evidence.update(detail.detail)
+        return evidence
 
-    @property
-    def warnings(self):
-        return self._loads(self.warnings_json, [])
+
+class DoctrineMatchEvidence(models.Model):
+    """Per-item match detail, kept apart from the result row so list pages never load it."""
+
+    COMPRESS_MIN_BYTES = 1024
+
+    contract = models.OneToOneField(
+        "corptools.CorporateContract",
+        on_delete=models.CASCADE,
+        related_name="doctrine_match_evidence",
+        primary_key=True,
+    )
+    compressed = models.BooleanField(default=False)
+    payload = models.BinaryField(default=b"")
+
+    class Meta:
+        verbose_name = "Doctrine Match Evidence"
+        verbose_name_plural = "Doctrine Match Evidence"
+
+    def __str__(self) -> str:
+        return f"{self.contract_id}:{len(self.payload or b'')}b"
+
+    @classmethod
+    def encode(cls, detail: dict, *, compress: bool = True) -> tuple[bytes, bool]:
+        raw = json_codec.dumps_bytes(detail)
+        if compress and len(raw) >= cls.COMPRESS_MIN_BYTES:
+            return zlib.compress(raw, 6), True
+        return raw, False
+
+    def _decode_payload(self) -> dict:
+        raw = bytes(self.payload or b"")
+        if self.compressed:
+            try:
+                raw = zlib.decompress(raw)
+            except zlib.error:
+                return {}
+        value = json_codec.loads(raw, {})
+        return value if isinstance(value, dict) else {}
 
     @property
-    def evidence(self):
-        return self._loads(self.evidence_json, {})
+    def detail(self) -> dict:
+        """Decoded payload, cached until ``payload`` is reassigned; treat it as read-only."""
+        cached = self.__dict__.get("_payload_parsed")
+        if cached is not None and cached[0] is self.payload and cached[1] == self.compressed:
+            return cached[2]
+        value = self._decode_payload()
+        self.__dict__["_payload_parsed"] = (self.payload, self.compressed, value)
+        return value
+
+
+class DoctrineMatchCandidate(models.Model):
+    """Reverse index of the fittings each contract was last scored against."""
+
+    contract = models.ForeignKey(
+        "corptools.CorporateContract",
+        on_delete=models.CASCADE,
+        related_name="doctrine_match_candidates",
+    )
+    fitting = models.ForeignKey(
+        "fittings.Fitting",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    class Meta:
+        verbose_name = "Doctrine Match Candidate"
+        verbose_name_plural = "Doctrine Match Candidates"
+        unique_together = ("contract", "fitting")
+        indexes = [
+            models.Index(fields=["fitting"], name="dmc_fitting_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.contract_id}:{self.fitting_id}"
 
 
 class DoctrineContractDecision(models.Model):
@@ -382,12 +496,145 @@ class DoctrineContractDecision(models.Model):
     def __str__(self) -> str:
         return f"{self.contract_id}:{self.decision}"
 
-    @property
-    def details(self):
+    details = ParsedJSON("details_json", dict)
+
+
+class DoctrineMatchBackfillCheckpoint(models.Model):
+    """Progress of a doctrine match backfill, keyed by its filter signature."""
+
+    signature = models.CharField(max_length=64, unique=True)
+    filters_json = models.TextField(default="{}", blank=True)
+    last_pk = models.BigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    status_counts_json = models.TextField(default="{}", blank=True)
+    source_counts_json = models.TextField(default="{}", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    # Set by --defer only; interactive runs stopped early are continued with --resume, not by the task.
+    deferred = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Doctrine Match Backfill Checkpoint"
+        verbose_name_plural = "Doctrine Match Backfill Checkpoints"
+
+    def __str__(self) -> str:
+        return f"{self.signature[:12]}:{self.last_pk}:{self.processed}"
+
+    @staticmethod
+    def _loads(raw: str) -> dict:
         try:
-            return json.loads(self.details_json or "{}")
+            value = json.loads(raw or "{}")
         except (TypeError, ValueError):
             return {}
+        return value if isinstance(value, dict) else {}
+
+    @property
+    def filters(self) -> dict:
+        return self._loads(self.filters_json)
+
+    @property
+    def status_counts(self) -> dict:
+        return self._loads(self.status_counts_json)
+
+    @property
+    def source_counts(self) -> dict:
+        return self._loads(self.source_counts_json)
+
+
+class FittingPriceSnapshot(models.Model):
+    """Precomputed basis, volume and suggested subsidy of a fitting under one set of pricing settings."""
+
+    VALUE_FIELDS = (
+        "items_basis_raw",
+        "ship_basis_raw",
+        "basis_total",
+        "items_volume_m3",
+        "ship_volume_m3",
+        "total_volume_m3",
+        "suggested",
+    )
+
+    fitting = models.ForeignKey(
+        "fittings.Fitting",
+        on_delete=models.CASCADE,
+        related_name="subsidy_price_snapshots",
+    )
+    config_version = models.CharField(max_length=64)
+    items_basis_raw = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    ship_basis_raw = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    basis_total = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    items_volume_m3 = models.DecimalField(max_digits=30, decimal_places=4, default=0)
+    ship_volume_m3 = models.DecimalField(max_digits=30, decimal_places=4, default=0)
+    total_volume_m3 = models.DecimalField(max_digits=30, decimal_places=4, default=0)
+    suggested = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Fitting Price Snapshot"
+        verbose_name_plural = "Fitting Price Snapshots"
+        unique_together = ("fitting", "config_version")
+
+    def __str__(self) -> str:
+        return f"{self.fitting_id}:{self.config_version[:12]}:{self.suggested}"
+
+
+class DoctrineStockSnapshot(models.Model):
+    """Stock, target and prices of a fitting in a staging system, as shown on the main page.
+
+    Rebuilt as a whole after contract imports and match runs; claims are not
+    stored here and are added when the page is rendered.
+    """
+
+    system = models.ForeignKey(DoctrineSystem, on_delete=models.CASCADE, related_name="stock_snapshots")
+    fitting = models.ForeignKey("fittings.Fitting", on_delete=models.CASCADE, related_name="+")
+    fitting_name = models.CharField(max_length=255, blank=True, default="")
+    doctrine_id = models.IntegerField(null=True, blank=True)
+    doctrine_name = models.CharField(max_length=255, blank=True, default="")
+    stock_requested = models.IntegerField(default=0)
+    stock_available = models.IntegerField(default=0)
+    stock_needed = models.IntegerField(default=0)
+    volume_m3 = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    jita_sell_isk = models.BigIntegerField(default=0)
+    subsidy_isk = models.BigIntegerField(default=0)
+    alliance_purchase_isk = models.BigIntegerField(default=0)
+    built_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Doctrine Stock Snapshot"
+        verbose_name_plural = "Doctrine Stock Snapshots"
+        unique_together = ("system", "fitting")
+
+    def __str__(self) -> str:
+        return f"{self.system_id}:{self.fitting_id}:{self.stock_available}/{self.stock_requested}"
+
+
+class FittingMatchSignature(models.Model):
+    """Canonical item signature of a fitting, used by the matcher's exact-match fast path."""
+
+    fitting = models.OneToOneField(
+        "fittings.Fitting",
+        on_delete=models.CASCADE,
+        related_name="subsidy_match_signature",
+    )
+    signature = models.CharField(max_length=64, blank=True, db_index=True)
+    hull_version = models.CharField(
+        max_length=64,
+        help_text="Versions of every fitting on the same hull when this row was built",
+    )
+    exclusive = models.BooleanField(
+        default=False,
+        help_text="A contract holding exactly these items auto-matches this fitting and no other",
+    )
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Fitting Match Signature"
+        verbose_name_plural = "Fitting Match Signatures"
+
+    def __str__(self) -> str:
+        return f"{self.fitting_id}:{self.signature[:12]}:{self.exclusive}"
+
 
 class SubsidyConfig(models.Model):
     PRICE_BASIS_CHOICES = (
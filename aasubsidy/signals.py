@@ -0,0 +1,136 @@
+"""Signal handlers"""
+
+# Django
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+# Alliance Auth
+from allianceauth.authentication.models import CharacterOwnership, UserProfile
+
+# Alliance Auth (External Libs)
+from fittings.models import Doctrine, Fitting, FittingItem
+
+# AA Subsidy App
+from .contracts.price_cache import bump_price_version_on_commit
+from .contracts.pricing import (
+    invalidate_fitting_price_snapshots,
+    rebuild_fitting_price_snapshots,
+    record_price_history,
+)
+from .contracts.rematch import queue_fitting_rematch
+from .contracts.stock import queue_stock_snapshot_refresh
+from .helpers.mains import bump_mains_version_on_commit
+from .helpers.services_update import seed_price_rows
+from .models import (
+    DoctrineContractDecision,
+    DoctrineItemRule,
+    DoctrineLocation,
+    DoctrineMatchProfile,
+    DoctrineQuantityTolerance,
+    DoctrineSubstitutionRule,
+    DoctrineSystem,
+    FittingRequest,
+    SubsidyConfig,
+    SubsidyItemPrice,
+)
+
+PRICING_CONFIG_FIELDS = {"price_basis", "pct_over_basis", "cost_per_m3", "rounding_increment"}
+
+
+def _seed_prices_on_commit(type_ids) -> None:
+    type_ids = {int(type_id) for type_id in type_ids if type_id}
+    if type_ids:
+        transaction.on_commit(lambda: seed_price_rows(type_ids))
+
+
+def _bump_definition_version(profile_ids) -> None:
+    DoctrineMatchProfile.objects.filter(pk__in=profile_ids).update(
+        definition_version=F("definition_version") + 1
+    )
+
+
+@receiver([post_save, post_delete], sender=DoctrineMatchProfile)
+def doctrine_profile_changed(sender, instance, **kwargs):
+    if kwargs.get("signal") is post_save:
+        _bump_definition_version([instance.pk])
+    queue_fitting_rematch([instance.fitting_id])
+
+
+@receiver([post_save, post_delete], sender=DoctrineItemRule)
+@receiver([post_save, post_delete], sender=DoctrineSubstitutionRule)
+@receiver([post_save, post_delete], sender=DoctrineQuantityTolerance)
+def doctrine_rule_changed(sender, instance, **kwargs):
+    # The profile may already be gone when rules are removed by a cascade; the
+    # profile's own post_delete covers that case.
+    _bump_definition_version([instance.profile_id])
+    if kwargs.get("signal") is post_save:
+        _seed_prices_on_commit(
+            [getattr(instance, field, None) for field in ("eve_type_id", "expected_type_id", "allowed_type_id")]
+        )
+    queue_fitting_rematch(
+        DoctrineMatchProfile.objects.filter(pk=instance.profile_id).values_list("fitting_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Fitting)
+def fitting_changed(sender, instance, **kwargs):
+    _seed_prices_on_commit([instance.ship_type_type_id])
+    invalidate_fitting_price_snapshots([instance.pk])
+    queue_stock_snapshot_refresh()
+
+
+@receiver([post_save, post_delete], sender=FittingItem)
+def fitting_item_changed(sender, instance, **kwargs):
+    if kwargs.get("signal") is post_save:
+        _seed_prices_on_commit([instance.type_id])
+    invalidate_fitting_price_snapshots([instance.fit_id])
+    queue_stock_snapshot_refresh()
+
+
+@receiver(m2m_changed, sender=Doctrine.fittings.through)
+def doctrine_fittings_changed(sender, action, **kwargs):
+    # The stock snapshot stores each fit's doctrine, so regrouping fits needs a rebuild.
+    if action in ("post_add", "post_remove", "post_clear"):
+        queue_stock_snapshot_refresh()
+
+
+@receiver(post_save, sender=SubsidyItemPrice)
+def item_price_changed(sender, instance, created=False, **kwargs):
+    # Bulk price refreshes bypass this, record history, bump the price cache and rebuild snapshots themselves.
+    bump_price_version_on_commit()
+    if not (created and not instance.buy and not instance.sell):
+        record_price_history(
+            [(instance.eve_type_id, instance.buy, instance.sell)],
+            instance.updated_at or timezone.now(),
+            skip_unchanged=True,
+        )
+    invalidate_fitting_price_snapshots(
+        set(Fitting.objects.filter(ship_type_type_id=instance.eve_type_id).values_list("pk", flat=True))
+        | set(FittingItem.objects.filter(type_id=instance.eve_type_id).values_list("fit_id", flat=True))
+    )
+    queue_stock_snapshot_refresh()
+
+
+@receiver(post_save, sender=SubsidyConfig)
+def pricing_config_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not PRICING_CONFIG_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(rebuild_fitting_price_snapshots)
+    queue_stock_snapshot_refresh()
+
+
+@receiver([post_save, post_delete], sender=DoctrineContractDecision)
+@receiver([post_save, post_delete], sender=DoctrineSystem)
+@receiver([post_save, post_delete], sender=DoctrineLocation)
+@receiver([post_save, post_delete], sender=FittingRequest)
+def stock_target_changed(sender, instance, **kwargs):
+    queue_stock_snapshot_refresh()
+
+
+@receiver([post_save, post_delete], sender=CharacterOwnership)
+@receiver([post_save, post_delete], sender=UserProfile)
+def ownership_changed(sender, instance, **kwargs):
+    bump_mains_version_on_commit()
@@ -371,17 +371,58 @@
             updateContractRow(String(summary.id), summary);
           }
         });
+        updateRematchIndicator(data.rematch_pending, data.rematch_queued);
       }
 
       applyFilters();
     }
 
-    async function loadContractItems(id) {
+    let rematchPending = Number(window.AASubsidyConfig.rematchPending || 0);
+    let rematchQueued = Boolean(window.AASubsidyConfig.rematchQueued);
+    let rematchPollTimer = null;
+
+    function updateRematchIndicator(pending, queued = false) {
+      if (pending === undefined || pending === null) return;
+      const indicator = document.getElementById('rematchIndicator');
+      const count = document.getElementById('rematchCount');
+      const value = Number(pending) || 0;
+      // A scheduled run has not counted its contracts yet.
+      const active = value > 0 || Boolean(queued);
+      if (count) count.textContent = value > 0 ? String(value) : '…';
+      if (indicator) indicator.classList.toggle('d-none', !active);
+      const finished = (rematchPending > 0 || rematchQueued) && !active;
+      rematchPending = value;
+      rematchQueued = Boolean(queued);
+      if (active) {
+        scheduleRematchPoll();
+      } else if (finished) {
+        // Background re-match just completed; pick up the new results.
+        refreshRowSummariesOnLoad();
+      }
+    }
+
+    function scheduleRematchPoll() {
+      if (rematchPollTimer) return;
+      rematchPollTimer = setTimeout(async () => {
+        rematchPollTimer = null;
+        const resp = await fetch(window.AASubsidyConfig.reviewSummariesUrl, {
+          headers: { 'X-Requested-With': 'XMLHttpRequest' }
+        }).catch(() => null);
+        const data = resp ? await resp.json().catch(() => ({})) : {};
+        if (data && data.ok) {
+          updateRematchIndicator(data.rematch_pending, data.rematch_queued);
+        } else {
+          updateRematchIndicator(rematchPending, rematchQueued);
+        }
+      }, Number(window.AASubsidyConfig.rematchPollMs || 15000));
+    }
+
+    async function loadContractItems(id, force = false) {
         const container = document.querySelector(`.items-container[data-id="${id}"]`);
-        if (container.getAttribute('data-loaded') === 'true') return;
+        if (!force && container.getAttribute('data-loaded') === 'true') return;
 
         try {
-            const url = window.AASubsidyConfig.contractItemsUrl.replace("/0/", `/${id}/`);
+            const url = window.AASubsidyConfig.contractItemsUrl.replace("/0/", `/${id}/`) + (force ? '?force=1' : '');
             const resp = await fetch(url);
             const data = await resp.json();
             if (!resp.ok || !data.ok) throw new Error(data.error || 'Failed to load items');
@@ -424,6 +465,7 @@
                             <div class="d-flex gap-2">
                                 ${analysis.can_accept_once ? `<button type="button" class="btn btn-sm btn-outline-success accept-once-btn" data-contract="${id}" data-fit="${analysis.selected_fit_id || ''}">${window.AASubsidyConfig.lang.acceptOnce}</button>` : ''}
                                 ${analysis.can_undo_accept_once ? `<button type="button" class="btn btn-sm btn-outline-warning undo-accept-once-btn" data-contract="${id}">${window.AASubsidyConfig.lang.undoAcceptOnce}</button>` : ''}
+                                ${analysis.can_force_rematch ? `<button type="button" class="btn btn-sm btn-outline-secondary force-rematch-btn" data-contract="${id}">${window.AASubsidyConfig.lang.forceRematch}</button>` : ''}
                             </div>
                         </div>
                         ${acceptedNotice}
@@ -790,6 +832,17 @@
         }
       }
 
+      const forceBtn = e.target.closest('.force-rematch-btn');
+      if (forceBtn) {
+        e.preventDefault();
+        e.stopPropagation();
+        const contractId = forceBtn.getAttribute('data-contract');
+        if (!contractId) return;
+        forceBtn.disabled = true;
+        await loadContractItems(contractId, true);
+        return;
+      }
+
       const undoBtn = e.target.closest('.undo-accept-once-btn');
       if (undoBtn) {
         e.preventDefault();
@@ -1023,6 +1076,8 @@
       });
     }
 
+    if (rematchPending > 0) scheduleRematchPoll();
+
     hideLoading();
   });
 })();
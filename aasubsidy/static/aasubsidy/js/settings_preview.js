@@ -0,0 +1,83 @@
+(function() {
+  const onReady = (fn) => (document.readyState !== 'loading') ? fn() : document.addEventListener('DOMContentLoaded', fn);
+  onReady(() => {
+      const cfg = window.AASubsidyConfig || {};
+      const lang = cfg.lang || {};
+      const box = document.getElementById('pricingPreview');
+      if (!box || !cfg.settingsPreviewUrl) return;
+
+      const $ = (id) => document.getElementById(id);
+      const fields = ['price_basis', 'pct_over_basis', 'cost_per_m3', 'rounding_increment'];
+      const inputs = fields.map((name) => document.querySelector(`[name="${name}"]`)).filter(Boolean);
+      const errorBox = $('pricingPreviewError');
+      const DEBOUNCE_MS = 250;
+
+      const escapeHtml = (value) => String(value ?? '').replace(/[&<>"']/g, (ch) => (
+          {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[ch]
+      ));
+      const isk = (value) => Number(value || 0).toLocaleString(undefined, { maximumFractionDigits: 0 });
+      const delta = (value) => {
+          const cls = value > 0 ? 'text-success' : (value < 0 ? 'text-danger' : 'text-muted');
+          return `<span class="${cls}">${value > 0 ? '+' : ''}${isk(value)}</span>`;
+      };
+      const totalsRow = (label, totals, extra) => `<tr>
+          <td>${escapeHtml(label)}${extra ? ` <span class="text-muted">(${escapeHtml(extra)})</span>` : ''}</td>
+          <td class="text-end">${isk(totals.current)}</td>
+          <td class="text-end">${isk(totals.proposed)}</td>
+          <td class="text-end">${delta(totals.delta)}</td>
+      </tr>`;
+
+      function render(result) {
+          $('pricingPreviewHeadline').textContent =
+              `${result.changed_fits} / ${result.fit_count} ${lang.fitsChange} (${result.elapsed_ms} ms)`;
+          $('pricingPreviewTotals').innerHTML =
+              totalsRow(lang.doctrineFits, result.fit_totals, result.fit_count) +
+              totalsRow(lang.unpaidBacklog, result.backlog, `${result.backlog.contracts} ${lang.contracts}`);
+          $('pricingPreviewFits').innerHTML = result.fits.filter((row) => row.delta).map((row) => `<tr>
+              <td>${escapeHtml(row.name)}</td>
+              <td class="text-end">${isk(row.current)}</td>
+              <td class="text-end">${isk(row.proposed)}</td>
+              <td class="text-end">${delta(row.delta)}</td>
+          </tr>`).join('') || `<tr><td colspan="4" class="text-muted">${escapeHtml(lang.noChanges)}</td></tr>`;
+          box.classList.remove('d-none');
+      }
+
+      let timer = null;
+      let sequence = 0;
+      function preview() {
+          const payload = {};
+          inputs.forEach((input) => { payload[input.name] = input.value; });
+          const current = ++sequence;
+          fetch(cfg.settingsPreviewUrl, {
+              method: 'POST',
+              credentials: 'same-origin',
+              headers: { 'Accept': 'application/json', 'Content-Type': 'application/json' },
+              body: JSON.stringify(payload),
+          })
+          .then((response) => response.json().then((data) => ({ response, data })))
+          .then(({ response, data }) => {
+              // A newer request was sent while this one ran; its answer wins.
+              if (current !== sequence) return;
+              if (!response.ok || !data.ok) {
+                  throw new Error(data.message || data.error || `HTTP ${response.status}`);
+              }
+              errorBox.classList.add('d-none');
+              render(data.result);
+          })
+          .catch((err) => {
+              if (current !== sequence) return;
+              errorBox.textContent = `${lang.failed} ${err.message}`;
+              errorBox.classList.remove('d-none');
+          });
+      }
+
+      inputs.forEach((input) => {
+          const schedule = () => {
+              clearTimeout(timer);
+              timer = setTimeout(preview, DEBOUNCE_MS);
+          };
+          input.addEventListener('input', schedule);
+          input.addEventListener('change', schedule);
+      });
+  });
+})();
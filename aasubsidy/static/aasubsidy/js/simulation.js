@@ -0,0 +1,129 @@
+(function() {
+  const onReady = (fn) => (document.readyState !== 'loading') ? fn() : document.addEventListener('DOMContentLoaded', fn);
+  onReady(() => {
+      const cfg = window.AASubsidyConfig || {};
+      const lang = cfg.lang || {};
+      const form = document.getElementById('simulationForm');
+      if (!form) return;
+
+      const $ = (id) => document.getElementById(id);
+      const fitting = $('simFitting');
+      const profileInputs = ['simAutoThreshold', 'simReviewThreshold', 'simEnabled', 'simMetaVariants', 'simFactionVariants',
+          'simSubRuleType', 'simSubExpected', 'simSubAllowed', 'simSubPenalty'].map($);
+      const runButton = $('simRun');
+      const errorBox = $('simulationError');
+      const resultBox = $('simulationResult');
+
+      const escapeHtml = (value) => String(value ?? '').replace(/[&<>"']/g, (ch) => (
+          {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[ch]
+      ));
+      const statusLabel = (status) => (lang.statuses || {})[status] || status;
+
+      fitting.addEventListener('change', () => {
+          const option = fitting.selectedOptions[0];
+          const selected = Boolean(fitting.value);
+          profileInputs.forEach((input) => { input.disabled = !selected; });
+          if (!selected) return;
+          $('simAutoThreshold').value = option.dataset.auto;
+          $('simReviewThreshold').value = option.dataset.review;
+          $('simEnabled').checked = option.dataset.enabled === '1';
+          $('simMetaVariants').checked = option.dataset.meta === '1';
+          $('simFactionVariants').checked = option.dataset.faction === '1';
+      });
+
+      function buildPayload() {
+          const payload = {
+              days: $('simDays').value,
+              limit: $('simLimit').value,
+              close_match_threshold: $('simCloseThreshold').value,
+              profiles: {},
+              substitutions: [],
+          };
+          if (!fitting.value) return payload;
+
+          const option = fitting.selectedOptions[0];
+          const overrides = {};
+          const numberChanged = (input, original) => input.value !== '' && Number(input.value) !== Number(original);
+          if (numberChanged($('simAutoThreshold'), option.dataset.auto)) overrides.auto_match_threshold = $('simAutoThreshold').value;
+          if (numberChanged($('simReviewThreshold'), option.dataset.review)) overrides.review_threshold = $('simReviewThreshold').value;
+          if ($('simEnabled').checked !== (option.dataset.enabled === '1')) overrides.enabled = $('simEnabled').checked;
+          if ($('simMetaVariants').checked !== (option.dataset.meta === '1')) overrides.allow_meta_variants = $('simMetaVariants').checked;
+          if ($('simFactionVariants').checked !== (option.dataset.faction === '1')) overrides.allow_faction_variants = $('simFactionVariants').checked;
+          if (Object.keys(overrides).length) payload.profiles[fitting.value] = overrides;
+
+          if ($('simSubRuleType').value) {
+              payload.substitutions.push({
+                  fitting_id: fitting.value,
+                  rule_type: $('simSubRuleType').value,
+                  expected_type_id: $('simSubExpected').value,
+                  allowed_type_id: $('simSubAllowed').value || null,
+                  penalty_points: $('simSubPenalty').value || 0,
+              });
+          }
+          return payload;
+      }
+
+      function renderResult(result) {
+          const seconds = ((result.stats || {}).total_seconds || 0).toFixed(2);
+          $('simulationHeadline').textContent =
+              `${result.changed} / ${result.contracts} ${lang.changed} (${lang.evaluated} ${seconds}s)`;
+
+          $('simulationCounts').innerHTML = Object.keys(result.before).map((status) => {
+              const delta = result.after[status] - result.before[status];
+              const deltaClass = delta > 0 ? 'text-success' : (delta < 0 ? 'text-danger' : 'text-muted');
+              return `<tr>
+                  <td>${escapeHtml(statusLabel(status))}</td>
+                  <td class="text-end">${result.before[status]}</td>
+                  <td class="text-end">${result.after[status]}</td>
+                  <td class="text-end ${deltaClass}">${delta > 0 ? '+' : ''}${delta}</td>
+              </tr>`;
+          }).join('');
+
+          $('simulationTransitions').innerHTML = result.transitions.length
+              ? result.transitions.map((row) => (
+                  `<li>${escapeHtml(statusLabel(row.from))} &rarr; ${escapeHtml(statusLabel(row.to))}: <strong>${row.count}</strong></li>`
+              )).join('')
+              : `<li class="text-muted">${escapeHtml(lang.noChanges)}</li>`;
+
+          const describe = (status, name, score) => (
+              `${escapeHtml(statusLabel(status))} &middot; ${escapeHtml(name || lang.noMatch)} &middot; ${score.toFixed(2)}%`
+          );
+          $('simulationChanged').innerHTML = result.changed_contracts.map((row) => `<tr>
+              <td>${escapeHtml(row.contract_number || row.contract_id)}</td>
+              <td>${describe(row.before_status, row.before_fit_name, row.before_score)}</td>
+              <td>${describe(row.after_status, row.after_fit_name, row.after_score)}</td>
+          </tr>`).join('');
+          resultBox.classList.remove('d-none');
+      }
+
+      form.addEventListener('submit', (event) => {
+          event.preventDefault();
+          errorBox.classList.add('d-none');
+          runButton.disabled = true;
+          const label = runButton.innerHTML;
+          runButton.textContent = lang.running;
+
+          fetch(cfg.simulationRunUrl, {
+              method: 'POST',
+              credentials: 'same-origin',
+              headers: { 'Accept': 'application/json', 'Content-Type': 'application/json' },
+              body: JSON.stringify(buildPayload()),
+          })
+          .then((response) => response.json().then((data) => ({ response, data })))
+          .then(({ response, data }) => {
+              if (!response.ok || !data.ok) {
+                  throw new Error(data.message || data.error || `HTTP ${response.status}`);
+              }
+              renderResult(data.result);
+          })
+          .catch((err) => {
+              errorBox.textContent = `${lang.failed} ${err.message}`;
+              errorBox.classList.remove('d-none');
+          })
+          .finally(() => {
+              runButton.disabled = false;
+              runButton.innerHTML = label;
+          });
+      });
+  });
+})();
@@ -32,9 +32,10 @@ from esi.openapi_clients import ESIClientProvider
 
 from . import __title__, __version__, app_settings
 from .contracts.filters import apply_contract_exclusions
+from .contracts.instrumentation import MatchStats, log_stats
 from .contracts.matching import match_contracts
 from .helpers.contract_import import plan_claim_clearance
-from .helpers.services_update import update_all_prices
+from .helpers.services_update import referenced_price_type_ids, seed_price_rows, update_all_prices
 from fittings.models import Fitting
 from .models import (
     CorporateContractSubsidy,
@@ -501,6 +502,7 @@ def _sync_corporate_contract_items_via_esi(
                 len(type_ids),
             )
             _ensure_eve_item_types_via_esi(type_ids)
+            seed_price_rows(type_ids)
 
         new_items: list[CorporateContractItem] = []
         for item in items:
@@ -614,6 +616,7 @@ def _sync_single_corporate_contract_item_via_esi(
     type_ids = _unique_positive_ids(_esi_value(item, "type_id") for item in items)
     if type_ids:
         _ensure_eve_item_types_via_esi(type_ids)
+        seed_price_rows(type_ids)
 
     new_items: list[CorporateContractItem] = []
     for item in items:
@@ -978,11 +981,15 @@ def sync_corporate_contracts_from_esi(
     corporation_id: int | None = None,
     force_refresh: bool = False,
 ) -> dict:
+    from .contracts.stock import queue_stock_snapshot_refresh
+
     corporation_id = _effective_corporation_id(corporation_id)
-    return _sync_corporate_contracts_via_esi(
+    result = _sync_corporate_contracts_via_esi(
         corporation_id,
         force_refresh=force_refresh,
     )
+    queue_stock_snapshot_refresh()
+    return result
 
 
 def _resolve_corporate_contract_pks(corporation_id: int, identifiers: list[int] | None = None) -> list[int]:
@@ -1142,10 +1149,12 @@ def _match_imported_contracts(
 
     matched = 0
     matched_results = {}
+    stats = MatchStats()
     for index in range(0, len(filtered_contract_pks), max(int(chunk_size or 250), 1)):
         batch = filtered_contract_pks[index : index + max(int(chunk_size or 250), 1)]
-        matched_results.update(match_contracts(batch, persist=True))
+        matched_results.update(match_contracts(batch, persist=True, stats=stats))
         matched += len(batch)
+    log_stats(stats, label="_match_imported_contracts")
 
     created_count = sum(1 for contract_pk in filtered_contract_pks if contract_pk in created_pk_set)
     refreshed_count = sum(1 for contract_pk in filtered_contract_pks if contract_pk in refreshed_pk_set)
@@ -1276,6 +1285,9 @@ def import_corporate_contract_reviews(
             auto_clear_claims=auto_clear_claims,
         )
 
+    from .contracts.stock import queue_stock_snapshot_refresh
+
+    queue_stock_snapshot_refresh()
     return {
         "created": created,
         "updated": 0,
@@ -1284,6 +1296,80 @@ def import_corporate_contract_reviews(
         "contract_matching": match_result,
     }
 
+
+@shared_task(bind=True)
+def rematch_contracts_for_fittings(self, fitting_ids: list[int], chunk_size: int = 250) -> dict:
+    """Re-match only the contracts that were scored against the changed fittings."""
+    from .contracts import rematch
+
+    rematch.release_fittings(fitting_ids)
+    contract_pks = rematch.affected_contract_pks(fitting_ids)
+    rematch.mark_rematch_running(fitting_ids, len(contract_pks))
+
+    matched = 0
+    stats = MatchStats()
+    try:
+        step = max(int(chunk_size or 250), 1)
+        for index in range(0, len(contract_pks), step):
+            batch = contract_pks[index : index + step]
+            match_contracts(batch, persist=True, stats=stats)
+            matched += len(batch)
+    finally:
+        rematch.mark_rematch_finished(fitting_ids)
+    log_stats(stats, label="rematch_contracts_for_fittings")
+    if matched:
+        from .contracts.stock import queue_stock_snapshot_refresh
+
+        queue_stock_snapshot_refresh()
+
+    logger.info("Re-matched %s contracts after rule changes on fittings %s", matched, fitting_ids)
+    return {"fitting_ids": list(fitting_ids), "matched": matched}
+
+
+@shared_task(bind=True)
+def backfill_doctrine_matches_slice(self, max_contracts: int = 2000, chunk_size: int = 250) -> dict:
+    """Advance the oldest unfinished backfill checkpoint by a bounded slice."""
+    from .contracts import backfill
+
+    checkpoint = backfill.next_open_checkpoint()
+    if checkpoint is None:
+        return {"checkpoint": None, "processed": 0, "completed": False}
+
+    result = backfill.run_slice(
+        checkpoint,
+        chunk_size=max(int(chunk_size or 250), 1),
+        max_contracts=max(int(max_contracts or 2000), 1),
+    )
+    logger.info(
+        "Doctrine match backfill %s: processed %s contracts (last id=%s, completed=%s)",
+        checkpoint.signature[:12],
+        result.processed,
+        result.last_pk,
+        result.completed,
+    )
+    if result.processed:
+        from .contracts.stock import queue_stock_snapshot_refresh
+
+        queue_stock_snapshot_refresh()
+    return {
+        "checkpoint": checkpoint.signature,
+        "processed": result.processed,
+        "last_pk": result.last_pk,
+        "completed": result.completed,
+    }
+
+
+@shared_task(bind=True)
+def refresh_doctrine_stock_snapshot(self) -> dict:
+    """Rebuild the doctrine stock snapshot shown on the main page."""
+    from .contracts import stock
+
+    stock.release_refresh()
+    rows = stock.rebuild_stock_snapshot()
+    logger.info("Rebuilt doctrine stock snapshot with %s rows", rows)
+    return {"rows": rows}
+
+
 @shared_task(bind=True)
 def refresh_subsidy_item_prices(self) -> dict:
     try:
@@ -1294,34 +1380,33 @@ def refresh_subsidy_item_prices(self) -> dict:
         return {"queued": False, "error": str(e)}
 
 @shared_task
-def seed_all_types_into_subsidy(chunk_size: int = 5000) -> dict:
+def seed_all_types_into_subsidy() -> dict:
     """
-    Ensure every EveType has a SubsidyItemPrice row. Intended to run weekly
-    before price refresh. Operates in chunks to limit memory usage.
+    Ensure every EveType has a SubsidyItemPrice row, in a single INSERT ... SELECT.
+    Most of these types are never priced; the scheduled seed uses
+    seed_referenced_types_into_subsidy instead.
     """
     if EveType is None:
         logger.warning("eveuniverse not available; cannot seed SubsidyItemPrice.")
-        return {"created": 0, "skipped": 0}
+        return {"created": 0}
 
-    total_types = EveType.objects.count()
-    created = 0
-    skipped = 0
+    created = seed_price_rows()
+    logger.info("Seeding complete. Created=%s", created)
+    return {"created": created}
 
-    logger.info("Seeding SubsidyItemPrice for %s EveTypes…", total_types)
 
-    ids = list(EveType.objects.order_by("id").values_list("id", flat=True))
-    for i in range(0, len(ids), chunk_size):
-        batch_ids = ids[i:i + chunk_size]
-        existing = set(
-            SubsidyItemPrice.objects.filter(eve_type_id__in=batch_ids).values_list("eve_type_id", flat=True)
-        )
-        to_create = [SubsidyItemPrice(eve_type_id=tid, buy=0, sell=0) for tid in batch_ids if tid not in existing]
-        skipped += len(batch_ids) - len(to_create)
-        if to_create:
-            with transaction.atomic():
-                SubsidyItemPrice.objects.bulk_create(to_create, ignore_conflicts=True)
-            created += len(to_create)
-            logger.debug("Seeded %s rows (progress: %s/%s)", len(to_create), min(i + chunk_size, len(ids)), len(ids))
+@shared_task
+def seed_referenced_types_into_subsidy() -> dict:
+    """
+    Create SubsidyItemPrice rows for the types fittings, doctrine rules and
+    contract items refer to. Contract item syncs and fitting/rule edits seed
+    their own types as they arrive; this catches anything they missed.
+    """
+    if EveType is None:
+        logger.warning("eveuniverse not available; cannot seed SubsidyItemPrice.")
+        return {"created": 0, "referenced": 0}
 
-    logger.info("Seeding complete. Created=%s, Skipped=%s", created, skipped)
-    return {"created": created, "skipped": skipped}
+    type_ids = referenced_price_type_ids()
+    created = seed_price_rows(type_ids)
+    logger.info("Seeded referenced types: referenced=%s created=%s", len(type_ids), created)
+    return {"created": created, "referenced": len(type_ids)}
@@ -0,0 +1,43 @@
+"""Fakes shared by the test modules."""
+
+
+class DictCache:
+    """The slice of the Django cache API the cache helpers use, counting round trips."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def get(self, key, default=None):
+        self.round_trips += 1
+        return self.data.get(key, default)
+
+    def get_many(self, keys):
+        self.round_trips += 1
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    def set(self, key, value, timeout=None):
+        self.round_trips += 1
+        self.data[key] = value
+
+    def delete(self, key):
+        self.round_trips += 1
+        self.data.pop(key, None)
+
+    def set_many(self, mapping, timeout=None):
+        self.round_trips += 1
+        self.data.update(mapping)
+
+    def add(self, key, value, timeout=None):
+        self.round_trips += 1
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    def incr(self, key, delta=1):
+        self.round_trips += 1
+        if key not in self.data:
+            raise ValueError(key)
+        self.data[key] += delta
+        return self.data[key]
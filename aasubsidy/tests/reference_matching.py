@@ -0,0 +1,465 @@
+"""Decimal reference implementation of the contract evaluator.
+
+Frozen copy of the scorer from before the integer centipoint core; the
+equivalence tests compare the production evaluator against it.
+"""
+
+from collections import Counter, defaultdict
+from decimal import Decimal
+from typing import Any, Iterable
+
+from aasubsidy.contracts.matching import (
+    MAX_SCORE,
+    ZERO,
+    CandidateMatch,
+    ContractItemData,
+    FittingDefinition,
+    MatchProfileData,
+    QuantityToleranceData,
+    SubstitutionRuleData,
+    TypeInfo,
+    _decimal,
+    _is_consumable_market_group,
+    _is_drone_substitution_candidate,
+    _issue,
+    _maybe_add_substitution_suggestions,
+    _min_required,
+    _preferred_quantity,
+    _row,
+    _substitution_matches,
+    _type_info_from_contract_item,
+)
+
+
+def _reference_implicit_penalty(
+    profile: MatchProfileData,
+    *,
+    expected: TypeInfo,
+    actual: TypeInfo,
+) -> Decimal | None:
+    if expected.type_id == actual.type_id:
+        return ZERO
+    if _is_drone_substitution_candidate(expected=expected, actual=actual):
+        return Decimal("1.00")
+    if profile.allow_meta_variants:
+        if (
+            expected.group_id
+            and actual.group_id
+            and expected.group_id == actual.group_id
+            and expected.meta_level is not None
+            and actual.meta_level is not None
+        ):
+            return Decimal("5.00")
+    if profile.allow_faction_variants:
+        if expected.group_id and actual.group_id and expected.group_id == actual.group_id and actual.faction:
+            return Decimal("4.00")
+    return None
+
+
+def _reference_match_tolerance(
+    tolerances: Iterable[QuantityToleranceData],
+    *,
+    actual_qty: int,
+    preferred_qty: int,
+) -> QuantityToleranceData | None:
+    if preferred_qty < 0:
+        return None
+    best: QuantityToleranceData | None = None
+    diff = actual_qty - preferred_qty
+    for tolerance in tolerances:
+        matched = False
+        if tolerance.mode == "absolute":
+            matched = tolerance.lower_bound <= diff <= tolerance.upper_bound
+        elif tolerance.mode == "percent" and preferred_qty > 0:
+            pct_diff = Decimal(diff) * Decimal("100") / Decimal(preferred_qty)
+            matched = Decimal(str(tolerance.lower_bound)) <= pct_diff <= Decimal(str(tolerance.upper_bound))
+        elif tolerance.mode == "missing_only" and diff < 0:
+            missing = abs(diff)
+            matched = tolerance.lower_bound <= missing <= tolerance.upper_bound
+        elif tolerance.mode == "extra_only" and diff > 0:
+            matched = tolerance.lower_bound <= diff <= tolerance.upper_bound
+        if matched and (best is None or tolerance.penalty_points < best.penalty_points):
+            best = tolerance
+    return best
+
+
+def evaluate_contract_reference(
+    contract_items: dict[int, ContractItemData],
+    fitting: FittingDefinition,
+) -> CandidateMatch:
+    """Decimal scoring as it was before the integer centipoint core."""
+    remaining = Counter({
+        type_id: int(item.included_qty)
+        for type_id, item in contract_items.items()
+        if int(item.included_qty or 0) > 0
+    })
+
+    hard_failures: list[dict[str, Any]] = []
+    warnings: list[dict[str, Any]] = []
+    approved_substitutions: list[dict[str, Any]] = []
+    item_rows: list[dict[str, Any]] = []
+    exact_match = True
+    used_learned_rule = False
+
+    # Track points for item-count scoring (START WITH MAX POINTS, SUBTRACT PENALTIES)
+    expected_items = 0  # Total items we expect (max possible points)
+    penalty_points = Decimal("0.00")  # Total penalties to subtract
+
+    substitution_rules_by_expected: dict[int, list[SubstitutionRuleData]] = defaultdict(list)
+    for substitution in fitting.substitutions:
+        substitution_rules_by_expected[substitution.expected_type_id].append(substitution)
+
+    # Process each expected item in the fitting
+    for rule in sorted(fitting.item_rules, key=lambda entry: (entry.sort_order, entry.expected_type_name.lower())):
+        expected_type = fitting.type_info.get(
+            rule.expected_type_id,
+            TypeInfo(type_id=rule.expected_type_id, name=rule.expected_type_name),
+        )
+        contract_item = contract_items.get(rule.expected_type_id)
+        included_qty = int(contract_item.included_qty) if contract_item else 0
+        excluded_qty = int(contract_item.excluded_qty) if contract_item else 0
+        exact_qty = int(remaining.get(rule.expected_type_id, 0))
+
+        # Check if this is a consumable
+        is_consumable = _is_consumable_market_group(expected_type.market_group_id)
+
+        # Ignore rules don't count toward scoring
+        if rule.rule_kind == "ignore":
+            if exact_qty > 0:
+                remaining[rule.expected_type_id] -= exact_qty
+                if remaining[rule.expected_type_id] <= 0:
+                    remaining.pop(rule.expected_type_id, None)
+                used_learned_rule = True
+                item_rows.append(_row(
+                    expected_type_id=rule.expected_type_id,
+                    expected_name=expected_type.name,
+                    actual_qty=exact_qty,
+                    included_qty=included_qty,
+                    excluded_qty=excluded_qty,
+                    expected_qty=rule.expected_quantity,
+                    reason="Ignored by doctrine policy.",
+                    category=rule.category,
+                ))
+            continue
+
+        # Count this item in our expected total (modules and consumable stacks both = 1 point)
+        expected_items += 1
+
+        preferred_qty = _preferred_quantity(rule)
+        minimum_qty = _min_required(rule)
+
+        # Try to find substitutes if needed
+        applied_substitutions: list[dict[str, Any]] = []
+        substitute_qty = 0
+        shortage_target = max(preferred_qty - exact_qty, 0) if preferred_qty > 0 else 0
+
+        if shortage_target > 0:
+            explicit_rules = sorted(
+                substitution_rules_by_expected.get(rule.expected_type_id, []),
+                key=lambda entry: (entry.penalty_points, entry.rule_type, entry.allowed_type_id or 0),
+            )
+            candidate_actual_ids = [
+                type_id for type_id, qty in remaining.items()
+                if qty > 0 and type_id != rule.expected_type_id
+            ]
+            for actual_type_id in candidate_actual_ids:
+                if substitute_qty >= shortage_target:
+                    break
+                actual_info = fitting.type_info.get(actual_type_id) or _type_info_from_contract_item(contract_items.get(actual_type_id)) or TypeInfo(type_id=actual_type_id, name=str(actual_type_id))
+                matched_rule = next((
+                    sub_rule for sub_rule in explicit_rules
+                    if _substitution_matches(sub_rule, expected=expected_type, actual=actual_info)
+                ), None)
+                implicit_penalty = _reference_implicit_penalty(fitting.profile, expected=expected_type, actual=actual_info)
+
+                if matched_rule is None and implicit_penalty is None:
+                    continue
+
+                available = int(remaining.get(actual_type_id, 0))
+                use_qty = min(available, shortage_target - substitute_qty)
+                if use_qty <= 0:
+                    continue
+
+                remaining[actual_type_id] -= use_qty
+                if remaining[actual_type_id] <= 0:
+                    remaining.pop(actual_type_id, None)
+                substitute_qty += use_qty
+
+                if matched_rule is not None and matched_rule.rule_type == "specific":
+                    penalty = ZERO
+                else:
+                    penalty = matched_rule.penalty_points if matched_rule is not None else implicit_penalty
+                penalty = _decimal(penalty)
+                if penalty > ZERO:
+                    penalty_points += penalty
+                    exact_match = False
+                used_learned_rule = True
+
+                applied_substitutions.append({
+                    "type_id": actual_info.type_id,
+                    "name": actual_info.name,
+                    "qty": use_qty,
+                    "penalty_points": float(penalty),
+                    "rule_type": matched_rule.rule_type if matched_rule else "profile_variant",
+                })
+                if penalty > ZERO:
+                    warnings.append(_issue(
+                        "warning",
+                        "substitution",
+                        f"{expected_type.name} matched with {actual_info.name}.",
+                        expected_type_id=expected_type.type_id,
+                        actual_type_id=actual_info.type_id,
+                        quantity=use_qty,
+                        fitting_id=fitting.fitting_id,
+                    ))
+                else:
+                    approved_substitutions.append(_issue(
+                        "info",
+                        "approved_substitution",
+                        f"{expected_type.name} matched with approved substitute {actual_info.name}.",
+                        expected_type_id=expected_type.type_id,
+                        actual_type_id=actual_info.type_id,
+                        quantity=use_qty,
+                        fitting_id=fitting.fitting_id,
+                    ))
+
+        actual_qty = exact_qty + substitute_qty
+        matched_tolerance = _reference_match_tolerance(
+            fitting.quantity_tolerances.get(rule.expected_type_id, []),
+            actual_qty=actual_qty,
+            preferred_qty=preferred_qty,
+        )
+        if exact_qty > 0:
+            remaining[rule.expected_type_id] -= exact_qty
+            if remaining[rule.expected_type_id] <= 0:
+                remaining.pop(rule.expected_type_id, None)
+
+        status = "ok"
+        reason = ""
+        actions: list[str] = []
+
+        # Check for hull mismatch first (automatic fail)
+        if rule.is_hull and actual_qty <= 0:
+            if not any(item.get("code") == "missing_required" and item.get("expected_type_id") == expected_type.type_id for item in hard_failures):
+                hard_failures.append(_issue(
+                    "error",
+                    "wrong_hull",
+                    f"Expected hull {expected_type.name}, but it is missing.",
+                    expected_type_id=expected_type.type_id,
+                    fitting_id=fitting.fitting_id,
+                ))
+            status = "error"
+            exact_match = False
+            reason = "Wrong hull for doctrine."
+            actions = []
+            # Hull mismatch doesn't affect item count, score will be forced to 0 later
+
+        # Optional items missing
+        elif rule.rule_kind == "optional" and actual_qty <= 0:
+            status = "warning"
+            exact_match = False
+            penalty_points += Decimal("1.00")  # -1 point for missing optional
+            used_learned_rule = True
+            reason = "Optional doctrine item is missing."
+            warnings.append(_issue(
+                "warning",
+                "optional_missing",
+                reason,
+                expected_type_id=expected_type.type_id,
+                fitting_id=fitting.fitting_id,
+            ))
+
+        # Required item missing but covered by an explicit tolerance rule
+        elif actual_qty < minimum_qty and matched_tolerance is not None and _decimal(matched_tolerance.penalty_points) <= ZERO:
+            used_learned_rule = True
+            reason = "Allowed quantity variance."
+
+        # Required item missing
+        elif actual_qty < minimum_qty:
+            status = "error"
+            exact_match = False
+            penalty_points += Decimal("1.00")  # -1 point for missing required item
+            reason = f"Expected at least {minimum_qty}, found {actual_qty}."
+            hard_failures.append(_issue(
+                "error",
+                "missing_required",
+                f"{expected_type.name}: {reason}",
+                expected_type_id=expected_type.type_id,
+                actual_qty=actual_qty,
+                expected_qty=minimum_qty,
+                fitting_id=fitting.fitting_id,
+            ))
+            if not rule.is_hull:
+                if actual_qty == 0:
+                    actions.append("optional_item")
+                else:
+                    actions.append("optional_item")
+                    actions.append("quantity_tolerance")
+
+        # Item present with an explicit consumable tolerance rule
+        elif (
+            actual_qty > 0
+            and is_consumable
+            and preferred_qty > 0
+            and matched_tolerance is not None
+            and _decimal(matched_tolerance.penalty_points) <= ZERO
+            and (
+                actual_qty < int(Decimal(preferred_qty) * Decimal("0.80"))
+                or actual_qty > int(Decimal(preferred_qty) * Decimal("1.20"))
+            )
+        ):
+            used_learned_rule = True
+            reason = "Allowed quantity variance."
+
+        # Item present - check quantity for consumables
+        elif actual_qty > 0:
+            # For consumables, check if quantity is within ±20%
+            if is_consumable and preferred_qty > 0:
+                tolerance_pct = Decimal("0.20")  # 20%
+                lower_bound = int(Decimal(preferred_qty) * (Decimal("1.00") - tolerance_pct))
+                upper_bound = int(Decimal(preferred_qty) * (Decimal("1.00") + tolerance_pct))
+
+                if actual_qty < lower_bound or actual_qty > upper_bound:
+                    # Outside tolerance: -0.5 points
+                    penalty_points += Decimal("0.50")
+                    exact_match = False
+                    status = "warning"
+                    reason = f"Consumable quantity {actual_qty} outside ±20% of expected {preferred_qty}."
+                    warnings.append(_issue(
+                        "warning",
+                        "consumable_quantity_tolerance",
+                        f"{expected_type.name}: {reason}",
+                        expected_type_id=expected_type.type_id,
+                        actual_qty=actual_qty,
+                        expected_qty=preferred_qty,
+                        fitting_id=fitting.fitting_id,
+                    ))
+                    actions.append("quantity_tolerance")
+
+        if applied_substitutions and status == "ok":
+            approved_names = [item["name"] for item in applied_substitutions if float(item.get("penalty_points") or 0) <= 0]
+            if approved_names:
+                if len(approved_names) == 1:
+                    reason = f"Approved substitute: {approved_names[0]}."
+                else:
+                    reason = f"Approved substitutes: {', '.join(approved_names)}."
+
+        item_rows.append(_row(
+            expected_type_id=rule.expected_type_id,
+            expected_name=expected_type.name,
+            actual_qty=actual_qty,
+            included_qty=included_qty,
+            excluded_qty=excluded_qty,
+            expected_qty=preferred_qty,
+            status=status,
+            reason=reason,
+            is_missing=actual_qty <= 0 and minimum_qty > 0,
+            actions=actions,
+            category=rule.category,
+            matched_type_ids=[item["type_id"] for item in applied_substitutions],
+            matched_types=[item["name"] for item in applied_substitutions],
+        ))
+
+    # Handle extra unexpected items
+    for actual_type_id, qty in list(remaining.items()):
+        if qty <= 0:
+            continue
+        contract_item = contract_items.get(actual_type_id)
+        actual_name = contract_item.name if contract_item else str(actual_type_id)
+        actual_type_info = fitting.type_info.get(actual_type_id) or _type_info_from_contract_item(contract_item) or TypeInfo(type_id=actual_type_id, name=actual_name)
+        is_consumable_extra = _is_consumable_market_group(actual_type_info.market_group_id)
+
+        if fitting.profile.allow_extra_items:
+            exact_match = False
+            penalty_points += Decimal("1.00")  # -1 point for extra item
+            warnings.append(_issue(
+                "warning",
+                "unexpected_extra_item",
+                f"Extra item: {actual_name} (qty: {qty}).",
+                actual_type_id=actual_type_id,
+                actual_qty=qty,
+                fitting_id=fitting.fitting_id,
+            ))
+            item_rows.append(_row(
+                expected_type_id=None,
+                expected_name=actual_name,
+                actual_type_id=actual_type_id,
+                actual_name=actual_name,
+                actual_qty=qty,
+                included_qty=int(contract_item.included_qty) if contract_item else qty,
+                excluded_qty=int(contract_item.excluded_qty) if contract_item else 0,
+                status="warning",
+                reason="Unexpected extra item allowed by profile.",
+                actions=["ignore_extra_item"],
+            ))
+        else:
+            exact_match = False
+            penalty_points += Decimal("1.00")  # -1 point for extra item
+            hard_failures.append(_issue(
+                "error",
+                "unexpected_extra_item",
+                f"Extra item not allowed: {actual_name} (qty: {qty}).",
+                actual_type_id=actual_type_id,
+                actual_qty=qty,
+                fitting_id=fitting.fitting_id,
+            ))
+            item_rows.append(_row(
+                expected_type_id=None,
+                expected_name=actual_name,
+                actual_type_id=actual_type_id,
+                actual_name=actual_name,
+                actual_qty=qty,
+                included_qty=int(contract_item.included_qty) if contract_item else qty,
+                excluded_qty=int(contract_item.excluded_qty) if contract_item else 0,
+                status="error",
+                reason="Unexpected extra item is not allowed by profile.",
+                actions=["ignore_extra_item"],
+            ))
+
+    # Calculate final score using item-count method
+    # Score = (expected_items - penalty_points) / expected_items × 100
+    has_wrong_hull = any(failure.get("code") == "wrong_hull" for failure in hard_failures)
+    if has_wrong_hull:
+        score = ZERO
+    elif expected_items == 0:
+        score = MAX_SCORE  # No items expected, perfect match
+    else:
+        points_earned = Decimal(expected_items) - penalty_points
+        score = (points_earned / Decimal(expected_items)) * Decimal("100.00")
+        score = max(score, ZERO).quantize(Decimal("0.01"))
+
+    source_hint = "auto"
+    if used_learned_rule or not exact_match:
+        source_hint = "learned_rule"
+
+    evidence = {
+        "selected_fit_id": fitting.fitting_id,
+        "selected_fit_name": fitting.fitting_name,
+        "profile": {
+            "auto_match_threshold": float(fitting.profile.auto_match_threshold),
+            "review_threshold": float(fitting.profile.review_threshold),
+            "allow_extra_items": fitting.profile.allow_extra_items,
+        },
+        "item_rows": item_rows,
+        "substitutions": [warning for warning in warnings if warning.get("code") == "substitution"],
+        "approved_substitutions": approved_substitutions,
+        "scoring_details": {
+            "expected_items": expected_items,
+            "penalty_points": float(penalty_points),
+            "points_earned": float(Decimal(expected_items) - penalty_points),
+        },
+    }
+    _maybe_add_substitution_suggestions(item_rows, contract_items=contract_items, fitting=fitting)
+
+    return CandidateMatch(
+        fitting_id=fitting.fitting_id,
+        fitting_name=fitting.fitting_name,
+        score=score,
+        exact_match=exact_match,
+        hard_failures=hard_failures,
+        warnings=warnings,
+        evidence=evidence,
+        source_hint=source_hint,
+        auto_threshold=fitting.profile.auto_match_threshold,
+        review_threshold=fitting.profile.review_threshold,
+    )
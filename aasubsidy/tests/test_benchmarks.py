@@ -0,0 +1,64 @@
+import unittest
+from dataclasses import replace
+from decimal import Decimal
+from unittest.mock import patch
+
+from aasubsidy.benchmarks import runner
+from aasubsidy.benchmarks.generator import ContractNoise, DoctrineGenerator
+from aasubsidy.contracts.matching import evaluate_contract_against_definition
+
+NO_NOISE = ContractNoise(missing_rate=0, substitute_rate=0, quantity_drift_rate=0, extra_items=0, wrong_hull_rate=0)
+
+
+class TestDoctrineGenerator(unittest.TestCase):
+    def test_generation_is_deterministic_per_seed(self):
+        first = DoctrineGenerator(7).scenario(doctrines=4, contracts=10)
+        second = DoctrineGenerator(7).scenario(doctrines=4, contracts=10)
+
+        self.assertEqual(first.source_fit_ids, second.source_fit_ids)
+        self.assertEqual(first.contracts, second.contracts)
+
+    def test_noise_free_contract_matches_its_doctrine_exactly(self):
+        generator = DoctrineGenerator(3)
+        definition = generator.doctrine(1)
+
+        result = evaluate_contract_against_definition(generator.contract(definition, NO_NOISE), definition)
+
+        self.assertEqual(result.score, Decimal("100.00"))
+        self.assertTrue(result.exact_match)
+
+    def test_cargo_copies_multiply_quantities(self):
+        generator = DoctrineGenerator(3)
+        definition = generator.doctrine(1)
+
+        contract = generator.contract(definition, replace(NO_NOISE, cargo_copies=3))
+
+        self.assertEqual(contract[definition.ship_type_id].included_qty, 3)
+        for rule in definition.item_rules[1:]:
+            self.assertEqual(contract[rule.expected_type_id].included_qty, rule.expected_quantity * 3)
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+    @patch.dict(runner.SCALES, {"tiny": {"doctrines": 3, "contracts": 5}})
+    def test_suite_reports_every_benchmark_and_compares_to_baseline(self):
+        current = runner.run_suite(["tiny"], repeat=1)
+
+        self.assertEqual(
+            set(current["benchmarks"]),
+            {
+                "evaluate_contract_against_definition[tiny]",
+                "_select_result[tiny]",
+                "match_contracts_pipeline[tiny]",
+            },
+        )
+        baseline = {"benchmarks": {name: dict(entry) for name, entry in current["benchmarks"].items()}}
+        name = "match_contracts_pipeline[tiny]"
+        baseline["benchmarks"][name]["per_op_us"] = current["benchmarks"][name]["per_op_us"] / 2
+
+        rows = {row["name"]: row for row in runner.compare(current, baseline)}
+        self.assertTrue(rows[name]["regression"])
+        self.assertFalse(rows["_select_result[tiny]"]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
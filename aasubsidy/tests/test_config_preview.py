@@ -0,0 +1,68 @@
+import unittest
+from decimal import Decimal
+
+from aasubsidy.contracts.config_preview import PreviewInputs, parse_pricing_config, summarise_preview
+from aasubsidy.contracts.pricing_engine import FittingPriceMatrix
+
+CFG = {"basis": "sell", "pct": Decimal("0.10"), "m3": Decimal("250"), "incr": 250_000, "corporation_id": 1}
+
+
+def _inputs(backlog=None):
+    matrix = FittingPriceMatrix(
+        {1: 100, 2: 100, 3: None},
+        {1: {10: 2}, 2: {10: 1, 11: 5}, 3: {11: 1}},
+        {100: (Decimal("30000000"), Decimal("40000000")), 10: (Decimal("1000000"), Decimal("2000000")), 11: (Decimal("10"), Decimal("20"))},
+        {100: 10000.0, 10: 5.0, 11: 0.01},
+    )
+    return PreviewInputs(matrix, {1: "Alpha", 2: "Bravo", 3: "Charlie"}, {1, 2}, backlog or {})
+
+
+class TestParsePricingConfig(unittest.TestCase):
+    def test_form_values_override_the_active_config(self):
+        cfg = parse_pricing_config(
+            {"price_basis": "buy", "pct_over_basis": "0.2", "cost_per_m3": "", "rounding_increment": "100000"}, CFG
+        )
+
+        self.assertEqual(cfg, {**CFG, "basis": "buy", "pct": Decimal("0.2"), "incr": 100_000})
+
+    def test_invalid_values_are_rejected(self):
+        for data in ({"pct_over_basis": "abc"}, {"cost_per_m3": "-1"}, {"rounding_increment": "0"}, {"pct_over_basis": "NaN"}):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                parse_pricing_config(data, CFG)
+
+
+class TestSummarisePreview(unittest.TestCase):
+    def test_deltas_per_fit_and_in_total(self):
+        inputs = _inputs(backlog={500: 1, 501: 1, 502: 3})
+        current = inputs.matrix.values(CFG)
+        proposed = inputs.matrix.values({**CFG, "pct": Decimal("0.20")})
+
+        result = summarise_preview(inputs, current, proposed)
+
+        self.assertEqual([row["name"] for row in result["fits"]], ["Alpha", "Bravo"])
+        alpha = result["fits"][0]
+        self.assertEqual(alpha["current"], float(current[1]["suggested"]))
+        self.assertEqual(alpha["delta"], float(proposed[1]["suggested"] - current[1]["suggested"]))
+        self.assertEqual(result["changed_fits"], 2)
+        self.assertEqual(
+            result["fit_totals"]["delta"],
+            float(sum(proposed[fit_id]["suggested"] - current[fit_id]["suggested"] for fit_id in (1, 2))),
+        )
+        self.assertEqual(result["backlog"]["contracts"], 3)
+        self.assertEqual(
+            result["backlog"]["proposed"],
+            float(2 * proposed[1]["suggested"] + proposed[3]["suggested"]),
+        )
+
+    def test_unchanged_config_has_no_deltas(self):
+        inputs = _inputs()
+        values = inputs.matrix.values(CFG)
+
+        result = summarise_preview(inputs, values, values)
+
+        self.assertEqual(result["changed_fits"], 0)
+        self.assertEqual(result["fit_totals"]["delta"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
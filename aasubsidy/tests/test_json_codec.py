@@ -0,0 +1,74 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from aasubsidy.helpers import json_codec
+from aasubsidy.helpers.json_codec import ParsedJSON
+
+
+class _Row:
+    summary = ParsedJSON("summary_json", dict)
+    failures = ParsedJSON("failures_json", list)
+
+    def __init__(self, summary_json="{}", failures_json="[]"):
+        self.summary_json = summary_json
+        self.failures_json = failures_json
+
+
+class TestCodec(unittest.TestCase):
+    PAYLOAD = {"engine_version": 7, "items": [{"type_id": 34, "qty": 2}], 12: "int key", "name": "Rifter ✓"}
+
+    def _round_trip(self):
+        encoded = json_codec.dumps(self.PAYLOAD)
+        self.assertIsInstance(encoded, str)
+        self.assertEqual(json.loads(encoded), json.loads(json.dumps(self.PAYLOAD)))
+        self.assertEqual(json_codec.loads(encoded), json.loads(json.dumps(self.PAYLOAD)))
+        self.assertEqual(json_codec.loads(encoded.encode("utf-8")), json_codec.loads(encoded))
+
+    def test_round_trip(self):
+        self._round_trip()
+
+    def test_round_trip_without_orjson(self):
+        with patch.object(json_codec, "orjson", None):
+            self._round_trip()
+
+    def test_values_orjson_refuses_fall_back_to_json(self):
+        self.assertEqual(json_codec.loads(json_codec.dumps([2**70])), [2**70])
+
+    def test_bad_input_returns_default(self):
+        for raw in (None, "", b"", "{not json", memoryview(b"")):
+            with self.subTest(raw=raw):
+                self.assertEqual(json_codec.loads(raw, {}), {})
+        self.assertEqual(json_codec.loads(memoryview(b"[1]")), [1])
+
+
+class TestParsedJSON(unittest.TestCase):
+    def test_decodes_once_per_raw_value(self):
+        row = _Row(summary_json='{"a": 1}')
+
+        with patch.object(json_codec, "loads", wraps=json_codec.loads) as loads:
+            first = row.summary
+            self.assertIs(row.summary, first)
+            self.assertEqual(loads.call_count, 1)
+
+        self.assertEqual(first, {"a": 1})
+
+    def test_assignment_invalidates(self):
+        row = _Row(summary_json='{"a": 1}')
+        self.assertEqual(row.summary, {"a": 1})
+
+        row.summary_json = '{"a": 2}'
+
+        self.assertEqual(row.summary, {"a": 2})
+
+    def test_malformed_or_empty_fields_use_fresh_defaults(self):
+        row = _Row(summary_json="", failures_json="[broken")
+        other = _Row(summary_json="")
+
+        self.assertEqual(row.summary, {})
+        self.assertEqual(row.failures, [])
+        self.assertIsNot(row.summary, other.summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from aasubsidy.helpers.mains import (
+    MainInfo,
+    bump_mains_version,
+    mains_for_characters,
+    mains_for_names,
+    mains_for_users,
+)
+from aasubsidy.tests.helpers import DictCache
+
+
+class _Owners:
+    def __init__(self, owners):
+        self.owners = owners
+        self.loads = []
+
+    def __call__(self, keys):
+        self.loads.append(set(keys))
+        return {key: self.owners[key] for key in keys if key in self.owners}
+
+
+class TestMains(unittest.TestCase):
+    def setUp(self):
+        self.backend = DictCache()
+        self.owners = _Owners({
+            9001: MainInfo(1, 9000, "Main One"),
+            9002: MainInfo(1, 9000, "Main One"),
+            9100: MainInfo(2, None, None),
+        })
+
+    def _resolve(self, character_ids):
+        return mains_for_characters(character_ids, backend=self.backend, loader=self.owners, timeout=60)
+
+    def test_resolves_many_characters_in_one_load(self):
+        self.assertEqual(self._resolve([9001, 9002, 9100, 9999, None]), {
+            9001: MainInfo(1, 9000, "Main One"),
+            9002: MainInfo(1, 9000, "Main One"),
+            9100: MainInfo(2, None, None),
+        })
+        self.assertEqual(self.owners.loads, [{9001, 9002, 9100, 9999}])
+
+    def test_cached_lookups_skip_the_loader(self):
+        self._resolve([9001, 9999])
+        self.backend.round_trips = 0
+
+        self.assertEqual(self._resolve([9001, 9999]), {9001: MainInfo(1, 9000, "Main One")})
+        self.assertEqual(self.owners.loads, [{9001, 9999}])
+        self.assertEqual(self.backend.round_trips, 1)
+
+    def test_ownership_change_retires_cached_mains(self):
+        self._resolve([9001])
+        self.owners.owners[9001] = MainInfo(3, 9300, "New Main")
+
+        bump_mains_version(self.backend)
+
+        self.assertEqual(self._resolve([9001]), {9001: MainInfo(3, 9300, "New Main")})
+
+    def test_names_and_users_are_cached_separately(self):
+        by_name = _Owners({"Alt With Spaces": MainInfo(1, 9000, "Main One")})
+        by_user = _Owners({1: MainInfo(1, 9000, "Main One")})
+
+        names = mains_for_names(["Alt With Spaces", "Stranger"], backend=self.backend, loader=by_name, timeout=60)
+        users = mains_for_users([1], backend=self.backend, loader=by_user, timeout=60)
+
+        self.assertEqual(names, {"Alt With Spaces": MainInfo(1, 9000, "Main One")})
+        self.assertEqual(users, {1: MainInfo(1, 9000, "Main One")})
+        self.assertTrue(all(" " not in key for key in self.backend.data))
+
+    def test_display_name_falls_back_without_a_main(self):
+        self.assertEqual(MainInfo(2, None, None).display_name("Issuer"), "Issuer")
+        self.assertEqual(MainInfo(1, 9000, "Main One").display_name("Issuer"), "Main One")
+
+
+if __name__ == "__main__":
+    unittest.main()
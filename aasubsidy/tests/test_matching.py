@@ -1,6 +1,9 @@
 import unittest
+from dataclasses import replace
 from decimal import Decimal
+from types import SimpleNamespace
 
+from aasubsidy.contracts.instrumentation import MatchStats
 from aasubsidy.contracts.matching import (
     ContractItemData,
     FittingDefinition,
@@ -9,7 +12,13 @@ from aasubsidy.contracts.matching import (
     QuantityToleranceData,
     SubstitutionRuleData,
     TypeInfo,
+    _contract_type_columns,
+    _contract_type_info,
+    _definition_version,
+    _result_content_hash,
     _select_result,
+    _split_evidence,
+    compile_definition,
     evaluate_contract_against_definition,
 )
 
@@ -478,5 +487,210 @@ class TestDoctrineMatching(unittest.TestCase):
         self.assertEqual(result.evidence["selected_fit_name"], "First Fit")
 
 
+class TestEvidenceSplit(unittest.TestCase):
+    def test_list_page_fields_stay_in_summary(self):
+        contract = {
+            100: ContractItemData(type_id=100, name="Hull", included_qty=1),
+            200: ContractItemData(type_id=200, name="Module", included_qty=1),
+        }
+        candidate = evaluate_contract_against_definition(
+            contract,
+            _fit_definition(
+                rules=[
+                    ItemRuleData(expected_type_id=100, expected_type_name="Hull", category="hull", is_hull=True),
+                    ItemRuleData(expected_type_id=200, expected_type_name="Module"),
+                ],
+                type_info={100: TypeInfo(100, "Hull"), 200: TypeInfo(200, "Module")},
+            ),
+        )
+        result = _select_result(contract_id=7, candidates=[candidate])
+
+        summary, detail = _split_evidence(result.evidence)
+
+        self.assertEqual(summary["selected_fit_id"], 1)
+        self.assertEqual(summary["candidates"][0]["fit_id"], 1)
+        self.assertNotIn("item_rows", summary)
+        self.assertEqual(len(detail["item_rows"]), 2)
+        self.assertEqual({**summary, **detail}, result.evidence)
+
+    def test_content_hash_only_changes_with_content(self):
+        candidate = evaluate_contract_against_definition(
+            {100: ContractItemData(type_id=100, name="Hull", included_qty=1)},
+            _fit_definition(
+                rules=[ItemRuleData(expected_type_id=100, expected_type_name="Hull", category="hull", is_hull=True)],
+                type_info={100: TypeInfo(100, "Hull")},
+            ),
+        )
+        result = _select_result(contract_id=7, candidates=[candidate])
+        summary, detail = _split_evidence(result.evidence)
+
+        first = _result_content_hash(result, summary, detail)
+        self.assertEqual(first, _result_content_hash(result, dict(reversed(list(summary.items()))), detail))
+
+        result.score = Decimal("90.00")
+        self.assertNotEqual(first, _result_content_hash(result, summary, detail))
+
+    def test_content_hash_ignores_input_fingerprint(self):
+        candidate = evaluate_contract_against_definition(
+            {100: ContractItemData(type_id=100, name="Hull", included_qty=1)},
+            _fit_definition(
+                rules=[ItemRuleData(expected_type_id=100, expected_type_name="Hull", category="hull", is_hull=True)],
+                type_info={100: TypeInfo(100, "Hull")},
+            ),
+        )
+        result = _select_result(contract_id=7, candidates=[candidate])
+        summary, detail = _split_evidence(result.evidence)
+
+        before = _result_content_hash(result, summary, detail)
+        result.input_fingerprint = "f" * 64
+
+        # A new fingerprint with the same outcome is stored without moving updated_at.
+        self.assertEqual(before, _result_content_hash(result, summary, detail))
+
+
+def _fake_type_model(*attnames, **class_attrs):
+    fields = [SimpleNamespace(attname=attname) for attname in attnames]
+    return type("FakeType", (), {"_meta": SimpleNamespace(concrete_fields=fields), **class_attrs})
+
+
+class TestContractTypeLookup(unittest.TestCase):
+    def test_columns_follow_probe_order(self):
+        model = _fake_type_model("type_id", "name", "group_id", "eve_market_group_id", "meta_level")
+
+        self.assertEqual(_contract_type_columns(model), ("group_id", "eve_market_group_id", "meta_level"))
+
+    def test_computed_attribute_falls_back_to_instances(self):
+        model = _fake_type_model("type_id", "name", "group_id", category_id=property(lambda self: 6))
+
+        self.assertIsNone(_contract_type_columns(model))
+
+    def test_type_info_uses_first_non_null_probe(self):
+        info = _contract_type_info(
+            501,
+            "Caldari Navy Ballistic Control",
+            {"group_id": None, "eve_group_id": 367, "market_group_id": 9, "meta_level": 3},
+        )
+
+        self.assertEqual(info.group_id, 367)
+        self.assertEqual(info.market_group_id, 9)
+        self.assertEqual(info.meta_level, 3)
+        self.assertIsNone(info.category_id)
+        self.assertTrue(info.faction)
+        self.assertEqual(_contract_type_info(7, None, {}).name, "7")
+
+
+class TestCompiledDefinitions(unittest.TestCase):
+    def _fit(self, **overrides):
+        return _fit_definition(
+            rules=[
+                ItemRuleData(300, "Zeta Module", expected_quantity=1, sort_order=1),
+                ItemRuleData(100, "Hull", expected_quantity=1, category="hull", is_hull=True, sort_order=-1000),
+                ItemRuleData(200, "Alpha Module", quantity_mode="minimum", expected_quantity=2, min_quantity=3, sort_order=1),
+                ItemRuleData(400, "Ignored", rule_kind="ignore"),
+            ],
+            substitutions=[
+                SubstitutionRuleData(200, rule_type="group", penalty_points=Decimal("1.50")),
+                SubstitutionRuleData(200, rule_type="specific", allowed_type_id=201, penalty_points=Decimal("3.00")),
+                SubstitutionRuleData(200, rule_type="market_group", penalty_points=Decimal("0.25")),
+            ],
+            **overrides,
+        )
+
+    def test_rules_are_presorted_with_resolved_quantities_and_penalties(self):
+        compiled = compile_definition(self._fit())
+
+        self.assertEqual([rule.rule.expected_type_id for rule in compiled.rules], [100, 400, 200, 300])
+        self.assertEqual(compiled.expected_items, 3)
+        alpha = compiled.rules[2]
+        self.assertEqual((alpha.preferred_qty, alpha.minimum_qty), (3, 3))
+        self.assertEqual(
+            [(rule.rule_type, penalty) for rule, penalty in alpha.substitutions],
+            [("market_group", 25), ("group", 150), ("specific", 0)],
+        )
+
+    def test_compiled_once_per_definition_object(self):
+        fit = self._fit()
+        stats = MatchStats()
+        contract = {100: ContractItemData(100, "Hull", included_qty=1)}
+
+        evaluate_contract_against_definition(contract, fit, stats=stats)
+        evaluate_contract_against_definition(contract, fit, stats=stats)
+
+        self.assertEqual(stats.counters["definitions_compiled"], 1)
+        self.assertIs(fit.compiled, compile_definition(fit))
+        self.assertIsNone(replace(fit, substitutions=[]).compiled)
+
+    def test_versioned_definitions_share_compiled_rules(self):
+        first = self._fit(fitting_id=9901)
+        first.version = "v1"
+        second = self._fit(fitting_id=9901)
+        second.version = "v1"
+        changed = replace(first, substitutions=[], version="v2")
+
+        self.assertIs(compile_definition(first), compile_definition(second))
+        self.assertIsNot(compile_definition(first), compile_definition(changed))
+
+    def test_definition_version_tracks_item_types_and_quantities(self):
+        version = _definition_version(2, 100, {200: 3, 300: 1})
+
+        self.assertEqual(version, _definition_version(2, 100, {300: 1, 200: 3}))
+        for changed in (
+            _definition_version(3, 100, {200: 3, 300: 1}),
+            _definition_version(2, 101, {200: 3, 300: 1}),
+            _definition_version(2, 100, {201: 3, 300: 1}),
+            _definition_version(2, 100, {200: 2, 300: 2}),
+        ):
+            self.assertNotEqual(version, changed)
+
+
+class TestMatchStats(unittest.TestCase):
+    def test_evaluator_records_counters(self):
+        fit = _fit_definition(
+            rules=[
+                ItemRuleData(100, "Hull", expected_quantity=1, category="hull", is_hull=True, sort_order=-1000),
+                ItemRuleData(500, "T2 Module", expected_quantity=1),
+            ],
+            substitutions=[SubstitutionRuleData(expected_type_id=500, rule_type="group", penalty_points=Decimal("1.00"))],
+            type_info={
+                100: TypeInfo(100, "Hull"),
+                500: TypeInfo(500, "T2 Module", group_id=10),
+                501: TypeInfo(501, "Compact Module", group_id=10),
+            },
+        )
+        contract = {
+            100: ContractItemData(100, "Hull", included_qty=1),
+            501: ContractItemData(501, "Compact Module", included_qty=1),
+        }
+        stats = MatchStats()
+
+        with stats.stage("evaluate"):
+            result = evaluate_contract_against_definition(contract, fit, stats=stats)
+            evaluate_contract_against_definition(contract, fit, stats=stats)
+
+        self.assertEqual(result.score, Decimal("50.00"))
+        data = stats.as_dict()
+        self.assertEqual(data["counters"]["candidates_evaluated"], 2)
+        self.assertEqual(data["counters"]["substitution_checks"], 2)
+        self.assertEqual(data["stages"]["evaluate"]["calls"], 1)
+        self.assertEqual(data["stages"]["evaluate"]["queries"], 0)
+        self.assertIn("substitution_search", data["timers"])
+
+    def test_merge_accumulates_stages_and_counters(self):
+        first = MatchStats()
+        second = MatchStats()
+        for stats in (first, second):
+            stats.contracts += 2
+            stats.incr("candidates_evaluated", 3)
+            with stats.stage("load_items"):
+                pass
+
+        first.merge(second)
+
+        data = first.as_dict()
+        self.assertEqual(data["contracts"], 4)
+        self.assertEqual(data["stages"]["load_items"]["calls"], 2)
+        self.assertEqual(data["candidates_per_contract"], 1.5)
+
+
 if __name__ == "__main__":
     unittest.main()
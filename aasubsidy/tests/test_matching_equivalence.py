@@ -0,0 +1,238 @@
+import copy
+import random
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+
+from aasubsidy.contracts.matching import (
+    ContractItemData,
+    FittingDefinition,
+    ItemRuleData,
+    MatchProfileData,
+    QuantityToleranceData,
+    SubstitutionRuleData,
+    TypeInfo,
+    _evaluate_contracts,
+    _score_from_centipoints,
+    _select_result,
+    evaluate_contract_against_definition,
+)
+from aasubsidy.benchmarks.generator import ContractNoise, DoctrineGenerator
+from aasubsidy.contracts.instrumentation import MatchStats
+from aasubsidy.tests import test_matching
+from aasubsidy.tests.reference_matching import evaluate_contract_reference
+
+RANDOM_CASES = 500
+PENALTIES = [Decimal("0.00"), Decimal("0.25"), Decimal("0.50"), Decimal("1.00"), Decimal("1.33"), Decimal("2.50"), Decimal("7.75")]
+
+
+def _random_type(rng, type_id):
+    return TypeInfo(
+        type_id=type_id,
+        name=f"Type {type_id}",
+        category_id=rng.choice([None, 7, 8, 18]),
+        group_id=rng.choice([None, 1, 2, 3]),
+        market_group_id=rng.choice([None, 11, 157]),
+        meta_level=rng.choice([None, 0, 1, 2, 5]),
+        faction=rng.random() < 0.15,
+    )
+
+
+def _random_fixture(rng):
+    """A fitting plus a noisy contract derived from it."""
+    hull_id = 100
+    module_ids = rng.sample(range(1000, 1040), rng.randint(0, 9))
+    spare_ids = [type_id for type_id in range(1000, 1040) if type_id not in module_ids]
+    type_info = {hull_id: TypeInfo(hull_id, "Hull")}
+    for type_id in module_ids + spare_ids:
+        type_info[type_id] = _random_type(rng, type_id)
+
+    rules = [ItemRuleData(hull_id, "Hull", category="hull", sort_order=-1000, is_hull=True)]
+    for type_id in module_ids:
+        rules.append(
+            ItemRuleData(
+                expected_type_id=type_id,
+                expected_type_name=f"Type {type_id}",
+                rule_kind=rng.choice(["required", "required", "optional", "cargo", "ignore"]),
+                quantity_mode=rng.choice(["exact", "minimum", "range"]),
+                expected_quantity=rng.choice([0, 1, 1, 2, 5, 7, 13, 100, 333, 1000]),
+                min_quantity=rng.choice([0, 0, 1, 3, 50]),
+                max_quantity=rng.choice([0, 0, 2, 10, 1200]),
+                category=rng.choice(["module", "cargo", "drone"]),
+                sort_order=rng.choice([0, 0, 1, 2]),
+            )
+        )
+
+    substitutions = []
+    for type_id in rng.sample(module_ids, min(len(module_ids), rng.randint(0, 3))):
+        substitutions.append(
+            SubstitutionRuleData(
+                expected_type_id=type_id,
+                rule_type=rng.choice(["specific", "group", "market_group", "meta_family"]),
+                allowed_type_id=rng.choice(spare_ids),
+                max_meta_level_delta=rng.choice([0, 1, 3]),
+                penalty_points=rng.choice(PENALTIES),
+            )
+        )
+
+    tolerances = {}
+    for type_id in rng.sample(module_ids, min(len(module_ids), rng.randint(0, 3))):
+        tolerances[type_id] = [
+            QuantityToleranceData(
+                eve_type_id=type_id,
+                mode=rng.choice(["absolute", "percent", "missing_only", "extra_only"]),
+                lower_bound=rng.choice([-50, -10, -1, 0]),
+                upper_bound=rng.choice([0, 1, 5, 20, 33]),
+                penalty_points=rng.choice(PENALTIES),
+            )
+            for _ in range(rng.randint(1, 2))
+        ]
+
+    profile = MatchProfileData(
+        fitting_id=1,
+        auto_match_threshold=rng.choice([Decimal("95.00"), Decimal("90.00")]),
+        review_threshold=rng.choice([Decimal("80.00"), Decimal("60.00")]),
+        allow_extra_items=rng.random() < 0.7,
+        allow_meta_variants=rng.random() < 0.3,
+        allow_faction_variants=rng.random() < 0.3,
+    )
+    fitting = FittingDefinition(
+        fitting_id=1,
+        fitting_name="Random Fit",
+        ship_type_id=hull_id,
+        ship_type_name="Hull",
+        profile=profile,
+        item_rules=rules,
+        substitutions=substitutions,
+        quantity_tolerances=tolerances,
+        type_info=type_info,
+    )
+
+    contract = {}
+    if rng.random() > 0.05:
+        contract[hull_id] = ContractItemData(type_id=hull_id, name="Hull", included_qty=1)
+    for rule in rules[1:]:
+        if rng.random() < 0.15:
+            continue
+        qty = max(rule.expected_quantity, rule.min_quantity)
+        qty = max(0, qty + rng.choice([0, 0, 0, -1, 1, -qty // 3, qty // 4, qty]))
+        if qty:
+            contract[rule.expected_type_id] = ContractItemData(type_id=rule.expected_type_id, name=f"Type {rule.expected_type_id}")
+            contract[rule.expected_type_id].included_qty = qty
+    for type_id in rng.sample(spare_ids, rng.randint(0, 4)):
+        info = type_info[type_id]
+        contract[type_id] = ContractItemData(
+            type_id=type_id,
+            name=info.name,
+            included_qty=rng.choice([1, 2, 5, 100]),
+            excluded_qty=rng.choice([0, 0, 3]),
+            category_id=info.category_id,
+            group_id=info.group_id,
+            market_group_id=info.market_group_id,
+            meta_level=info.meta_level,
+            faction=info.faction,
+        )
+    return contract, fitting
+
+
+class TestFixedPointScoringEquivalence(unittest.TestCase):
+    def assertCandidateEqual(self, actual, expected):
+        self.assertEqual(actual.score, expected.score)
+        self.assertEqual(str(actual.score), str(expected.score))
+        self.assertEqual(actual.exact_match, expected.exact_match)
+        self.assertEqual(actual.source_hint, expected.source_hint)
+        self.assertEqual(actual.hard_failures, expected.hard_failures)
+        self.assertEqual(actual.warnings, expected.warnings)
+        self.assertEqual(actual.evidence, expected.evidence)
+
+    def test_existing_cases_score_like_reference(self):
+        evaluated = []
+        production = test_matching.evaluate_contract_against_definition
+
+        def checked(contract_items, fitting):
+            expected = evaluate_contract_reference(copy.deepcopy(contract_items), copy.deepcopy(fitting))
+            actual = production(contract_items, fitting)
+            self.assertCandidateEqual(actual, expected)
+            evaluated.append(fitting.fitting_id)
+            return actual
+
+        with patch.object(test_matching, "evaluate_contract_against_definition", checked):
+            outcome = unittest.TestResult()
+            unittest.defaultTestLoader.loadTestsFromTestCase(test_matching.TestDoctrineMatching).run(outcome)
+
+        self.assertTrue(outcome.wasSuccessful(), outcome.failures + outcome.errors)
+        self.assertGreater(len(evaluated), 10)
+
+    def test_random_fixtures_score_like_reference(self):
+        rng = random.Random(20260507)
+        for index in range(RANDOM_CASES):
+            contract, fitting = _random_fixture(rng)
+            with self.subTest(case=index):
+                self.assertCandidateEqual(
+                    evaluate_contract_against_definition(contract, fitting),
+                    evaluate_contract_reference(contract, fitting),
+                )
+
+    def test_score_rounding_matches_decimal_quantize(self):
+        for expected_items in range(1, 60):
+            for penalty_centipoints in range(0, expected_items * 100 + 101, 25):
+                points_earned = Decimal(expected_items) - Decimal(penalty_centipoints).scaleb(-2)
+                reference = max(
+                    (points_earned / Decimal(expected_items)) * Decimal("100.00"),
+                    Decimal("0.00"),
+                ).quantize(Decimal("0.01"))
+                self.assertEqual(_score_from_centipoints(expected_items, penalty_centipoints), reference)
+
+
+class TestTwoPhaseEvaluation(unittest.TestCase):
+    def test_summary_candidates_score_like_full_candidates(self):
+        rng = random.Random(20261019)
+        for index in range(RANDOM_CASES):
+            contract, fitting = _random_fixture(rng)
+            full = evaluate_contract_against_definition(contract, fitting)
+            summary = evaluate_contract_against_definition(contract, fitting, detail=False)
+            with self.subTest(case=index):
+                self.assertEqual(
+                    (summary.score, summary.exact_match, summary.source_hint, summary.hard_failures, summary.warnings),
+                    (full.score, full.exact_match, full.source_hint, full.hard_failures, full.warnings),
+                )
+                self.assertFalse(summary.detailed)
+                self.assertNotIn("item_rows", summary.evidence)
+
+    def test_results_match_selection_over_full_candidates(self):
+        scenario = DoctrineGenerator(11, hulls=3).scenario(
+            doctrines=12, contracts=60, noise=ContractNoise(substitute_rate=0.3, missing_rate=0.2)
+        )
+        threshold = Decimal("70.00")
+        stats = MatchStats()
+
+        results = _evaluate_contracts(
+            list(scenario.contracts),
+            contract_items_map=scenario.contracts,
+            fit_definitions=scenario.definitions,
+            forced_fit_ids={},
+            latest_decisions={},
+            preview_fit_id=None,
+            close_match_threshold=threshold,
+            stats=stats,
+        )
+
+        for contract_id, contract in scenario.contracts.items():
+            candidates = [
+                evaluate_contract_against_definition(contract, definition)
+                for definition in scenario.definitions.values()
+                if definition.ship_type_id in contract
+            ]
+            expected = _select_result(contract_id=contract_id, candidates=candidates, close_match_threshold=threshold)
+            actual = results[contract_id]
+            with self.subTest(contract=contract_id):
+                self.assertEqual(
+                    (actual.match_status, actual.matched_fitting_id, actual.score, actual.warnings, actual.evidence),
+                    (expected.match_status, expected.matched_fitting_id, expected.score, expected.warnings, expected.evidence),
+                )
+        self.assertLessEqual(stats.counters["evidence_built"], len(scenario.contracts))
+        self.assertGreater(stats.counters["candidates_evaluated"], stats.counters["evidence_built"])
+
+
+if __name__ == "__main__":
+    unittest.main()
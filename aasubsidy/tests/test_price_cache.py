@@ -0,0 +1,73 @@
+import unittest
+from decimal import Decimal
+
+from aasubsidy.contracts.price_cache import (
+    VERSION_KEY,
+    _LocalPrices,
+    bump_price_version,
+    get_prices,
+    prices_for,
+)
+from aasubsidy.tests.helpers import DictCache
+
+
+class _Prices:
+    def __init__(self, prices):
+        self.prices = prices
+        self.loads = []
+
+    def __call__(self, type_ids):
+        self.loads.append(set(type_ids))
+        return {type_id: self.prices[type_id] for type_id in type_ids if type_id in self.prices}
+
+
+class TestPriceCache(unittest.TestCase):
+    def setUp(self):
+        self.backend = DictCache()
+        self.db = _Prices({34: (Decimal("4"), Decimal("5")), 35: (Decimal("9"), Decimal("10"))})
+
+    def _get(self, type_ids, local):
+        return get_prices(type_ids, backend=self.backend, loader=self.db, timeout=60, local=local)
+
+    def test_database_is_read_once_across_processes(self):
+        self.assertEqual(self._get([34, 35, 36], _LocalPrices()), {34: self.db.prices[34], 35: self.db.prices[35]})
+        self.assertEqual(self._get([34, 35, 36], _LocalPrices()), {34: self.db.prices[34], 35: self.db.prices[35]})
+
+        self.assertEqual(self.db.loads, [{34, 35, 36}])
+
+    def test_warm_process_resolves_in_one_round_trip(self):
+        local = _LocalPrices()
+        self._get([34, 35], local)
+        self.backend.round_trips = 0
+
+        self.assertEqual(prices_for([34, 35], "sell", backend=self.backend, loader=self.db, local=local), {
+            34: Decimal("5"),
+            35: Decimal("10"),
+        })
+        self.assertEqual(self.backend.round_trips, 1)
+
+    def test_version_bump_retires_cached_prices(self):
+        local = _LocalPrices()
+        self._get([34], local)
+        self.db.prices[34] = (Decimal("6"), Decimal("7"))
+
+        version = self.backend.data[VERSION_KEY]
+        self.assertEqual(bump_price_version(self.backend), version + 1)
+
+        self.assertEqual(self._get([34], local), {34: (Decimal("6"), Decimal("7"))})
+        self.assertEqual(self._get([34], _LocalPrices()), {34: (Decimal("6"), Decimal("7"))})
+        self.assertEqual(self.db.loads, [{34}, {34}])
+
+    def test_bump_without_a_version_starts_one(self):
+        self.assertGreater(bump_price_version(self.backend), 1)
+
+    def test_local_lru_is_bounded(self):
+        local = _LocalPrices(max_entries=2)
+        for type_id in (1, 2, 3):
+            local.put(type_id, 1, None)
+
+        self.assertEqual(set(local.versions([1, 2, 3])), {2, 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
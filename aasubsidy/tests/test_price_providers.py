@@ -0,0 +1,140 @@
+import json
+import unittest
+from pathlib import Path
+
+from aasubsidy.helpers.price_providers import (
+    FuzzworkPriceProvider,
+    JanicePriceProvider,
+    PriceProvider,
+    PriceProviderError,
+    fetch_prices,
+    fetch_prices_and_failures,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class _Response:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status_code = status
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.payload
+
+
+class _RecordedSession:
+    """Serves a recorded payload for every request and keeps the calls."""
+
+    def __init__(self, fixture, status=200):
+        self.payload = json.loads((FIXTURES / fixture).read_text()) if fixture else None
+        self.status = status
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append(("POST", url, kwargs))
+        return _Response(self.payload, self.status)
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, kwargs))
+        return _Response(self.payload, self.status)
+
+
+class _StaticProvider(PriceProvider):
+    def __init__(self, name, prices=None, fail=False, chunk_size=2):
+        super().__init__(session=object())
+        self.name = name
+        self.prices = prices or {}
+        self.fail = fail
+        self.chunk_size = chunk_size
+        self.requested = []
+
+    def _fetch(self, type_ids):
+        self.requested.append(list(type_ids))
+        if self.fail:
+            raise RuntimeError("down")
+        return {str(type_id): self.prices[type_id] for type_id in type_ids if type_id in self.prices}
+
+
+def _price(value):
+    return {"buy": {"percentile": value}, "sell": {"percentile": value}}
+
+
+class TestRecordedProviders(unittest.TestCase):
+    def test_janice_payload_is_normalised(self):
+        session = _RecordedSession("janice_pricer.json")
+
+        prices = JanicePriceProvider("key", session=session).fetch([34, 2048, 99999999])
+
+        self.assertEqual(prices["34"], {"buy": {"percentile": "3.91"}, "sell": {"percentile": "4.1"}})
+        self.assertEqual(prices["2048"]["buy"]["percentile"], "510250.5")
+        self.assertNotIn("99999999", prices)
+        method, _, kwargs = session.calls[0]
+        self.assertEqual(method, "POST")
+        self.assertEqual(kwargs["data"], "34\n2048\n99999999")
+        self.assertEqual(kwargs["headers"]["X-ApiKey"], "key")
+
+    def test_fuzzwork_payload_is_normalised(self):
+        session = _RecordedSession("fuzzwork_aggregates.json")
+
+        prices = FuzzworkPriceProvider(session=session).fetch([34, 2048])
+
+        self.assertEqual(prices["2048"], {"buy": {"percentile": "511500.12"}, "sell": {"percentile": "550100"}})
+        self.assertEqual(session.calls[0][2]["params"], {"station": 60003760, "types": "34,2048"})
+
+    def test_http_errors_surface_as_provider_errors(self):
+        with self.assertRaises(PriceProviderError):
+            FuzzworkPriceProvider(session=_RecordedSession("fuzzwork_aggregates.json", status=503)).fetch([34])
+
+    def test_janice_without_key_is_unavailable(self):
+        self.assertFalse(JanicePriceProvider("", session=object()).available)
+
+
+class TestFetchPrices(unittest.TestCase):
+    def test_chunks_fail_over_to_the_next_provider(self):
+        primary = _StaticProvider("primary", fail=True, chunk_size=3)
+        fallback = _StaticProvider("fallback", {1: _price("1"), 2: _price("2"), 4: _price("4")}, chunk_size=2)
+
+        prices = fetch_prices([4, 3, 2, 1], providers=[primary, fallback], max_workers=2)
+
+        self.assertEqual(set(prices), {"1", "2", "4"})
+        self.assertEqual(sorted(primary.requested), [[1, 2, 3], [4]])
+        # The fallback re-chunks to its own request size.
+        self.assertEqual(sorted(fallback.requested), [[1, 2], [3], [4]])
+
+    def test_unanswered_chunks_are_absent(self):
+        providers = [_StaticProvider("a", fail=True), _StaticProvider("b", fail=True)]
+
+        prices = fetch_prices([1, 2, 3], providers=providers, max_workers=1)
+
+        self.assertEqual(prices, {})
+
+    def test_failed_requests_are_reported_apart_from_unpriced_types(self):
+        class _FailingPart(_StaticProvider):
+            def _fetch(self, type_ids):
+                if 3 in type_ids:
+                    self.requested.append(list(type_ids))
+                    raise RuntimeError("down")
+                return super()._fetch(type_ids)
+
+        # 1-2 answered (2 has no price), 3-4 failed on every provider, 5 answered.
+        providers = [
+            _FailingPart("a", {1: _price("1"), 5: _price("5")}),
+            _FailingPart("b", {1: _price("1"), 5: _price("5")}),
+        ]
+
+        prices, unfetched = fetch_prices_and_failures(range(1, 6), providers=providers, max_workers=1)
+
+        self.assertEqual(set(prices), {"1", "5"})
+        self.assertEqual(unfetched, {3, 4})
+
+    def test_no_providers_returns_nothing(self):
+        self.assertEqual(fetch_prices([1], providers=[]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from aasubsidy.contracts.pricing import (
+    PriceTimeline,
+    fitting_price_values,
+    parse_rounding_increment,
+    pricing_config_version,
+)
+
+CFG = {"basis": "sell", "pct": Decimal("0.10"), "m3": Decimal("250"), "incr": 250_000}
+
+
+class TestFittingPriceValues(unittest.TestCase):
+    def test_rounds_item_and_hull_basis_separately_before_markup(self):
+        values = fitting_price_values(
+            item_lines=[(2, Decimal("1000000.00"), Decimal("5")), (100, Decimal("150.50"), Decimal("0.01"))],
+            ship_price=Decimal("40100000.00"),
+            ship_volume=Decimal("10000"),
+            cfg=CFG,
+        )
+
+        self.assertEqual(values["items_basis_raw"], Decimal("2015050.00"))
+        self.assertEqual(values["ship_basis_raw"], Decimal("40100000.00"))
+        # 2,250,000 + 40,250,000
+        self.assertEqual(values["basis_total"], Decimal("42500000.00"))
+        self.assertEqual(values["total_volume_m3"], Decimal("10011.0000"))
+        # 4,250,000 + 2,502,750 = 6,752,750 -> 7,000,000
+        self.assertEqual(values["suggested"], Decimal("7000000.00"))
+
+    def test_missing_prices_and_volumes_count_as_zero(self):
+        values = fitting_price_values(item_lines=[(3, None, None)], ship_price=None, ship_volume=None, cfg=CFG)
+
+        self.assertEqual(values["basis_total"], Decimal("0.00"))
+        self.assertEqual(values["suggested"], Decimal("0.00"))
+
+    def test_zero_increment_falls_back_to_default(self):
+        values = fitting_price_values(item_lines=[], ship_price=Decimal("1"), ship_volume=None, cfg={**CFG, "incr": 0})
+
+        self.assertEqual(values["basis_total"], Decimal("250000.00"))
+
+
+class TestParseRoundingIncrement(unittest.TestCase):
+    def test_accepts_whole_isk_and_rejects_less_than_one(self):
+        self.assertEqual(parse_rounding_increment("100000"), 100_000)
+        self.assertEqual(parse_rounding_increment("1"), 1)
+        for raw in ("0", "-5", "abc"):
+            with self.subTest(raw=raw), self.assertRaises(ValueError):
+                parse_rounding_increment(raw)
+
+
+class TestPricingConfigVersion(unittest.TestCase):
+    def test_version_tracks_pricing_settings_only(self):
+        version = pricing_config_version(CFG)
+
+        self.assertEqual(version, pricing_config_version({**CFG, "pct": Decimal("0.1000"), "corporation_id": 5}))
+        self.assertNotEqual(version, pricing_config_version({**CFG, "basis": "buy"}))
+        self.assertNotEqual(version, pricing_config_version({**CFG, "incr": 100_000}))
+
+
+class TestPriceTimeline(unittest.TestCase):
+    START = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+    def setUp(self):
+        day = timedelta(days=1)
+        self.timeline = PriceTimeline(
+            [
+                (34, self.START + 2 * day, Decimal("6"), Decimal("7")),
+                (34, self.START, Decimal("4"), Decimal("5")),
+                (35, self.START + day, Decimal("10"), Decimal("11")),
+            ],
+            current={34: (Decimal("8"), Decimal("9")), 35: (Decimal("12"), Decimal("13")), 36: (Decimal("1"), Decimal("2"))},
+        )
+
+    def test_latest_row_at_or_before_the_time_wins(self):
+        self.assertEqual(self.timeline.price(34, self.START), Decimal("4"))
+        self.assertEqual(self.timeline.price(34, self.START + timedelta(days=1, hours=23)), Decimal("4"))
+        self.assertEqual(self.timeline.price(34, self.START + timedelta(days=2), "sell"), Decimal("7"))
+
+    def test_times_before_any_history_use_the_current_price(self):
+        self.assertEqual(self.timeline.price(35, self.START), Decimal("12"))
+        self.assertEqual(self.timeline.price(36, self.START + timedelta(days=9), "sell"), Decimal("2"))
+        self.assertEqual(self.timeline.price(34, None), Decimal("8"))
+        self.assertIsNone(self.timeline.price(37, self.START))
+
+
+if __name__ == "__main__":
+    unittest.main()
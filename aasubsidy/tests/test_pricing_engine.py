@@ -0,0 +1,100 @@
+import random
+import unittest
+from decimal import Decimal
+
+from aasubsidy.contracts import pricing_engine
+from aasubsidy.contracts.pricing_engine import FittingPriceMatrix
+
+CONFIGS = [
+    {"basis": "sell", "pct": Decimal("0.10"), "m3": Decimal("250"), "incr": 250_000},
+    {"basis": "buy", "pct": Decimal("0.1234"), "m3": Decimal("312.5"), "incr": 1},
+    {"basis": "sell", "pct": Decimal("0"), "m3": Decimal("0.0001"), "incr": 100_000},
+    {"basis": "buy", "pct": Decimal("0.05"), "m3": Decimal("0"), "incr": -5},
+    {"basis": "sell", "pct": None, "m3": None, "incr": None},
+]
+
+
+def _fleet(seed, fits=40, types=60):
+    rng = random.Random(seed)
+    prices = {
+        type_id: (Decimal(rng.randint(0, 10**9)) / 100, Decimal(rng.randint(0, 10**9)) / 100)
+        for type_id in range(1, types + 1)
+        if rng.random() > 0.1
+    }
+    volumes = {
+        type_id: rng.choice([0.01, 0.0025, 5.0, 10.0, 2500.0, 47000.0, 0.00125, rng.randint(0, 10**6) / 1000])
+        for type_id in range(1, types + 1)
+        if rng.random() > 0.05
+    }
+    ships = {fit_id: rng.choice([None, *range(1, 11)]) for fit_id in range(100, 100 + fits)}
+    lines_by_fit = {
+        fit_id: {rng.randint(1, types): rng.randint(0, 5000) for _ in range(rng.randint(0, 25))}
+        for fit_id in ships
+        if rng.random() > 0.05
+    }
+    return ships, lines_by_fit, prices, volumes
+
+
+@unittest.skipIf(pricing_engine.np is None, "numpy is not installed")
+class TestVectorisedPricing(unittest.TestCase):
+    def test_matches_decimal_pricing_exactly(self):
+        for seed in range(8):
+            matrix = FittingPriceMatrix(*_fleet(seed))
+            self.assertTrue(matrix.vectorised)
+            for cfg in CONFIGS:
+                with self.subTest(seed=seed, cfg=cfg):
+                    expected = matrix._decimal_values(cfg)
+                    actual = matrix.values(cfg)
+                    # Compare the strings too so the Decimal exponents agree.
+                    self.assertEqual(
+                        {fit_id: {k: str(v) for k, v in values.items()} for fit_id, values in actual.items()},
+                        {fit_id: {k: str(v) for k, v in values.items()} for fit_id, values in expected.items()},
+                    )
+
+    def test_rounding_ties(self):
+        # 0.00125 m3 rounds half-even to 0.0012 and 0.00375 to 0.0038; 0.5 cent markups round up.
+        matrix = FittingPriceMatrix(
+            {1: None, 2: None},
+            {1: {7: 1}, 2: {7: 3, 8: 1}},
+            {8: (Decimal("0.05"), Decimal("0.05"))},
+            {7: 0.00125},
+        )
+        cfg = {"basis": "sell", "pct": Decimal("0.1"), "m3": Decimal("0"), "incr": 1}
+
+        values = matrix.values(cfg)
+
+        self.assertTrue(matrix.vectorised)
+        self.assertEqual(values[1]["total_volume_m3"], Decimal("0.0012"))
+        self.assertEqual(values[2]["total_volume_m3"], Decimal("0.0038"))
+        self.assertEqual(values, matrix._decimal_values(cfg))
+
+    def test_sub_cent_prices_fall_back_to_decimal_pricing(self):
+        ships, lines_by_fit, prices, volumes = _fleet(1)
+        prices[1] = (Decimal("0.005"), Decimal("1"))
+
+        matrix = FittingPriceMatrix(ships, lines_by_fit, prices, volumes)
+
+        self.assertFalse(matrix.vectorised)
+        self.assertEqual(matrix.values(CONFIGS[0]), matrix._decimal_values(CONFIGS[0]))
+
+    def test_float_noise_volumes_fall_back_to_decimal_pricing(self):
+        ships, lines_by_fit, prices, volumes = _fleet(1)
+        volumes[1] = 0.1 + 0.2
+
+        matrix = FittingPriceMatrix(ships, lines_by_fit, prices, volumes)
+
+        self.assertFalse(matrix.vectorised)
+        self.assertEqual(matrix.values(CONFIGS[0]), matrix._decimal_values(CONFIGS[0]))
+
+    def test_negative_rates_fall_back_to_decimal_pricing(self):
+        matrix = FittingPriceMatrix(*_fleet(2))
+        cfg = {**CONFIGS[0], "pct": Decimal("-0.1")}
+
+        self.assertEqual(matrix.values(cfg), matrix._decimal_values(cfg))
+
+    def test_no_fits(self):
+        self.assertEqual(FittingPriceMatrix({}, {}, {}, {}).values(CONFIGS[0]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
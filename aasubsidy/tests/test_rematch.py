@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch
+
+from aasubsidy.contracts import rematch
+from aasubsidy.tests.helpers import DictCache
+
+
+class TestPendingRematch(unittest.TestCase):
+    def setUp(self):
+        self.backend = DictCache()
+        patcher = patch.object(rematch, "cache", self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scheduled_run_is_queued_until_the_task_counts_it(self):
+        rematch._set_run([7, 9], None)
+        self.assertEqual(rematch.pending_rematch(), rematch.RematchStatus(contracts=0, queued=True))
+
+        rematch.mark_rematch_running([9, 7], 12)
+        self.assertEqual(rematch.pending_rematch(), rematch.RematchStatus(contracts=12, queued=False))
+
+    def test_runs_add_up_and_finished_runs_drop_out(self):
+        rematch.mark_rematch_running([7], 12)
+        rematch.mark_rematch_running([8], 3)
+        self.assertEqual(rematch.pending_rematch().contracts, 15)
+
+        rematch.mark_rematch_finished([7])
+        self.assertEqual(rematch.pending_rematch(), rematch.RematchStatus(contracts=3, queued=False))
+        self.assertNotIn(rematch._RUNS_LOCK_KEY, self.backend.data)
+
+    def test_poll_is_one_cache_read(self):
+        rematch.mark_rematch_running([7], 12)
+        self.backend.round_trips = 0
+
+        rematch.pending_rematch()
+
+        self.assertEqual(self.backend.round_trips, 1)
+
+    def test_runs_left_by_a_killed_worker_expire(self):
+        with patch.object(rematch.time, "time", return_value=1000.0):
+            rematch.mark_rematch_running([7], 12)
+        with patch.object(rematch.time, "time", return_value=1000.0 + rematch.REMATCH_PENDING_TIMEOUT + 1):
+            self.assertEqual(rematch.pending_rematch(), rematch.RematchStatus(contracts=0, queued=False))
@@ -0,0 +1,108 @@
+import unittest
+from dataclasses import replace
+from decimal import Decimal
+
+from aasubsidy.benchmarks.generator import ContractNoise, DoctrineGenerator
+from aasubsidy.contracts.instrumentation import MatchStats
+from aasubsidy.contracts.matching import ContractItemData, ItemRuleData, _evaluate_contracts
+from aasubsidy.contracts.signatures import (
+    _exact_contract,
+    contract_signature,
+    definition_signature,
+    hull_signatures,
+)
+
+THRESHOLD = Decimal("70.00")
+EXACT = ContractNoise(
+    missing_rate=0, substitute_rate=0, quantity_drift_rate=0, extra_items=0, cargo_copies=0, wrong_hull_rate=0
+)
+
+
+def _evaluate(scenario, **kwargs):
+    return _evaluate_contracts(
+        list(scenario.contracts),
+        contract_items_map=scenario.contracts,
+        fit_definitions=scenario.definitions,
+        forced_fit_ids={},
+        latest_decisions={},
+        preview_fit_id=None,
+        close_match_threshold=THRESHOLD,
+        **kwargs,
+    )
+
+
+def _index(definitions):
+    by_hull = {}
+    for definition in definitions.values():
+        by_hull.setdefault(definition.ship_type_id, []).append(definition)
+    return {
+        signature: fit_id
+        for group in by_hull.values()
+        for fit_id, (signature, exclusive) in hull_signatures(group).items()
+        if exclusive
+    }
+
+
+class TestSignatures(unittest.TestCase):
+    def test_contract_and_fit_signatures_agree(self):
+        definition = DoctrineGenerator(3).doctrine(1)
+
+        contract = _exact_contract(definition)
+        contract[999] = ContractItemData(999, "Excluded", excluded_qty=5)
+
+        self.assertEqual(contract_signature(contract), definition_signature(definition))
+
+    def test_ignore_rules_are_not_part_of_the_signature(self):
+        definition = DoctrineGenerator(3).doctrine(1)
+        ignored = replace(definition, item_rules=[*definition.item_rules, ItemRuleData(999, "Ignored", rule_kind="ignore")])
+
+        self.assertEqual(definition_signature(ignored), definition_signature(definition))
+
+    def test_duplicate_fits_are_not_exclusive(self):
+        definition = DoctrineGenerator(3).doctrine(1)
+        twin = replace(definition, fitting_id=2, fitting_name="Twin")
+
+        self.assertEqual({exclusive for _, exclusive in hull_signatures([definition, twin]).values()}, {False})
+        self.assertTrue(hull_signatures([definition])[1][1])
+
+    def test_disabled_fits_are_not_exclusive(self):
+        definition = DoctrineGenerator(3).doctrine(1)
+        disabled = replace(definition, profile=replace(definition.profile, enabled=False))
+
+        self.assertFalse(hull_signatures([disabled])[1][1])
+
+
+class TestSignatureFastPath(unittest.TestCase):
+    def test_fast_path_reproduces_scored_results(self):
+        scenario = DoctrineGenerator(7, hulls=3).scenario(doctrines=9, contracts=40, noise=EXACT)
+        index = _index(scenario.definitions)
+        self.assertTrue(index)
+        stats = MatchStats()
+
+        fast = _evaluate(scenario, signature_index=index, stats=stats)
+        scored = _evaluate(scenario)
+
+        self.assertGreater(stats.counters["signature_matches"], 0)
+        for contract_id, result in scored.items():
+            with self.subTest(contract=contract_id):
+                self.assertEqual(
+                    (fast[contract_id].match_status, fast[contract_id].matched_fitting_id, fast[contract_id].score),
+                    (result.match_status, result.matched_fitting_id, result.score),
+                )
+                self.assertEqual(fast[contract_id].candidate_fit_ids, result.candidate_fit_ids)
+                if fast[contract_id].evidence.get("signature_match"):
+                    self.assertEqual(fast[contract_id].evidence["item_rows"], result.evidence["item_rows"])
+
+    def test_noisy_contracts_are_scored_normally(self):
+        scenario = DoctrineGenerator(7, hulls=3).scenario(
+            doctrines=9, contracts=40, noise=ContractNoise(extra_items=1, cargo_copies=0)
+        )
+        stats = MatchStats()
+
+        _evaluate(scenario, signature_index=_index(scenario.definitions), stats=stats)
+
+        self.assertNotIn("signature_matches", stats.counters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from decimal import Decimal
+
+from aasubsidy.benchmarks.generator import ContractNoise, DoctrineGenerator
+from aasubsidy.contracts.matching import CandidateMatch, MatchResultData, _evaluate_contracts
+from aasubsidy.contracts.simulation import apply_proposal, diff_results, parse_proposal
+
+THRESHOLD = Decimal("70.00")
+
+
+def _result(contract_id, status, fit_id=None, score="0.00"):
+    return MatchResultData(
+        contract_id=contract_id,
+        matched_fitting_id=fit_id,
+        matched_fitting_name=f"Fit {fit_id}" if fit_id else None,
+        match_source="auto",
+        match_status=status,
+        score=Decimal(score),
+        hard_failures=[],
+        warnings=[],
+        evidence={},
+    )
+
+
+class TestParseProposal(unittest.TestCase):
+    def test_parses_thresholds_flags_and_substitutions(self):
+        proposal = parse_proposal({
+            "close_match_threshold": "65",
+            "profiles": {"7": {"review_threshold": "75.5", "allow_meta_variants": True, "auto_match_threshold": ""}},
+            "substitutions": [{"fitting_id": 7, "expected_type_id": 100, "allowed_type_id": 101, "penalty_points": "0.5"}],
+        })
+
+        self.assertEqual(proposal.close_match_threshold, Decimal("65.00"))
+        self.assertEqual(proposal.profiles, {7: {"review_threshold": Decimal("75.50"), "allow_meta_variants": True}})
+        self.assertEqual(proposal.substitutions[7][0].allowed_type_id, 101)
+        self.assertEqual(proposal.substitutions[7][0].penalty_points, Decimal("0.50"))
+        self.assertEqual(proposal.changed_fit_ids, {7})
+
+    def test_rejects_invalid_values(self):
+        for payload in (
+            {"close_match_threshold": "150"},
+            {"profiles": {"x": {"review_threshold": "80"}}},
+            {"substitutions": [{"fitting_id": 1, "expected_type_id": 2, "rule_type": "specific"}]},
+            {"substitutions": [{"fitting_id": 1, "expected_type_id": 2, "rule_type": "anything"}]},
+        ):
+            with self.subTest(payload=payload), self.assertRaises(ValueError):
+                parse_proposal(payload)
+
+    def test_empty_payload_is_empty(self):
+        self.assertTrue(parse_proposal({"profiles": {"3": {}}}).is_empty)
+
+
+class TestApplyProposal(unittest.TestCase):
+    def test_only_changed_definitions_are_copied(self):
+        definitions = DoctrineGenerator(1).doctrines(3)
+        proposal = parse_proposal({
+            "profiles": {"1": {"review_threshold": "50"}},
+            "substitutions": [{"fitting_id": 2, "expected_type_id": 20_000, "rule_type": "group"}],
+        })
+
+        proposed = apply_proposal(definitions, proposal)
+
+        self.assertIs(proposed[3], definitions[3])
+        self.assertEqual(proposed[1].profile.review_threshold, Decimal("50.00"))
+        self.assertEqual(definitions[1].profile.review_threshold, Decimal("80.00"))
+        self.assertEqual(len(proposed[2].substitutions), len(definitions[2].substitutions) + 1)
+
+
+class TestDiffResults(unittest.TestCase):
+    def test_counts_transitions_and_fit_changes(self):
+        baseline = {
+            1: _result(1, "matched", 10, "98.00"),
+            2: _result(2, "needs_review", 10, "85.00"),
+            3: _result(3, "no_match", None, "40.00"),
+            4: _result(4, "matched", 10, "96.00"),
+        }
+        proposed = {
+            1: _result(1, "needs_review", 10, "90.00"),
+            2: _result(2, "needs_review", 11, "86.00"),
+            3: _result(3, "no_match", None, "45.00"),
+            4: _result(4, "matched", 10, "96.00"),
+        }
+
+        diff = diff_results(baseline, proposed)
+
+        self.assertEqual(diff["contracts"], 4)
+        self.assertEqual(diff["changed"], 2)
+        self.assertEqual(diff["score_changed"], 1)
+        self.assertEqual(diff["before"], {"matched": 2, "needs_review": 1, "no_match": 1})
+        self.assertEqual(diff["after"], {"matched": 1, "needs_review": 2, "no_match": 1})
+        self.assertEqual(
+            {(row["from"], row["to"]): row["count"] for row in diff["transitions"]},
+            {("matched", "needs_review"): 1, ("needs_review", "needs_review"): 1},
+        )
+        self.assertEqual([row["contract_id"] for row in diff["changed_contracts"]], [1, 2])
+
+
+class TestCandidateCache(unittest.TestCase):
+    def test_cached_candidates_reproduce_uncached_results(self):
+        scenario = DoctrineGenerator(5).scenario(doctrines=6, contracts=30, noise=ContractNoise(substitute_rate=0.3))
+        contract_ids = list(scenario.contracts)
+        kwargs = dict(
+            contract_items_map=scenario.contracts,
+            fit_definitions=scenario.definitions,
+            forced_fit_ids={},
+            latest_decisions={},
+            preview_fit_id=None,
+            close_match_threshold=THRESHOLD,
+        )
+        cache: dict[tuple[int, int], CandidateMatch] = {}
+
+        first = _evaluate_contracts(contract_ids, candidate_cache=cache, **kwargs)
+        self.assertTrue(cache)
+        second = _evaluate_contracts(contract_ids, candidate_cache=cache, **kwargs)
+        uncached = _evaluate_contracts(contract_ids, **kwargs)
+
+        for contract_id in contract_ids:
+            self.assertEqual(
+                (first[contract_id].match_status, first[contract_id].matched_fitting_id, first[contract_id].score),
+                (uncached[contract_id].match_status, uncached[contract_id].matched_fitting_id, uncached[contract_id].score),
+            )
+            self.assertEqual(second[contract_id].score, uncached[contract_id].score)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from decimal import Decimal
+
+from aasubsidy.contracts.stock import (
+    index_system_locations,
+    requests_by_system,
+    stock_by_system,
+    systems_from_snapshot,
+)
+
+
+class TestStockBySystem(unittest.TestCase):
+    SYSTEMS = {
+        1: {60003760, 30000142},  # a station and a whole solar system
+        2: {1022734985679},
+        3: {30000142},
+    }
+
+    def _reference(self, matched_fit_map, contract_locations, system_locations):
+        """The per-system scan this replaces."""
+        output = {}
+        for system_id, allowed in system_locations.items():
+            counts = {}
+            for contract_id, fit_id in matched_fit_map.items():
+                if contract_locations.get(contract_id, set()) & allowed:
+                    counts[fit_id] = counts.get(fit_id, 0) + 1
+            if counts:
+                output[system_id] = counts
+        return output
+
+    def test_index_lists_every_system_per_location(self):
+        self.assertEqual(index_system_locations(self.SYSTEMS)[30000142], {1, 3})
+
+    def test_matches_the_per_system_scan(self):
+        matched = {10: 501, 11: 501, 12: 502, 13: 503, 14: 501}
+        locations = {
+            10: {60003760, 30000142},
+            11: {1022734985679, 30000144},
+            12: {60003761, 30000142},
+            13: {60009999, 30000999},
+            14: {60003760},
+        }
+
+        result = stock_by_system(matched, locations, self.SYSTEMS)
+
+        self.assertEqual(result, self._reference(matched, locations, self.SYSTEMS))
+        self.assertEqual(result[1], {501: 2, 502: 1})
+
+    def test_contract_listed_twice_in_a_system_counts_once(self):
+        result = stock_by_system({10: 501}, {10: {60003760, 30000142}}, {1: {60003760, 30000142}})
+
+        self.assertEqual(result, {1: {501: 1}})
+
+    def test_requests_skip_rows_without_a_system(self):
+        rows = [(1, 501, 3), (1, 502, None), (None, 501, 9), (2, 501, 1)]
+
+        self.assertEqual(requests_by_system(rows), {1: {501: 3, 502: 0}, 2: {501: 1}})
+
+
+
+class TestSystemsFromSnapshot(unittest.TestCase):
+    def _row(self, system_id, fit_id, requested, available, doctrine_id=None):
+        return {
+            "system_id": system_id,
+            "system__name": f"System {system_id}",
+            "system__description": "",
+            "fitting_id": fit_id,
+            "fitting_name": f"Fit {fit_id}",
+            "doctrine_id": doctrine_id,
+            "doctrine_name": "Armor" if doctrine_id else "",
+            "stock_requested": requested,
+            "stock_available": available,
+            "stock_needed": max(requested - available, 0),
+            "volume_m3": Decimal("2500.50"),
+            "jita_sell_isk": 90_000_000,
+            "subsidy_isk": 10_000_000,
+            "alliance_purchase_isk": 100_000_000,
+        }
+
+    def test_groups_rows_by_system_with_totals(self):
+        systems = systems_from_snapshot([
+            self._row(1, 501, 5, 2, doctrine_id=7),
+            self._row(1, 502, 0, 1),
+            self._row(2, 501, 3, 4, doctrine_id=7),
+        ])
+
+        self.assertEqual([system["system_id"] for system in systems], [1, 2])
+        self.assertEqual(systems[0]["totals"], {"requested": 5, "available": 3, "needed": 3})
+        self.assertEqual(systems[1]["totals"], {"requested": 3, "available": 4, "needed": 0})
+        self.assertEqual(systems[0]["rows"][0]["doctrine"], "Armor")
+        self.assertEqual(systems[0]["rows"][1]["doctrine"], "No Doctrine")
+        self.assertEqual(systems[0]["rows"][0]["volume_m3"], 2500.5)
+
+    def test_empty_snapshot_has_no_systems(self):
+        self.assertEqual(systems_from_snapshot([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -83,3 +83,196 @@ class TestOptionalModelFieldSave(SimpleTestCase):
 
         self.assertFalse(result)
         audit.save.assert_not_called()
+
+
+class TestRematchContractsForFittings(SimpleTestCase):
+    @patch("aasubsidy.tasks.log_stats")
+    @patch("aasubsidy.contracts.stock.queue_stock_snapshot_refresh")
+    @patch("aasubsidy.tasks.match_contracts")
+    @patch("aasubsidy.contracts.rematch.mark_rematch_finished")
+    @patch("aasubsidy.contracts.rematch.mark_rematch_running")
+    @patch("aasubsidy.contracts.rematch.release_fittings")
+    @patch("aasubsidy.contracts.rematch.affected_contract_pks", return_value=[11, 12, 13])
+    def test_rematches_only_affected_contracts_in_chunks(
+        self, affected, release, running, finished, match_contracts, queue_refresh, log_stats
+    ):
+        result = tasks.rematch_contracts_for_fittings.run([7], chunk_size=2)
+
+        self.assertEqual(result, {"fitting_ids": [7], "matched": 3})
+        release.assert_called_once_with([7])
+        affected.assert_called_once_with([7])
+        running.assert_called_once_with([7], 3)
+        finished.assert_called_once_with([7])
+        self.assertEqual(
+            [call.args[0] for call in match_contracts.call_args_list],
+            [[11, 12], [13]],
+        )
+        # Every chunk accumulates into one collector, which is logged once for the run.
+        stats = {id(call.kwargs["stats"]) for call in match_contracts.call_args_list}
+        self.assertEqual(len(stats), 1)
+        log_stats.assert_called_once()
+        queue_refresh.assert_called_once_with()
+
+
+class TestRefreshDoctrineStockSnapshot(SimpleTestCase):
+    @patch("aasubsidy.contracts.stock.rebuild_stock_snapshot", return_value=4)
+    @patch("aasubsidy.contracts.stock.release_refresh")
+    def test_reopens_the_debounce_window_before_rebuilding(self, release, rebuild):
+        self.assertEqual(tasks.refresh_doctrine_stock_snapshot.run(), {"rows": 4})
+        release.assert_called_once_with()
+        rebuild.assert_called_once_with()
+
+
+class _FakeContractQuerySet:
+    def __init__(self, pks):
+        self.pks = sorted(pks)
+
+    def filter(self, id__gt):
+        return _FakeContractQuerySet([pk for pk in self.pks if pk > id__gt])
+
+    def values_list(self, field, flat=False):
+        return self.pks
+
+
+@patch("aasubsidy.contracts.stock.queue_stock_snapshot_refresh")
+class TestBackfillDoctrineMatchesSlice(SimpleTestCase):
+    def _checkpoint(self, last_pk=0, processed=0):
+        return Mock(
+            signature="a" * 64,
+            filters={"corporation_id": 1},
+            status_counts={},
+            source_counts={},
+            last_pk=last_pk,
+            processed=processed,
+            completed_at=None,
+        )
+
+    def _match(self, pks, persist=True, stats=None):
+        return {pk: Mock(match_status="matched", match_source="auto") for pk in pks}
+
+    @patch("aasubsidy.contracts.backfill.backfill_queryset", return_value=_FakeContractQuerySet([3, 5, 8, 9, 12]))
+    @patch("aasubsidy.contracts.backfill.next_open_checkpoint")
+    def test_processes_a_bounded_slice_after_the_checkpoint(self, next_open, queryset, queue_refresh):
+        checkpoint = self._checkpoint(last_pk=3, processed=1)
+        next_open.return_value = checkpoint
+
+        with patch("aasubsidy.contracts.matching.match_contracts", side_effect=self._match) as match_contracts:
+            result = tasks.backfill_doctrine_matches_slice.run(max_contracts=3, chunk_size=2)
+
+        self.assertEqual(result["processed"], 3)
+        self.assertEqual(result["last_pk"], 9)
+        self.assertFalse(result["completed"])
+        self.assertEqual([call.args[0] for call in match_contracts.call_args_list], [[5, 8], [9]])
+        self.assertEqual(checkpoint.last_pk, 9)
+        self.assertEqual(checkpoint.processed, 4)
+        self.assertEqual(json.loads(checkpoint.status_counts_json), {"matched": 3})
+        self.assertIsNone(checkpoint.completed_at)
+        self.assertEqual(checkpoint.save.call_count, 2)
+
+    @patch("aasubsidy.contracts.backfill.backfill_queryset", return_value=_FakeContractQuerySet([3, 5]))
+    @patch("aasubsidy.contracts.backfill.next_open_checkpoint")
+    def test_marks_checkpoint_complete_when_keyset_is_exhausted(self, next_open, queryset, queue_refresh):
+        checkpoint = self._checkpoint(last_pk=3, processed=1)
+        next_open.return_value = checkpoint
+
+        with patch("aasubsidy.contracts.matching.match_contracts", side_effect=self._match):
+            result = tasks.backfill_doctrine_matches_slice.run(max_contracts=10, chunk_size=5)
+
+        self.assertEqual(result["processed"], 1)
+        self.assertTrue(result["completed"])
+        self.assertIsNotNone(checkpoint.completed_at)
+
+    @patch("aasubsidy.contracts.backfill.next_open_checkpoint", return_value=None)
+    def test_noop_without_open_checkpoint(self, next_open, queue_refresh):
+        self.assertEqual(
+            tasks.backfill_doctrine_matches_slice.run(),
+            {"checkpoint": None, "processed": 0, "completed": False},
+        )
+        queue_refresh.assert_not_called()
+
+
+class TestPriceRefresh(SimpleTestCase):
+    def test_only_moved_prices_are_returned(self):
+        from decimal import Decimal
+
+        from aasubsidy.helpers import services_update
+
+        rows = [
+            (1, 34, Decimal("5.00"), Decimal("5.50")),
+            (2, 35, Decimal("10.00"), Decimal("11.00")),
+            (3, 36, Decimal("7.00"), Decimal("8.00")),
+        ]
+        market_data = {
+            "34": {"buy": {"percentile": "5.001"}, "sell": {"percentile": "5.5"}},
+            "35": {"buy": {"percentile": "10.00"}, "sell": {"percentile": "12.25"}},
+        }
+
+        changed, changed_type_ids, missing = services_update._price_changes(rows, market_data)
+
+        self.assertEqual(changed_type_ids, [35, 36])
+        self.assertEqual([(price.pk, price.sell) for price in changed], [(2, Decimal("12.25")), (3, Decimal("0.00"))])
+        self.assertEqual(missing, 1)
+
+    @patch("aasubsidy.helpers.services_update.seed_price_rows", return_value=0)
+    @patch("aasubsidy.helpers.services_update.fetch_prices_and_failures", return_value=({}, {34, 35}))
+    @patch("aasubsidy.helpers.services_update.SubsidyItemPrice")
+    @patch("aasubsidy.helpers.services_update.hot_price_type_ids", return_value={34, 35})
+    def test_unanswered_chunks_keep_stored_prices(self, hot, price_model, fetch, seed):
+        price_model.objects.filter.return_value.order_by.return_value.values_list.return_value = [34, 35]
+
+        from aasubsidy.helpers import services_update
+
+        result = services_update.update_all_prices.run(include_cold=False)
+
+        self.assertEqual(result["failed_chunks"], 1)
+        self.assertEqual(result["updated"], 0)
+        price_model.objects.bulk_update.assert_not_called()
+        seed.assert_called_once_with([34, 35], chunk_size=services_update.PRICE_CHUNK_SIZE)
+
+    @patch("aasubsidy.contracts.stock.queue_stock_snapshot_refresh")
+    @patch("aasubsidy.contracts.price_cache.bump_price_version")
+    @patch("aasubsidy.contracts.pricing.rebuild_fitting_price_snapshots", return_value=1)
+    @patch("aasubsidy.helpers.services_update.record_price_history")
+    @patch("aasubsidy.helpers.services_update.transaction")
+    @patch("aasubsidy.helpers.services_update.seed_price_rows", return_value=0)
+    @patch("aasubsidy.helpers.services_update.fetch_prices_and_failures")
+    @patch("aasubsidy.helpers.services_update.SubsidyItemPrice")
+    @patch("aasubsidy.helpers.services_update.hot_price_type_ids", return_value={34, 35})
+    def test_changed_prices_are_recorded_in_history(
+        self, hot, price_model, fetch, seed, transaction, history, rebuild, bump, queue_refresh
+    ):
+        from decimal import Decimal
+
+        from aasubsidy.helpers import services_update
+
+        price_model.side_effect = lambda **kwargs: Mock(**kwargs)
+        price_model.objects.filter.return_value.order_by.return_value.values_list.return_value = [34, 35]
+        price_model.objects.filter.return_value.values_list.return_value = [
+            (1, 34, Decimal("5.00"), Decimal("5.50")),
+            (2, 35, Decimal("10.00"), Decimal("11.00")),
+        ]
+        fetch.return_value = (
+            {
+                "34": {"buy": {"percentile": "5.00"}, "sell": {"percentile": "5.50"}},
+                "35": {"buy": {"percentile": "10.00"}, "sell": {"percentile": "12.25"}},
+            },
+            set(),
+        )
+
+        result = services_update.update_all_prices.run(include_cold=False)
+
+        self.assertEqual(result["changed_type_ids"], [35])
+        rows, recorded_at = history.call_args.args
+        self.assertEqual(list(rows), [(35, Decimal("10.00"), Decimal("12.25"))])
+        self.assertIsNotNone(recorded_at)
+        bump.assert_called_once_with()
+        queue_refresh.assert_called_once_with()
+
+    @patch("aasubsidy.helpers.services_update.seed_price_rows", return_value=1)
+    def test_ensure_prices_for_types_seeds_only_given_types(self, seed):
+        from aasubsidy.helpers import services_update
+
+        result = services_update.ensure_prices_for_types.run([34, 35, 35, 0])
+
+        seed.assert_called_once_with({34, 35})
+        self.assertEqual(result, {"created": 1, "skipped": 1})
@@ -0,0 +1,30 @@
+import unittest
+
+from aasubsidy.helpers.versioned_cache import VersionedCache
+from aasubsidy.tests.helpers import DictCache
+
+
+class TestVersionedCache(unittest.TestCase):
+    def setUp(self):
+        self.backend = DictCache()
+        self.cache = VersionedCache("test:version", "UNUSED_TIMEOUT_SETTING")
+
+    def test_entries_from_another_version_are_not_returned(self):
+        version, fetched = self.cache.read(["a"], self.backend)
+        self.assertEqual(fetched, {})
+        self.cache.write(version, {"a": 1, "b": None}, self.backend, timeout=60)
+
+        self.assertEqual(self.cache.read(["a", "b", "c"], self.backend), (version, {"a": 1, "b": None}))
+
+        bumped = self.cache.bump(self.backend)
+        self.assertEqual(self.cache.read(["a", "b"], self.backend), (bumped, {}))
+        self.assertEqual(self.cache.read_at(["a"], version, self.backend), {"a": 1})
+
+    def test_version_is_none_until_first_use(self):
+        self.assertIsNone(self.cache.version(self.backend))
+        version, _ = self.cache.read([], self.backend)
+        self.assertEqual(self.cache.version(self.backend), version)
+
+
+if __name__ == "__main__":
+    unittest.main()
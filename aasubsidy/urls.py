@@ -1,8 +1,9 @@
 from django.urls import path
 from .contracts import view as v
 from .contracts.doctrines import DoctrineRequestsAdminView, DoctrineRequestsDetailView, location_search
-from .contracts.admin.settings import SubsidySettingsAdminView
+from .contracts.admin.settings import SubsidySettingsAdminView, SubsidySettingsPreviewView
 from .contracts.admin import rule_exceptions as admin_views
+from .contracts.admin.simulation import SimulationAdminView, SimulationRunView
 
 app_name = "aasubsidy"
 
@@ -30,6 +31,9 @@ urlpatterns = [
     path("admin/doctrines/", DoctrineRequestsAdminView.as_view(), name="doctrine_admin"),
     path("admin/doctrines/<str:doctrine_name>/", DoctrineRequestsDetailView.as_view(), name="doctrine_detail"),
     path("admin/subsidy-settings/", SubsidySettingsAdminView.as_view(), name="subsidy_settings"),
+    path("admin/subsidy-settings/preview/", SubsidySettingsPreviewView.as_view(), name="subsidy_settings_preview"),
+    path("admin/simulation/", SimulationAdminView.as_view(), name="simulation"),
+    path("admin/simulation/run/", SimulationRunView.as_view(), name="simulation_run"),
     path("admin/rule-exceptions/", admin_views.RuleExceptionsView.as_view(), name="rule_exceptions"),
     path("admin/rule-exceptions/delete/", admin_views.DeleteRuleView.as_view(), name="delete_rule"),
     path("api/location-search/", location_search, name="location_search"),